@@ -0,0 +1,274 @@
+"""
+Smart Conveyor — reproducible scaling benchmark.
+
+產生合成產線 (N lines × M waypoints × K boards)，在 in-memory USD stage 上
+以固定 dt 逐幀驅動 spawner 與 PCBConveyorController，量測：
+  - start_sim 延遲 (ms)
+  - 每幀 spawner / controller 時間 (ms, mean / p50 / p95 / max)
+  - 每幀 USD 變更數 (Usd.Notice.ObjectsChanged 的 changed-info + resync 路徑數)
+
+結果寫成 JSON；可與先前存下的 baseline 比較，超過門檻即以非零狀態結束。
+
+需在 Kit 內執行（headless 即可），例如：
+    kit --no-window --ext-folder <repo>/exts --enable tw.zin.smart_conveyor \\
+        --exec "benchmark.py --lines 1 10 50 --waypoints 10 --boards 20 --out bench.json --baseline bench_base.json"
+
+除 run_scenario() 之外的函式皆為純 Python，不需要 Omniverse。
+"""
+
+import argparse
+import itertools
+import json
+import math
+import platform
+import sys
+import time
+from typing import Dict, List, Optional, Sequence
+
+# 與 baseline 比較的指標：(JSON 路徑, 說明)
+COMPARED_METRICS = [
+    ("start_sim_ms", "start_sim latency"),
+    ("spawner_ms.p50", "spawner p50"),
+    ("spawner_ms.p95", "spawner p95"),
+    ("controller_ms.p50", "controller p50"),
+    ("controller_ms.p95", "controller p95"),
+    ("usd_changes_per_frame.mean", "USD changes / frame"),
+]
+# 低於此絕對差值的變動視為量測雜訊，不算 regression
+NOISE_FLOOR = {"ms": 0.05, "count": 0.5}
+
+
+def generate_line_waypoints(num_waypoints: int, spacing: float = 100.0, pause: float = 0.0,
+                            y_offset: float = 0.0) -> List[dict]:
+    """產生一條蛇行 (zig-zag) 路徑，讓每段都有轉向以觸發 Slerp。"""
+    waypoints = []
+    for i in range(max(2, num_waypoints)):
+        x = spacing * (i // 2 + (i % 2))
+        y = y_offset + (spacing * 0.5 if i % 2 else 0.0)
+        waypoints.append({
+            "name": f"WP_{i}",
+            "pos": [float(x), float(y), 0.0],
+            "rot": [0.0, 0.0, 90.0 * (i % 4)],
+            "pause": pause if 0 < i < num_waypoints - 1 else 0.0,
+        })
+    return waypoints
+
+
+def path_travel_time(waypoints: Sequence[dict], speed: float) -> float:
+    total = 0.0
+    for i in range(1, len(waypoints)):
+        a, b = waypoints[i - 1]["pos"], waypoints[i]["pos"]
+        total += math.sqrt(sum((b[k] - a[k]) ** 2 for k in range(3))) / speed
+        total += waypoints[i].get("pause", 0.0)
+    return total
+
+
+def dispatch_interval_for_boards(waypoints: Sequence[dict], speed: float, boards: int) -> float:
+    """選擇發車間隔，使穩態時每條線約有 boards 片板子在線上。"""
+    return max(path_travel_time(waypoints, speed) / max(1, boards), 1e-3)
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Linear-interpolated percentile (pct 0–100)。"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100.0
+    lo, hi = int(math.floor(k)), int(math.ceil(k))
+    if lo == hi:
+        return float(ordered[lo])
+    return float(ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo))
+
+
+def summarize(values: Sequence[float]) -> Dict[str, float]:
+    if not values:
+        return {"mean": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+    return {
+        "mean": sum(values) / len(values),
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "max": float(max(values)),
+    }
+
+
+def _lookup(result: dict, dotted: str) -> Optional[float]:
+    cur = result
+    for key in dotted.split("."):
+        if not isinstance(cur, dict) or key not in cur:
+            return None
+        cur = cur[key]
+    return cur if isinstance(cur, (int, float)) else None
+
+
+def compare_to_baseline(results: dict, baseline: dict, threshold: float) -> List[dict]:
+    """回傳所有超過 threshold (例如 0.2 = +20%) 的 regression。只比較兩邊都有的 scenario。"""
+    base_by_name = {s["name"]: s for s in baseline.get("scenarios", [])}
+    regressions = []
+    for scenario in results.get("scenarios", []):
+        base = base_by_name.get(scenario["name"])
+        if not base:
+            continue
+        for metric, label in COMPARED_METRICS:
+            cur_v, base_v = _lookup(scenario, metric), _lookup(base, metric)
+            if cur_v is None or base_v is None:
+                continue
+            floor = NOISE_FLOOR["ms"] if "_ms" in metric else NOISE_FLOOR["count"]
+            if cur_v - base_v > floor and cur_v > base_v * (1.0 + threshold):
+                regressions.append({
+                    "scenario": scenario["name"],
+                    "metric": metric,
+                    "label": label,
+                    "baseline": base_v,
+                    "current": cur_v,
+                    "ratio": cur_v / base_v if base_v > 0 else math.inf,
+                })
+    return regressions
+
+
+def scenario_name(lines: int, waypoints: int, boards: int) -> str:
+    return f"N{lines}_M{waypoints}_K{boards}"
+
+
+# ==========================================
+# Kit-side runner
+# ==========================================
+class _FrameEvent:
+    """Minimal stand-in for the carb update event: only payload["dt"] is read."""
+    def __init__(self, dt):
+        self.payload = {"dt": dt}
+
+
+def run_scenario(lines: int, waypoints: int, boards: int, frames: int = 300, warmup: int = 120,
+                 dt: float = 1.0 / 60.0, speed: float = 50.0) -> dict:
+    """在新的 in-memory stage 上跑一個 scenario（需要 Kit）。"""
+    import omni.usd
+    from pxr import Usd, UsdGeom, Tf
+    from smart_conveyor.extension import SmartConveyorExtension
+
+    ctx = omni.usd.get_context()
+    ctx.new_stage()
+    stage = ctx.get_stage()
+    UsdGeom.Xform.Define(stage, "/World")
+    templates = []
+    for n in range(lines):
+        path = f"/World/Bench_Templates/PCB_{n:03d}"
+        UsdGeom.Xform.Define(stage, path)
+        UsdGeom.Cube.Define(stage, f"{path}/Board").GetSizeAttr().Set(10.0)
+        templates.append(path)
+
+    wps = generate_line_waypoints(waypoints)
+    interval = dispatch_interval_for_boards(wps, speed, boards)
+
+    ext = SmartConveyorExtension()
+    ext._ensure_models()
+    ext._multi_line_models = []
+    ext._enable_inline_model.set_value(True)
+    ext._prim_path_model.set_value(", ".join(templates))
+    ext._speed_model.set_value(speed)
+    ext._initial_delay_model.set_value(0.0)
+    ext._dispatch_interval_model.set_value(interval)
+    ext._loop_model.set_value(False)
+    ext._reverse_model.set_value(False)
+    ext._waypoint_models = [
+        ext._make_wp_model(*wp["pos"], *wp["rot"], wp["pause"], wp["name"]) for wp in wps
+    ]
+
+    t0 = time.perf_counter()
+    ext.start_sim()
+    start_sim_ms = (time.perf_counter() - t0) * 1000.0
+    # 由 benchmark 逐幀驅動，不依賴 Kit 的 update loop
+    ext._spawner_sub = None
+
+    changes = [0]
+
+    def _on_objects_changed(notice, sender):
+        changes[0] += len(notice.GetChangedInfoOnlyPaths()) + len(notice.GetResyncedPaths())
+
+    listener = Tf.Notice.Register(Usd.Notice.ObjectsChanged, _on_objects_changed, stage)
+
+    event = _FrameEvent(dt)
+    spawner_ms, controller_ms, usd_changes, active = [], [], [], []
+    try:
+        for frame in range(warmup + frames):
+            changes[0] = 0
+            t0 = time.perf_counter()
+            ext._on_spawner_update(event)
+            t1 = time.perf_counter()
+            for ctrl in list(ext.controllers):
+                ctrl._update_sub = None
+                ctrl._on_update(event)
+            t2 = time.perf_counter()
+            if frame >= warmup:
+                spawner_ms.append((t1 - t0) * 1000.0)
+                controller_ms.append((t2 - t1) * 1000.0)
+                usd_changes.append(changes[0])
+                active.append(len(ext.controllers))
+    finally:
+        listener.Revoke()
+        ext.stop_sim()
+
+    return {
+        "name": scenario_name(lines, waypoints, boards),
+        "lines": lines,
+        "waypoints": waypoints,
+        "boards": boards,
+        "frames": frames,
+        "dt": dt,
+        "dispatch_interval": interval,
+        "start_sim_ms": start_sim_ms,
+        "spawner_ms": summarize(spawner_ms),
+        "controller_ms": summarize(controller_ms),
+        "usd_changes_per_frame": summarize(usd_changes),
+        "active_boards": summarize(active),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Smart Conveyor scaling benchmark.")
+    parser.add_argument("--lines", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--waypoints", type=int, nargs="+", default=[10])
+    parser.add_argument("--boards", type=int, nargs="+", default=[10])
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=120)
+    parser.add_argument("--dt", type=float, default=1.0 / 60.0)
+    parser.add_argument("--out", default="conveyor_bench.json")
+    parser.add_argument("--baseline", help="previous result JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown ratio (0.2 = +20%%)")
+    args = parser.parse_args(argv)
+
+    scenarios = []
+    for n, m, k in itertools.product(args.lines, args.waypoints, args.boards):
+        res = run_scenario(n, m, k, frames=args.frames, warmup=args.warmup, dt=args.dt)
+        print(f"[bench] {res['name']}: start_sim {res['start_sim_ms']:.2f} ms | "
+              f"spawner p95 {res['spawner_ms']['p95']:.3f} ms | controller p95 {res['controller_ms']['p95']:.3f} ms | "
+              f"USD changes/frame {res['usd_changes_per_frame']['mean']:.1f}")
+        scenarios.append(res)
+
+    results = {
+        "meta": {"python": platform.python_version(), "platform": platform.platform(),
+                 "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")},
+        "scenarios": scenarios,
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"[bench] Results written to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.threshold)
+        for r in regressions:
+            print(f"[bench] REGRESSION {r['scenario']} {r['label']}: "
+                  f"{r['baseline']:.3f} -> {r['current']:.3f} (x{r['ratio']:.2f})")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    _code = main()
+    try:
+        import omni.kit.app
+        omni.kit.app.get_app().post_quit(_code)
+    except ImportError:
+        sys.exit(_code)
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+Smart Conveyor — offline config linter / conflict analyzer.
+
+純 Python（不需要 Omniverse / pxr）檢查 Smart Conveyor JSON 設定檔，
+讓錯誤設定在 commit 前就被擋下，而不是按下 Play 才發現。
+
+檢查項目：
+  - 速度 / 發車間隔為 0、負數或 NaN
+  - 少於 2 個 waypoint、waypoint 座標含 NaN、零長度線段、重複座標
+  - 發車間隔 < 第一段線段的通過時間（前後板子重疊）
+  - 找不到的 template prim（需提供 --stage 或 known_prims）與 multi-line config_file
+  - 多條產線共用同一個 template（會生成到同一組 Spawned 路徑）
+  - trigger_zones 區間超出路徑、指向不存在的 waypoint
+
+Usage:
+    python config_lint.py <config_dir_or_file> [...] [--stage scene.usd] [--jobs N] [--strict] [--json]
+
+Exit status: 0 = 沒有 error；1 = 至少一個 error（--strict 時 warning 也算）；2 = 參數錯誤。
+"""
+
+import argparse
+import glob
+import json
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Set
+
+SEVERITY_ERROR = "error"
+SEVERITY_WARNING = "warning"
+SEVERITY_INFO = "info"
+_SEVERITY_ORDER = {SEVERITY_ERROR: 0, SEVERITY_WARNING: 1, SEVERITY_INFO: 2}
+
+# 與 SmartConveyorExtension 的預設值保持一致
+DEFAULT_SPEED = 50.0
+DEFAULT_DISPATCH_INTERVAL = 3.0
+POSITION_EPSILON = 1e-5
+
+
+def make_issue(severity: str, code: str, path: str, message: str, file: str = "") -> dict:
+    """建立一筆檢查結果。path 為 JSON-path 形式的位置 (例如 $.waypoints[2].pos)。"""
+    return {"severity": severity, "code": code, "path": path, "message": message, "file": file}
+
+
+def split_prim_paths(raw) -> List[str]:
+    """與 start_sim 相同的規則切割 prim path 字串（逗號或空白分隔）。"""
+    if isinstance(raw, (list, tuple)):
+        raw = " ".join(str(p) for p in raw)
+    return [p.strip() for p in str(raw or "").replace(",", " ").split() if p.strip()]
+
+
+def normalize_config(cfg: dict) -> dict:
+    """Normalise nested format to flat keys (pure-Python 版 _parse_config_dict，座標保留為 list)。"""
+    out = dict(cfg)
+    if isinstance(out.get("global_settings"), dict):
+        gs = out["global_settings"]
+        out.setdefault("speed",             gs.get("speed", DEFAULT_SPEED))
+        out.setdefault("initial_delay",     gs.get("initial_delay", 1.0))
+        out.setdefault("dispatch_interval", gs.get("dispatch_interval", DEFAULT_DISPATCH_INTERVAL))
+    if isinstance(out.get("behavior"), dict):
+        bh = out["behavior"]
+        out.setdefault("reverse",        bh.get("reverse", False))
+        out.setdefault("loop",           bh.get("loop", False))
+        out.setdefault("end_visibility", bh.get("end_visibility", False))
+    if "target_pcb_paths" in out and "prim_paths" not in out:
+        out["prim_paths"] = ", ".join(str(p) for p in out["target_pcb_paths"])
+    return out
+
+
+def _to_float(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _as_vec3(value) -> Optional[List[float]]:
+    if not isinstance(value, (list, tuple)) or len(value) < 3:
+        return None
+    vec = [_to_float(v) for v in value[:3]]
+    if any(v is None for v in vec):
+        return None
+    return vec
+
+
+def _dist(a: List[float], b: List[float]) -> float:
+    return math.sqrt(sum((a[i] - b[i]) ** 2 for i in range(3)))
+
+
+def _check_positive(cfg: dict, key: str, default: float, issues: list, file: str) -> Optional[float]:
+    raw = cfg.get(key, default)
+    val = _to_float(raw)
+    if val is None or math.isnan(val) or math.isinf(val):
+        issues.append(make_issue(SEVERITY_ERROR, f"invalid-{key.replace('_', '-')}", f"$.{key}",
+                                 f"{key} must be a finite number, got {raw!r}", file))
+        return None
+    if val <= 0:
+        issues.append(make_issue(SEVERITY_ERROR, f"invalid-{key.replace('_', '-')}", f"$.{key}",
+                                 f"{key} must be > 0, got {val}", file))
+        return None
+    return val
+
+
+def check_waypoints(waypoints, issues: list, file: str = "", base: str = "$.waypoints") -> List[Optional[List[float]]]:
+    """檢查 waypoint 座標與線段，回傳解析後的座標（無效者為 None）。"""
+    if not isinstance(waypoints, list):
+        issues.append(make_issue(SEVERITY_ERROR, "invalid-waypoints", base, "waypoints must be a list", file))
+        return []
+    if len(waypoints) < 2:
+        issues.append(make_issue(SEVERITY_ERROR, "too-few-waypoints", base,
+                                 f"need at least 2 waypoints, got {len(waypoints)}", file))
+
+    positions = []
+    for i, wp in enumerate(waypoints):
+        wp_path = f"{base}[{i}]"
+        if not isinstance(wp, dict):
+            issues.append(make_issue(SEVERITY_ERROR, "invalid-waypoint", wp_path, "waypoint must be an object", file))
+            positions.append(None)
+            continue
+        pos = _as_vec3(wp.get("pos"))
+        if pos is None:
+            issues.append(make_issue(SEVERITY_ERROR, "invalid-position", f"{wp_path}.pos",
+                                     f"pos must be [x, y, z] numbers, got {wp.get('pos')!r}", file))
+        elif any(math.isnan(v) or math.isinf(v) for v in pos):
+            issues.append(make_issue(SEVERITY_ERROR, "nan-position", f"{wp_path}.pos",
+                                     f"pos contains NaN/Inf: {pos}", file))
+            pos = None
+        if "rot" in wp and _as_vec3(wp.get("rot")) is None:
+            issues.append(make_issue(SEVERITY_ERROR, "invalid-rotation", f"{wp_path}.rot",
+                                     f"rot must be [x, y, z] numbers, got {wp.get('rot')!r}", file))
+        pause = _to_float(wp.get("pause", 0.0))
+        if pause is None or math.isnan(pause) or pause < 0:
+            issues.append(make_issue(SEVERITY_ERROR, "invalid-pause", f"{wp_path}.pause",
+                                     f"pause must be a number >= 0, got {wp.get('pause')!r}", file))
+        positions.append(pos)
+
+    # 零長度線段（相鄰點重疊）與重複座標（非相鄰點重疊）：Play 時會失敗，視為 error
+    seen = {}
+    for i, pos in enumerate(positions):
+        if pos is None:
+            continue
+        if i > 0 and positions[i - 1] is not None and _dist(positions[i - 1], pos) < POSITION_EPSILON:
+            issues.append(make_issue(SEVERITY_ERROR, "zero-length-segment", f"{base}[{i}]",
+                                     f"segment {i - 1}->{i} has zero length", file))
+            continue
+        key = tuple(round(v / POSITION_EPSILON) for v in pos)
+        if key in seen:
+            issues.append(make_issue(SEVERITY_ERROR, "duplicate-position", f"{base}[{i}].pos",
+                                     f"same position as {base}[{seen[key]}]", file))
+        else:
+            seen[key] = i
+    return positions
+
+
+def check_dispatch_overlap(waypoints, positions, speed: float, dispatch_interval: float,
+                           issues: list, file: str = "", base: str = "$") -> None:
+    """發車間隔必須大於第一段線段的通過時間（含到站停留），否則下一片板子會疊在上一片上。"""
+    if len(positions) < 2 or positions[0] is None or positions[1] is None:
+        return
+    seg_len = _dist(positions[0], positions[1])
+    pause = _to_float(waypoints[1].get("pause", 0.0)) or 0.0
+    clear_time = seg_len / speed + max(pause, 0.0)
+    if dispatch_interval < clear_time:
+        issues.append(make_issue(
+            SEVERITY_ERROR, "dispatch-overlap", f"{base}.dispatch_interval",
+            f"dispatch_interval {dispatch_interval:g}s < {clear_time:.3f}s needed to clear the first segment "
+            f"({seg_len:g} units @ {speed:g}/s + {pause:g}s pause); boards will overlap", file))
+
+
+def check_trigger_zones(zones, waypoints, positions, issues: list, file: str = "", base: str = "$.trigger_zones") -> None:
+    """檢查 trigger_zones：區間必須落在路徑長度內，waypoint 型 zone 必須指向存在的 waypoint 名稱。"""
+    if not isinstance(zones, list):
+        issues.append(make_issue(SEVERITY_ERROR, "invalid-trigger-zones", base, "trigger_zones must be a list", file))
+        return
+    path_len = None
+    if positions and all(p is not None for p in positions):
+        path_len = sum(_dist(positions[i - 1], positions[i]) for i in range(1, len(positions)))
+    wp_names = {str(wp.get("name")) for wp in waypoints if isinstance(wp, dict) and wp.get("name")}
+    seen_names = set()
+    for idx, zone in enumerate(zones):
+        z_path = f"{base}[{idx}]"
+        if not isinstance(zone, dict):
+            issues.append(make_issue(SEVERITY_ERROR, "invalid-trigger-zone", z_path, "trigger zone must be an object", file))
+            continue
+        name = zone.get("name")
+        if name in seen_names:
+            issues.append(make_issue(SEVERITY_WARNING, "duplicate-zone-name", f"{z_path}.name",
+                                     f"zone name '{name}' is used more than once", file))
+        seen_names.add(name)
+        if "waypoint" in zone:
+            if str(zone["waypoint"]) not in wp_names:
+                issues.append(make_issue(SEVERITY_ERROR, "unknown-zone-waypoint", f"{z_path}.waypoint",
+                                         f"waypoint '{zone['waypoint']}' does not exist", file))
+            continue
+        start, end = _to_float(zone.get("start")), _to_float(zone.get("end", zone.get("start")))
+        if start is None or end is None or math.isnan(start) or math.isnan(end):
+            issues.append(make_issue(SEVERITY_ERROR, "invalid-zone-range", z_path,
+                                     "zone needs numeric 'start'/'end' or a 'waypoint'", file))
+        elif end < start:
+            issues.append(make_issue(SEVERITY_WARNING, "inverted-zone-range", z_path,
+                                     f"zone end {end:g} < start {start:g}", file))
+        elif path_len is not None and (start > path_len + POSITION_EPSILON or end < 0):
+            issues.append(make_issue(SEVERITY_WARNING, "zone-outside-path", z_path,
+                                     f"zone [{start:g}, {end:g}] lies outside the path (length {path_len:g})", file))
+
+
+def _resolve_config_file(config_file: str, owner_file: str) -> str:
+    path = config_file.replace("\\", "/")
+    if owner_file and not os.path.isabs(path) and "://" not in path and not (len(path) > 1 and path[1] == ":"):
+        path = os.path.join(os.path.dirname(owner_file), path)
+    return path
+
+
+def analyze_config(cfg, file: str = "", known_prims: Optional[Set[str]] = None) -> dict:
+    """分析單一 conveyor 設定 (已 json.loads 的 dict)。
+
+    Returns:
+        {"issues": [issue, ...], "templates": {template_path: [json_path, ...]}}
+    """
+    issues = []
+    templates: Dict[str, List[str]] = {}
+    if not isinstance(cfg, dict):
+        issues.append(make_issue(SEVERITY_ERROR, "invalid-root", "$", "config root must be a JSON object", file))
+        return {"issues": issues, "templates": templates}
+
+    cfg = normalize_config(cfg)
+    speed = _check_positive(cfg, "speed", DEFAULT_SPEED, issues, file)
+    dispatch = _check_positive(cfg, "dispatch_interval", DEFAULT_DISPATCH_INTERVAL, issues, file)
+
+    waypoints = cfg.get("waypoints", [])
+    positions = check_waypoints(waypoints, issues, file)
+    if speed and dispatch and isinstance(waypoints, list):
+        check_dispatch_overlap(waypoints, positions, speed, dispatch, issues, file)
+    if "trigger_zones" in cfg and isinstance(waypoints, list):
+        check_trigger_zones(cfg["trigger_zones"], waypoints, positions, issues, file)
+
+    # --- Inline templates ---
+    prim_key = "target_pcb_paths" if "target_pcb_paths" in cfg and isinstance(cfg["target_pcb_paths"], list) else "prim_paths"
+    for idx, tpl in enumerate(split_prim_paths(cfg.get("prim_paths", ""))):
+        templates.setdefault(tpl, []).append(f"$.{prim_key}[{idx}]")
+
+    # --- Multi-line references ---
+    multi_lines = cfg.get("multi_lines", [])
+    if not isinstance(multi_lines, list):
+        issues.append(make_issue(SEVERITY_ERROR, "invalid-multi-lines", "$.multi_lines", "multi_lines must be a list", file))
+        multi_lines = []
+    for m_idx, m_cfg in enumerate(multi_lines):
+        m_base = f"$.multi_lines[{m_idx}]"
+        if not isinstance(m_cfg, dict) or not m_cfg.get("enabled", True):
+            continue
+        m_templates = split_prim_paths(m_cfg.get("paths", ""))
+        config_file = str(m_cfg.get("config_file", "") or "").strip()
+        if not m_templates and not config_file:
+            continue  # UI 預留的空白列
+        if m_templates and not config_file:
+            issues.append(make_issue(SEVERITY_ERROR, "missing-config-file", f"{m_base}.config_file",
+                                     "line has template paths but no config_file; it will be skipped at Play", file))
+        elif config_file and not m_templates:
+            issues.append(make_issue(SEVERITY_WARNING, "missing-templates", f"{m_base}.paths",
+                                     "line has a config_file but no template paths; it will be skipped at Play", file))
+        if config_file:
+            resolved = _resolve_config_file(config_file, file)
+            if "://" in resolved:
+                issues.append(make_issue(SEVERITY_INFO, "remote-config-file", f"{m_base}.config_file",
+                                         f"remote config '{config_file}' cannot be checked offline", file))
+            elif not os.path.isfile(resolved):
+                issues.append(make_issue(SEVERITY_ERROR, "config-file-not-found", f"{m_base}.config_file",
+                                         f"config_file '{config_file}' does not exist", file))
+        if m_cfg.get("override", False):
+            for key in ("speed", "dispatch_interval"):
+                val = _to_float(m_cfg.get(key))
+                if val is None or math.isnan(val) or val <= 0:
+                    issues.append(make_issue(SEVERITY_ERROR, f"invalid-{key.replace('_', '-')}", f"{m_base}.{key}",
+                                             f"override {key} must be > 0, got {m_cfg.get(key)!r}", file))
+        for p_idx, tpl in enumerate(m_templates):
+            templates.setdefault(tpl, []).append(f"{m_base}.paths[{p_idx}]")
+
+    # --- Template 檢查 ---
+    for tpl, locations in templates.items():
+        if not tpl.startswith("/"):
+            issues.append(make_issue(SEVERITY_ERROR, "invalid-template-path", locations[0],
+                                     f"template '{tpl}' is not an absolute prim path", file))
+        elif known_prims is not None and tpl not in known_prims:
+            issues.append(make_issue(SEVERITY_ERROR, "template-not-found", locations[0],
+                                     f"template '{tpl}' does not exist on the stage", file))
+        if len(locations) > 1:
+            issues.append(make_issue(SEVERITY_ERROR, "shared-template", locations[1],
+                                     f"template '{tpl}' is used by {len(locations)} lines ({', '.join(locations)}); "
+                                     f"their spawned instances and template visibility will conflict", file))
+
+    return {"issues": issues, "templates": templates}
+
+
+def analyze_file(filepath: str, known_prims: Optional[Set[str]] = None) -> dict:
+    """讀取並分析單一 JSON 檔，回傳與 analyze_config 相同格式。"""
+    try:
+        with open(filepath, "r", encoding="utf-8") as f:
+            cfg = json.load(f)
+    except (OSError, UnicodeDecodeError) as e:
+        return {"issues": [make_issue(SEVERITY_ERROR, "unreadable-file", "$", str(e), filepath)], "templates": {}}
+    except ValueError as e:
+        return {"issues": [make_issue(SEVERITY_ERROR, "invalid-json", "$", str(e), filepath)], "templates": {}}
+    return analyze_config(cfg, filepath, known_prims)
+
+
+def find_cross_file_conflicts(results: Dict[str, dict]) -> List[dict]:
+    """找出不同設定檔之間共用同一個 template 的衝突。"""
+    owners: Dict[str, List[tuple]] = {}
+    for filepath, result in results.items():
+        for tpl, locations in result.get("templates", {}).items():
+            owners.setdefault(tpl, []).append((filepath, locations[0]))
+    issues = []
+    for tpl, users in owners.items():
+        if len(users) < 2:
+            continue
+        for filepath, location in users:
+            others = ", ".join(os.path.basename(f) for f, _ in users if f != filepath)
+            issues.append(make_issue(SEVERITY_WARNING, "shared-template-across-files", location,
+                                     f"template '{tpl}' is also used by {others}", filepath))
+    return issues
+
+
+def collect_config_files(targets: Iterable[str]) -> List[str]:
+    files = []
+    for target in targets:
+        if os.path.isdir(target):
+            files.extend(sorted(glob.glob(os.path.join(target, "**", "*.json"), recursive=True)))
+        else:
+            files.append(target)
+    return files
+
+
+def load_stage_prim_paths(stage_path: str) -> Set[str]:
+    """用 pxr 開啟 USD 並收集所有 prim path（僅 --stage 時需要 pxr）。"""
+    from pxr import Usd
+    stage = Usd.Stage.Open(stage_path)
+    if not stage:
+        raise RuntimeError(f"cannot open stage '{stage_path}'")
+    return {str(p.GetPath()) for p in stage.TraverseAll()}
+
+
+def lint_paths(targets: Iterable[str], known_prims: Optional[Set[str]] = None, jobs: Optional[int] = None) -> List[dict]:
+    """平行分析所有設定檔，回傳依檔案與嚴重度排序的 issue 清單。"""
+    files = collect_config_files(targets)
+    results: Dict[str, dict] = {}
+    if jobs is not None:
+        jobs = max(1, jobs)     # --jobs 0 / 負數視為 1 (ProcessPoolExecutor 不接受 0)
+    if len(files) > 1 and jobs != 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            for filepath, result in zip(files, pool.map(analyze_file, files, [known_prims] * len(files))):
+                results[filepath] = result
+    else:
+        for filepath in files:
+            results[filepath] = analyze_file(filepath, known_prims)
+
+    issues = [issue for result in results.values() for issue in result["issues"]]
+    issues.extend(find_cross_file_conflicts(results))
+    issues.sort(key=lambda i: (i["file"], _SEVERITY_ORDER.get(i["severity"], 9), i["path"]))
+    return issues
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Lint Smart Conveyor JSON configs.")
+    parser.add_argument("targets", nargs="+", help="config .json files or folders")
+    parser.add_argument("--stage", help="USD file used to verify that template prims exist (requires pxr)")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--strict", action="store_true", help="treat warnings as errors")
+    parser.add_argument("--json", action="store_true", help="print issues as JSON")
+    args = parser.parse_args(argv)
+
+    known_prims = None
+    if args.stage:
+        try:
+            known_prims = load_stage_prim_paths(args.stage)
+        except Exception as e:
+            print(f"[config_lint] {e}", file=sys.stderr)
+            return 2
+
+    files = collect_config_files(args.targets)
+    if not files:
+        print("[config_lint] No config files found.", file=sys.stderr)
+        return 2
+
+    issues = lint_paths(files, known_prims, args.jobs)
+    if args.json:
+        print(json.dumps(issues, indent=2, ensure_ascii=False))
+    else:
+        for i in issues:
+            print(f"{i['file']}: {i['severity'].upper()} {i['path']} [{i['code']}] {i['message']}")
+        n_err = sum(1 for i in issues if i["severity"] == SEVERITY_ERROR)
+        n_warn = sum(1 for i in issues if i["severity"] == SEVERITY_WARNING)
+        print(f"Checked {len(files)} file(s): {n_err} error(s), {n_warn} warning(s).")
+
+    failing = {SEVERITY_ERROR, SEVERITY_WARNING} if args.strict else {SEVERITY_ERROR}
+    return 1 if any(i["severity"] in failing for i in issues) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -55,6 +55,19 @@ except Exception as _e:
         @property
         def widget(self): return self._btn
 
+from .trigger_zones import ZoneIndex, ZoneTracker, build_trigger_zones, cumulative_arc_lengths
+
+# ── Trigger zone events (message bus) ────────────────────────────────────────
+# 其他 extension 可用 get_message_bus_event_stream().create_subscription_to_pop_by_type(...) 訂閱
+ZONE_ENTER_EVENT = carb.events.type_from_string("tw.zin.smart_conveyor.zone_enter")
+ZONE_EXIT_EVENT = carb.events.type_from_string("tw.zin.smart_conveyor.zone_exit")
+
+# Station events: a board pausing at a waypoint (arrived / pause progress / left)
+STATION_ARRIVED_EVENT = carb.events.type_from_string("tw.zin.smart_conveyor.station_arrived")
+STATION_PROGRESS_EVENT = carb.events.type_from_string("tw.zin.smart_conveyor.station_progress")
+STATION_LEFT_EVENT = carb.events.type_from_string("tw.zin.smart_conveyor.station_left")
+STATION_PROGRESS_STEP = 0.1   # fraction of the pause between station_progress events
+
 # ==========================================
 # Core Logic: PCB Conveyor Controller
 # ==========================================
@@ -99,11 +112,23 @@ class PCBConveyorController:
         self.timer = 0.0
         self.state = "INITIAL_DELAY" if self.initial_delay > 0 else "MOVING"
         self.direction = 1
+        self._station_pos = None
+        self._station_steps = 0
+
+        # Trigger zones: shared per-line ZoneIndex, per-board tracker keyed on arc length
+        self.line_id = config.get("line_id", "")
+        self.arc_lengths = cumulative_arc_lengths(self.waypoints)
+        self.distance = 0.0
+        zone_index = config.get("zone_index")
+        self._zone_tracker = ZoneTracker(zone_index, self._emit_zone_event) if zone_index else None
+        # World units per path unit; the template parent does not change during a run, so read it once
+        self.path_scale = self._world_to_path_scale() if self._zone_tracker else 1.0
 
         if self.waypoints:
             init_pos, init_rot = self._get_target_world_transform(self.waypoints[0]["pos"], self.waypoints[0]["rot"])
             self._apply_world_transform(init_pos, init_rot)
             self._set_visibility(True)
+            self._update_distance(0.0)
 
         # Register frame update event subscription (named for Profiler visibility)
         self._update_sub = omni.kit.app.get_app().get_update_event_stream().create_subscription_to_pop(
@@ -138,6 +163,48 @@ class PCBConveyorController:
         
         return target_world_pos, world_rot_mat.ExtractRotation()
 
+    def _emit_zone_event(self, kind, zone, distance):
+        event_type = ZONE_ENTER_EVENT if kind == "enter" else ZONE_EXIT_EVENT
+        omni.kit.app.get_app().get_message_bus_event_stream().push(event_type, payload={
+            "line_id": self.line_id,
+            "zone": zone["name"],
+            "prim_path": self.prim_path,
+            "distance": float(distance),
+        })
+
+    def _emit_station_event(self, event_type):
+        wp = self.waypoints[self.current_wp_idx]
+        omni.kit.app.get_app().get_message_bus_event_stream().push(event_type, payload={
+            "line_id": self.line_id,
+            "prim_path": self.prim_path,
+            "waypoint": wp.get("name", ""),
+            "waypoint_index": self.current_wp_idx,
+            "pos": self._station_pos,
+            "pause": float(wp.get("pause", 0.0)),
+            "elapsed": float(self.timer),
+        })
+
+    def _enter_pause(self):
+        """Start pausing at the current waypoint and announce the board's arrival at that station."""
+        self.state = "PAUSING"
+        self.timer = 0.0
+        wp = self.waypoints[self.current_wp_idx]
+        pos, _ = self._get_target_world_transform(wp["pos"], wp["rot"])
+        self._station_pos = [float(pos[0]), float(pos[1]), float(pos[2])]
+        self._station_steps = 0
+        self._emit_station_event(STATION_ARRIVED_EVENT)
+
+    def _update_distance(self, distance):
+        """Record the board's arc-length position and fire any zone enter/exit events."""
+        self.distance = distance
+        if self._zone_tracker:
+            self._zone_tracker.update(distance)
+
+    def _world_to_path_scale(self):
+        # Waypoints (and trigger zones) are authored in template-parent space; movement runs in world space
+        scale = self._get_ref_matrix().GetRow3(0).GetLength()
+        return scale if scale > 1e-9 else 1.0
+
     def _get_or_create_op(self, op_type):
         # USD best practice: check for existing op before adding a new one
         for op in self.xformable.GetOrderedXformOps():
@@ -224,8 +291,16 @@ class PCBConveyorController:
             current_wp = self.waypoints[self.current_wp_idx]
             pause_time = current_wp.get("pause", 0.0)
             if self.timer >= pause_time:
+                self.timer = pause_time
+                self._emit_station_event(STATION_LEFT_EVENT)
                 self.timer = 0.0
                 self._advance_waypoint()
+            else:
+                # Coarse progress events let listeners correct their own extrapolation
+                steps = int(self.timer / pause_time / STATION_PROGRESS_STEP)
+                if steps > self._station_steps:
+                    self._station_steps = steps
+                    self._emit_station_event(STATION_PROGRESS_EVENT)
 
         elif self.state == "MOVING":
             # 必須在同一個「世界座標系」下計算向量，才不會因為父層旋轉導致方向偏移
@@ -248,8 +323,9 @@ class PCBConveyorController:
             if distance < 1e-5:
                 self._apply_world_transform(target_world_pos, target_world_rot)
                 self.current_wp_idx = next_idx
+                self._update_distance(self.arc_lengths[next_idx])
                 if target_wp.get("pause", 0.0) > 0:
-                    self.state = "PAUSING"
+                    self._enter_pause()
                 else:
                     self._advance_waypoint()
                 return
@@ -259,8 +335,9 @@ class PCBConveyorController:
             if step >= distance:
                 self._apply_world_transform(target_world_pos, target_world_rot)
                 self.current_wp_idx = next_idx
+                self._update_distance(self.arc_lengths[next_idx])
                 if target_wp.get("pause", 0.0) > 0:
-                    self.state = "PAUSING"
+                    self._enter_pause()
                 else:
                     self._advance_waypoint()
             else:
@@ -303,6 +380,10 @@ class PCBConveyorController:
                 interp_rot = Gf.Rotation(interp_q)
                 self._apply_world_transform(new_world_pos, interp_rot)
 
+                if self._zone_tracker:
+                    remaining = (distance - step) / self.path_scale
+                    self._update_distance(self.arc_lengths[next_idx] - self.direction * remaining)
+
     def _advance_waypoint(self):
         if (self.direction == 1 and self.current_wp_idx == len(self.waypoints) - 1) or \
            (self.direction == -1 and self.current_wp_idx == 0):
@@ -322,6 +403,9 @@ class PCBConveyorController:
             self.current_wp_idx = 0
             self.direction = 1
             self.state = "MOVING"
+            if self._zone_tracker:
+                self._zone_tracker.reset(0.0)
+            self._update_distance(0.0)
             carb.log_info("[tw.zin.smart_conveyor] Loop: restarting from waypoint 0.")
         else:
             if not self.end_visibility:
@@ -340,6 +424,12 @@ class PCBConveyorController:
         # Safely unsubscribe from the update event stream
         if hasattr(self, '_update_sub'):
             self._update_sub = None
+        # A board removed mid-pause still leaves its station
+        if self.state == "PAUSING" and getattr(self, "_station_pos", None) is not None:
+            self._emit_station_event(STATION_LEFT_EVENT)
+        # A recycled/stopped board leaves every zone it is still inside (STOPPED boards stay put)
+        if self.state != "STOPPED" and getattr(self, "_zone_tracker", None):
+            self._zone_tracker.reset()
         if self.state != "STOPPED":
             self.state = "FINISHED"
         carb.log_info("[tw.zin.smart_conveyor] Controller stopped.")
@@ -368,6 +458,7 @@ class SmartConveyorExtension(omni.ext.IExt):
         self._active_spawners = []     # List of active spawner configs
         self._inactive_pools = {}      # dict mapping line_id -> list of idle prim paths
         self._stage_sub = None         # Stage event subscription
+        self._trigger_zones = []       # Raw "trigger_zones" entries of the inline line config
         # UI data models are created lazily by _ensure_models()
 
     def on_startup(self, ext_id):
@@ -1803,6 +1894,7 @@ class SmartConveyorExtension(omni.ext.IExt):
             "loop":           self._loop_model.get_value_as_bool(),
             "end_visibility": self._visible_at_end_model.get_value_as_bool(),
             "waypoints":      waypoints,
+            "trigger_zones":  list(getattr(self, "_trigger_zones", [])),
         }
 
     def _on_window_visibility_changed(self, visible):
@@ -1901,6 +1993,9 @@ class SmartConveyorExtension(omni.ext.IExt):
             cfg = dict(config_dict)
             cfg["initial_delay"] = 0.0
             cfg["template_path"] = tpl_path
+            cfg["line_id"] = line_id
+            zones = build_trigger_zones(config_dict.get("trigger_zones", []), config_dict["waypoints"])
+            cfg["zone_index"] = ZoneIndex(zones) if zones else None
             
             self._active_spawners.append({
                 "template_path": tpl_path,
@@ -2444,6 +2539,7 @@ class SmartConveyorExtension(omni.ext.IExt):
                 p = wp.get("pos", [0, 0, 0])
                 r = wp.get("rot", [0, 0, 0])
                 converted.append({
+                    "name": wp.get("name", f"WP_{len(converted)}"),
                     "pos": Gf.Vec3d(float(p[0]), float(p[1]), float(p[2])),
                     "rot": Gf.Vec3d(float(r[0]), float(r[1]), float(r[2])),
                     "pause": float(wp.get("pause", 0.0))
@@ -2481,6 +2577,8 @@ class SmartConveyorExtension(omni.ext.IExt):
                 self._loop_model.set_value(bool(cfg["loop"]))
             if "end_visibility" in cfg:
                 self._visible_at_end_model.set_value(bool(cfg["end_visibility"]))
+            # Trigger zones have no editor yet: keep them so they round-trip through Save/USD
+            self._trigger_zones = list(cfg.get("trigger_zones", []))
             if "waypoints" in cfg and cfg["waypoints"]:
                 self._save_undo_snapshot()
                 self._waypoint_models = []
@@ -2592,6 +2690,7 @@ class SmartConveyorExtension(omni.ext.IExt):
         self._reverse_model.set_value(False)
         self._loop_model.set_value(False)
         self._visible_at_end_model.set_value(False)
+        self._trigger_zones = []
         
         self._waypoint_models = [
             self._make_wp_model(0,   0, 0, 0, 0, 0, 0.0, "S"),
@@ -0,0 +1,157 @@
+"""
+Smart Conveyor — arc-length trigger zones (photo-eye style sensors).
+
+每條產線的 trigger zone 以「沿路徑的累積距離 (arc length)」定義，
+存放在排序好的區間索引 (ZoneIndex) 中；每一幀只需用板子本幀走過的
+距離範圍查詢一次（O(log n + k)），再由 ZoneTracker 比對出 enter / exit 事件。
+
+Config 格式 (conveyor JSON 的 "trigger_zones")：
+    {"name": "AOI",    "start": 120.0, "end": 260.0}   # arc-length 區間
+    {"name": "Unload", "waypoint": "E"}                 # 位於 waypoint 上的點狀 sensor
+    {"name": "Buffer", "waypoint": "B", "length": 40.0} # 從 waypoint 起算長度
+
+本模組不依賴 Omniverse，可直接在測試中使用。
+"""
+
+import bisect
+import math
+from typing import Callable, List, Optional, Sequence
+
+
+def cumulative_arc_lengths(waypoints: Sequence) -> List[float]:
+    """回傳每個 waypoint 的累積路徑長度；waypoints 可為 {"pos": ...} dict 或座標序列。"""
+    arc = []
+    total = 0.0
+    prev = None
+    for wp in waypoints:
+        pos = wp["pos"] if isinstance(wp, dict) else wp
+        if prev is not None:
+            total += math.sqrt(sum((float(pos[i]) - float(prev[i])) ** 2 for i in range(3)))
+        arc.append(total)
+        prev = pos
+    return arc
+
+
+def build_trigger_zones(zone_cfgs: Sequence[dict], waypoints: Sequence) -> List[dict]:
+    """把 config 內的 trigger_zones 轉成 {"name", "start", "end"}，無效的項目略過。"""
+    if not zone_cfgs:
+        return []
+    arc = cumulative_arc_lengths(waypoints)
+    wp_arc = {}
+    for i, wp in enumerate(waypoints):
+        if isinstance(wp, dict) and wp.get("name"):
+            wp_arc.setdefault(str(wp["name"]), arc[i])
+
+    zones = []
+    for idx, zc in enumerate(zone_cfgs):
+        if not isinstance(zc, dict):
+            continue
+        name = str(zc.get("name", f"Zone_{idx}"))
+        try:
+            if "waypoint" in zc:
+                if str(zc["waypoint"]) not in wp_arc:
+                    continue
+                start = wp_arc[str(zc["waypoint"])]
+                end = start + float(zc.get("length", 0.0))
+            else:
+                start = float(zc["start"])
+                end = float(zc.get("end", start))
+        except (KeyError, TypeError, ValueError):
+            continue
+        if math.isnan(start) or math.isnan(end):
+            continue
+        if end < start:
+            start, end = end, start
+        zones.append({"name": name, "start": start, "end": end})
+    return zones
+
+
+class ZoneIndex:
+    """Static interval index over trigger zones.
+
+    Zones 依 start 排序後以隱式平衡二元樹 (中點為根) 存放，每個節點記錄
+    子樹內最大的 end，查詢與 [lo, hi] 重疊的 zone 為 O(log n + k)。
+    """
+
+    def __init__(self, zones: Sequence[dict]):
+        self.zones = sorted(zones, key=lambda z: (z["start"], z["end"]))
+        self._starts = [z["start"] for z in self.zones]
+        self._ends = [z["end"] for z in self.zones]
+        self._max_end = [0.0] * len(self.zones)
+        self._build(0, len(self.zones))
+
+    def __len__(self):
+        return len(self.zones)
+
+    def _build(self, lo: int, hi: int) -> float:
+        if lo >= hi:
+            return -math.inf
+        mid = (lo + hi) // 2
+        m = max(self._ends[mid], self._build(lo, mid), self._build(mid + 1, hi))
+        self._max_end[mid] = m
+        return m
+
+    def query(self, lo: float, hi: float) -> List[int]:
+        """回傳所有與閉區間 [lo, hi] 重疊之 zone 的索引。"""
+        if lo > hi:
+            lo, hi = hi, lo
+        out = []
+        # start > hi 的 zone 不可能重疊：bisect 找出上限，樹走訪時略過右側
+        self._query(0, len(self.zones), lo, bisect.bisect_right(self._starts, hi), out)
+        return out
+
+    def _query(self, a: int, b: int, lo: float, limit: int, out: list) -> None:
+        if a >= b or a >= limit:
+            return
+        mid = (a + b) // 2
+        if self._max_end[mid] < lo:
+            return
+        self._query(a, mid, lo, limit, out)
+        if mid < limit:
+            if self._ends[mid] >= lo:
+                out.append(mid)
+            self._query(mid + 1, b, lo, limit, out)
+
+    def stab(self, s: float) -> List[int]:
+        return self.query(s, s)
+
+
+class ZoneTracker:
+    """追蹤單一板子目前所在的 zone，依本幀走過的範圍產生 enter / exit 事件。"""
+
+    def __init__(self, index: ZoneIndex, emit: Callable[[str, dict, float], None]):
+        self._index = index
+        self._emit = emit
+        self._inside = set()
+        self._last_s: Optional[float] = None
+
+    @property
+    def inside(self) -> List[str]:
+        return [self._index.zones[i]["name"] for i in sorted(self._inside)]
+
+    def update(self, s: float) -> None:
+        """板子目前位於 arc length s；與上一幀之間經過的 zone 都會觸發事件。"""
+        prev = s if self._last_s is None else self._last_s
+        self._last_s = s
+        lo, hi = (prev, s) if prev <= s else (s, prev)
+        now_inside = set()
+        for i in self._index.query(lo, hi):
+            zone = self._index.zones[i]
+            if zone["start"] <= s <= zone["end"]:
+                now_inside.add(i)
+            elif i not in self._inside:
+                # 高速或低 FPS 時整個 zone 在一幀內被穿越：仍補發 enter + exit
+                self._emit("enter", zone, s)
+                self._emit("exit", zone, s)
+        for i in sorted(self._inside - now_inside):
+            self._emit("exit", self._index.zones[i], s)
+        for i in sorted(now_inside - self._inside):
+            self._emit("enter", self._index.zones[i], s)
+        self._inside = now_inside
+
+    def reset(self, s: Optional[float] = None) -> None:
+        """離開所有 zone（例如 Loop 瞬移回起點或板子被回收）。"""
+        for i in sorted(self._inside):
+            self._emit("exit", self._index.zones[i], self._last_s if s is None else s)
+        self._inside = set()
+        self._last_s = s
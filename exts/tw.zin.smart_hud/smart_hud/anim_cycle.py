@@ -0,0 +1,232 @@
+"""
+Smart HUD — cached animation-cycle detection.
+
+動畫週期偵測拆成兩段：
+  1. 主執行緒：解析 animationTarget、找出動畫來源 (animation source) —
+     也就是組成目標 prim 的 layer spec (layer, spec path, layer offset)，
+     只讀 prim stack 與關係，不讀任何屬性值。
+  2. 對每個來源以 Sdf layer 層級查詢 (Layer.Traverse + ListTimeSamplesForPath)
+     取得 time sample 範圍，不經過 composed attribute。Sdf layer 不能在被寫入的同時
+     讀取：被參照的 asset layer 在背景執行緒掃描；stage 自己 layer stack 內的 layer
+     (root / sublayer，輸送帶與 HUD 編輯每幀都在寫) 在主執行緒掃描。
+
+每個來源的結果以 (layer identifier, spec path) 快取：
+  - 被參照的 layer：記錄 layer 的 change counter，Sdf.Notice.LayersDidChange 後失效
+  - layer stack 內的 layer：每幀都會被修改，不看 layer 層級的通知；只有
+    Usd.Notice.ObjectsChanged 回報的路徑落在來源 spec 子樹內 (或 resync 了它的祖先)
+    時才失效 (note_paths_changed)
+同一個來源 (例如多個 HUD 共用的角色動畫) 只會被掃描一次。
+
+除 find_animation_sources() 需要 pxr.Usd 之外，皆只依賴 pxr.Sdf。
+"""
+
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from pxr import Sdf
+
+SKEL_RELATIONSHIPS = ("skel:animationSource", "skel:skeleton")
+
+
+class AnimationSource:
+    """One layer spec contributing to an animated prim: (layer, spec path) plus its time offset."""
+
+    __slots__ = ("layer", "path", "offset")
+
+    def __init__(self, layer, path, offset=None):
+        self.layer = layer
+        self.path = Sdf.Path(path)
+        self.offset = offset if offset is not None else Sdf.LayerOffset()
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        return (self.layer.identifier, str(self.path))
+
+    def __repr__(self):
+        return f"AnimationSource({self.layer.identifier!r}, {self.path})"
+
+
+def _prim_stack_with_offsets(prim):
+    if hasattr(prim, "GetPrimStackWithLayerOffsets"):
+        return prim.GetPrimStackWithLayerOffsets()
+    return [(spec, None) for spec in prim.GetPrimStack()]
+
+
+def find_animation_sources(stage, prim) -> List[AnimationSource]:
+    """收集 prim 子樹的動畫來源 (主執行緒，不讀屬性值)。
+
+    新的 layer 只會在 composition arc (reference / payload) 出現，因此只對
+    根 prim、帶有 arc 的子孫、以及 skel 關係指向的 prim 讀取 prim stack；
+    同一 layer 內被祖先 spec 涵蓋的路徑會被去除。
+    """
+    from pxr import Usd
+
+    roots = [prim]
+    try:
+        for p in Usd.PrimRange(prim):
+            if p != prim and (p.HasAuthoredReferences() or p.HasPayload()):
+                roots.append(p)
+            for rel_name in SKEL_RELATIONSHIPS:
+                rel = p.GetRelationship(rel_name)
+                if rel and rel.IsValid():
+                    for target in rel.GetTargets():
+                        src_prim = stage.GetPrimAtPath(target)
+                        if src_prim and src_prim.IsValid():
+                            roots.append(src_prim)
+    except Exception:
+        pass
+
+    by_layer: Dict[str, List[AnimationSource]] = {}
+    for root in roots:
+        for spec, offset in _prim_stack_with_offsets(root):
+            source = AnimationSource(spec.layer, spec.path, offset)
+            by_layer.setdefault(source.layer.identifier, []).append(source)
+
+    sources = []
+    for layer_sources in by_layer.values():
+        layer_sources.sort(key=lambda s: s.path.pathElementCount)
+        kept: List[AnimationSource] = []
+        for s in layer_sources:
+            if not any(s.path.HasPrefix(k.path) for k in kept):
+                kept.append(s)
+        sources.extend(kept)
+    return sources
+
+
+def scan_layer_time_samples(layer, root_path) -> dict:
+    """以 layer 層級查詢掃描 root_path 子樹內所有屬性的 time sample 範圍 (layer 時間)。
+
+    可在背景執行緒呼叫。回傳 {"start", "end", "attrs_scanned", "samples_found",
+    "layer_start", "layer_end"}；沒有動畫時 start / end 為 None。
+    """
+    stats = {"start": None, "end": None, "attrs_scanned": 0, "samples_found": 0,
+             "layer_start": None, "layer_end": None}
+    root_path = Sdf.Path(root_path)
+
+    def _visit(path):
+        if not path.IsPropertyPath():
+            return
+        stats["attrs_scanned"] += 1
+        if layer.GetNumTimeSamplesForPath(path) > 1:
+            times = layer.ListTimeSamplesForPath(path)
+            if times:
+                stats["samples_found"] += 1
+                lo, hi = float(times[0]), float(times[-1])
+                stats["start"] = lo if stats["start"] is None else min(stats["start"], lo)
+                stats["end"] = hi if stats["end"] is None else max(stats["end"], hi)
+
+    if layer.GetPrimAtPath(root_path):
+        layer.Traverse(root_path, _visit)
+    if layer.HasStartTimeCode() and layer.HasEndTimeCode():
+        stats["layer_start"] = float(layer.startTimeCode)
+        stats["layer_end"] = float(layer.endTimeCode)
+    return stats
+
+
+def combine_source_stats(sources: Sequence[AnimationSource], stats: Sequence[dict], root_layer_identifier: str = "") -> dict:
+    """合併多個來源的掃描結果並套用各自的 layer offset，回傳 stage 時間的週期範圍。
+
+    status 為 "Success" (有 time samples)、"Success (Layer)" (只有被參照 layer 的
+    start/endTimeCode) 或 "Failed"。
+    """
+    start = end = None
+    layer_range = None
+    attrs_scanned = samples_found = 0
+    for source, st in zip(sources, stats):
+        attrs_scanned += st["attrs_scanned"]
+        samples_found += st["samples_found"]
+        if st["start"] is not None:
+            a, b = source.offset * st["start"], source.offset * st["end"]
+            a, b = min(a, b), max(a, b)
+            start = a if start is None else min(start, a)
+            end = b if end is None else max(end, b)
+        elif (layer_range is None and st["layer_start"] is not None
+              and source.layer.identifier != root_layer_identifier
+              and st["layer_end"] > st["layer_start"]):
+            layer_range = (source.offset * st["layer_start"], source.offset * st["layer_end"])
+
+    result = {"attrs_scanned": attrs_scanned, "samples_found": samples_found}
+    if start is not None and end > start:
+        result.update(start=start, end=end, status="Success")
+    elif layer_range is not None:
+        result.update(start=layer_range[0], end=layer_range[1], status="Success (Layer)", samples_found=0)
+    else:
+        result.update(start=None, end=None, status="Failed")
+    return result
+
+
+Version = Tuple[int, int]    # (layer change count, source change count)
+
+
+class AnimCycleCache:
+    """Per-source scan results keyed by (layer identifier, spec path), invalidated per layer or per spec path."""
+
+    def __init__(self):
+        self._change_counts: Dict[str, int] = {}
+        self._source_counts: Dict[Tuple[str, str], int] = {}
+        self._results: Dict[Tuple[str, str], Tuple[Version, dict]] = {}
+        self._pending: Dict[Tuple[str, str], List[Callable]] = {}
+
+    def __len__(self):
+        return len(self._results)
+
+    def change_count(self, layer_identifier: str) -> int:
+        return self._change_counts.get(layer_identifier, 0)
+
+    def note_layer_changed(self, layer_identifier: str, serial: Optional[int] = None) -> None:
+        """由 Sdf.Notice.LayersDidChange 呼叫；serial 通常是 notice.GetSerialNumber()。"""
+        current = self._change_counts.get(layer_identifier, 0)
+        self._change_counts[layer_identifier] = serial if serial is not None and serial > current else current + 1
+
+    def note_paths_changed(self, paths: Iterable[Sdf.Path], layer_identifiers: Iterable[str]) -> int:
+        """由 Usd.Notice.ObjectsChanged 呼叫：使這些 layer 中 spec 子樹被改到的來源失效，回傳失效數。
+
+        paths 是 stage 路徑；layer stack 內 spec 的編輯會以同一路徑出現在 ObjectsChanged 中。
+        """
+        layers = set(layer_identifiers)
+        keys = [k for k in set(self._results) | set(self._pending) if k[0] in layers]
+        if not keys:
+            return 0
+        paths = list(paths)
+        dropped = 0
+        for key in keys:
+            root = Sdf.Path(key[1])
+            # An edit inside the source's subtree, or a resync of the source or one of its ancestors
+            if any(p.HasPrefix(root) or (not p.IsPropertyPath() and root.HasPrefix(p)) for p in paths):
+                self._source_counts[key] = self._source_counts.get(key, 0) + 1
+                dropped += 1
+        return dropped
+
+    def version(self, source: AnimationSource) -> Version:
+        return (self.change_count(source.layer.identifier), self._source_counts.get(source.key, 0))
+
+    def get(self, source: AnimationSource) -> Optional[dict]:
+        entry = self._results.get(source.key)
+        if entry is None or entry[0] != self.version(source):
+            return None
+        return entry[1]
+
+    def put(self, source: AnimationSource, stats: dict, version: Version) -> bool:
+        """存入掃描結果；若掃描期間來源又被修改 (version 過期) 則丟棄並回傳 False。"""
+        if version != self.version(source):
+            return False
+        self._results[source.key] = (version, stats)
+        return True
+
+    def missing(self, sources: Sequence[AnimationSource]) -> List[AnimationSource]:
+        return [s for s in sources if self.get(s) is None]
+
+    def add_waiter(self, source: AnimationSource, callback: Callable) -> bool:
+        """登記等待某個來源的 callback；回傳 True 表示呼叫者需要啟動掃描 (尚無進行中的工作)。"""
+        waiters = self._pending.get(source.key)
+        if waiters is not None:
+            waiters.append(callback)
+            return False
+        self._pending[source.key] = [callback]
+        return True
+
+    def pop_waiters(self, source: AnimationSource) -> List[Callable]:
+        return self._pending.pop(source.key, [])
+
+    def clear(self) -> None:
+        self._results.clear()
+        self._pending.clear()
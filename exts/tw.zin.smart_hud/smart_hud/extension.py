@@ -3,8 +3,8 @@ import omni.ui as ui
 import omni.ui.scene as sc
 import omni.usd
 import omni.timeline
-from pxr import Usd, UsdGeom, UsdSkel, Gf, Sdf
-import random
+import omni.kit.commands
+from pxr import Usd, UsdGeom, UsdSkel, Gf, Sdf, Tf
 import statistics
 import sys
 import os
@@ -16,6 +16,47 @@ if _tools_box_path not in sys.path:
     
 import tools_box.zin_ui_utils as zin_ui_utils
 
+from .hud_anchor import AnchorBatch
+from .hud_anchor_index import AnchorIndex
+from .hud_authoring import author_attributes, collect_targets, hud_attribute_values, restore_specs, snapshot_specs
+from .hud_discovery import HUD_ATTRIBUTES, DiscoveryTracker, is_under
+from .hud_history import MetricHistory
+from .hud_pool import PanelContent, PanelPool
+from .hud_progress import (PROGRESS_STEP_PCT, TRACK_STYLE, RedrawCounter, fill_style, format_progress,
+                           label_style, quantize_progress)
+from .hud_scheduler import FrameBudgetScheduler
+from .hud_station import PROGRESS_SOURCE_ANIMATION, PROGRESS_SOURCE_CONVEYOR, STATION_EVENTS, StationProgressRouter
+from .hud_spatial import SpatialGrid, frustum_planes_from_matrix
+from .waypoint_index import WaypointPauseIndex
+from .telemetry import ConveyorZoneSource, FileTailSource, LocalHttpSource, ReplaySource, TelemetryHub
+from .anim_cycle import AnimCycleCache, combine_source_stats, find_animation_sources, scan_layer_time_samples
+from .hud_cluster import (LOD_COMPACT, LOD_FULL, LOD_ICON, ScreenClusterer, project_to_screen,
+                          projected_size_px, select_lod, status_severity, summarize_cluster)
+
+# ==============================================================================
+# Commands
+# ==============================================================================
+class ApplyHudAttributesCommand(omni.kit.commands.Command):
+    """Author HUD / AIF attributes on many prims in one Sdf.ChangeBlock; undone as a single step."""
+    def __init__(self, layer_identifier, plan):
+        self._layer_identifier = layer_identifier
+        self._plan = plan
+        self._snapshot = None
+
+    def do(self):
+        layer = Sdf.Layer.Find(self._layer_identifier)
+        if not layer:
+            return False
+        self._snapshot = snapshot_specs(layer, self._plan)
+        author_attributes(layer, self._plan)
+        return True
+
+    def undo(self):
+        layer = Sdf.Layer.Find(self._layer_identifier)
+        if layer and self._snapshot is not None:
+            restore_specs(layer, self._snapshot)
+
+
 # ==============================================================================
 # MVVM View Model
 # ==============================================================================
@@ -37,13 +78,14 @@ class HUDViewModel:
         self.generic_sub = ui.SimpleStringModel("Station")
         self.generic_content = ui.SimpleStringModel("Description")
         
-        # Progress bar state
+        # Progress bar state (quantized; the fill style is shared between HUDs)
         self.current_progress_pct = 100.0
-        self.current_r = 0.0
-        self.current_g = 1.0
-        self.progress_text = ui.SimpleStringModel("100.0%")
-        self.collapsed_progress_frame = None
-        self.expanded_progress_frame = None
+        self.progress_style = fill_style(100.0)
+        self.progress_text = ui.SimpleStringModel(format_progress(100.0))
+        
+        # Bounded per-metric history (NumPy ring buffers) and the expanded panel's sparkline
+        self.history = MetricHistory()
+        self.sparkline = None
         
         # Animation binding debug info
         self.bind_status = "N/A"      # "Success" or "Fallback"
@@ -56,6 +98,36 @@ class HUDViewModel:
 # HUD Engine
 # ==============================================================================
 class GrayboxHUDEngine:
+    HUD_Z_OFFSET = 80.0
+    DEFAULT_CULL_DISTANCE = 15000.0   # e.g. 150 meters in cm stages
+    CULL_MARGIN = 300.0               # keep panels whose anchor is just off-screen
+    
+    # Screen-space LOD / clustering
+    HUD_WORLD_HEIGHT = 35.0           # collapsed panel height used to estimate projected size
+    LOD_FULL_PX = 24.0                # projected height above which the full collapsed panel is drawn
+    LOD_COMPACT_PX = 12.0             # ... above which the compact panel is drawn (icon below)
+    LOD_COMPACT_SCALE = 0.6
+    CLUSTER_CELL_PX = 96.0
+    
+    # Widget refresh budget
+    FRAME_BUDGET_MS = 1.5
+    STATS_INTERVAL_FRAMES = 30
+    PROGRESS_STEP_PCT = PROGRESS_STEP_PCT   # progress resolution the widgets are redrawn at
+    
+    # Metric history / sparklines
+    HISTORY_INTERVAL_S = 0.5
+    SPARKLINE_WINDOW_S = 300.0
+    SPARKLINE_POINTS = 48
+    
+    # Conveyor-driven progress: max distance between a station waypoint and its HUD prim
+    STATION_MATCH_TOLERANCE = 500.0
+    
+    # Pooled panels: live sc.Widgets (in use + free) per panel kind
+    MAX_LIVE_PANELS = {"collapsed": 256, "icon": 512, "expanded": 16}
+    PANEL_KIND = {"expanded": "expanded", LOD_FULL: "collapsed", LOD_COMPACT: "collapsed", LOD_ICON: "icon"}
+    PANEL_FALLBACK = {"expanded": LOD_FULL, LOD_FULL: LOD_ICON, LOD_COMPACT: LOD_ICON, LOD_ICON: "hidden"}
+    PANEL_TYPES = ("Machine", "Robot Station", "Human Station")
+
     def __init__(self, ui_instance):
         self._hud_instances = {} 
         self.scene_view = None
@@ -63,8 +135,52 @@ class GrayboxHUDEngine:
         self._update_sub = None
         self._ui_instance = ui_instance
         
+        # Cached world anchors: only HUDs invalidated by USD notices are recomputed
+        self._anchor_index = AnchorIndex()  # HUD prims + ancestors -> HUDs; dirty anchors / local bounds
+        self._animated_anchors = set()    # prim paths with time-varying xforms (refreshed while playing)
+        self._objects_changed_listener = None
+        
+        # Incremental HUD discovery: notice paths are collected and applied once per frame
+        self._discovery = DiscoveryTracker()
+        
+        # Panels are pooled per (kind, HUD type) and rebound to whichever HUD needs one
+        self._panels = PanelPool(self._create_panel, caps=self.MAX_LIVE_PANELS,
+                                 bind=self._bind_panel, unbind=self._unbind_panel, destroy=self._destroy_panel)
+        self._spare_transforms = []       # emptied transforms of evicted panels, reused by new panels
+        
+        # Spatial index over anchors: culling only visits HUDs inside the view frustum
+        self._spatial = SpatialGrid()
+        self._visible_huds = set()
+        
+        # Screen-space clustering: HUDs sharing a screen cell collapse into one summary badge
+        self._camera_state = None         # (view_proj, proj[1][1], width, height) of the last culling pass
+        self._clusterer = ScreenClusterer(cell_px=self.CLUSTER_CELL_PX)
+        self._cluster_badges = {}         # screen cell -> badge dict
+        self._badge_pool = []             # hidden badges ready for reuse
+        
+        # Animation-cycle detection results per animation source, scanned in the background
+        self._cycle_cache = AnimCycleCache()
+        self._layers_changed_listener = Tf.Notice.RegisterGlobally(Sdf.Notice.LayersDidChange, self._on_layers_changed)
+        
+        # Telemetry sources -> HUD view models (only changed values are pushed)
+        self._telemetry = TelemetryHub()
+        
+        # Smart Conveyor station events -> progress of the nearest conveyor-mode HUD
+        self._stations = StationProgressRouter(self.STATION_MATCH_TOLERANCE)
+        self._station_subs = []
+        self._station_clock = 0.0
+        
+        # Budgeted, prioritized widget refreshes
+        self._scheduler = FrameBudgetScheduler(budget_ms=self.FRAME_BUDGET_MS)
+        self._camera_pos = None
+        self._stats_frame = 0
+        self._redraws = RedrawCounter()
+        self._history_time = 0.0
+        self._history_elapsed = 0.0
+        
         self._build_ui()
         self._scan_stage_and_build_huds()
+        self._register_stage_listener()
         self._start_telemetry()
 
     def _build_ui(self):
@@ -94,48 +210,204 @@ class GrayboxHUDEngine:
         if not stage:
             return
             
-        with self.scene_view.scene:
-            for prim in stage.Traverse():
-                attr = prim.GetAttribute("machine_type")
-                if attr and attr.IsValid():
-                    m_type = attr.Get()
-                    if m_type:
-                        self._create_hud_for_prim(prim, str(m_type))
+        for prim in stage.Traverse():
+            m_type = self._get_machine_type(prim)
+            if m_type:
+                self._add_hud(prim, m_type)
+        # All anchors of the pass share one bbox cache
+        self._refresh_dirty_anchors(stage, Usd.TimeCode.Default())
+        self._prewarm_panels()
                         
     def rebuild_huds(self):
         if self.scene_view and self.scene_view.scene:
             self.scene_view.scene.clear()
+        self._panels.clear()
+        self._spare_transforms.clear()
+        self._discovery.clear()
         self._hud_instances.clear()
+        self._anchor_index.clear()
+        self._animated_anchors.clear()
+        self._spatial.clear()
+        self._visible_huds.clear()
+        self._reset_clusters()
+        self._telemetry.clear_huds()
+        self._stations.clear()
+        self._scheduler.clear()
         self._scan_stage_and_build_huds()
 
-    def _create_hud_for_prim(self, prim, m_type):
-        import omni.ui as ui
-        import omni.ui.scene as sc
-        from pxr import UsdGeom, Usd
-        
-        prim_path = str(prim.GetPath())
-        world_transform = UsdGeom.Xformable(prim).ComputeLocalToWorldTransform(Usd.TimeCode.Default())
-        purposes = [UsdGeom.Tokens.default_, UsdGeom.Tokens.render]
-        bbox_cache = UsdGeom.BBoxCache(Usd.TimeCode.Default(), purposes)
-        bbox = bbox_cache.ComputeWorldBound(prim)
-        world_box = bbox.ComputeAlignedBox()
-        
-        if not world_box.IsEmpty():
-            min_pt = world_box.GetMin()
-            max_pt = world_box.GetMax()
-            top_center = ((min_pt[0] + max_pt[0]) / 2.0, (min_pt[1] + max_pt[1]) / 2.0, max_pt[2])
-            translation = list(top_center)
-        else:
-            translation = list(world_transform.ExtractTranslation())
-            
-        translation[2] += 80.0  # Z offset
-        
-        transform_matrix = [
+    # ------------------------------------------------------------------
+    # Cached world anchors (Tf.Notice driven)
+    # ------------------------------------------------------------------
+    def _register_stage_listener(self):
+        stage = omni.usd.get_context().get_stage()
+        if stage:
+            self._objects_changed_listener = Tf.Notice.Register(
+                Usd.Notice.ObjectsChanged, self._on_objects_changed, stage)
+
+    def _on_objects_changed(self, notice, sender):
+        if not self._running:
+            return
+        resynced = [str(p) for p in notice.GetResyncedPaths()]
+        changed_info = [str(p) for p in notice.GetChangedInfoOnlyPaths()]
+        self._discovery.note(resynced, changed_info)
+        self._anchor_index.note(resynced, changed_info)
+        self._cycle_cache.note_paths_changed(
+            list(notice.GetResyncedPaths()) + list(notice.GetChangedInfoOnlyPaths()),
+            [layer.identifier for layer in sender.GetLayerStack()])
+
+    def _refresh_dirty_anchors(self, stage, time_code, include_animated=False):
+        """Recompute the invalidated anchors (and animated ones during playback) in one batch."""
+        dirty_anchors, dirty_bounds = self._anchor_index.pop()
+        to_refresh = dirty_anchors
+        if include_animated and self._animated_anchors:
+            to_refresh = to_refresh | self._animated_anchors
+        if not to_refresh:
+            return
+        batch = AnchorBatch(time_code, self.HUD_Z_OFFSET)
+        for prim_path in to_refresh:
+            self._refresh_anchor(stage, prim_path, batch, bounds=prim_path in dirty_bounds,
+                                 check_animated=prim_path in dirty_anchors)
+
+    def _refresh_anchor(self, stage, prim_path, batch, bounds=True, check_animated=True):
+        """Recompute one HUD's world anchor and push it to its panel."""
+        instance = self._hud_instances.get(prim_path)
+        if instance is None:
+            return
+        prim = stage.GetPrimAtPath(prim_path)
+        if not prim or not prim.IsValid():
+            instance["anchor"] = None
+            self._animated_anchors.discard(prim_path)
+            self._spatial.remove(prim_path)
+            return
+
+        # The local bound survives transform-only changes (including animated xforms)
+        if bounds or instance.get("local_bound") is None:
+            instance["local_bound"] = batch.local_bound(prim)
+        translation = batch.world_anchor(prim, instance["local_bound"])
+        instance["anchor"] = translation
+        self._spatial.update(prim_path, translation)
+        if instance.get("progress_source") == PROGRESS_SOURCE_CONVEYOR:
+            # Station waypoints are matched against the prim's own origin, not the panel anchor
+            self._stations.set_hud(prim_path, batch.xform_cache.GetLocalToWorldTransform(prim).ExtractTranslation())
+
+        if check_animated:
+            # A time-sampled xform on the prim or any ancestor changes without notices during playback
+            p = prim
+            animated = False
+            while p and p.IsValid() and not p.IsPseudoRoot():
+                xformable = UsdGeom.Xformable(p)
+                if xformable and xformable.TransformMightBeTimeVarying():
+                    animated = True
+                    break
+                p = p.GetParent()
+            if animated:
+                self._animated_anchors.add(prim_path)
+            else:
+                self._animated_anchors.discard(prim_path)
+
+        instance["matrix"] = [
             1, 0, 0, 0,
             0, 1, 0, 0,
             0, 0, 1, 0,
             translation[0], translation[1], translation[2], 1
         ]
+        panel = instance.get("panel")
+        if panel is not None:
+            panel["transform"].transform = instance["matrix"]
+
+    # ------------------------------------------------------------------
+    # Incremental HUD discovery
+    # ------------------------------------------------------------------
+    def _get_machine_type(self, prim):
+        attr = prim.GetAttribute("machine_type")
+        if attr and attr.IsValid():
+            m_type = attr.Get()
+            if m_type:
+                return str(m_type)
+        return None
+
+    def _hud_signature(self, prim):
+        """Values of every attribute the HUD is built from; a change means the HUD must be recreated."""
+        values = []
+        for name in sorted(HUD_ATTRIBUTES):
+            attr = prim.GetAttribute(name)
+            values.append(attr.Get() if attr and attr.IsValid() else None)
+        return tuple(values)
+
+    def _add_hud(self, prim, m_type):
+        """Create one HUD; it owns no scene items until a display mode acquires a pooled panel."""
+        self._create_hud_for_prim(prim, m_type)
+        instance = self._hud_instances.get(str(prim.GetPath()))
+        if instance is not None:
+            instance["signature"] = self._hud_signature(prim)
+        return instance
+
+    def _remove_hud(self, prim_path):
+        instance = self._hud_instances.pop(prim_path, None)
+        if instance is None:
+            return
+        self._panels.release(prim_path)
+        self._anchor_index.remove(prim_path)
+        self._animated_anchors.discard(prim_path)
+        self._spatial.remove(prim_path)
+        self._visible_huds.discard(prim_path)
+        self._clusterer.remove(prim_path)
+        self._scheduler.discard(prim_path)
+        self._telemetry.unregister_hud(prim_path)
+        self._stations.remove_hud(prim_path)
+
+    def _sync_hud_prim(self, prim):
+        """Add, update or remove the HUD of one prim. Returns True if a HUD was created or removed."""
+        prim_path = str(prim.GetPath())
+        m_type = self._get_machine_type(prim)
+        instance = self._hud_instances.get(prim_path)
+        if not m_type:
+            if instance is not None:
+                self._remove_hud(prim_path)
+                return True
+            return False
+        if instance is not None:
+            if instance.get("machine_type") == m_type and instance.get("signature") == self._hud_signature(prim):
+                return False
+            was_expanded = instance.get("is_expanded", False)
+            self._remove_hud(prim_path)
+            self._add_hud(prim, m_type)
+            if was_expanded:
+                self.toggle_hud_state(prim_path, expand=True)
+            return True
+        self._add_hud(prim, m_type)
+        return True
+
+    def _process_discovery(self, stage):
+        """Apply the HUD additions / removals / updates collected from USD notices since the last frame."""
+        if not self._discovery:
+            return
+        roots, updated = self._discovery.pop()
+        changed = False
+        for root in roots:
+            found = set()
+            prim = stage.GetPrimAtPath(root)
+            if prim and prim.IsValid():
+                for p in Usd.PrimRange(prim):
+                    changed |= self._sync_hud_prim(p)
+                    if str(p.GetPath()) in self._hud_instances:
+                        found.add(str(p.GetPath()))
+            for prim_path in [p for p in self._hud_instances if is_under(p, root) and p not in found]:
+                self._remove_hud(prim_path)
+                changed = True
+        for prim_path in updated:
+            prim = stage.GetPrimAtPath(prim_path)
+            if prim and prim.IsValid():
+                changed |= self._sync_hud_prim(prim)
+            elif prim_path in self._hud_instances:
+                self._remove_hud(prim_path)
+                changed = True
+        if changed and self._ui_instance and hasattr(self._ui_instance, "_update_binding_diagnostics"):
+            self._ui_instance._update_binding_diagnostics()
+
+    def _create_hud_for_prim(self, prim, m_type):
+        # The anchor (bbox top centre) is computed in batch by _refresh_dirty_anchors
+        prim_path = str(prim.GetPath())
         
         view_model = HUDViewModel()
         
@@ -152,25 +424,16 @@ class GrayboxHUDEngine:
             content = str(content_attr.Get())
         if takt_label_attr and takt_label_attr.IsValid():
             takt_label = str(takt_label_attr.Get())
+        progress_source = PROGRESS_SOURCE_ANIMATION
+        source_attr = prim.GetAttribute("hud_progress_source")
+        if source_attr and source_attr.IsValid() and source_attr.Get() == PROGRESS_SOURCE_CONVEYOR:
+            progress_source = PROGRESS_SOURCE_CONVEYOR
             
         display_title = sub_title or m_type
         
-        cycle_info = self._get_anim_cycle_frames(prim.GetStage(), prim_path)
-        cycle_start = cycle_info["start"]
-        cycle_end = cycle_info["end"]
-        fps = prim.GetStage().GetTimeCodesPerSecond()
-        cycle_len = cycle_end - cycle_start
-        cycle_len_seconds = cycle_len / fps if cycle_len > 0.0 else 3.0
-        
-        # Store binding debug info on the view model
-        view_model.bind_status = cycle_info["status"]
-        view_model.bind_target = cycle_info["target_path"]
-        view_model.bind_cycle_len = cycle_len
-        
-        print(f"[Smart HUD] 🔍 {prim_path}: bind_status={cycle_info['status']}, "
-              f"target={cycle_info['target_path']}, "
-              f"cycle=[{cycle_start:.0f} → {cycle_end:.0f}] ({cycle_len:.0f} frames), "
-              f"attrs_scanned={cycle_info['attrs_scanned']}, samples_found={cycle_info['samples_found']}")
+        # Cached per animation source; uncached sources are scanned in the background
+        # and the instance is updated through _on_cycle_scanned.
+        cycle_info = self._get_anim_cycle_frames(prim.GetStage(), prim_path, on_pending=self._on_cycle_scanned)
         
         if m_type == "Machine":
             view_model.aoi_title.set_value(display_title)
@@ -186,142 +449,252 @@ class GrayboxHUDEngine:
             view_model.generic_sub.set_value(sub_title)
             view_model.generic_content.set_value(content)
             
-        show_dynamic = True
-        show_static = True
-        if self._ui_instance:
-            if hasattr(self._ui_instance, "cb_dynamic"):
-                show_dynamic = self._ui_instance.cb_dynamic.model.get_value_as_bool()
-            if hasattr(self._ui_instance, "cb_static"):
-                show_static = self._ui_instance.cb_static.model.get_value_as_bool()
-                
-        collapsed_transform = sc.Transform(transform=transform_matrix, look_at=sc.Transform.LookAt.CAMERA, visible=True)
-        with collapsed_transform:
-            collapsed_widget = sc.Widget(width=150, height=55 if m_type == "Human Station" else 35)
-            def build_collapsed(title=display_title, path=prim_path, m=m_type, vm=view_model):
-                def on_click(x, y, button, modifier, p=path):
-                    if button == 0:
-                        self.toggle_hud_state(p, expand=True)
-                    return False
-                f = ui.Frame(style={"Frame:hovered": {"background_color": 0x00000000}}, prevent_focus_on_click=True)
-                f.set_mouse_pressed_fn(on_click)
-                with f:
-                    _stack = ui.ZStack()
-                with _stack:
-                        ui.Rectangle(style={"background_color": 0xCC1A1E24, "border_color": 0x8800FFFF, "border_width": 1})
-                        if m == "Human Station":
-                            with ui.VStack(spacing=2):
-                                ui.Spacer(height=4)
-                                ui.Label(title, height=18, style={"color": ui.color(0.0, 0.88, 1.0), "font_size": 14, "alignment": ui.Alignment.CENTER})
-                                with ui.HStack():
-                                    ui.Spacer(width=5)
-                                    pf = ui.Frame(height=16)
-                                    vm.collapsed_progress_frame = pf
-                                    pf.set_build_fn(lambda v=vm: self._build_progress_bar_widget(v, height=14, font_size=10))
-                                    ui.Spacer(width=5)
-                                ui.Spacer(height=4)
-                        else:
-                            ui.Label(title, style={"color": ui.color(0.0, 0.88, 1.0), "font_size": 16, "alignment": ui.Alignment.CENTER})
-            collapsed_widget.frame.set_build_fn(build_collapsed)
-            
-        expanded_transform = sc.Transform(transform=transform_matrix, look_at=sc.Transform.LookAt.CAMERA, visible=False)
-        with expanded_transform:
-            scale = 1.0
-            if self._ui_instance and hasattr(self._ui_instance, "hud_scale_model"):
-                scale = self._ui_instance.hud_scale_model.as_float
-                
-            scale_matrix = [
-                scale, 0, 0, 0,
-                0, scale, 0, 0,
-                0, 0, scale, 0,
-                0, 0, 0, 1
-            ]
-            scale_transform = sc.Transform(transform=scale_matrix)
-            
-            with scale_transform:
-                expanded_widget = sc.Widget(width=300, height=280)
-                
-                if m_type == "Machine":
-                    builder = lambda vm=view_model, p=prim_path: self._build_aoi_ui(vm, p)
-                elif m_type == "Robot Station":
-                    builder = lambda vm=view_model, p=prim_path: self._build_robot_ui(vm, p)
-                elif m_type == "Human Station":
-                    builder = lambda vm=view_model, p=prim_path: self._build_manual_station_ui(vm, p)
-                else:
-                    builder = lambda vm=view_model, p=prim_path, sd=show_dynamic, ss=show_static: self._build_generic_ui(vm, p, sd, ss)
-                    
-                expanded_widget.frame.set_build_fn(builder)
-
         self._hud_instances[prim_path] = {
+            "prim_path": prim_path,
             "view_model": view_model,
             "machine_type": m_type,
-            "collapsed_transform": collapsed_transform,
-            "expanded_transform": expanded_transform,
-            "scale_transform": scale_transform,
-            "collapsed_widget": collapsed_widget,
-            "expanded_widget": expanded_widget,
-            "cycle_start": cycle_start,
-            "cycle_end": cycle_end,
-            "cycle_len_seconds": cycle_len_seconds,
-            "time_remaining": cycle_len_seconds,
-            "is_expanded": False
+            "title": display_title,
+            "matrix": None,
+            "local_bound": None,
+            "panel": None,
+            "cycle_start": 0.0,
+            "cycle_end": 0.0,
+            "cycle_len_seconds": 3.0,
+            "time_remaining": 3.0,
+            "progress_source": progress_source,
+            "is_expanded": False,
+            "display": "hidden",   # the first culling pass acquires a panel
+            "lod": LOD_FULL,
+            "anchor": None
         }
+        self._apply_cycle_info(prim_path, cycle_info)
+        self._telemetry.register_hud(prim_path, self._get_machine_id(prim))
+        self._anchor_index.add(prim_path)
 
-    def _build_progress_bar_widget(self, view_model, height=20, font_size=14):
-        import omni.ui as ui
-        # Clear stale references — this method is called on every frame.rebuild()
-        if not hasattr(view_model, "progress_bars"):
-            view_model.progress_bars = []
+    # ------------------------------------------------------------------
+    # Pooled panels
+    # ------------------------------------------------------------------
+    def _panel_type(self, m_type):
+        return m_type if m_type in self.PANEL_TYPES else "Generic"
+
+    def _get_hud_scale(self):
+        if self._ui_instance and hasattr(self._ui_instance, "hud_scale_model"):
+            return self._ui_instance.hud_scale_model.as_float
+        return 1.0
+
+    def _create_panel(self, kind, hud_type):
+        """One pooled panel; its widget tree is built once, for its HUD type, and rebound afterwards."""
+        import omni.ui.scene as sc
+        if kind == "expanded":
+            s = self._get_hud_scale()
+            size = (300, 280)
         else:
-            view_model.progress_bars.clear()
-            
+            s = 1.0
+            size = (16, 16) if kind == "icon" else (150, 55 if hud_type == "Human Station" else 35)
+        if self._spare_transforms:
+            # Reuse the emptied transform of an evicted panel instead of adding another scene item
+            transform = self._spare_transforms.pop()
+        else:
+            with self.scene_view.scene:
+                transform = sc.Transform(look_at=sc.Transform.LookAt.CAMERA, visible=False)
+        with transform:
+            inner = sc.Transform(transform=[s, 0, 0, 0, 0, s, 0, 0, 0, 0, s, 0, 0, 0, 0, 1])
+            with inner:
+                widget = sc.Widget(width=size[0], height=size[1])
+        panel = {"kind": kind, "hud_type": hud_type, "transform": transform, "inner": inner, "widget": widget}
+        panel["content"] = PanelContent(build=lambda p=panel: self._build_panel(p), rebind=self._rebind_panel)
+        widget.frame.set_build_fn(panel["content"].build)
+        return panel
+
+    def _bind_panel(self, panel, prim_path):
+        instance = self._hud_instances[prim_path]
+        if instance["matrix"] is not None:
+            panel["transform"].transform = instance["matrix"]
+        panel["content"].bind(prim_path)
+        panel["transform"].visible = True
+        panel["widget"].invalidate()
+
+    def _unbind_panel(self, panel, prim_path):
+        panel["transform"].visible = False
+        panel["content"].unbind()
+        instance = self._hud_instances.get(prim_path)
+        if instance is not None:
+            instance["view_model"].sparkline = None
+            instance["panel"] = None
+
+    def _destroy_panel(self, panel):
+        # Scene items cannot be removed individually: clearing frees the widget and its texture,
+        # and the empty transform is kept for the next panel that is created
+        panel["transform"].clear()
+        panel["transform"].visible = False
+        self._spare_transforms.append(panel["transform"])
+
+    def _build_panel(self, panel):
+        """Build a panel's widgets for its kind and HUD type; returns the handles rebinding updates."""
+        handles = {"texts": [], "models": [], "progress_bars": [], "sparkline": None}
+        kind = panel["kind"]
+        hud_type = panel["hud_type"]
+        if kind == "collapsed":
+            self._build_collapsed_ui(panel, handles, hud_type)
+        elif kind == "icon":
+            self._build_icon_ui(panel)
+        elif hud_type == "Machine":
+            self._build_aoi_ui(panel, handles)
+        elif hud_type == "Robot Station":
+            self._build_robot_ui(panel, handles)
+        elif hud_type == "Human Station":
+            self._build_manual_station_ui(panel, handles)
+        else:
+            show_dynamic = True
+            show_static = True
+            if self._ui_instance:
+                if hasattr(self._ui_instance, "cb_dynamic"):
+                    show_dynamic = self._ui_instance.cb_dynamic.model.get_value_as_bool()
+                if hasattr(self._ui_instance, "cb_static"):
+                    show_static = self._ui_instance.cb_static.model.get_value_as_bool()
+            self._build_generic_ui(panel, handles, show_dynamic, show_static)
+        return handles
+
+    def _rebind_panel(self, handles, prim_path):
+        """Show another HUD in an already built panel: swap models and text, keep the widgets."""
+        instance = self._hud_instances.get(prim_path)
+        if instance is None:
+            return
+        vm = instance["view_model"]
+        for field, attr in handles["models"]:
+            field.model = getattr(vm, attr)
+        for pb in handles["progress_bars"]:
+            pb["pct"] = pb["style"] = None       # what the widgets show belongs to the previous HUD
+        sparkline = handles["sparkline"]
+        vm.sparkline = sparkline
+        if sparkline is not None:
+            if sparkline["optional"]:
+                sparkline["stack"].visible = bool(vm.history.metrics())
+            if not self._update_sparkline(vm):
+                try:
+                    sparkline["plot"].set_data(0.0)
+                    sparkline["caption"].text = ""
+                except Exception:
+                    pass
+        self._push_panel_values(instance, handles)
+
+    def _push_panel_values(self, instance, handles):
+        """Copy a HUD's view-model values into its panel's retained widgets, skipping unchanged ones."""
+        vm = instance["view_model"]
+        for label, attr in handles["texts"]:
+            text = instance["title"] if attr == "title" else getattr(vm, attr).get_value_as_string()
+            if label.text != text:
+                label.text = text
+        progress_pct = vm.current_progress_pct
+        for pb in handles["progress_bars"]:
+            try:
+                if pb["pct"] != progress_pct:
+                    pb["fill"].width = ui.Percent(progress_pct)
+                    pb["spacer"].width = ui.Percent(100.0 - progress_pct)
+                    pb["pct"] = progress_pct
+                if pb["style"] is not vm.progress_style:
+                    pb["fill"].set_style(vm.progress_style)
+                    pb["style"] = vm.progress_style
+            except Exception:
+                pass
+
+    def _panel_click_fn(self, panel, expand):
+        # The closure follows the panel, whichever HUD it is bound to
+        def on_click(x, y, button, modifier):
+            owner = panel["content"].owner
+            if button == 0 and owner is not None:
+                self.toggle_hud_state(owner, expand=expand)
+            return False
+        return on_click
+
+    def _prewarm_panels(self):
+        """Build one expanded panel per HUD type in use so the first expand does not allocate."""
+        for hud_type in {self._panel_type(i["machine_type"]) for i in self._hud_instances.values()}:
+            self._panels.prewarm("expanded", hud_type, 1)
+
+    def set_hud_scale(self, scale):
+        scale_matrix = [
+            scale, 0, 0, 0,
+            0, scale, 0, 0,
+            0, 0, scale, 0,
+            0, 0, 0, 1
+        ]
+        for panel in self._panels.panels("expanded"):
+            panel["inner"].transform = scale_matrix
+
+    def _build_collapsed_ui(self, panel, handles, hud_type):
+        import omni.ui as ui
+        f = ui.Frame(style={"Frame:hovered": {"background_color": 0x00000000}}, prevent_focus_on_click=True)
+        f.set_mouse_pressed_fn(self._panel_click_fn(panel, expand=True))
+        with f:
+            _stack = ui.ZStack()
+        with _stack:
+            ui.Rectangle(style={"background_color": 0xCC1A1E24, "border_color": 0x8800FFFF, "border_width": 1})
+            if hud_type == "Human Station":
+                with ui.VStack(spacing=2):
+                    ui.Spacer(height=4)
+                    handles["texts"].append((ui.Label("", height=18, style={"color": ui.color(0.0, 0.88, 1.0), "font_size": 14, "alignment": ui.Alignment.CENTER}), "title"))
+                    with ui.HStack():
+                        ui.Spacer(width=5)
+                        with ui.Frame(height=16):
+                            self._build_progress_bar_widget(handles, height=14, font_size=10)
+                        ui.Spacer(width=5)
+                    ui.Spacer(height=4)
+            else:
+                handles["texts"].append((ui.Label("", style={"color": ui.color(0.0, 0.88, 1.0), "font_size": 16, "alignment": ui.Alignment.CENTER}), "title"))
+
+    def _build_icon_ui(self, panel):
+        # Icon LOD: a small status dot for HUDs that are too far away to read
+        import omni.ui as ui
+        f = ui.Frame(prevent_focus_on_click=True)
+        f.set_mouse_pressed_fn(self._panel_click_fn(panel, expand=True))
+        with f:
+            ui.Circle(radius=6, style={"background_color": 0xCC1A1E24, "border_color": 0xFFFFE000, "border_width": 2})
+
+    def _build_progress_bar_widget(self, handles, height=20, font_size=14):
+        import omni.ui as ui
         with ui.ZStack(height=height):
             # 1. Background track
-            ui.Rectangle(style={"background_color": 0x44000000, "border_radius": 3})
+            ui.Rectangle(style=TRACK_STYLE)
             
-            # 2. Animated Color Fill
+            # 2. Animated Color Fill (width and style are pushed by _push_panel_values)
             with ui.HStack():
-                fill = ui.Rectangle(
-                    width=ui.Percent(view_model.current_progress_pct),
-                    style={
-                        "background_color": ui.color(view_model.current_r, view_model.current_g, 0.0, 1.0),
-                        "border_radius": 3
-                    }
-                )
-                spacer = ui.Spacer(width=ui.Percent(100.0 - view_model.current_progress_pct))
+                fill = ui.Rectangle(width=ui.Percent(100.0))
+                spacer = ui.Spacer(width=ui.Percent(0.0))
                 
             # 3. White Text Overlay
             with ui.HStack():
                 ui.Spacer()
                 label = ui.Label(
-                    view_model.progress_text.get_value_as_string(), 
-                    model=view_model.progress_text,
+                    "",
                     width=0,
-                    style={"color": 0xFFFFFFFF, "font_size": font_size},
+                    style=label_style(font_size),
                     alignment=ui.Alignment.RIGHT_CENTER
                 )
                 ui.Spacer(width=5)
                 
-            view_model.progress_bars.append({
+            # What the widgets currently show, so refreshes can skip unchanged properties
+            handles["texts"].append((label, "progress_text"))
+            handles["progress_bars"].append({
                 "fill": fill,
                 "spacer": spacer,
-                "label": label
+                "pct": None,
+                "style": None
             })
 
     def toggle_hud_state(self, prim_path, expand):
         if prim_path in self._hud_instances:
             instance = self._hud_instances[prim_path]
             instance["is_expanded"] = expand
-            instance["collapsed_transform"].visible = not expand
-            instance["expanded_transform"].visible = expand
+            if expand:
+                # An expanded panel is always drawn on its own, never inside a cluster badge
+                self._clusterer.remove(prim_path)
+            self._apply_display_mode(instance, "expanded" if expand else instance.get("lod", LOD_FULL))
 
-    def _build_aoi_ui(self, view_model, prim_path):
+    def _build_aoi_ui(self, panel, handles):
         import omni.ui as ui
-        def on_click(x, y, button, modifier, p=prim_path):
-            if button == 0:
-                self.toggle_hud_state(p, expand=False)
-            return False
         f = ui.Frame(style={"Frame:hovered": {"background_color": 0x00000000}}, prevent_focus_on_click=True)
-        f.set_mouse_pressed_fn(on_click)
+        f.set_mouse_pressed_fn(self._panel_click_fn(panel, expand=False))
         with f:
             _stack = ui.ZStack()
         with _stack:
@@ -330,7 +703,7 @@ class GrayboxHUDEngine:
                 ui.Spacer(width=25)
                 with ui.VStack(spacing=5):
                     ui.Spacer(height=15)
-                    ui.Label(view_model.aoi_title.get_value_as_string(), model=view_model.aoi_title, style={"color": 0xFF00FFFF, "font_size": 20, "alignment": ui.Alignment.CENTER})
+                    handles["texts"].append((ui.Label("", style={"color": 0xFF00FFFF, "font_size": 20, "alignment": ui.Alignment.CENTER}), "aoi_title"))
                     with ui.HStack(height=1):
                         ui.Spacer(width=5)
                         ui.Rectangle(height=1, style={"background_color": ui.color(0.0, 0.8, 1.0, 0.30)})
@@ -338,21 +711,18 @@ class GrayboxHUDEngine:
                     ui.Spacer(height=5)
                     with ui.HStack():
                         ui.Label("Status:", width=80, style={"color": 0xFFAAAAAA})
-                        ui.Label(view_model.aoi_status.get_value_as_string(), model=view_model.aoi_status, style={"color": 0xFFFFFFFF})
+                        handles["texts"].append((ui.Label("", style={"color": 0xFFFFFFFF}), "aoi_status"))
                     with ui.HStack():
                         ui.Label("Defect %:", width=80, style={"color": 0xFFAAAAAA})
-                        ui.FloatField(model=view_model.aoi_defect_rate, read_only=True, style={"color": 0xFFFFFFFF})
+                        handles["models"].append((ui.FloatField(read_only=True, style={"color": 0xFFFFFFFF}), "aoi_defect_rate"))
+                    self._build_sparkline(handles)
                     ui.Spacer(height=15)
                 ui.Spacer(width=25)
 
-    def _build_robot_ui(self, view_model, prim_path):
+    def _build_robot_ui(self, panel, handles):
         import omni.ui as ui
-        def on_click(x, y, button, modifier, p=prim_path):
-            if button == 0:
-                self.toggle_hud_state(p, expand=False)
-            return False
         f = ui.Frame(style={"Frame:hovered": {"background_color": 0x00000000}}, prevent_focus_on_click=True)
-        f.set_mouse_pressed_fn(on_click)
+        f.set_mouse_pressed_fn(self._panel_click_fn(panel, expand=False))
         with f:
             _stack = ui.ZStack()
         with _stack:
@@ -361,7 +731,7 @@ class GrayboxHUDEngine:
                 ui.Spacer(width=25)
                 with ui.VStack(spacing=5):
                     ui.Spacer(height=15)
-                    ui.Label(view_model.robot_title.get_value_as_string(), model=view_model.robot_title, style={"color": 0xFF00FFFF, "font_size": 20, "alignment": ui.Alignment.CENTER})
+                    handles["texts"].append((ui.Label("", style={"color": 0xFF00FFFF, "font_size": 20, "alignment": ui.Alignment.CENTER}), "robot_title"))
                     with ui.HStack(height=1):
                         ui.Spacer(width=5)
                         ui.Rectangle(height=1, style={"background_color": ui.color(0.0, 0.8, 1.0, 0.30)})
@@ -369,18 +739,15 @@ class GrayboxHUDEngine:
                     ui.Spacer(height=5)
                     with ui.HStack():
                         ui.Label("State:", width=80, style={"color": 0xFFAAAAAA})
-                        ui.Label(view_model.robot_state.get_value_as_string(), model=view_model.robot_state, style={"color": 0xFFFFFFFF})
+                        handles["texts"].append((ui.Label("", style={"color": 0xFFFFFFFF}), "robot_state"))
+                    self._build_sparkline(handles)
                     ui.Spacer(height=15)
                 ui.Spacer(width=25)
 
-    def _build_manual_station_ui(self, view_model, prim_path):
+    def _build_manual_station_ui(self, panel, handles):
         import omni.ui as ui
-        def on_click(x, y, button, modifier, p=prim_path):
-            if button == 0:
-                self.toggle_hud_state(p, expand=False)
-            return False
         f = ui.Frame(style={"Frame:hovered": {"background_color": 0x00000000}}, prevent_focus_on_click=True)
-        f.set_mouse_pressed_fn(on_click)
+        f.set_mouse_pressed_fn(self._panel_click_fn(panel, expand=False))
         with f:
             _stack = ui.ZStack()
         with _stack:
@@ -389,32 +756,27 @@ class GrayboxHUDEngine:
                 ui.Spacer(width=25)
                 with ui.VStack(spacing=5):
                     ui.Spacer(height=15)
-                    ui.Label(view_model.manual_station_name.get_value_as_string(), model=view_model.manual_station_name, style={"color": 0xFF00FFFF, "font_size": 22, "alignment": ui.Alignment.CENTER})
+                    handles["texts"].append((ui.Label("", style={"color": 0xFF00FFFF, "font_size": 22, "alignment": ui.Alignment.CENTER}), "manual_station_name"))
                     with ui.HStack(height=1):
                         ui.Spacer(width=5)
                         ui.Rectangle(height=1, style={"background_color": ui.color(0.0, 0.8, 1.0, 0.30)})
                         ui.Spacer(width=5)
-                    ui.Label(view_model.manual_station_sub.get_value_as_string(), height=16, model=view_model.manual_station_sub, style={"color": 0xFFFFAA00, "font_size": 14, "alignment": ui.Alignment.CENTER})
-                    ui.Label(view_model.manual_station_content.get_value_as_string(), height=16, model=view_model.manual_station_content, style={"color": 0xFFAAAAAA, "font_size": 14, "alignment": ui.Alignment.CENTER})
+                    handles["texts"].append((ui.Label("", height=16, style={"color": 0xFFFFAA00, "font_size": 14, "alignment": ui.Alignment.CENTER}), "manual_station_sub"))
+                    handles["texts"].append((ui.Label("", height=16, style={"color": 0xFFAAAAAA, "font_size": 14, "alignment": ui.Alignment.CENTER}), "manual_station_content"))
                     ui.Spacer(height=5)
-                    ui.Label(view_model.manual_takt_label.get_value_as_string(), model=view_model.manual_takt_label, style={"color": 0xFFAAAAAA, "font_size": 14})
+                    handles["texts"].append((ui.Label("", style={"color": 0xFFAAAAAA, "font_size": 14}), "manual_takt_label"))
                     
-                    pf = ui.Frame(height=20)
-                    view_model.expanded_progress_frame = pf
-                    pf.set_build_fn(lambda vm=view_model: self._build_progress_bar_widget(vm, height=20, font_size=14))
+                    with ui.Frame(height=20):
+                        self._build_progress_bar_widget(handles, height=20, font_size=14)
                     
-                    ui.Spacer(height=15)
+                    self._build_sparkline(handles)
                     ui.Spacer(height=15)
                 ui.Spacer(width=25)
 
-    def _build_generic_ui(self, view_model, prim_path, show_dynamic, show_static):
+    def _build_generic_ui(self, panel, handles, show_dynamic, show_static):
         import omni.ui as ui
-        def on_click(x, y, button, modifier, p=prim_path):
-            if button == 0:
-                self.toggle_hud_state(p, expand=False)
-            return False
         f = ui.Frame(style={"Frame:hovered": {"background_color": 0x00000000}}, prevent_focus_on_click=True)
-        f.set_mouse_pressed_fn(on_click)
+        f.set_mouse_pressed_fn(self._panel_click_fn(panel, expand=False))
         with f:
             _stack = ui.ZStack()
         with _stack:
@@ -426,14 +788,16 @@ class GrayboxHUDEngine:
                     ui.Spacer(height=10)
                     if show_dynamic:
                         with ui.VStack(spacing=2):
-                            ui.Label(view_model.generic_title.get_value_as_string(), height=22, model=view_model.generic_title, style={"color": 0xFF00FFFF, "font_size": 20, "weight": "bold"})
+                            handles["texts"].append((ui.Label("", height=22, style={"color": 0xFF00FFFF, "font_size": 20, "weight": "bold"}), "generic_title"))
                             with ui.HStack(height=1):
                                 ui.Spacer(width=5)
                                 ui.Rectangle(height=1, style={"background_color": ui.color(0.0, 0.8, 1.0, 0.30)})
                                 ui.Spacer(width=5)
                             ui.Spacer(height=3)
-                            ui.Label(view_model.generic_sub.get_value_as_string(), height=16, model=view_model.generic_sub, style={"color": 0xFFFFAA00, "font_size": 14})
-                            ui.Label(view_model.generic_content.get_value_as_string(), height=16, model=view_model.generic_content, style={"color": 0xFFAAAAAA, "font_size": 14})
+                            handles["texts"].append((ui.Label("", height=16, style={"color": 0xFFFFAA00, "font_size": 14}), "generic_sub"))
+                            handles["texts"].append((ui.Label("", height=16, style={"color": 0xFFAAAAAA, "font_size": 14}), "generic_content"))
+                            # Only shown for HUDs with a metric history (toggled on rebind)
+                            self._build_sparkline(handles, height=22, optional=True)
                             ui.Spacer(height=5)
                             ui.Line(style={"color": 0xFF444444, "border_width": 1})
                             ui.Spacer(height=5)
@@ -443,27 +807,31 @@ class GrayboxHUDEngine:
                             ui.Spacer(height=3)
                             with ui.HStack(height=16):
                                 ui.Label("Asset Class:", width=90, style={"color": 0xFF888888, "font_size": 12})
-                                ui.Label(view_model.generic_title.get_value_as_string(), model=view_model.generic_title, style={"color": 0xFFDDDDDD, "font_size": 12})
+                                handles["texts"].append((ui.Label("", style={"color": 0xFFDDDDDD, "font_size": 12}), "generic_title"))
                             with ui.HStack(height=16):
                                 ui.Label("Model No:", width=90, style={"color": 0xFF888888, "font_size": 12})
-                                ui.Label(view_model.generic_sub.get_value_as_string(), model=view_model.generic_sub, style={"color": 0xFFDDDDDD, "font_size": 12})
+                                handles["texts"].append((ui.Label("", style={"color": 0xFFDDDDDD, "font_size": 12}), "generic_sub"))
                             with ui.HStack(height=16):
                                 ui.Label("Status:", width=90, style={"color": 0xFF888888, "font_size": 12})
                                 ui.Label("Active", style={"color": 0xFF44AA44, "font_size": 12})
                     ui.Spacer(height=10)
                 ui.Spacer(width=15)
 
-    def _get_anim_cycle_frames(self, stage, prim_path):
-        """Ultimate animation cycle detection.
+    def _get_anim_cycle_frames(self, stage, prim_path, on_pending=None):
+        """Cached animation cycle detection.
         
         Strategy:
           1. Resolve aif:core:animationTarget redirect
-          2. Recursively scan target prim + descendants for any attr with
-             GetNumTimeSamples() > 1, aggregate min/max time codes
-          3. Follow skel:animationSource / skel:skeleton relationships
-          4. If no time samples found, check referenced layers for
-             layer.startTimeCode / layer.endTimeCode
-          5. Final fallback: stage time range (marks status as Failed)
+          2. Collect the animation sources (layer specs of the target subtree,
+             referenced layers and skel:animationSource / skel:skeleton targets)
+          3. Combine the per-source time-sample ranges, read with Sdf layer
+             queries and cached by layer identifier + layer change count.
+             Referenced layers' startTimeCode / endTimeCode are the fallback.
+          4. Final fallback: stage time range (marks status as Failed)
+        
+        Sources not in the cache yet are scanned in a background job; the
+        stage range is returned with status "Pending" and on_pending(prim_path)
+        is called once the scan finished.
         
         Returns a dict: {start, end, status, target_path, attrs_scanned, samples_found}
         """
@@ -520,93 +888,143 @@ class GrayboxHUDEngine:
         if not resolved_target:
             resolved_target = str(prim.GetPath())
 
-        # --- Step 2: Collect all prims to scan ---
-        prims_to_check = set()
-        try:
-            for p in Usd.PrimRange(prim):
-                prims_to_check.add(p)
-                
-                # Follow skeleton/animation relationships
-                for rel_name in ["skel:animationSource", "skel:skeleton"]:
-                    rel = p.GetRelationship(rel_name)
-                    if rel and rel.IsValid():
-                        for t in rel.GetTargets():
-                            src_prim = stage.GetPrimAtPath(t)
-                            if src_prim and src_prim.IsValid():
-                                for sp in Usd.PrimRange(src_prim):
-                                    prims_to_check.add(sp)
-        except Exception:
-            pass
-
-        # --- Step 3: Scan using GetNumTimeSamples (most robust) ---
-        anim_bounds = []
-        attrs_scanned = 0
-        samples_found = 0
-        try:
-            for p in prims_to_check:
-                for attr in p.GetAttributes():
-                    attrs_scanned += 1
-                    num_samples = attr.GetNumTimeSamples()
-                    if num_samples > 1:
-                        samples = attr.GetTimeSamples()
-                        if samples:
-                            samples_found += 1
-                            anim_bounds.append((float(samples[0]), float(samples[-1])))
-        except Exception as e:
-            print(f"[Smart HUD] ⚠️ Error scanning attributes: {e}")
-
-        if anim_bounds:
-            start = min(b[0] for b in anim_bounds)
-            end = max(b[1] for b in anim_bounds)
-            if end > start:
-                return {
-                    "start": start,
-                    "end": end,
-                    "status": "Success",
-                    "target_path": resolved_target,
-                    "attrs_scanned": attrs_scanned,
-                    "samples_found": samples_found,
-                }
+        # --- Step 2: Animation sources (layer specs), no attribute reads ---
+        sources = find_animation_sources(stage, prim)
+        missing = self._cycle_cache.missing(sources)
+        if missing:
+            if on_pending is not None:
+                self._scan_cycle_sources(missing, lambda p=prim_path: on_pending(p))
+            fallback["status"] = "Pending"
+            fallback["target_path"] = resolved_target
+            return fallback
 
-        # --- Step 4: Reference layer fallback ---
-        # If the prim is defined via a reference, check the referenced layer's
-        # own startTimeCode / endTimeCode metadata.
-        try:
-            prim_stack = prim.GetPrimStack()
-            for prim_spec in prim_stack:
-                layer = prim_spec.layer
-                if layer and layer != stage.GetRootLayer():
-                    layer_start = layer.startTimeCode
-                    layer_end = layer.endTimeCode
-                    if layer_start is not None and layer_end is not None and layer_end > layer_start:
-                        print(f"[Smart HUD] 📦 Using referenced layer time codes: "
-                              f"{layer.identifier} [{layer_start:.0f} → {layer_end:.0f}]")
-                        return {
-                            "start": layer_start,
-                            "end": layer_end,
-                            "status": "Success (Layer)",
-                            "target_path": resolved_target,
-                            "attrs_scanned": attrs_scanned,
-                            "samples_found": 0,
-                        }
-        except Exception as e:
-            print(f"[Smart HUD] ⚠️ Error querying referenced layers: {e}")
+        # --- Step 3: Combine cached per-source time-sample ranges ---
+        combined = combine_source_stats(
+            sources, [self._cycle_cache.get(s) for s in sources], stage.GetRootLayer().identifier
+        )
+        if combined["status"] != "Failed":
+            if combined["status"] == "Success (Layer)":
+                print(f"[Smart HUD] 📦 Using referenced layer time codes for {resolved_target}: "
+                      f"[{combined['start']:.0f} → {combined['end']:.0f}]")
+            combined["target_path"] = resolved_target
+            return combined
 
-        # --- Step 5: Final fallback (stage range) ---
+        # --- Step 4: Final fallback (stage range) ---
         fallback["target_path"] = resolved_target
-        fallback["attrs_scanned"] = attrs_scanned
-        fallback["samples_found"] = samples_found
+        fallback["attrs_scanned"] = combined["attrs_scanned"]
+        fallback["samples_found"] = combined["samples_found"]
         print(f"[Smart HUD] ⚠️ Cycle detection FAILED for {resolved_target}: "
-              f"scanned {attrs_scanned} attrs, found {samples_found} with time samples. "
+              f"scanned {fallback['attrs_scanned']} attrs, found {fallback['samples_found']} with time samples. "
               f"Using stage fallback [{fallback['start']:.0f} → {fallback['end']:.0f}]")
         return fallback
 
+    def _scan_cycle_sources(self, sources, on_done):
+        """Scan uncached animation sources in the background; on_done() runs once all of them finished.
+
+        Sources already being scanned for another HUD are not scanned twice.
+        """
+        import asyncio
+        remaining = {s.key for s in sources}
+
+        def _source_done(source):
+            remaining.discard(source.key)
+            if not remaining:
+                on_done()
+
+        for source in sources:
+            if self._cycle_cache.add_waiter(source, _source_done):
+                asyncio.ensure_future(self._scan_cycle_source(source))
+
+    async def _scan_cycle_source(self, source):
+        import asyncio
+        loop = asyncio.get_event_loop()
+        version = self._cycle_cache.version(source)
+        stage = omni.usd.get_context().get_stage()
+        try:
+            if stage and stage.HasLocalLayer(source.layer):
+                # The stage's own layers are written on this thread every frame (conveyor, HUD authoring)
+                # and Sdf layers cannot be read while being written: scan them here, not on a worker
+                stats = scan_layer_time_samples(source.layer, source.path)
+            else:
+                stats = await loop.run_in_executor(None, scan_layer_time_samples, source.layer, source.path)
+        except Exception as e:
+            print(f"[Smart HUD] ⚠️ Error scanning time samples of {source}: {e}")
+            stats = {"start": None, "end": None, "attrs_scanned": 0, "samples_found": 0,
+                     "layer_start": None, "layer_end": None}
+        # Dropped if the source was edited while scanning; the next lookup rescans it
+        self._cycle_cache.put(source, stats, version)
+        for callback in self._cycle_cache.pop_waiters(source):
+            callback(source)
+
+    def _on_cycle_scanned(self, prim_path):
+        if not self._running or prim_path not in self._hud_instances:
+            return
+        stage = omni.usd.get_context().get_stage()
+        if not stage:
+            return
+        cycle_info = self._get_anim_cycle_frames(stage, prim_path, on_pending=self._on_cycle_scanned)
+        if cycle_info["status"] == "Pending":
+            return  # a source changed during the scan and is being rescanned
+        self._apply_cycle_info(prim_path, cycle_info)
+        if self._ui_instance and hasattr(self._ui_instance, "_update_binding_diagnostics"):
+            self._ui_instance._update_binding_diagnostics()
+
+    def _apply_cycle_info(self, prim_path, cycle_info):
+        instance = self._hud_instances.get(prim_path)
+        stage = omni.usd.get_context().get_stage()
+        if instance is None or not stage:
+            return
+        cycle_start = cycle_info["start"]
+        cycle_end = cycle_info["end"]
+        fps = stage.GetTimeCodesPerSecond()
+        cycle_len = cycle_end - cycle_start
+        cycle_len_seconds = cycle_len / fps if cycle_len > 0.0 else 3.0
+        instance["cycle_start"] = cycle_start
+        instance["cycle_end"] = cycle_end
+        instance["cycle_len_seconds"] = cycle_len_seconds
+        instance["time_remaining"] = cycle_len_seconds
+        
+        # Store binding debug info on the view model
+        view_model = instance["view_model"]
+        view_model.bind_status = cycle_info["status"]
+        view_model.bind_target = cycle_info["target_path"]
+        view_model.bind_cycle_len = cycle_len
+        
+        print(f"[Smart HUD] 🔍 {prim_path}: bind_status={cycle_info['status']}, "
+              f"target={cycle_info['target_path']}, "
+              f"cycle=[{cycle_start:.0f} → {cycle_end:.0f}] ({cycle_len:.0f} frames), "
+              f"attrs_scanned={cycle_info['attrs_scanned']}, samples_found={cycle_info['samples_found']}")
+
+    def _on_layers_changed(self, notice, sender):
+        # Only referenced layers are invalidated as a whole; the stage's own layers change every frame
+        # and are invalidated per source spec path from ObjectsChanged instead
+        stage = omni.usd.get_context().get_stage()
+        serial = notice.GetSerialNumber()
+        for layer in notice.GetLayers():
+            if not (stage and stage.HasLocalLayer(layer)):
+                self._cycle_cache.note_layer_changed(layer.identifier, serial)
+
     def _start_telemetry(self):
+        import carb.events
         import omni.kit.app
         self._update_sub = omni.kit.app.get_app().get_update_event_stream().create_subscription_to_pop(self._on_update)
+        bus = omni.kit.app.get_app().get_message_bus_event_stream()
+        self._station_subs = [
+            bus.create_subscription_to_pop_by_type(
+                carb.events.type_from_string(event_name),
+                lambda e, k=kind: self._on_station_event(k, e),
+            )
+            for kind, event_name in STATION_EVENTS
+        ]
+
+    def _on_station_event(self, kind, event):
+        """Route a Smart Conveyor station event; the progress itself is extrapolated in _on_update."""
+        if not self._running:
+            return
+        payload = dict(event.payload.get_dict()) if hasattr(event.payload, "get_dict") else dict(event.payload)
+        self._stations.handle(kind, payload, self._station_clock)
 
     def _on_update(self, event):
-        import random
         import omni.usd
         import omni.timeline
         import omni.kit.viewport.utility
@@ -616,6 +1034,7 @@ class GrayboxHUDEngine:
             return
 
         dt = event.payload.get("dt", 0.0)
+        self._station_clock += dt
 
         context = omni.usd.get_context()
         stage = context.get_stage()
@@ -632,63 +1051,48 @@ class GrayboxHUDEngine:
             current_frame = timeline.get_current_time() * fps
             time_code = Usd.TimeCode(current_frame)
             
-        # 1. Initialize Shared XformCache for performance
-        xform_cache = UsdGeom.XformCache(time_code)
+        # 0. Add / remove / update only the HUDs touched by USD notices
+        self._process_discovery(stage)
         
-        # 2. Get Camera Position for Distance Culling
-        cam_pos = None
-        window = omni.kit.viewport.utility.get_active_viewport_window()
-        if window and hasattr(window, "viewport_api"):
-            cam_path = window.viewport_api.camera_path
-            if cam_path:
-                cam_prim = stage.GetPrimAtPath(cam_path)
-                if cam_prim and cam_prim.IsValid():
-                    cam_matrix = xform_cache.GetLocalToWorldTransform(cam_prim)
-                    cam_pos = cam_matrix.ExtractTranslation()
+        # 1. Refresh only the anchors invalidated by USD notices (plus time-varying ones while playing)
+        self._refresh_dirty_anchors(stage, time_code, include_animated=is_playing)
         
-        culling_distance_sq = 15000.0 * 15000.0  # Adjust as needed (e.g., 150 meters)
+        # 2. Query the spatial index with the camera frustum + max distance
+        visible = self._query_visible_huds(stage, time_code)
         
-        for prim_path, instance in self._hud_instances.items():
+        for prim_path in self._visible_huds - visible:
+            self._apply_display_mode(self._hud_instances.get(prim_path), "hidden")
+        self._visible_huds = visible
+        
+        # 3. Screen-space LOD + clustering of the visible HUDs
+        self._update_lod_and_clusters(visible)
+        
+        # 4. Telemetry: only HUDs whose values changed are touched
+        for prim_path, fields in self._telemetry.poll().items():
+            instance = self._hud_instances.get(prim_path)
+            if instance is not None:
+                self._apply_telemetry(instance, fields)
+        
+        # 5. Human Station progress (view model only)
+        for prim_path in visible:
+            instance = self._hud_instances.get(prim_path)
+            if instance is None:
+                continue
             vm = instance["view_model"]
             m_type = instance["machine_type"]
             
-            # --- Transform & Culling Update ---
-            prim = stage.GetPrimAtPath(prim_path)
-            if prim and prim.IsValid():
-                world_transform = xform_cache.GetLocalToWorldTransform(prim)
-                translation = world_transform.ExtractTranslation()
-                
-                # Check distance if camera is valid
-                if cam_pos is not None:
-                    dist_sq = (translation[0] - cam_pos[0])**2 + (translation[1] - cam_pos[1])**2 + (translation[2] - cam_pos[2])**2
-                    is_visible = dist_sq < culling_distance_sq
-                    
-                    # Toggle visibility based on distance
-                    if instance.get("is_expanded"):
-                        instance["expanded_transform"].visible = is_visible
-                        instance["collapsed_transform"].visible = False
-                    else:
-                        instance["expanded_transform"].visible = False
-                        instance["collapsed_transform"].visible = is_visible
-                        
-                    # Skip matrix update if culled
-                    if not is_visible:
-                        continue
-                
-                # Apply Z offset for HUD positioning
-                translation[2] += 80.0
-                
-                new_transform_matrix = [
-                    1, 0, 0, 0,
-                    0, 1, 0, 0,
-                    0, 0, 1, 0,
-                    translation[0], translation[1], translation[2], 1
-                ]
-                
-                if instance.get("collapsed_transform"):
-                    instance["collapsed_transform"].transform = new_transform_matrix
-                if instance.get("expanded_transform"):
-                    instance["expanded_transform"].transform = new_transform_matrix
+            if instance.get("progress_source") == PROGRESS_SOURCE_CONVEYOR:
+                # Driven by conveyor station events (whatever the timeline state)
+                progress_pct = self._stations.progress(prim_path, self._station_clock)
+                if progress_pct is None:
+                    continue
+                progress_pct = quantize_progress(progress_pct, self.PROGRESS_STEP_PCT)
+                if progress_pct != vm.current_progress_pct:
+                    vm.current_progress_pct = progress_pct
+                    vm.progress_style = fill_style(progress_pct)
+                    vm.history.set_current("progress", progress_pct)
+                    self._scheduler.mark_dirty(prim_path)
+                continue
             
             # HUD metrics/progress should only update when timeline is playing
             if not is_playing:
@@ -707,54 +1111,409 @@ class GrayboxHUDEngine:
                 else:
                     progress_pct = 100.0
                     
-                # Color logic: Green(100) -> Yellow(50) -> Red(0)
-                if progress_pct > 50:
-                    r = max(0.0, min(1.0, (100.0 - progress_pct) / 50.0))
-                    g = 1.0
-                else:
-                    r = 1.0
-                    g = max(0.0, min(1.0, progress_pct / 50.0))
+                # Only a change at display resolution needs a redraw
+                progress_pct = quantize_progress(progress_pct, self.PROGRESS_STEP_PCT)
+                if progress_pct == vm.current_progress_pct:
+                    continue
                     
-                # Store values on the view model
+                # Store values on the view model; the widgets are refreshed within the frame budget
+                # Color logic: Green(100) -> Yellow(50) -> Red(0), one shared style per colour level
                 vm.current_progress_pct = progress_pct
-                vm.current_r = r
-                vm.current_g = g
-                
-                # Update model to trigger sc.Widget repaint
-                vm.progress_text.set_value(f"{progress_pct:.1f}%")
-                
-                # Force sc.Widget texture update since Model update alone 
-                # doesn't automatically trigger 3D texture repaint in older versions
-                if instance.get("is_expanded") and "expanded_widget" in instance:
-                    instance["expanded_widget"].invalidate()
-                elif not instance.get("is_expanded") and "collapsed_widget" in instance:
-                    instance["collapsed_widget"].invalidate()
-                
-                # Directly update retained widget properties for immediate redraw.
-                if hasattr(vm, "progress_bars"):
-                    for pb in vm.progress_bars:
-                        try:
-                            pb["fill"].width = ui.Percent(progress_pct)
-                            pb["fill"].set_style({
-                                "background_color": ui.color(r, g, 0.0, 1.0),
-                                "border_radius": 3
-                            })
-                            pb["spacer"].width = ui.Percent(100.0 - progress_pct)
-                        except Exception:
-                            pass
-                    
-            elif m_type == "Machine":
-                    # Update these less frequently to avoid flickering, e.g. based on frame count or time, but keeping random logic for now
-                    vm.aoi_status.set_value(random.choice(["INSPECTING", "PASS", "FAIL"]))
-                    vm.aoi_defect_rate.set_value(random.uniform(0.0, 5.0))
-                        
-            elif m_type == "Robot Station":
-                vm.robot_state.set_value(random.choice(["MOVING", "WELDING", "IDLE"]))
+                vm.progress_style = fill_style(progress_pct)
+                vm.history.set_current("progress", progress_pct)
+                self._scheduler.mark_dirty(prim_path)
+        
+        # 6. Metric history at a fixed interval (all HUDs, culled ones included)
+        self._sample_history(dt)
+        
+        # 7. Widget refreshes (set_style / invalidate) within the per-frame time budget
+        self._scheduler.budget_ms = self._get_frame_budget_ms()
+        self._scheduler.run(visible, self._refresh_hud_widgets, self._hud_camera_distance, dt)
+        self._publish_refresh_stats()
+
+    def _refresh_hud_widgets(self, prim_path):
+        """Push a HUD's view-model values into its retained widgets and repaint it."""
+        instance = self._hud_instances.get(prim_path)
+        if instance is None:
+            return
+        vm = instance["view_model"]
+        if instance["machine_type"] == "Human Station":
+            text = format_progress(vm.current_progress_pct)
+            if vm.progress_text.get_value_as_string() != text:
+                vm.progress_text.set_value(text)
+        
+        # Force sc.Widget texture update since Model update alone 
+        # doesn't automatically trigger 3D texture repaint in older versions
+        if instance.get("display") in ("hidden", "clustered"):
+            return
+        panel = instance.get("panel")
+        if panel is not None:
+            # Directly update retained widget properties, skipping the ones already showing this value.
+            if panel["content"].handles is not None:
+                self._push_panel_values(instance, panel["content"].handles)
+            panel["widget"].invalidate()
+            self._redraws.note()
+
+    def _sample_history(self, dt):
+        self._history_time += dt
+        self._history_elapsed += dt
+        if self._history_elapsed < self.HISTORY_INTERVAL_S:
+            return
+        self._history_elapsed = 0.0
+        for prim_path, instance in self._hud_instances.items():
+            vm = instance["view_model"]
+            vm.history.sample(self._history_time)
+            if vm.sparkline is not None and self._update_sparkline(vm):
+                self._scheduler.mark_dirty(prim_path)
+
+    def _update_sparkline(self, vm):
+        """Push the primary metric's recent history into the expanded panel's plot."""
+        sparkline = vm.sparkline
+        metric = vm.history.primary()
+        data = vm.history.sparkline(metric, self.SPARKLINE_POINTS, self.SPARKLINE_WINDOW_S / self.HISTORY_INTERVAL_S) if metric else None
+        if data is None:
+            return False
+        values, lo, hi = data
+        if hi - lo < 1e-6:
+            lo, hi = lo - 0.5, hi + 0.5
+        try:
+            sparkline["plot"].scale_min = lo
+            sparkline["plot"].scale_max = hi
+            sparkline["plot"].set_data(*values.tolist())
+            sparkline["caption"].text = f"{metric}  {lo:.1f} – {hi:.1f}"
+        except Exception:
+            return False
+        return True
+
+    def _build_sparkline(self, handles, height=28, optional=False):
+        import omni.ui as ui
+        with ui.VStack(height=height + 14, spacing=1) as stack:
+            caption = ui.Label("", height=12, style={"color": 0xFF888888, "font_size": 11})
+            plot = ui.Plot(ui.Type.LINE, 0.0, 1.0, 0.0, height=height,
+                           style={"color": 0xFF00E0FF, "background_color": 0x22000000})
+        handles["sparkline"] = {"plot": plot, "caption": caption, "stack": stack, "optional": optional}
+
+    def _hud_camera_distance(self, prim_path):
+        pos = self._spatial.position(prim_path)
+        cam = self._camera_pos
+        if pos is None or cam is None:
+            return 0.0
+        return ((pos[0] - cam[0]) ** 2 + (pos[1] - cam[1]) ** 2 + (pos[2] - cam[2]) ** 2) ** 0.5
+
+    def _get_frame_budget_ms(self):
+        if self._ui_instance and hasattr(self._ui_instance, "hud_budget_model"):
+            return max(0.1, self._ui_instance.hud_budget_model.as_float)
+        return self.FRAME_BUDGET_MS
+
+    def get_refresh_stats(self):
+        stats = self._scheduler.stats()
+        stats["pending"] = len(self._scheduler)
+        stats["panels"] = self._panels.stats()
+        stats["redraws_per_second"] = self._redraws.rate()
+        stats["redraws_total"] = self._redraws.total
+        return stats
+
+    def _publish_refresh_stats(self):
+        self._stats_frame += 1
+        if self._stats_frame % self.STATS_INTERVAL_FRAMES:
+            return
+        label = getattr(self._ui_instance, "_refresh_stats_label", None) if self._ui_instance else None
+        if label:
+            st = self.get_refresh_stats()
+            label.text = (f"{st['refresh_rate_hz']:.1f} Hz per HUD | {st['last_frame_ms']:.2f} / {st['budget_ms']:.1f} ms"
+                          f" | deferred {st['deferred']} | {st['redraws_per_second']:.0f} redraws/s"
+                          f" | panels {st['panels']['in_use']}/{len(self._panels)}")
+
+    # ------------------------------------------------------------------
+    # Telemetry
+    # ------------------------------------------------------------------
+    def set_telemetry_sources(self, sources):
+        """Replace the active telemetry sources (stopping the previous ones)."""
+        self._telemetry.clear_sources()
+        for source in sources:
+            try:
+                self._telemetry.add_source(source)
+            except Exception as e:
+                print(f"[Smart HUD] ⚠️ Cannot start telemetry source '{source.name}': {e}")
+
+    def get_telemetry_status(self):
+        names = ", ".join(s.name for s in self._telemetry.sources) or "None"
+        return f"{names} | unmatched records: {self._telemetry.unmatched}"
+
+    def _get_machine_id(self, prim):
+        for attr_name in ("hud_machine_id", "aif:core:modelNumber"):
+            attr = prim.GetAttribute(attr_name)
+            if attr and attr.IsValid():
+                value = attr.Get()
+                if value:
+                    return str(value)
+        return None
+
+    def _apply_telemetry(self, instance, fields):
+        vm = instance["view_model"]
+        m_type = instance["machine_type"]
+        if m_type == "Machine":
+            status = fields.get("status", fields.get("state"))
+            if status is not None:
+                vm.aoi_status.set_value(str(status))
+            if "defect_rate" in fields:
+                try:
+                    vm.aoi_defect_rate.set_value(float(fields["defect_rate"]))
+                except (TypeError, ValueError):
+                    pass
+        elif m_type == "Robot Station":
+            state = fields.get("state", fields.get("status"))
+            if state is not None:
+                vm.robot_state.set_value(str(state))
+        elif m_type == "Human Station":
+            if "content" in fields:
+                vm.manual_station_content.set_value(str(fields["content"]))
+        elif "content" in fields:
+            vm.generic_content.set_value(str(fields["content"]))
+        
+        # Numeric values (temperature, defect rate, ...) also feed the metric history
+        for name, value in fields.items():
+            if not isinstance(value, bool):
+                vm.history.set_current(name, value)
+        
+        # sc.Widget textures are not repainted by model changes alone: repaint within the frame budget
+        self._scheduler.mark_dirty(instance["prim_path"])
+
+    def _get_cull_distance(self):
+        if self._ui_instance and hasattr(self._ui_instance, "hud_cull_distance_model"):
+            return max(0.0, self._ui_instance.hud_cull_distance_model.as_float)
+        return self.DEFAULT_CULL_DISTANCE
+
+    def _query_visible_huds(self, stage, time_code):
+        """Return the set of HUD prim paths inside the view frustum and cull distance."""
+        import omni.kit.viewport.utility
+        window = omni.kit.viewport.utility.get_active_viewport_window()
+        viewport_api = getattr(window, "viewport_api", None) if window else None
+        if viewport_api is None or not viewport_api.camera_path:
+            # No camera information: keep the previous behaviour (everything visible)
+            return set(self._hud_instances.keys())
+
+        cam_prim = stage.GetPrimAtPath(viewport_api.camera_path)
+        if not cam_prim or not cam_prim.IsValid():
+            return set(self._hud_instances.keys())
+        cam_pos = UsdGeom.Xformable(cam_prim).ComputeLocalToWorldTransform(time_code).ExtractTranslation()
+        self._camera_pos = cam_pos
+
+        planes = ()
+        self._camera_state = None
+        try:
+            projection = viewport_api.projection
+            view_proj = viewport_api.view * projection
+            planes = frustum_planes_from_matrix(view_proj)
+            width, height = viewport_api.resolution
+            self._camera_state = (view_proj, projection[1][1], float(width), float(height))
+        except Exception:
+            pass  # distance-only culling if the viewport exposes no matrices
+
+        return set(self._spatial.query_frustum(planes, cam_pos, self._get_cull_distance(), self.CULL_MARGIN))
+
+    def _apply_display_mode(self, instance, mode):
+        """Switch a HUD between "expanded", full / compact / icon LOD, "clustered" and "hidden".
+
+        Modes with a panel acquire one from the pool; when a panel kind is at its cap the HUD
+        falls back to the next cheaper mode (expanded -> full -> icon -> hidden).
+        """
+        if instance is None or instance.get("display") == mode:
+            return
+        prim_path = instance["prim_path"]
+        kind = self.PANEL_KIND.get(mode)
+        panel = instance.get("panel")
+        if panel is not None and panel["kind"] != kind:
+            self._panels.release(prim_path)
+            panel = None
+        if kind is not None and panel is None:
+            panel = self._panels.acquire(kind, self._panel_type(instance["machine_type"]), prim_path)
+            if panel is None:
+                if mode == "expanded":
+                    instance["is_expanded"] = False
+                    print(f"[Smart HUD] ⚠️ At most {self.MAX_LIVE_PANELS['expanded']} expanded HUDs can be open")
+                instance["display"] = "hidden"
+                self._apply_display_mode(instance, self.PANEL_FALLBACK[mode])
+                return
+            instance["panel"] = panel
+        instance["display"] = mode
+        if kind == "collapsed":
+            s = self.LOD_COMPACT_SCALE if mode == LOD_COMPACT else 1.0
+            panel["inner"].transform = [s, 0, 0, 0, 0, s, 0, 0, 0, 0, s, 0, 0, 0, 0, 1]
+
+    def _is_clustering_enabled(self):
+        if self._ui_instance and hasattr(self._ui_instance, "hud_cluster_model"):
+            return self._ui_instance.hud_cluster_model.get_value_as_bool()
+        return True
+
+    def _update_lod_and_clusters(self, visible):
+        """Pick a LOD per visible HUD from its projected size and merge HUDs sharing a screen cell."""
+        cam = self._camera_state
+        clustering = cam is not None and self._is_clustering_enabled()
+        candidates = set()
+        for prim_path in visible:
+            instance = self._hud_instances.get(prim_path)
+            if instance is None:
+                continue
+            if instance.get("is_expanded"):
+                self._apply_display_mode(instance, "expanded")
+                continue
+            lod = LOD_FULL
+            anchor = self._spatial.position(prim_path)
+            if cam is not None and anchor is not None:
+                view_proj, proj_yy, width, height = cam
+                screen = project_to_screen(view_proj, anchor, width, height)
+                if screen is not None:
+                    size_px = projected_size_px(self.HUD_WORLD_HEIGHT, screen[2], proj_yy, height)
+                    lod = select_lod(size_px, self.LOD_FULL_PX, self.LOD_COMPACT_PX)
+                    if clustering:
+                        self._clusterer.update(prim_path, screen)
+                        candidates.add(prim_path)
+            instance["lod"] = lod
+
+        # Only HUDs that changed screen cell touched the clusterer; drop the ones no longer candidates
+        self._clusterer.retain(candidates)
+        acquiring = []
+        for prim_path in visible:
+            instance = self._hud_instances.get(prim_path)
+            if instance is None or instance.get("is_expanded"):
+                continue
+            clustered = prim_path in candidates and self._clusterer.is_clustered(prim_path)
+            mode = "clustered" if clustered else instance["lod"]
+            if instance.get("display") == mode:
+                continue
+            if self.PANEL_KIND.get(mode) is None:
+                self._apply_display_mode(instance, mode)
+            else:
+                acquiring.append((prim_path, mode))
+        # Panels freed above are handed out first to the HUDs nearest the camera
+        acquiring.sort(key=lambda item: self._hud_camera_distance(item[0]))
+        for prim_path, mode in acquiring:
+            self._apply_display_mode(self._hud_instances[prim_path], mode)
+        self._update_cluster_badges()
+
+    # ------------------------------------------------------------------
+    # Cluster summary badges
+    # ------------------------------------------------------------------
+    def _hud_status(self, instance):
+        vm = instance["view_model"]
+        m_type = instance["machine_type"]
+        if m_type == "Machine":
+            return vm.aoi_status.get_value_as_string()
+        if m_type == "Robot Station":
+            return vm.robot_state.get_value_as_string()
+        return None
+
+    def _hud_progress(self, instance):
+        if instance["machine_type"] == "Human Station":
+            return instance["view_model"].current_progress_pct
+        return None
+
+    def _update_cluster_badges(self):
+        clusters = self._clusterer.clusters()
+        # Membership changes only happen in dirty cells; badges elsewhere just refresh their text
+        for cell in self._clusterer.pop_dirty():
+            if cell not in clusters:
+                badge = self._cluster_badges.pop(cell, None)
+                if badge is not None:
+                    badge["transform"].visible = False
+                    self._badge_pool.append(badge)
+            elif cell not in self._cluster_badges:
+                self._cluster_badges[cell] = self._acquire_badge()
+
+        for cell, badge in self._cluster_badges.items():
+            members = clusters.get(cell, ())
+            instances = [self._hud_instances[p] for p in members if p in self._hud_instances]
+            if not instances:
+                continue
+            summary = summarize_cluster(
+                (self._hud_status(i) for i in instances),
+                (self._hud_progress(i) for i in instances),
+            )
+            positions = [self._spatial.position(p) for p in members]
+            positions = [p for p in positions if p is not None]
+            if positions:
+                n = float(len(positions))
+                center = [sum(p[k] for p in positions) / n for k in range(3)]
+                badge["transform"].transform = [1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0, center[0], center[1], center[2], 1]
+            self._set_badge_summary(badge, summary)
+            badge["transform"].visible = True
+
+    def _acquire_badge(self):
+        if self._badge_pool:
+            return self._badge_pool.pop()
+        import omni.ui as ui
+        import omni.ui.scene as sc
+        badge = {
+            "count": ui.SimpleStringModel(""),
+            "detail": ui.SimpleStringModel(""),
+            "summary": None,
+        }
+        with self.scene_view.scene:
+            badge["transform"] = sc.Transform(look_at=sc.Transform.LookAt.CAMERA, visible=False)
+            with badge["transform"]:
+                badge["widget"] = sc.Widget(width=96, height=40)
+
+        def build_badge(b=badge):
+            with ui.ZStack():
+                b["background"] = ui.Rectangle(style={"background_color": 0xCC1A1E24, "border_color": 0x8800FFFF, "border_width": 1, "border_radius": 4})
+                with ui.VStack():
+                    ui.Label("", model=b["count"], height=20, style={"color": ui.color(0.0, 0.88, 1.0), "font_size": 14}, alignment=ui.Alignment.CENTER)
+                    ui.Label("", model=b["detail"], style={"color": 0xFFDDDDDD, "font_size": 11}, alignment=ui.Alignment.CENTER)
+        badge["widget"].frame.set_build_fn(build_badge)
+        return badge
+
+    def _set_badge_summary(self, badge, summary):
+        # Round the progress so the badge texture is only repainted on visible changes
+        mean = summary["mean_progress"]
+        key = (summary["count"], summary["worst_status"], None if mean is None else round(mean))
+        if badge["summary"] == key:
+            return
+        badge["summary"] = key
+        badge["count"].set_value(f"{summary['count']} HUDs")
+        parts = []
+        if summary["worst_status"]:
+            parts.append(str(summary["worst_status"]))
+        if mean is not None:
+            parts.append(f"{mean:.0f}%")
+        badge["detail"].set_value(" | ".join(parts))
+        severity = status_severity(summary["worst_status"])
+        border = 0xFF3333FF if severity >= 4 else 0xFF00A5FF if severity == 3 else 0x8800FFFF
+        if badge.get("background") is not None:
+            badge["background"].set_style({"background_color": 0xCC1A1E24, "border_color": border, "border_width": 1, "border_radius": 4})
+        badge["widget"].invalidate()
+
+    def _reset_clusters(self):
+        # Badge transforms live under scene_view.scene and are dropped with it
+        self._clusterer = ScreenClusterer(cell_px=self.CLUSTER_CELL_PX)
+        self._cluster_badges.clear()
+        self._badge_pool.clear()
+        self._camera_state = None
 
     def destroy(self):
         self._running = False
         self._update_sub = None
+        self._station_subs = []
+        self._stations.clear()
+        if self._objects_changed_listener:
+            self._objects_changed_listener.Revoke()
+            self._objects_changed_listener = None
+        if self._layers_changed_listener:
+            self._layers_changed_listener.Revoke()
+            self._layers_changed_listener = None
+        self._cycle_cache.clear()
+        self._telemetry.clear_sources()
+        self._telemetry.clear_huds()
+        self._scheduler.clear()
         self._hud_instances.clear()
+        self._anchor_index.clear()
+        self._animated_anchors.clear()
+        self._spatial.clear()
+        self._visible_huds.clear()
+        self._reset_clusters()
+        self._discovery.clear()
+        self._panels.clear()
+        self._spare_transforms.clear()
         
         if self.scene_view:
             if self.scene_view.scene:
@@ -789,11 +1548,24 @@ class SmartHudUI:
         "Button:pressed": { "background_color": 0xFF471F1F } 
     }
 
+    UPH_FALLBACK_DIR = r"D:\Inventec\DigitalTwin\Factory\IMX\ProdLine_UPH"
+    WAYPOINT_MATCH_TOLERANCE = 500.0
+
     def __init__(self):
         self.engine = None
         self.is_enabled = False
+        self._waypoint_index = WaypointPauseIndex()
         self.hud_scale_model = ui.SimpleFloatModel(1.0)
         self.hud_scale_model.add_value_changed_fn(self._on_hud_scale_changed)
+        self.hud_cull_distance_model = ui.SimpleFloatModel(GrayboxHUDEngine.DEFAULT_CULL_DISTANCE)
+        self.hud_cluster_model = ui.SimpleBoolModel(True)
+        self.hud_budget_model = ui.SimpleFloatModel(GrayboxHUDEngine.FRAME_BUDGET_MS)
+        self._telemetry_options = ["None", "File Tail (CSV/JSONL)", "Replay File", "Local HTTP", "Conveyor Zones"]
+        self.telemetry_type_model = None
+        self.telemetry_target_model = ui.SimpleStringModel("")
+        self.target_types_model = ui.SimpleStringModel("Mesh")
+        self.target_pattern_model = ui.SimpleStringModel("")
+        omni.kit.commands.register(ApplyHudAttributesCommand)
         
         # Subscribe to stage events to auto-disable HUD on stage change
         import omni.usd
@@ -867,9 +1639,28 @@ class SmartHudUI:
                         self.takt_label_field = ui.StringField()
                         self.takt_label_field.model.set_value("Process:")
                     zin_ui_utils.build_property_row("Process:", build_process, tooltip="Will be written to 'hud_takt_label'.")
+                    
+                    def build_progress_source():
+                        self._progress_source_options = [PROGRESS_SOURCE_ANIMATION, PROGRESS_SOURCE_CONVEYOR]
+                        self.progress_source_combo = ui.ComboBox(0, "Animation", "Conveyor")
+                    zin_ui_utils.build_property_row("Progress Source:", build_progress_source, tooltip="Will be written to 'hud_progress_source'. Conveyor: progress follows Smart Conveyor boards pausing at the nearest waypoint.")
                         
                     self.apply_to_children_cb = ui.SimpleBoolModel(True)
-                    zin_ui_utils.build_checkbox_row("Target:", self.apply_to_children_cb, "Auto-apply to Child Meshes (For Groups)", "If checked, applying to a Group/Xform will automatically apply to its internal Meshes.")
+                    zin_ui_utils.build_checkbox_row("Target:", self.apply_to_children_cb, "Auto-apply to Child Prims (For Groups)", "If checked, applying to a Group/Xform will automatically apply to its internal prims of the target types.")
+                    
+                    def build_target_types():
+                        ui.StringField(self.target_types_model)
+                    zin_ui_utils.build_property_row("Target Types:", build_target_types, tooltip="Comma-separated prim type names the groups are expanded to (e.g. Mesh, Xform).")
+                    
+                    def build_target_pattern():
+                        ui.StringField(self.target_pattern_model)
+                    zin_ui_utils.build_property_row("Path Pattern:", build_target_pattern, tooltip="Optional wildcard on the full prim path (e.g. */Station_*). Empty applies to every target.")
+                    
+                    def build_target_preview():
+                        with ui.HStack(spacing=zin_ui_utils.ZIN_ROW_SPACING):
+                            ui.Button("Preview", width=70, clicked_fn=self._preview_attribute_targets, tooltip="Count the prims Add / Update would write to.")
+                            self._target_preview_label = ui.Label("", name="Description")
+                    zin_ui_utils.build_property_row("Targets:", build_target_preview)
                     
                     def build_custom_cycle():
                         self.custom_cycle_field = ui.IntField()
@@ -893,6 +1684,18 @@ class SmartHudUI:
                         ui.FloatSlider(self.hud_scale_model, min=0.5, max=3.0)
                     zin_ui_utils.build_property_row("HUD Scale:", build_scale, tooltip="Dynamically rescale the expanded HUDs.")
                     
+                    def build_cull_distance():
+                        ui.FloatDrag(self.hud_cull_distance_model, min=0.0, max=100000.0, step=100.0)
+                    zin_ui_utils.build_property_row("Cull Distance:", build_cull_distance, tooltip="HUDs farther than this from the camera (stage units) or outside the view are hidden.")
+                    def build_budget():
+                        ui.FloatDrag(self.hud_budget_model, min=0.1, max=16.0, step=0.1)
+                    zin_ui_utils.build_property_row("Frame Budget (ms):", build_budget, tooltip="Time per frame spent repainting HUD widgets. HUDs that do not fit are refreshed on later frames (closest and longest-waiting first).")
+                    
+                    def build_refresh_stats():
+                        self._refresh_stats_label = ui.Label("N/A", name="Description")
+                    zin_ui_utils.build_property_row("HUD Refresh:", build_refresh_stats, tooltip="Achieved refresh rate per pending HUD, time spent vs. budget, HUDs deferred to the next frame, HUD texture redraws per second, pooled panels in use / alive.")
+                    zin_ui_utils.build_checkbox_row("Clustering:", self.hud_cluster_model, "Merge overlapping HUDs", tooltip="HUDs that overlap on screen are merged into one summary badge (count, worst status, mean progress); distant HUDs switch to compact / icon panels.")
+                    
                     ui.Spacer(height=5)
                     with ui.HStack(spacing=zin_ui_utils.ZIN_ROW_SPACING, height=24):
                         ui.Button(
@@ -937,8 +1740,52 @@ class SmartHudUI:
                         self._diag_cycle_label = ui.Label("(none)", name="Description")
                     zin_ui_utils.build_property_row("Cycle Length:", build_diag_cycle)
 
+            ui.Spacer(height=10)
+            with ui.CollapsableFrame("Telemetry", collapsed=True, height=0):
+                with ui.VStack(spacing=zin_ui_utils.ZIN_V_SPACING, padding=6):
+                    def build_telemetry_type():
+                        combo = ui.ComboBox(0, *self._telemetry_options)
+                        self.telemetry_type_model = combo.model
+                    zin_ui_utils.build_property_row("Source:", build_telemetry_type, tooltip="Where Machine / Robot HUD values come from. Records are matched by 'prim_path' or by 'machine_id' / 'id' (hud_machine_id or aif:core:modelNumber on the HUD prim).")
+                    
+                    def build_telemetry_target():
+                        ui.StringField(self.telemetry_target_model)
+                    zin_ui_utils.build_property_row("File / Port:", build_telemetry_target, tooltip="File path for File Tail / Replay, port number for Local HTTP (POST JSON to /telemetry/<id>).")
+                    
+                    zin_ui_utils.build_button_row("", "Apply Source", self._apply_telemetry_sources, self._STYLE_POSITIVE, "Starts the selected telemetry source on the running HUD.")
+                    
+                    def build_telemetry_status():
+                        self._telemetry_status_label = ui.Label("N/A", name="Description")
+                    zin_ui_utils.build_property_row("Status:", build_telemetry_status)
+
             ui.Spacer()
 
+    def _make_telemetry_sources(self):
+        index = self.telemetry_type_model.get_item_value_model().as_int if self.telemetry_type_model else 0
+        target = self.telemetry_target_model.get_value_as_string().strip().strip('"')
+        option = self._telemetry_options[index]
+        if option.startswith("File Tail") and target:
+            return [FileTailSource(target)]
+        if option == "Replay File" and target:
+            return [ReplaySource(target)]
+        if option == "Local HTTP":
+            return [LocalHttpSource(int(target) if target.isdigit() else 8765)]
+        if option == "Conveyor Zones":
+            return [ConveyorZoneSource()]
+        return []
+
+    def _apply_telemetry_sources(self):
+        if not self.engine:
+            return
+        try:
+            sources = self._make_telemetry_sources()
+        except Exception as e:
+            print(f"[Smart HUD] ⚠️ Cannot create telemetry source: {e}")
+            sources = []
+        self.engine.set_telemetry_sources(sources)
+        if getattr(self, "_telemetry_status_label", None):
+            self._telemetry_status_label.text = self.engine.get_telemetry_status()
+
     def _on_display_setting_changed(self, model):
         # Notify the engine to rebuild HUDs to reflect the new display settings
         if self.is_enabled and self.engine:
@@ -948,17 +1795,7 @@ class SmartHudUI:
         if not self.is_enabled or not self.engine:
             return
             
-        scale = model.as_float
-        scale_matrix = [
-            scale, 0, 0, 0,
-            0, scale, 0, 0,
-            0, 0, scale, 0,
-            0, 0, 0, 1
-        ]
-        
-        for path, instance in self.engine._hud_instances.items():
-            if "scale_transform" in instance:
-                instance["scale_transform"].transform = scale_matrix
+        self.engine.set_hud_scale(model.as_float)
 
     def _bind_animation_target(self):
         """Writes 'aif:core:animationTarget' to selected prims."""
@@ -1003,16 +1840,10 @@ class SmartHudUI:
             else:
                 print(f"[Smart HUD] ✅ Bound animationTarget = '{target_path}' (auto-detect cycle) on {path}")
         
-        # Update diagnostic labels and trigger engine rebuild
+        # The running engine picks up the edited HUDs from USD notices on the next frame
         self._update_binding_diagnostics()
-        if self.is_enabled and self.engine:
-            self.engine.rebuild_huds()
-            self._update_binding_diagnostics()
 
-    def _find_closest_waypoint_pause(self, world_pos):
-        import glob
-        import json
-        import math
+    def _resolve_uph_dir(self):
         import omni.usd
         import os
         
@@ -1020,7 +1851,7 @@ class SmartHudUI:
         context = omni.usd.get_context()
         stage_url = context.get_stage_url()
         
-        json_dir = r"D:\Inventec\DigitalTwin\Factory\IMX\ProdLine_UPH" # Fallback
+        json_dir = self.UPH_FALLBACK_DIR
         if stage_url:
             stage_path = stage_url.replace("omniverse://", "").split("?")[0]
             # 假設結構為 .../IMX_1F/ProdLine/Line_S01.usd
@@ -1028,46 +1859,53 @@ class SmartHudUI:
             dynamic_dir = os.path.join(parent_dir, "ProdLine_UPH")
             if os.path.exists(dynamic_dir):
                 json_dir = dynamic_dir
-                
-        print(f"[Smart HUD] 🔍 Scanning JSON files in: {json_dir}")
-        json_files = glob.glob(f"{json_dir}/*.json")
-        
-        closest_wp = None
-        min_dist = float('inf')
-        
-        for f in json_files:
-            try:
-                with open(f, 'r', encoding='utf-8') as file:
-                    data = json.load(file)
-                    
-                waypoints = data.get("waypoints", [])
-                for wp in waypoints:
-                    pos = wp.get("pos")
-                    if pos and len(pos) >= 3:
-                        dx = pos[0] - world_pos[0]
-                        dy = pos[1] - world_pos[1]
-                        dz = pos[2] - world_pos[2]
-                        dist = math.sqrt(dx*dx + dy*dy + dz*dz)
-                        if dist < min_dist:
-                            min_dist = dist
-                            closest_wp = wp
-            except Exception as e:
-                print(f"[Smart HUD] Error reading {f}: {e}")
+        return json_dir
+
+    def _find_closest_waypoint_pause(self, world_pos, json_dir=None):
+        # 索引只在資料夾內 JSON 變動時重建；查詢本身不讀硬碟
+        self._waypoint_index.ensure_current(json_dir or self._resolve_uph_dir())
+        closest_wp, min_dist = self._waypoint_index.nearest(world_pos)
                 
         if closest_wp:
             print(f"[Smart HUD] 📍 Closest Waypoint '{closest_wp.get('name')}' found at distance {min_dist:.2f} units. Pause: {closest_wp.get('pause')}s")
             
-        # 增加一個距離寬容值，如果離最靠近的點位大於 200 (2公尺)，可能代表抓錯了
-        if closest_wp and min_dist < 500.0:
+        # 增加一個距離寬容值，如果離最靠近的點位大於 500 (5公尺)，可能代表抓錯了
+        if closest_wp and min_dist < self.WAYPOINT_MATCH_TOLERANCE:
             if "pause" in closest_wp:
                 return closest_wp["pause"]
             
-        print("[Smart HUD] ⚠️ No valid waypoint found within 500 units.")
+        print(f"[Smart HUD] ⚠️ No valid waypoint found within {self.WAYPOINT_MATCH_TOLERANCE:.0f} units.")
         return None
 
+    def _get_target_filter(self):
+        """(expand to children, type names, path pattern) from the Add / Update options."""
+        apply_to_children = False
+        if hasattr(self, "apply_to_children_cb"):
+            apply_to_children = self.apply_to_children_cb.get_value_as_bool()
+        type_names = ("Mesh",)
+        if hasattr(self, "target_types_model"):
+            type_names = tuple(t.strip() for t in self.target_types_model.get_value_as_string().split(",") if t.strip())
+        path_pattern = self.target_pattern_model.get_value_as_string().strip() if hasattr(self, "target_pattern_model") else ""
+        return apply_to_children, type_names, path_pattern
+
+    def _collect_attribute_targets(self, stage, selection):
+        apply_to_children, type_names, path_pattern = self._get_target_filter()
+        return collect_targets(stage, selection, apply_to_children, type_names, path_pattern)
+
+    def _preview_attribute_targets(self):
+        import omni.usd
+        context = omni.usd.get_context()
+        stage = context.get_stage()
+        selection = context.get_selection().get_selected_prim_paths() if stage else []
+        count = len(self._collect_attribute_targets(stage, selection)) if selection else 0
+        if hasattr(self, "_target_preview_label") and self._target_preview_label:
+            self._target_preview_label.text = f"{count} prims will be updated"
+        return count
+
     def _apply_attributes_to_selected(self):
         import omni.usd
-        from pxr import Sdf, UsdGeom, Usd
+        import omni.kit.commands
+        from pxr import UsdGeom, Usd
         
         context = omni.usd.get_context()
         stage = context.get_stage()
@@ -1085,135 +1923,61 @@ class SmartHudUI:
         subject = self.subject_field.model.get_value_as_string()
         content = self.content_field.model.get_value_as_string()
         takt_label = self.takt_label_field.model.get_value_as_string()
+        source_idx = self.progress_source_combo.model.get_item_value_model().get_value_as_int()
+        progress_source = self._progress_source_options[source_idx] if 0 <= source_idx < len(self._progress_source_options) else PROGRESS_SOURCE_ANIMATION
         
-        apply_to_children = False
-        if hasattr(self, "apply_to_children_cb"):
-            apply_to_children = self.apply_to_children_cb.get_value_as_bool()
+        # Also persist custom cycle length if set in the UI
+        custom_cycle_val = 0
+        if hasattr(self, "custom_cycle_field"):
+            custom_cycle_val = self.custom_cycle_field.model.get_value_as_int()
 
-        target_paths = set()
-        for path in selection:
-            prim = stage.GetPrimAtPath(path)
-            if not prim or not prim.IsValid():
-                continue
-                
-            if apply_to_children and not prim.IsA(UsdGeom.Mesh):
-                # Expand group: find all descendant Meshes
-                meshes = [p for p in Usd.PrimRange(prim) if p.IsA(UsdGeom.Mesh)]
-                if meshes:
-                    for m in meshes:
-                        target_paths.add(str(m.GetPath()))
-                    print(f"[Smart HUD] 📦 Auto-expanded group {path} into {len(meshes)} Mesh prims.")
-                else:
-                    target_paths.add(path)
-            else:
-                target_paths.add(path)
+        target_paths = self._collect_attribute_targets(stage, selection)
+        if not target_paths:
+            print("[Smart HUD] ⚠️ No prims match the target type / path filter.")
+            return
 
+        # 1. Plan every value on the composed stage (no authoring yet)
+        edit_target = stage.GetEditTarget()
+        xform_cache = UsdGeom.XformCache(Usd.TimeCode.Default())
+        fps = stage.GetTimeCodesPerSecond()
+        uph_dir = None  # resolved on first use, shared by all target prims
+        auto_bound = 0
+        zero_pause = 0
+        plan = {}
         for path in target_paths:
             prim = stage.GetPrimAtPath(path)
-            if not prim or not prim.IsValid():
-                continue
-
-            # 1. Add smart_hud attributes
-            attr_type = prim.GetAttribute("machine_type")
-            if not attr_type: attr_type = prim.CreateAttribute("machine_type", Sdf.ValueTypeNames.String)
-            attr_type.Set(topic)
-            
-            attr_sub = prim.GetAttribute("hud_sub_title")
-            if not attr_sub: attr_sub = prim.CreateAttribute("hud_sub_title", Sdf.ValueTypeNames.String)
-            attr_sub.Set(subject)
-            
-            attr_cont = prim.GetAttribute("hud_content")
-            if not attr_cont: attr_cont = prim.CreateAttribute("hud_content", Sdf.ValueTypeNames.String)
-            attr_cont.Set(content)
-            
-            attr_takt = prim.GetAttribute("hud_takt_label")
-            if not attr_takt: attr_takt = prim.CreateAttribute("hud_takt_label", Sdf.ValueTypeNames.String)
-            attr_takt.Set(takt_label)
+            cycle_val = custom_cycle_val
             
-            # Also persist custom cycle length if set in the UI
-            custom_cycle_val = 0
-            if hasattr(self, "custom_cycle_field"):
-                custom_cycle_val = self.custom_cycle_field.model.get_value_as_int()
-                
             # --- Auto-bind from JSON if Machine or Robot Station ---
-            if topic in ["Machine", "Robot Station"]:
-                world_transform = UsdGeom.Xformable(prim).ComputeLocalToWorldTransform(Usd.TimeCode.Default())
-                translation = world_transform.ExtractTranslation()
-                pause_sec = self._find_closest_waypoint_pause(translation)
+            if topic in ["Machine", "Robot Station"] and custom_cycle_val <= 0:
+                translation = xform_cache.GetLocalToWorldTransform(prim).ExtractTranslation()
+                if uph_dir is None:
+                    uph_dir = self._resolve_uph_dir()
+                pause_sec = self._find_closest_waypoint_pause(translation, uph_dir)
                 
                 if pause_sec is not None:
-                    fps = stage.GetTimeCodesPerSecond()
                     auto_cycle_val = int(pause_sec * fps)
-                    if custom_cycle_val <= 0 and auto_cycle_val > 0:  # Only override if not manually set in UI and pause > 0
-                        custom_cycle_val = auto_cycle_val
-                        print(f"[Smart HUD] ✅ Auto-Bound: Matched closest Waypoint. Set cycle time to {auto_cycle_val} frames (Pause: {pause_sec}s) on {path}.")
-                    elif custom_cycle_val <= 0 and auto_cycle_val == 0:
-                        print(f"[Smart HUD] ⚠️ Closest Waypoint has 0s pause. Cycle time not updated for {path}.")
+                    if auto_cycle_val > 0:  # Only override if pause > 0
+                        cycle_val = auto_cycle_val
+                        auto_bound += 1
+                    else:
+                        zero_pause += 1
             
-            cycle_attr = prim.GetAttribute("hud_custom_cycle_length")
-            if not cycle_attr:
-                cycle_attr = prim.CreateAttribute("hud_custom_cycle_length", Sdf.ValueTypeNames.Int)
-            cycle_attr.Set(custom_cycle_val)
+            spec_path = str(edit_target.MapToSpecPath(Sdf.Path(path)))
+            plan[spec_path] = hud_attribute_values(topic, subject, content, takt_label, cycle_val,
+                                                    progress_source=progress_source)
 
-            # 2. Add smart_info_panel attributes (aif:core and aif:spec)
-            # 遵循 AIF Pipeline Samples 綁定規範 (AIF-MANAGED, Locked)
-            aif_attrs = {
-                "aif:core:assetClass": {
-                    "value": topic, 
-                    "doc": "Class of AI Factory Equipment"
-                },
-                "aif:core:modelNumber": {
-                    "value": subject, 
-                    "doc": "Equipment model number"
-                },
-                "aif:core:manufacturer": {
-                    "value": "Inventec", 
-                    "doc": "Equipment manufacturer name"
-                },
-                "aif:core:assetDescription": {
-                    "value": content, 
-                    "doc": "Human Readable Description of Asset"
-                },
-                "aif:spec:status": {
-                    "value": "Active", 
-                    "doc": "Current status of the equipment"
-                }
-            }
-
-            for attr_name, attr_info in aif_attrs.items():
-                attr = prim.GetAttribute(attr_name)
-                
-                # Unlock existing locked attribute before writing
-                if attr and attr.IsValid():
-                    existing_cd = attr.GetCustomData()
-                    if existing_cd.get('omni', {}).get('kit', {}).get('locked', False):
-                        unlocked_cd = dict(existing_cd)
-                        unlocked_cd['omni'] = dict(unlocked_cd.get('omni', {}))
-                        unlocked_cd['omni']['kit'] = dict(unlocked_cd['omni'].get('kit', {}))
-                        unlocked_cd['omni']['kit']['locked'] = False
-                        attr.SetCustomData(unlocked_cd)
-                
-                if not attr or not attr.IsValid():
-                    attr = prim.CreateAttribute(attr_name, Sdf.ValueTypeNames.String)
-                attr.Set(attr_info["value"])
-                
-                # AIF 規範：加入 [AIF-MANAGED] 標籤與鎖定屬性
-                managed_doc = f"{attr_info['doc']} [AIF-MANAGED]"
-                attr.SetDocumentation(managed_doc)
-                
-                custom_data = {
-                    'omni': {
-                        'kit': {
-                            'locked': True
-                        }
-                    }
-                }
-                attr.SetCustomData(custom_data)
-                
-            print(f"[Smart HUD] ✅ Applied HUD and AIF-MANAGED attributes to {path}")
-            
-        if self.is_enabled and self.engine:
-            self.engine.rebuild_huds()
+        # 2. Author everything in one Sdf.ChangeBlock, as a single undoable command
+        omni.kit.commands.execute(
+            "ApplyHudAttributes",
+            layer_identifier=edit_target.GetLayer().identifier,
+            plan=plan,
+        )
+        if auto_bound:
+            print(f"[Smart HUD] ✅ Auto-Bound: {auto_bound} prims took their cycle time from the closest Waypoint.")
+        if zero_pause:
+            print(f"[Smart HUD] ⚠️ {zero_pause} prims matched a Waypoint with 0s pause. Cycle time not updated.")
+        print(f"[Smart HUD] ✅ Applied HUD and AIF-MANAGED attributes to {len(plan)} prims.")
 
     def _remove_attributes_from_selected(self):
         import omni.usd
@@ -1227,7 +1991,7 @@ class SmartHudUI:
 
         attrs_to_remove = [
             "machine_type", "hud_sub_title", "hud_content", "hud_takt_label",
-            "hud_custom_cycle_length",
+            "hud_custom_cycle_length", "hud_progress_source",
             "aif:core:assetClass", "aif:core:modelNumber", 
             "aif:core:manufacturer", "aif:core:assetDescription", 
             "aif:spec:status"
@@ -1289,6 +2053,7 @@ class SmartHudUI:
             self.toggle_btn.set_style(self._STYLE_NEGATIVE)
             if not self.engine:
                 self.engine = GrayboxHUDEngine(self)
+                self._apply_telemetry_sources()
             self._update_binding_diagnostics()
         else:
             self.toggle_btn.text = "Turn ON"
@@ -1327,6 +2092,9 @@ class SmartHudUI:
                 if is_manual:
                     self._diag_status_label.text = f"🎯 Manual Override"
                     self._diag_status_label.set_style({"color": 0xFF00CCFF, "font_size": 12})
+                elif vm.bind_status == "Pending":
+                    self._diag_status_label.text = f"⏳ Detecting Cycle..."
+                    self._diag_status_label.set_style({"color": 0xFFAAAAAA, "font_size": 12})
                 elif is_success:
                     self._diag_status_label.text = f"✅ Bound Successfully"
                     self._diag_status_label.set_style({"color": 0xFF44FF44, "font_size": 12})
@@ -1349,3 +2117,4 @@ class SmartHudUI:
         
         # Clear stage event subscriptions
         self._stage_event_subs = []
+        omni.kit.commands.unregister(ApplyHudAttributesCommand)
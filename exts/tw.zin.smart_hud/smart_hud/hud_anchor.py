@@ -0,0 +1,56 @@
+"""
+Smart HUD — shared, cached HUD anchor computation.
+
+HUD 面板放在 prim 世界 bounding box 頂面中心上方。計算拆成兩層：
+  - local bound：prim 子樹在 prim 自身座標系下的 bound (BBoxCache.ComputeUntransformedBound)，
+    只有子樹內的幾何 (points / extent / visibility ...) 或子孫的 xform 改變時才需要重算
+  - world anchor：local bound 乘上 prim 的 local-to-world，transform 改變 (含播放中的動畫) 時只重算這一步
+
+AnchorBatch 讓同一次處理 (例如整個 stage 的 HUD 建立，或一幀內所有失效的 anchor)
+共用同一個 XformCache 與 BBoxCache，重疊的子樹 bound 只計算一次。
+
+只依賴 pxr.Usd / UsdGeom / Gf。
+"""
+
+from pxr import Gf, Usd, UsdGeom
+
+try:
+    from .hud_anchor_index import BOUNDS_ATTRIBUTES
+except ImportError:   # imported as a top-level module (tests)
+    from hud_anchor_index import BOUNDS_ATTRIBUTES
+
+
+def affects_bounds(attr_name: str) -> bool:
+    return attr_name in BOUNDS_ATTRIBUTES
+
+
+class AnchorBatch:
+    """One XformCache + lazily created BBoxCache shared by every anchor computed in a pass."""
+
+    def __init__(self, time_code=Usd.TimeCode.Default(), z_offset: float = 0.0):
+        self.time_code = time_code
+        self.z_offset = z_offset
+        self.xform_cache = UsdGeom.XformCache(time_code)
+        self._bbox_cache = None
+        self.bounds_computed = 0
+
+    def local_bound(self, prim) -> Gf.BBox3d:
+        if self._bbox_cache is None:
+            purposes = [UsdGeom.Tokens.default_, UsdGeom.Tokens.render]
+            self._bbox_cache = UsdGeom.BBoxCache(self.time_code, purposes)
+        self.bounds_computed += 1
+        return self._bbox_cache.ComputeUntransformedBound(prim)
+
+    def world_anchor(self, prim, local_bound: Gf.BBox3d) -> Gf.Vec3d:
+        """Top centre of the prim's world-aligned box (its origin if it has no geometry), raised by z_offset."""
+        world = self.xform_cache.GetLocalToWorldTransform(prim)
+        box = None
+        if local_bound is not None:
+            box = Gf.BBox3d(local_bound.GetRange(), local_bound.GetMatrix() * world).ComputeAlignedRange()
+        if box is None or box.IsEmpty():
+            anchor = Gf.Vec3d(world.ExtractTranslation())
+        else:
+            lo, hi = box.GetMin(), box.GetMax()
+            anchor = Gf.Vec3d((lo[0] + hi[0]) / 2.0, (lo[1] + hi[1]) / 2.0, hi[2])
+        anchor[2] += self.z_offset
+        return anchor
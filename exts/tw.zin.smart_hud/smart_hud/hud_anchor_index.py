@@ -0,0 +1,131 @@
+"""
+Smart HUD — which cached HUD anchors a USD change invalidates.
+
+每個 HUD 的 anchor 分兩層快取 (見 hud_anchor.py)：local bound 與 world anchor。
+AnchorIndex 以「HUD prim 與其所有祖先 → HUD」的索引，把 Usd.Notice.ObjectsChanged
+的路徑轉成兩個失效集合：
+
+  - prim resync (新增 / 刪除 / 重組)：該 prim 以下的 HUD 兩層都失效，
+    以上的 HUD 子樹內容改變，local bound 也失效
+  - xformOp：該 prim 以下的 HUD 只需重算 world anchor (local bound 不變)；
+    以上的 HUD 是子樹內有子孫移動，local bound 失效
+  - visibility / purpose：會被子孫繼承，以下與以上的 HUD local bound 都失效
+  - points / extent / size ... 幾何屬性：該 prim 與以上的 HUD local bound 失效
+  - 其他屬性：不影響 anchor
+
+HUD 被移除 / 重新加入 (例如 resync 後重新掃描) 時以 remove / add 更新索引。
+
+純 Python (路徑以字串表示)，不依賴 Omniverse。
+"""
+
+from typing import Dict, Iterable, Set, Tuple
+
+try:
+    from .hud_discovery import split_property_path
+except ImportError:   # imported as a top-level module (tests)
+    from hud_discovery import split_property_path
+
+# 會改變 prim 子樹 bound 的屬性 (xformOp:* 另外判斷)
+BOUNDS_ATTRIBUTES = frozenset({
+    "points",
+    "extent",
+    "extentsHint",
+    "visibility",
+    "purpose",
+    "size",
+    "radius",
+    "radiusTop",
+    "radiusBottom",
+    "height",
+    "width",
+    "length",
+    "axis",
+})
+
+# 會被子孫繼承的屬性：改在祖先上也會改變子孫的 bound
+INHERITED_ATTRIBUTES = frozenset({"visibility", "purpose"})
+
+
+def is_xform_attribute(attr_name: str) -> bool:
+    """Same rule as UsdGeom.Xformable.IsTransformationAffectedByAttrNamed."""
+    return attr_name == "xformOpOrder" or attr_name.startswith("xformOp:")
+
+
+def ancestors(path: str) -> Iterable[str]:
+    """path, its parent, ... up to (not including) "/"."""
+    while path and path != "/":
+        yield path
+        path = path.rsplit("/", 1)[0] or "/"
+
+
+class AnchorIndex:
+    """Maps HUD prims and their ancestors to HUDs, and collects the anchors invalidated by notices."""
+
+    def __init__(self):
+        self._index: Dict[str, Set[str]] = {}      # HUD prim or ancestor -> HUD prim paths at or below it
+        self.dirty_anchors: Set[str] = set()       # world anchor must be recomputed
+        self.dirty_bounds: Set[str] = set()        # local bound too (always a subset of dirty_anchors)
+
+    def __contains__(self, hud_path: str) -> bool:
+        return hud_path in self._index.get(hud_path, ())
+
+    def add(self, hud_path: str) -> None:
+        """Index a HUD prim; its anchor is dirty until first computed."""
+        for path in ancestors(hud_path):
+            self._index.setdefault(path, set()).add(hud_path)
+        self.dirty_anchors.add(hud_path)
+        self.dirty_bounds.add(hud_path)
+
+    def remove(self, hud_path: str) -> None:
+        for path in ancestors(hud_path):
+            huds = self._index.get(path)
+            if huds is not None:
+                huds.discard(hud_path)
+                if not huds:
+                    del self._index[path]
+        self.dirty_anchors.discard(hud_path)
+        self.dirty_bounds.discard(hud_path)
+
+    def clear(self) -> None:
+        self._index.clear()
+        self.dirty_anchors.clear()
+        self.dirty_bounds.clear()
+
+    def pop(self) -> Tuple[Set[str], Set[str]]:
+        """(dirty anchors, dirty bounds), resetting both."""
+        dirty = (self.dirty_anchors, self.dirty_bounds)
+        self.dirty_anchors, self.dirty_bounds = set(), set()
+        return dirty
+
+    def _below(self, prim_path: str, bounds: bool) -> None:
+        """HUDs at or below prim_path."""
+        huds = self._index.get(prim_path) if prim_path != "/" else {h for hs in self._index.values() for h in hs}
+        if huds:
+            self.dirty_anchors.update(huds)
+            if bounds:
+                self.dirty_bounds.update(huds)
+
+    def _above(self, prim_path: str) -> None:
+        """Local bounds of the HUDs at or above prim_path (their subtree contains it)."""
+        for path in ancestors(prim_path):
+            if path in self:
+                self.dirty_bounds.add(path)
+                self.dirty_anchors.add(path)
+
+    def note(self, resynced: Iterable[str], changed_info_only: Iterable[str]) -> None:
+        """Apply the paths of one ObjectsChanged notice."""
+        for path in list(resynced) + list(changed_info_only):
+            prim_path, prop = split_property_path(str(path))
+            if not prop:
+                # Subtree added / removed / recomposed: everything at, below and above it
+                self._below(prim_path, bounds=True)
+                self._above(prim_path)
+            elif is_xform_attribute(prop):
+                # HUDs at or below move; HUDs above see a descendant move inside their bound
+                self._below(prim_path, bounds=False)
+                self._above(prim_path.rsplit("/", 1)[0] or "/")
+            elif prop in INHERITED_ATTRIBUTES:
+                self._below(prim_path, bounds=True)
+                self._above(prim_path)
+            elif prop in BOUNDS_ATTRIBUTES:
+                self._above(prim_path)
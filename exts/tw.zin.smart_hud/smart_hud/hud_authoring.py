@@ -0,0 +1,183 @@
+"""
+Smart HUD — bulk HUD / AIF attribute authoring at the Sdf layer level.
+
+逐一 prim 呼叫 CreateAttribute / Set 時，每次寫入都會送出 USD notice，
+大型組件要花數十秒，並讓 HUD 重新掃描整個 stage。這裡的流程分成：
+
+  1. collect_targets：展開選取項 (類型 / 路徑樣式過濾)，可先預覽數量
+  2. 規劃：在 composed stage 上讀取需要的資料 (例如 waypoint 週期)，產生
+     {prim path: {attribute name: AttributeValue}}
+  3. author_attributes：在單一 Sdf.ChangeBlock 內直接寫入 edit target layer 的 spec，
+     整批只產生一次 notice
+
+snapshot_specs / restore_specs 記錄並還原被觸及的 spec，讓整批操作成為一個 undo。
+
+只依賴 pxr (Sdf / Usd)。
+"""
+
+from fnmatch import fnmatchcase
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+from pxr import Sdf, Usd
+
+LOCKED_CUSTOM_DATA = {"omni": {"kit": {"locked": True}}}
+MANAGED_TAG = " [AIF-MANAGED]"
+
+# 遵循 AIF Pipeline Samples 綁定規範 (AIF-MANAGED, Locked)
+AIF_ATTRIBUTE_DOCS = {
+    "aif:core:assetClass": "Class of AI Factory Equipment",
+    "aif:core:modelNumber": "Equipment model number",
+    "aif:core:manufacturer": "Equipment manufacturer name",
+    "aif:core:assetDescription": "Human Readable Description of Asset",
+    "aif:spec:status": "Current status of the equipment",
+}
+
+
+class AttributeValue(NamedTuple):
+    type_name: Sdf.ValueTypeName
+    value: object
+    doc: Optional[str] = None
+    custom_data: Optional[dict] = None
+
+
+def collect_targets(stage, roots: Iterable[str], expand_children: bool = True,
+                    type_names: Sequence[str] = ("Mesh",), path_pattern: str = "") -> List[str]:
+    """Prim paths to author on.
+
+    With expand_children, a selected prim that is not itself one of type_names is replaced by its
+    descendants of those types (the prim itself is kept when it has none). path_pattern is an
+    fnmatch pattern on the full prim path (e.g. "*/Station_*"); empty keeps everything.
+    """
+    type_names = set(type_names or ())
+    targets = []
+    seen = set()
+
+    def _add(path):
+        if path not in seen and (not path_pattern or fnmatchcase(path, path_pattern)):
+            seen.add(path)
+            targets.append(path)
+
+    for root in roots:
+        prim = stage.GetPrimAtPath(str(root))
+        if not prim or not prim.IsValid():
+            continue
+        if expand_children and type_names and prim.GetTypeName() not in type_names:
+            matches = [str(p.GetPath()) for p in Usd.PrimRange(prim) if p.GetTypeName() in type_names]
+            if matches:
+                for path in matches:
+                    _add(path)
+                continue
+        _add(str(prim.GetPath()))
+    return targets
+
+
+def hud_attribute_values(topic: str, subject: str, content: str, takt_label: str,
+                         cycle_frames: int = 0, manufacturer: str = "Inventec",
+                         progress_source: str = "animation") -> Dict[str, AttributeValue]:
+    """Smart HUD attributes plus the locked smart_info_panel (AIF) attributes of one prim."""
+    string = Sdf.ValueTypeNames.String
+    values = {
+        "machine_type": AttributeValue(string, topic),
+        "hud_sub_title": AttributeValue(string, subject),
+        "hud_content": AttributeValue(string, content),
+        "hud_takt_label": AttributeValue(string, takt_label),
+        "hud_custom_cycle_length": AttributeValue(Sdf.ValueTypeNames.Int, int(cycle_frames)),
+        "hud_progress_source": AttributeValue(string, progress_source),
+    }
+    aif_values = {
+        "aif:core:assetClass": topic,
+        "aif:core:modelNumber": subject,
+        "aif:core:manufacturer": manufacturer,
+        "aif:core:assetDescription": content,
+        "aif:spec:status": "Active",
+    }
+    for name, value in aif_values.items():
+        values[name] = AttributeValue(string, value, AIF_ATTRIBUTE_DOCS[name] + MANAGED_TAG, LOCKED_CUSTOM_DATA)
+    return values
+
+
+def _missing_root(layer, path: Sdf.Path) -> Optional[Sdf.Path]:
+    """Highest ancestor (or the path itself) without a spec in layer; None if the prim spec exists."""
+    missing = None
+    while path != Sdf.Path.absoluteRootPath and not path.isEmpty:
+        if layer.GetPrimAtPath(path):
+            break
+        missing = path
+        path = path.GetParentPath()
+    return missing
+
+
+def snapshot_specs(layer, plan: Dict[str, Dict[str, AttributeValue]]) -> dict:
+    """State of every spec the plan will touch, for restore_specs."""
+    created_roots = set()
+    attributes = {}
+    for path, values in plan.items():
+        prim_path = Sdf.Path(path)
+        missing = _missing_root(layer, prim_path)
+        if missing is not None:
+            created_roots.add(missing)
+            continue
+        prim_spec = layer.GetPrimAtPath(prim_path)
+        for name in values:
+            spec = prim_spec.attributes.get(name)
+            # Only authored fields are recorded; the others are cleared again on restore
+            attributes[(path, name)] = None if spec is None else {
+                "type_name": spec.typeName,
+                "custom": spec.custom,
+                "default": spec.default if spec.HasDefaultValue() else None,
+                "doc": spec.documentation if spec.HasInfo("documentation") else None,
+                "custom_data": dict(spec.customData) if spec.HasInfo("customData") else None,
+            }
+    return {"created_roots": sorted(created_roots), "attributes": attributes}
+
+
+def _write_attribute(prim_spec, name, type_name, value, custom=True, doc=None, custom_data=None):
+    spec = prim_spec.attributes.get(name)
+    if spec is not None and spec.typeName != type_name:
+        prim_spec.RemoveProperty(spec)
+        spec = None
+    if spec is None:
+        spec = Sdf.AttributeSpec(prim_spec, name, type_name, Sdf.VariabilityVarying, custom)
+    if value is not None:
+        spec.default = value
+    if doc is not None:
+        spec.documentation = doc
+    if custom_data is not None:
+        spec.customData = custom_data
+
+
+def author_attributes(layer, plan: Dict[str, Dict[str, AttributeValue]]) -> int:
+    """Write every planned value into layer inside one Sdf.ChangeBlock. Returns the number of prims."""
+    with Sdf.ChangeBlock():
+        for path, values in plan.items():
+            prim_spec = Sdf.CreatePrimInLayer(layer, Sdf.Path(path))
+            for name, v in values.items():
+                _write_attribute(prim_spec, name, v.type_name, v.value, doc=v.doc, custom_data=v.custom_data)
+    return len(plan)
+
+
+def restore_specs(layer, snapshot: dict) -> None:
+    """Undo author_attributes: restore previous attribute specs and drop prim specs it created."""
+    with Sdf.ChangeBlock():
+        for (path, name), state in snapshot["attributes"].items():
+            prim_spec = layer.GetPrimAtPath(path)
+            if not prim_spec:
+                continue
+            if state is None:
+                spec = prim_spec.attributes.get(name)
+                if spec is not None:
+                    prim_spec.RemoveProperty(spec)
+                continue
+            _write_attribute(prim_spec, name, state["type_name"], state["default"], custom=state["custom"],
+                             doc=state["doc"], custom_data=state["custom_data"])
+            spec = prim_spec.attributes[name]
+            if state["default"] is None:
+                spec.ClearDefaultValue()
+            for key in ("doc", "custom_data"):
+                if state[key] is None:
+                    spec.ClearInfo("documentation" if key == "doc" else "customData")
+        for root in snapshot["created_roots"]:
+            if not layer.GetPrimAtPath(root):
+                continue
+            parent = layer.GetPrimAtPath(root.GetParentPath()) or layer.pseudoRoot
+            del parent.nameChildren[root.name]
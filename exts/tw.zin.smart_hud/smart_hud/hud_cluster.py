@@ -0,0 +1,147 @@
+"""
+Smart HUD — screen-space clustering and level of detail.
+
+大型廠房總覽時，投影到同一個螢幕格 (screen cell) 的 HUD 會合併成一個
+summary badge（數量、最差狀態、平均進度）；未合併的 HUD 依投影尺寸
+在 full → compact → icon 之間切換。
+
+ScreenClusterer 在幀與幀之間保留每個 HUD 所在的格子，只有換格的 HUD
+會在 bucket 間搬移，並記錄受影響的格子 (dirty cells)，不需每幀重新排序。
+
+純 Python，不依賴 Omniverse。
+"""
+
+import math
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Set, Tuple
+
+LOD_FULL = "full"
+LOD_COMPACT = "compact"
+LOD_ICON = "icon"
+
+# 狀態嚴重度：數字越大越嚴重，summary badge 顯示成員中最嚴重的狀態
+STATUS_SEVERITY = {
+    "FAIL": 4, "ERROR": 4, "ALARM": 4, "DOWN": 4,
+    "WARN": 3, "WARNING": 3, "BLOCKED": 3,
+    "INSPECTING": 2, "MOVING": 2, "WELDING": 2, "RUNNING": 2, "BUSY": 2,
+    "PASS": 1, "OK": 1, "ACTIVE": 1,
+    "IDLE": 0, "STANDBY": 0,
+}
+
+
+def project_to_screen(view_proj, p: Sequence[float], width: float, height: float) -> Optional[Tuple[float, float, float]]:
+    """世界座標 → 螢幕像素 (x 向右, y 向下)。回傳 (x, y, w_clip)；點在相機後方時回傳 None。
+
+    view_proj 為 row-vector 慣例的 4x4 (Gf.Matrix4d 或巢狀序列)。
+    """
+    x, y, z = float(p[0]), float(p[1]), float(p[2])
+    cx = x * view_proj[0][0] + y * view_proj[1][0] + z * view_proj[2][0] + view_proj[3][0]
+    cy = x * view_proj[0][1] + y * view_proj[1][1] + z * view_proj[2][1] + view_proj[3][1]
+    cw = x * view_proj[0][3] + y * view_proj[1][3] + z * view_proj[2][3] + view_proj[3][3]
+    if cw <= 1e-9:
+        return None
+    return ((cx / cw * 0.5 + 0.5) * width, (0.5 - cy / cw * 0.5) * height, cw)
+
+
+def projected_size_px(world_size: float, w_clip: float, proj_yy: float, height: float) -> float:
+    """world_size 長度的物件在 w_clip 深度時的螢幕高度 (像素)。"""
+    if w_clip <= 1e-9:
+        return 0.0
+    return world_size * abs(proj_yy) / w_clip * 0.5 * height
+
+
+def select_lod(size_px: float, full_px: float = 48.0, compact_px: float = 20.0) -> str:
+    if size_px >= full_px:
+        return LOD_FULL
+    if size_px >= compact_px:
+        return LOD_COMPACT
+    return LOD_ICON
+
+
+def status_severity(status: Optional[str]) -> int:
+    if not status:
+        return -1
+    return STATUS_SEVERITY.get(str(status).upper(), 0)
+
+
+def summarize_cluster(statuses: Iterable[Optional[str]], progresses: Iterable[Optional[float]]) -> dict:
+    """回傳 {"count", "worst_status", "mean_progress"}；沒有進度資料時 mean_progress 為 None。"""
+    count = 0
+    worst, worst_rank = None, -2
+    for st in statuses:
+        count += 1
+        rank = status_severity(st)
+        if rank > worst_rank:
+            worst, worst_rank = st, rank
+    prog = [float(v) for v in progresses if v is not None]
+    return {
+        "count": count,
+        "worst_status": worst,
+        "mean_progress": sum(prog) / len(prog) if prog else None,
+    }
+
+
+class ScreenClusterer:
+    """Incremental screen-cell bucketing of projected HUD anchors."""
+
+    def __init__(self, cell_px: float = 96.0, min_cluster: int = 2):
+        self.cell_px = float(cell_px)
+        self.min_cluster = int(min_cluster)
+        self._cell_of: Dict[Hashable, Tuple[int, int]] = {}
+        self._buckets: Dict[Tuple[int, int], Set[Hashable]] = {}
+        self._dirty: Set[Tuple[int, int]] = set()
+
+    def __len__(self):
+        return len(self._cell_of)
+
+    def cell_for(self, screen_xy: Sequence[float]) -> Tuple[int, int]:
+        return (int(math.floor(screen_xy[0] / self.cell_px)), int(math.floor(screen_xy[1] / self.cell_px)))
+
+    def update(self, key, screen_xy: Sequence[float]) -> None:
+        cell = self.cell_for(screen_xy)
+        old = self._cell_of.get(key)
+        if old == cell:
+            return
+        if old is not None:
+            self._leave(old, key)
+        self._cell_of[key] = cell
+        self._buckets.setdefault(cell, set()).add(key)
+        self._dirty.add(cell)
+
+    def remove(self, key) -> None:
+        old = self._cell_of.pop(key, None)
+        if old is not None:
+            self._leave(old, key)
+
+    def retain(self, keys: Set[Hashable]) -> None:
+        """移除所有不在 keys 內的項目（例如被視錐剔除的 HUD）。"""
+        for key in [k for k in self._cell_of if k not in keys]:
+            self.remove(key)
+
+    def clear(self) -> None:
+        self._dirty.update(self._buckets.keys())
+        self._cell_of.clear()
+        self._buckets.clear()
+
+    def _leave(self, cell, key) -> None:
+        members = self._buckets.get(cell)
+        if members is not None:
+            members.discard(key)
+            if not members:
+                del self._buckets[cell]
+        self._dirty.add(cell)
+
+    def members(self, cell) -> Set[Hashable]:
+        return self._buckets.get(cell, set())
+
+    def is_clustered(self, key) -> bool:
+        cell = self._cell_of.get(key)
+        return cell is not None and len(self._buckets.get(cell, ())) >= self.min_cluster
+
+    def clusters(self) -> Dict[Tuple[int, int], Set[Hashable]]:
+        return {c: m for c, m in self._buckets.items() if len(m) >= self.min_cluster}
+
+    def pop_dirty(self) -> List[Tuple[int, int]]:
+        """回傳上次呼叫後成員有變動的格子。"""
+        dirty = list(self._dirty)
+        self._dirty.clear()
+        return dirty
@@ -0,0 +1,87 @@
+"""
+Smart HUD — incremental discovery of HUD prims from USD change notices.
+
+Usd.Notice.ObjectsChanged 的路徑分成兩類：
+  - resync 的 prim 路徑：子樹可能新增 / 刪除 prim，需要重新掃描該子樹
+  - HUD 屬性 (machine_type、hud_* 等) 的 resync / info-only 變更：只需更新那一個 prim
+
+DiscoveryTracker 在 notice callback 中累積這些路徑，下一幀再一次處理；
+被其他 resync 根涵蓋的路徑會被合併掉，避免重複掃描。
+
+純 Python (路徑以字串表示)，不依賴 Omniverse。
+"""
+
+from typing import Iterable, List, Set, Tuple
+
+# 影響 HUD 內容的屬性：任一項變動時重建該 prim 的 HUD
+HUD_ATTRIBUTES = frozenset({
+    "machine_type",
+    "hud_sub_title",
+    "hud_content",
+    "hud_takt_label",
+    "hud_custom_cycle_length",
+    "hud_progress_source",
+    "hud_machine_id",
+    "aif:core:animationTarget",
+    "aif:core:modelNumber",
+})
+
+
+def split_property_path(path: str) -> Tuple[str, str]:
+    """"/World/A.machine_type" → ("/World/A", "machine_type")；prim 路徑的屬性名稱為 ""。"""
+    slash = path.rfind("/")
+    dot = path.find(".", slash + 1)
+    if dot < 0:
+        return path, ""
+    return path[:dot], path[dot + 1:]
+
+
+def is_under(path: str, root: str) -> bool:
+    if root == "/" or path == root:
+        return True
+    return path.startswith(root + "/")
+
+
+def collapse_roots(paths: Iterable[str]) -> List[str]:
+    """去除被其他路徑涵蓋的子路徑。"""
+    roots: List[str] = []
+    for p in sorted(set(paths), key=lambda s: (s.count("/"), s) if s != "/" else (0, s)):
+        if not any(is_under(p, r) for r in roots):
+            roots.append(p)
+    return roots
+
+
+class DiscoveryTracker:
+    """Accumulates notice paths between frames."""
+
+    def __init__(self, attributes: Iterable[str] = HUD_ATTRIBUTES):
+        self.attributes = frozenset(attributes)
+        self._resync_roots: Set[str] = set()
+        self._updated: Set[str] = set()
+
+    def __bool__(self):
+        return bool(self._resync_roots or self._updated)
+
+    def note(self, resynced: Iterable[str], changed_info_only: Iterable[str]) -> None:
+        for path in resynced:
+            prim_path, prop = split_property_path(str(path))
+            if not prop:
+                self._resync_roots.add(prim_path)
+            elif prop in self.attributes:
+                self._updated.add(prim_path)
+        for path in changed_info_only:
+            prim_path, prop = split_property_path(str(path))
+            if prop in self.attributes:
+                self._updated.add(prim_path)
+
+    def pop(self) -> Tuple[List[str], List[str]]:
+        """回傳 (resync roots, 需更新的 prim)；已被 resync root 涵蓋的更新會被略過。"""
+        roots = collapse_roots(self._resync_roots)
+        updated = sorted(p for p in self._updated if not any(is_under(p, r) for r in roots))
+        self._resync_roots.clear()
+        self._updated.clear()
+        return roots, updated
+
+    def clear(self) -> None:
+        self._resync_roots.clear()
+        self._updated.clear()
@@ -0,0 +1,185 @@
+"""
+Smart HUD — bounded metric history for sparklines.
+
+每個 HUD 的每個指標 (progress、defect_rate、遙測數值 ...) 各有一個固定容量的環形緩衝區，
+以 NumPy 陣列儲存，寫入不會讓任何 Python list 成長：
+
+  tier 0：原始取樣 (固定間隔取樣目前值)
+  tier k：每 factor 個 tier k-1 的樣本合併成一筆 (min, max, mean)
+
+因此每個指標的記憶體為 tiers × capacity × 4 個 float64，整體為
+O(HUD 數 × 指標數 × capacity)。長時間的視窗從較粗的 tier 讀取，
+sparkline 只需要固定點數，不需要逐筆讀取原始資料。
+
+純 NumPy，不依賴 Omniverse。
+"""
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+
+class TieredRing:
+    """Fixed-capacity ring of (time, min, max, mean) rows with coarser downsampled tiers."""
+
+    def __init__(self, capacity: int = 120, tiers: int = 3, factor: int = 8):
+        self.capacity = int(capacity)
+        self.factor = int(factor)
+        # data[tier, column, slot]; columns: time, min, max, mean
+        self._data = np.zeros((tiers, 4, self.capacity), dtype=np.float64)
+        self._head = np.zeros(tiers, dtype=np.int64)     # next slot to write
+        self._count = np.zeros(tiers, dtype=np.int64)
+        # Partially filled bucket per tier above 0: (start time, min, max, sum, n)
+        self._pending = np.zeros((tiers, 5), dtype=np.float64)
+        self._pending[:, 1] = np.inf
+        self._pending[:, 2] = -np.inf
+
+    @property
+    def tiers(self) -> int:
+        return self._data.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        return self._data.nbytes + self._head.nbytes + self._count.nbytes + self._pending.nbytes
+
+    def __len__(self):
+        return int(self._count[0])
+
+    def _write(self, tier, t, lo, hi, mean):
+        slot = self._head[tier]
+        col = self._data[tier]
+        col[0, slot] = t
+        col[1, slot] = lo
+        col[2, slot] = hi
+        col[3, slot] = mean
+        self._head[tier] = (slot + 1) % self.capacity
+        if self._count[tier] < self.capacity:
+            self._count[tier] += 1
+        # Feed the next tier's bucket
+        up = tier + 1
+        if up >= self.tiers:
+            return
+        p = self._pending[up]
+        if p[4] == 0:
+            p[0] = t
+        p[1] = min(p[1], lo)
+        p[2] = max(p[2], hi)
+        p[3] += mean
+        p[4] += 1
+        if p[4] >= self.factor:
+            start, b_lo, b_hi, b_sum, n = p
+            p[:] = (0.0, np.inf, -np.inf, 0.0, 0.0)
+            self._write(up, start, b_lo, b_hi, b_sum / n)
+
+    def push(self, t: float, value: float) -> None:
+        v = float(value)
+        self._write(0, float(t), v, v, v)
+
+    def tier(self, k: int) -> np.ndarray:
+        """Rows of tier k, oldest first, as a (4, n) copy: time, min, max, mean."""
+        n = int(self._count[k])
+        if n == 0:
+            return np.zeros((4, 0))
+        head = int(self._head[k])
+        if n < self.capacity:
+            return self._data[k, :, :n].copy()
+        return np.roll(self._data[k], -head, axis=1)
+
+    def span(self, k: int) -> float:
+        """Raw (tier 0) samples covered by a full tier k."""
+        return float(self.capacity * self.factor ** k)
+
+    def window(self, samples: float) -> np.ndarray:
+        """Rows of the finest tier that covers the last `samples` raw samples."""
+        k = 0
+        # A tier that never wrapped still holds everything since the first sample
+        while k < self.tiers - 1 and self.span(k) < samples and self._count[k] >= self.capacity:
+            k += 1
+        rows = self.tier(k)
+        keep = int(np.ceil(samples / self.factor ** k))
+        return rows[:, -keep:] if rows.shape[1] > keep else rows
+
+    def latest(self) -> Optional[float]:
+        if self._count[0] == 0:
+            return None
+        return float(self._data[0, 3, (self._head[0] - 1) % self.capacity])
+
+
+def downsample(rows: np.ndarray, points: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Reduce (4, n) rows to at most `points` (min, max, mean) buckets."""
+    n = rows.shape[1]
+    if n <= points:
+        return rows[1], rows[2], rows[3]
+    edges = np.linspace(0, n, points + 1).astype(np.int64)
+    lo = np.minimum.reduceat(rows[1], edges[:-1])
+    hi = np.maximum.reduceat(rows[2], edges[:-1])
+    mean = np.add.reduceat(rows[3], edges[:-1]) / np.diff(edges)
+    return lo, hi, mean
+
+
+class MetricHistory:
+    """Per-HUD history: one TieredRing per metric, sampled from the metric's current value."""
+
+    def __init__(self, capacity: int = 120, tiers: int = 3, factor: int = 8, max_metrics: int = 4):
+        self.capacity = capacity
+        self.tiers = tiers
+        self.factor = factor
+        self.max_metrics = max_metrics
+        self._rings: Dict[str, TieredRing] = {}
+        self._current: Dict[str, float] = {}
+        self.samples = 0
+
+    def metrics(self):
+        return list(self._rings.keys())
+
+    def ring(self, metric: str) -> Optional[TieredRing]:
+        return self._rings.get(metric)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(r.nbytes for r in self._rings.values())
+
+    def set_current(self, metric: str, value) -> bool:
+        """Record the metric's latest value; ignored for non-numeric values or beyond max_metrics.
+
+        Rings are allocated on a metric's first value, so HUDs without numeric data cost nothing.
+        """
+        try:
+            v = float(value)
+        except (TypeError, ValueError):
+            return False
+        if not np.isfinite(v):
+            return False
+        if metric not in self._rings:
+            if len(self._rings) >= self.max_metrics:
+                return False
+            self._rings[metric] = TieredRing(self.capacity, self.tiers, self.factor)
+        self._current[metric] = v
+        return True
+
+    def sample(self, t: float) -> None:
+        """Push every metric's current value (called at a fixed interval)."""
+        for metric, value in self._current.items():
+            self._rings[metric].push(t, value)
+        if self._current:
+            self.samples += 1
+
+    def primary(self, preferred=("progress", "temperature", "defect_rate")) -> Optional[str]:
+        for metric in preferred:
+            if metric in self._rings:
+                return metric
+        return next(iter(self._rings), None)
+
+    def sparkline(self, metric: str, points: int = 48, window_samples: float = None):
+        """(mean values, window min, window max) for a sparkline of `points` values, or None."""
+        ring = self._rings.get(metric)
+        if ring is None or len(ring) == 0:
+            return None
+        rows = ring.window(window_samples or ring.capacity)
+        lo, hi, mean = downsample(rows, points)
+        return mean, float(lo.min()), float(hi.max())
+
+    def clear(self) -> None:
+        self._rings.clear()
+        self._current.clear()
+        self.samples = 0
@@ -0,0 +1,172 @@
+"""
+Smart HUD — pooled HUD panels.
+
+每個 sc.Widget 都有自己的離屏貼圖，建立 / 銷毀的成本遠高於切換 visible。
+HUD 本身只保留資料 (anchor、HUDViewModel、顯示模式)；畫面上的面板
+(collapsed / icon / expanded) 依 (kind, HUD 類型) 放在池中：
+
+  - acquire：優先重用同類型的空閒面板，並透過 bind 重新綁定到新的 HUD
+  - release：unbind 後放回池中，不銷毀
+  - 每種 kind 有存活上限 (使用中 + 空閒)；到達上限時淘汰最久未用的其他類型空閒面板，
+    仍無空位則 acquire 回傳 None，由呼叫端降級成較便宜的顯示方式
+
+PanelContent 是面板內的 omni.ui 樹：每個池中面板只建立一次 (由 frame 的 build_fn 呼叫)，
+保留 label / progress bar 等 handle；重新綁定時只把新 HUD 的值與文字推進這些 handle，
+不重建 frame、label、progress bar 與 click closure。
+
+純 Python (面板由 factory 建立，內容不透明)，不依賴 Omniverse。
+"""
+
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Iterator, List, Optional
+
+
+class PanelPool:
+    """Per-(kind, hud type) free lists of panels with a cap on live panels per kind."""
+
+    def __init__(self, factory: Callable, caps: Optional[Dict[str, int]] = None,
+                 bind: Callable = None, unbind: Callable = None, destroy: Callable = None):
+        self._factory = factory          # factory(kind, hud_type) -> panel
+        self._bind = bind                # bind(panel, owner)
+        self._unbind = unbind            # unbind(panel, owner)
+        self._destroy = destroy          # destroy(panel) when evicted
+        self.caps = dict(caps or {})
+        self._free: Dict[tuple, List] = {}
+        self._free_order: "OrderedDict[int, tuple]" = OrderedDict()   # id(panel) -> key, oldest first
+        self._in_use: Dict[Hashable, tuple] = {}                     # owner -> (key, panel)
+        self._live: Dict[str, int] = {}
+        self._counters = {"created": 0, "reused": 0, "evicted": 0, "denied": 0}
+
+    def __len__(self):
+        return sum(self._live.values())
+
+    def panel_of(self, owner) -> Optional[object]:
+        entry = self._in_use.get(owner)
+        return entry[1] if entry else None
+
+    def panels(self, kind: str = None) -> Iterator:
+        """All live panels (in use and free), optionally of one kind."""
+        for key, panel in self._in_use.values():
+            if kind is None or key[0] == kind:
+                yield panel
+        for key, free in self._free.items():
+            if kind is None or key[0] == kind:
+                yield from free
+
+    def _pop_free(self, key):
+        free = self._free.get(key)
+        if not free:
+            return None
+        panel = free.pop()
+        self._free_order.pop(id(panel), None)
+        return panel
+
+    def _evict_one(self, kind) -> bool:
+        for pid, key in self._free_order.items():
+            if key[0] != kind:
+                continue
+            free = self._free[key]
+            panel = next(p for p in free if id(p) == pid)
+            free.remove(panel)
+            del self._free_order[pid]
+            self._live[kind] -= 1
+            self._counters["evicted"] += 1
+            if self._destroy:
+                self._destroy(panel)
+            return True
+        return False
+
+    def _create(self, kind, hud_type):
+        cap = self.caps.get(kind)
+        if cap is not None and self._live.get(kind, 0) >= cap and not self._evict_one(kind):
+            return None
+        panel = self._factory(kind, hud_type)
+        self._live[kind] = self._live.get(kind, 0) + 1
+        self._counters["created"] += 1
+        return panel
+
+    def acquire(self, kind: str, hud_type: Hashable, owner: Hashable):
+        """Return a panel bound to owner, or None when the kind is at its cap."""
+        entry = self._in_use.get(owner)
+        if entry is not None:
+            if entry[0] == (kind, hud_type):
+                return entry[1]
+            self.release(owner)
+        key = (kind, hud_type)
+        panel = self._pop_free(key)
+        if panel is not None:
+            self._counters["reused"] += 1
+        else:
+            panel = self._create(kind, hud_type)
+            if panel is None:
+                self._counters["denied"] += 1
+                return None
+        self._in_use[owner] = (key, panel)
+        if self._bind:
+            self._bind(panel, owner)
+        return panel
+
+    def release(self, owner: Hashable) -> bool:
+        entry = self._in_use.pop(owner, None)
+        if entry is None:
+            return False
+        key, panel = entry
+        if self._unbind:
+            self._unbind(panel, owner)
+        self._free.setdefault(key, []).append(panel)
+        self._free_order[id(panel)] = key
+        return True
+
+    def prewarm(self, kind: str, hud_type: Hashable, count: int) -> int:
+        """Build up to count free panels ahead of time (within the cap). Returns how many were built."""
+        built = 0
+        while len(self._free.get((kind, hud_type), ())) < count:
+            cap = self.caps.get(kind)
+            if cap is not None and self._live.get(kind, 0) >= cap:
+                break
+            panel = self._create(kind, hud_type)
+            self._free.setdefault((kind, hud_type), []).append(panel)
+            self._free_order[id(panel)] = (kind, hud_type)
+            built += 1
+        return built
+
+    def stats(self) -> dict:
+        out = dict(self._counters)
+        out["live"] = dict(self._live)
+        out["in_use"] = len(self._in_use)
+        out["free"] = sum(len(v) for v in self._free.values())
+        return out
+
+    def clear(self) -> None:
+        """Forget every panel without calling destroy (the scene they live in was cleared)."""
+        self._free.clear()
+        self._free_order.clear()
+        self._in_use.clear()
+        self._live.clear()
+
+
+class PanelContent:
+    """A pooled panel's widget tree: built once, then rebound to each new owner."""
+
+    def __init__(self, build: Callable, rebind: Callable):
+        self._build = build              # build() -> handles; runs inside the panel's frame
+        self._rebind = rebind            # rebind(handles, owner): push the owner's values into the handles
+        self.handles = None
+        self.owner = None
+        self.builds = 0
+
+    def build(self) -> None:
+        """The frame's build_fn: (re)create the widgets and show the current owner in them."""
+        self.handles = self._build()
+        self.builds += 1
+        if self.owner is not None:
+            self._rebind(self.handles, self.owner)
+
+    def bind(self, owner) -> None:
+        """Show owner; the widgets are only updated (or built on the frame's first draw)."""
+        self.owner = owner
+        if self.handles is not None:
+            self._rebind(self.handles, owner)
+
+    def unbind(self) -> None:
+        self.owner = None
@@ -0,0 +1,103 @@
+"""
+Smart HUD — change-driven progress bar values.
+
+進度條的寬度、顏色與文字都量化到使用者看得出的解析度：
+  - 進度以 step (預設 0.5%) 為單位，文字固定小數位數
+  - 顏色 (綠 → 黃 → 紅) 分成固定階數，每一階對應一個共用的 style dict
+
+只有量化值改變時才需要 set_style / invalidate；style dict 由所有 HUD 共用，
+不在每幀建立新的 dict。RedrawCounter 統計每秒實際重繪次數。
+
+純 Python，不依賴 Omniverse (顏色以 omni.ui 的 0xAABBGGRR 整數表示)。
+"""
+
+import time
+from typing import Dict, Tuple
+
+PROGRESS_STEP_PCT = 0.5
+COLOR_LEVELS = 32
+
+# 所有 HUD 共用的靜態 style
+TRACK_STYLE = {"background_color": 0x44000000, "border_radius": 3}
+_LABEL_STYLES: Dict[int, dict] = {}
+_FILL_STYLES: Dict[int, dict] = {}
+
+
+def quantize_progress(pct: float, step: float = PROGRESS_STEP_PCT) -> float:
+    """Clamp to [0, 100] and round to the nearest step."""
+    pct = max(0.0, min(100.0, float(pct)))
+    if step <= 0:
+        return pct
+    return min(100.0, round(pct / step) * step)
+
+
+def format_progress(pct: float, decimals: int = 1) -> str:
+    return f"{pct:.{decimals}f}%"
+
+
+def progress_color(pct: float) -> Tuple[float, float]:
+    """(r, g) of the bar: green at 100%, yellow at 50%, red at 0%."""
+    if pct > 50:
+        return max(0.0, min(1.0, (100.0 - pct) / 50.0)), 1.0
+    return 1.0, max(0.0, min(1.0, pct / 50.0))
+
+
+def pack_color(r: float, g: float, b: float = 0.0, a: float = 1.0) -> int:
+    """Same packing as omni.ui.color(r, g, b, a)."""
+    c = [int(round(max(0.0, min(1.0, v)) * 255)) for v in (r, g, b, a)]
+    return (c[3] << 24) | (c[2] << 16) | (c[1] << 8) | c[0]
+
+
+def color_level(pct: float, levels: int = COLOR_LEVELS) -> int:
+    return int(round(max(0.0, min(100.0, pct)) / 100.0 * (levels - 1)))
+
+
+def fill_style(pct: float, levels: int = COLOR_LEVELS) -> dict:
+    """Shared style dict of the fill at pct; identical objects for the same colour level."""
+    level = color_level(pct, levels)
+    style = _FILL_STYLES.get(level)
+    if style is None:
+        r, g = progress_color(level * 100.0 / (levels - 1))
+        style = {"background_color": pack_color(r, g), "border_radius": 3}
+        _FILL_STYLES[level] = style
+    return style
+
+
+def label_style(font_size: int) -> dict:
+    style = _LABEL_STYLES.get(font_size)
+    if style is None:
+        style = {"color": 0xFFFFFFFF, "font_size": font_size}
+        _LABEL_STYLES[font_size] = style
+    return style
+
+
+class RedrawCounter:
+    """Counts redraws and reports the rate over the last complete window."""
+
+    def __init__(self, window: float = 1.0, clock=time.monotonic):
+        self.window = window
+        self._clock = clock
+        self._start = None
+        self._count = 0
+        self.total = 0
+        self.per_second = 0.0
+
+    def note(self, n: int = 1) -> None:
+        self._roll()
+        self._count += n
+        self.total += n
+
+    def rate(self) -> float:
+        self._roll()
+        return self.per_second
+
+    def _roll(self):
+        now = self._clock()
+        if self._start is None:
+            self._start = now
+            return
+        elapsed = now - self._start
+        if elapsed >= self.window:
+            self.per_second = self._count / elapsed
+            self._count = 0
+            self._start = now
@@ -0,0 +1,106 @@
+"""
+Smart HUD — per-frame time budget for HUD widget refreshes.
+
+HUD 的數值 (progress、telemetry) 每幀都可以便宜地更新到 view model，
+但 set_style / invalidate 這類 widget 重繪成本高。FrameBudgetScheduler
+把「需要重繪」的 HUD 放進佇列，每幀只在時間預算 (預設 1.5 ms) 內處理，
+做不完的留到下一幀。
+
+排序採 round-robin + 優先權：
+  score = 距上次刷新經過的幀數 / (1 + 與相機距離 / near_distance)
+越久沒刷新、越靠近相機的 HUD 分數越高；遠處的 HUD 分數仍會隨時間增加，
+不會餓死 (starvation)。
+
+refresh_rate_hz 為「待刷新 HUD 平均每秒被刷新幾次」(EMA)，全部在
+預算內完成時等於 FPS。
+
+純 Python，不依賴 Omniverse。
+"""
+
+import time
+from typing import Callable, Dict, Hashable, Iterable, Optional
+
+
+class FrameBudgetScheduler:
+    """Deferred, budgeted HUD refresh queue."""
+
+    def __init__(self, budget_ms: float = 1.5, near_distance: float = 1000.0,
+                 clock: Callable[[], float] = time.perf_counter, smoothing: float = 0.1):
+        self.budget_ms = float(budget_ms)
+        self.near_distance = max(1e-6, float(near_distance))
+        self._clock = clock
+        self._smoothing = smoothing
+        self._dirty = set()
+        self._last_served: Dict[Hashable, int] = {}
+        self._frame = 0
+        self.refresh_rate_hz = 0.0
+        self.last_frame_ms = 0.0
+        self.last_served = 0
+        self.last_deferred = 0
+
+    def __len__(self):
+        return len(self._dirty)
+
+    def mark_dirty(self, key) -> None:
+        self._dirty.add(key)
+
+    def is_dirty(self, key) -> bool:
+        return key in self._dirty
+
+    def discard(self, key) -> None:
+        self._dirty.discard(key)
+        self._last_served.pop(key, None)
+
+    def clear(self) -> None:
+        self._dirty.clear()
+        self._last_served.clear()
+
+    def _score(self, key, distance: float) -> float:
+        age = self._frame - self._last_served.get(key, -1_000_000)
+        return age / (1.0 + max(0.0, distance) / self.near_distance)
+
+    def run(self, visible: Iterable[Hashable], work: Callable[[Hashable], None],
+            distance_of: Optional[Callable[[Hashable], float]] = None, dt: float = 0.0) -> int:
+        """Refresh dirty, visible HUDs in priority order until the budget is spent.
+
+        At least one HUD is refreshed per frame so the queue always drains.
+        Returns the number of HUDs refreshed.
+        """
+        self._frame += 1
+        visible = visible if isinstance(visible, (set, frozenset, dict)) else set(visible)
+        pending = [k for k in self._dirty if k in visible]
+        if distance_of is not None:
+            pending.sort(key=lambda k: self._score(k, distance_of(k)), reverse=True)
+        else:
+            pending.sort(key=lambda k: self._score(k, 0.0), reverse=True)
+
+        budget_s = self.budget_ms / 1000.0
+        start = self._clock()
+        served = 0
+        for key in pending:
+            if served and self._clock() - start >= budget_s:
+                break
+            self._dirty.discard(key)
+            self._last_served[key] = self._frame
+            try:
+                work(key)
+            except Exception as e:
+                print(f"[Smart HUD] ⚠️ HUD refresh failed for {key}: {e}")
+            served += 1
+
+        self.last_frame_ms = (self._clock() - start) * 1000.0
+        self.last_served = served
+        self.last_deferred = len(pending) - served
+        if pending and dt > 0.0:
+            rate = (served / len(pending)) / dt
+            self.refresh_rate_hz += (rate - self.refresh_rate_hz) * self._smoothing
+        return served
+
+    def stats(self) -> dict:
+        return {
+            "budget_ms": self.budget_ms,
+            "last_frame_ms": self.last_frame_ms,
+            "served": self.last_served,
+            "deferred": self.last_deferred,
+            "refresh_rate_hz": self.refresh_rate_hz,
+        }
@@ -0,0 +1,157 @@
+"""
+Smart HUD — spatial index for HUD anchors.
+
+以均勻格點 (uniform grid) 存放每個 HUD 的世界座標錨點，支援：
+  - 錨點移動時 O(1) 更新
+  - 以相機視錐 (view frustum) + 最大距離查詢可見 HUD
+
+查詢只走訪「距離範圍內的格子」與「已佔用格子」兩者中較少的一方，
+每幀成本與可見 HUD 數量成正比，而非 HUD 總數。
+
+純 Python，不依賴 Omniverse；矩陣以 4x4 row-major 序列傳入 (Gf.Matrix4d 亦可)。
+"""
+
+import math
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+Vec3 = Tuple[float, float, float]
+Plane = Tuple[float, float, float, float]
+
+
+def frustum_planes_from_matrix(view_proj) -> List[Plane]:
+    """從 view * projection 矩陣取出 6 個視錐平面 (Gribb/Hartmann)。
+
+    使用 USD/Gf 的 row-vector 慣例：clip = p_world * view_proj，
+    所以平面由矩陣的「欄」組合而成。平面法向朝內並正規化，
+    點 p 在平面內側時 a*x + b*y + c*z + d >= 0。
+    """
+    col = [[float(view_proj[r][c]) for r in range(4)] for c in range(4)]
+    raw = [
+        [col[3][i] + col[0][i] for i in range(4)],  # left
+        [col[3][i] - col[0][i] for i in range(4)],  # right
+        [col[3][i] + col[1][i] for i in range(4)],  # bottom
+        [col[3][i] - col[1][i] for i in range(4)],  # top
+        [col[3][i] + col[2][i] for i in range(4)],  # near
+        [col[3][i] - col[2][i] for i in range(4)],  # far
+    ]
+    planes = []
+    for a, b, c, d in raw:
+        n = math.sqrt(a * a + b * b + c * c)
+        if n < 1e-12:
+            continue  # 無限遠 far plane 等退化平面
+        planes.append((a / n, b / n, c / n, d / n))
+    return planes
+
+
+def point_in_frustum(planes: Sequence[Plane], p: Sequence[float], margin: float = 0.0) -> bool:
+    for a, b, c, d in planes:
+        if a * p[0] + b * p[1] + c * p[2] + d < -margin:
+            return False
+    return True
+
+
+def aabb_in_frustum(planes: Sequence[Plane], b_min: Sequence[float], b_max: Sequence[float], margin: float = 0.0) -> bool:
+    """保守測試：AABB 完全在任一平面外側才回傳 False。"""
+    for a, b, c, d in planes:
+        # p-vertex：沿平面法向最遠的角
+        px = b_max[0] if a >= 0 else b_min[0]
+        py = b_max[1] if b >= 0 else b_min[1]
+        pz = b_max[2] if c >= 0 else b_min[2]
+        if a * px + b * py + c * pz + d < -margin:
+            return False
+    return True
+
+
+class SpatialGrid:
+    """Uniform grid over point anchors keyed by an arbitrary hashable id (HUD prim path)."""
+
+    # 距離範圍內的格子數超過已佔用格子數的這個倍數時，改為走訪已佔用格子
+    _RANGE_SCAN_FACTOR = 1
+
+    def __init__(self, cell_size: float = 2000.0):
+        self.cell_size = float(cell_size)
+        self._cells: Dict[Tuple[int, int, int], Dict[Hashable, Vec3]] = {}
+        self._where: Dict[Hashable, Tuple[Tuple[int, int, int], Vec3]] = {}
+
+    def __len__(self):
+        return len(self._where)
+
+    def __contains__(self, key):
+        return key in self._where
+
+    def _cell_of(self, p: Sequence[float]) -> Tuple[int, int, int]:
+        s = self.cell_size
+        return (int(math.floor(p[0] / s)), int(math.floor(p[1] / s)), int(math.floor(p[2] / s)))
+
+    def position(self, key) -> Optional[Vec3]:
+        entry = self._where.get(key)
+        return entry[1] if entry else None
+
+    def update(self, key, pos: Sequence[float]) -> None:
+        """插入或移動一個錨點。"""
+        pos = (float(pos[0]), float(pos[1]), float(pos[2]))
+        cell = self._cell_of(pos)
+        old = self._where.get(key)
+        if old is not None and old[0] != cell:
+            self._discard_from_cell(old[0], key)
+        self._cells.setdefault(cell, {})[key] = pos
+        self._where[key] = (cell, pos)
+
+    def remove(self, key) -> None:
+        old = self._where.pop(key, None)
+        if old is not None:
+            self._discard_from_cell(old[0], key)
+
+    def clear(self) -> None:
+        self._cells.clear()
+        self._where.clear()
+
+    def _discard_from_cell(self, cell, key) -> None:
+        members = self._cells.get(cell)
+        if members is not None:
+            members.pop(key, None)
+            if not members:
+                del self._cells[cell]
+
+    def _candidate_cells(self, center: Sequence[float], radius: float):
+        lo = self._cell_of([center[i] - radius for i in range(3)])
+        hi = self._cell_of([center[i] + radius for i in range(3)])
+        n_range = (hi[0] - lo[0] + 1) * (hi[1] - lo[1] + 1) * (hi[2] - lo[2] + 1)
+        if n_range <= len(self._cells) * self._RANGE_SCAN_FACTOR:
+            for ix in range(lo[0], hi[0] + 1):
+                for iy in range(lo[1], hi[1] + 1):
+                    for iz in range(lo[2], hi[2] + 1):
+                        members = self._cells.get((ix, iy, iz))
+                        if members:
+                            yield (ix, iy, iz), members
+        else:
+            for cell, members in self._cells.items():
+                if all(lo[i] <= cell[i] <= hi[i] for i in range(3)):
+                    yield cell, members
+
+    def query_sphere(self, center: Sequence[float], radius: float) -> List[Hashable]:
+        return self.query_frustum((), center, radius)
+
+    def query_frustum(self, planes: Sequence[Plane], center: Sequence[float], max_distance: float,
+                      margin: float = 0.0) -> List[Hashable]:
+        """回傳在視錐內且距離 center 不超過 max_distance 的所有 key。
+
+        margin 讓只有一部分露出畫面的面板 (錨點略在視錐外) 仍被視為可見。
+        """
+        r_sq = max_distance * max_distance
+        s = self.cell_size
+        out = []
+        for cell, members in self._candidate_cells(center, max_distance):
+            if planes:
+                c_min = (cell[0] * s, cell[1] * s, cell[2] * s)
+                c_max = (c_min[0] + s, c_min[1] + s, c_min[2] + s)
+                if not aabb_in_frustum(planes, c_min, c_max, margin):
+                    continue
+            for key, p in members.items():
+                dx, dy, dz = p[0] - center[0], p[1] - center[1], p[2] - center[2]
+                if dx * dx + dy * dy + dz * dz > r_sq:
+                    continue
+                if planes and not point_in_frustum(planes, p, margin):
+                    continue
+                out.append(key)
+        return out
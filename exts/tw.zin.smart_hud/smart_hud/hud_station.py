@@ -0,0 +1,123 @@
+"""
+Smart HUD — station progress driven by Smart Conveyor station events.
+
+Smart Conveyor 在 message bus 上送出三種站點事件 (payload 皆含 line_id、waypoint_index、
+pos = waypoint 世界座標、pause 秒數、elapsed 秒數、prim_path = 板子)：
+
+  station_arrived   板子到站開始停留
+  station_progress  停留時間每經過 1/10 送一次 (elapsed 用來校正漂移)
+  station_left      停留結束 (或板子被回收) 離站
+
+StationProgressRouter 依 waypoint 世界座標找出最近的 HUD prim (容許距離內)，
+結果以 (line_id, waypoint_index) 快取；事件之間的進度以 HUD 自己的時鐘外插，
+不需要每幀向輸送帶查詢。進度與既有的動畫模式相同：剩餘停留時間的百分比 (100 → 0)。
+
+純 Python，不依賴 Omniverse。
+"""
+
+import math
+from typing import Dict, Optional, Sequence, Tuple
+
+ARRIVED_EVENT = "tw.zin.smart_conveyor.station_arrived"
+PROGRESS_EVENT = "tw.zin.smart_conveyor.station_progress"
+LEFT_EVENT = "tw.zin.smart_conveyor.station_left"
+STATION_EVENTS = (("arrived", ARRIVED_EVENT), ("progress", PROGRESS_EVENT), ("left", LEFT_EVENT))
+
+PROGRESS_SOURCE_ANIMATION = "animation"
+PROGRESS_SOURCE_CONVEYOR = "conveyor"
+
+
+class StationProgress:
+    """Pause progress of the board currently at one station."""
+
+    __slots__ = ("board", "pause", "elapsed", "stamp")
+
+    def __init__(self):
+        self.board = None
+        self.pause = 0.0
+        self.elapsed = 0.0    # elapsed pause at `stamp` (HUD clock)
+        self.stamp = 0.0
+
+    @property
+    def busy(self) -> bool:
+        return self.board is not None
+
+    def remaining_pct(self, now: float) -> float:
+        if not self.busy or self.pause <= 0:
+            return 100.0
+        elapsed = self.elapsed + max(0.0, now - self.stamp)
+        return max(0.0, min(100.0, (1.0 - elapsed / self.pause) * 100.0))
+
+
+class StationProgressRouter:
+    """Routes conveyor station events to the nearest conveyor-mode HUD."""
+
+    def __init__(self, match_tolerance: float = 500.0):
+        self.match_tolerance = match_tolerance
+        self._huds: Dict[str, Tuple[float, float, float]] = {}   # prim path -> world position
+        self._stations: Dict[tuple, Optional[str]] = {}           # (line_id, waypoint index) -> prim path
+        self._progress: Dict[str, StationProgress] = {}
+        self.unmatched = 0
+
+    def __len__(self):
+        return len(self._huds)
+
+    def set_hud(self, prim_path: str, position: Sequence[float]) -> None:
+        pos = (float(position[0]), float(position[1]), float(position[2]))
+        if self._huds.get(prim_path) != pos:
+            self._huds[prim_path] = pos
+            self._stations.clear()   # matches may change; re-resolved on the next event of each station
+        self._progress.setdefault(prim_path, StationProgress())
+
+    def remove_hud(self, prim_path: str) -> None:
+        if self._huds.pop(prim_path, None) is not None:
+            self._stations.clear()
+        self._progress.pop(prim_path, None)
+
+    def clear(self) -> None:
+        self._huds.clear()
+        self._stations.clear()
+        self._progress.clear()
+
+    def resolve(self, line_id, waypoint_index, position: Sequence[float]) -> Optional[str]:
+        key = (line_id, waypoint_index)
+        if key in self._stations:
+            return self._stations[key]
+        best, best_d = None, self.match_tolerance
+        for prim_path, p in self._huds.items():
+            d = math.dist(p, position)
+            if d <= best_d:
+                best, best_d = prim_path, d
+        self._stations[key] = best
+        return best
+
+    def handle(self, kind: str, payload: dict, now: float) -> Optional[str]:
+        """Apply one station event; returns the HUD prim path it was routed to (None if unmatched)."""
+        pos = payload.get("pos")
+        if not pos or len(pos) < 3:
+            return None
+        prim_path = self.resolve(payload.get("line_id", ""), payload.get("waypoint_index"), pos)
+        if prim_path is None:
+            self.unmatched += 1
+            return None
+        state = self._progress[prim_path]
+        board = payload.get("prim_path") or "?"
+        if kind == "left":
+            if state.board in (None, board):
+                state.board = None
+            return prim_path
+        if kind == "progress" and state.board not in (None, board):
+            return prim_path   # another board owns the station (e.g. overlapping lines)
+        state.board = board
+        state.pause = float(payload.get("pause", 0.0) or 0.0)
+        state.elapsed = float(payload.get("elapsed", 0.0) or 0.0)
+        state.stamp = now
+        return prim_path
+
+    def busy(self):
+        """Prim paths whose station currently holds a board."""
+        return [p for p, s in self._progress.items() if s.busy]
+
+    def progress(self, prim_path: str, now: float) -> Optional[float]:
+        state = self._progress.get(prim_path)
+        return state.remaining_pct(now) if state is not None else None
@@ -0,0 +1,426 @@
+"""
+Smart HUD — pluggable telemetry sources.
+
+HUD 的即時數值由 TelemetrySource 提供，TelemetryHub 負責：
+  - 依 prim path 或 machine ID (hud_machine_id / aif:core:modelNumber) 對應到 HUD；
+    批次寫入的 modelNumber 常讓多個 HUD 共用同一個 ID，紀錄會推給每一個
+  - 只回傳「值有變動」的欄位，讓 HUDViewModel 只在變動時更新
+
+內建來源：
+  - FileTailSource      : 追蹤 CSV / JSONL 檔案新增的行 (tail -f)
+  - ReplaySource        : 依時間戳重播錄製好的 CSV / JSONL (離線測試)
+  - LocalHttpSource     : 本機 HTTP 端點，POST JSON 至 /telemetry/<id> (類似 MQTT topic)
+  - ConveyorZoneSource  : Smart Conveyor trigger zone 事件 → 每個 zone 的佔用數 / 通過數
+
+每筆紀錄是一個 dict，以 "prim_path"、"machine_id" 或 "id" 欄位指定對象，
+其他欄位 (例如 status / state / defect_rate) 會推給對應的 HUD。
+
+除 ConveyorZoneSource.start() 需要 Kit 之外皆為純 Python。
+"""
+
+import csv
+import io
+import json
+import os
+import queue
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+KEY_FIELDS = ("prim_path", "machine_id", "id")
+TIME_FIELDS = ("timestamp", "time", "t")
+
+
+def _coerce(value):
+    """CSV 欄位字串轉成數字 (可轉時)。"""
+    if not isinstance(value, str):
+        return value
+    text = value.strip()
+    try:
+        return float(text) if any(c in text for c in ".eE") else int(text)
+    except ValueError:
+        return text
+
+
+def record_key(record: dict) -> Optional[str]:
+    for field in KEY_FIELDS:
+        value = record.get(field)
+        if value not in (None, ""):
+            return str(value)
+    return None
+
+
+def record_time(record: dict) -> Optional[float]:
+    for field in TIME_FIELDS:
+        value = record.get(field)
+        if value not in (None, ""):
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                return None
+    return None
+
+
+def record_fields(record: dict) -> dict:
+    """去掉 key / 時間欄位後的數值欄位。"""
+    skip = set(KEY_FIELDS) | set(TIME_FIELDS)
+    return {k: v for k, v in record.items() if k not in skip and v not in (None, "")}
+
+
+def parse_lines(lines: Iterable[str], fmt: str, header: Optional[List[str]] = None) -> Tuple[List[dict], Optional[List[str]]]:
+    """解析 CSV / JSONL 行。CSV 的第一行為欄位名稱；回傳 (records, header)。"""
+    records = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if fmt == "jsonl":
+            try:
+                obj = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(obj, dict):
+                records.append(obj)
+        else:
+            row = next(csv.reader(io.StringIO(line)))
+            if header is None:
+                header = [h.strip() for h in row]
+                continue
+            records.append({h: _coerce(v) for h, v in zip(header, row)})
+    return records, header
+
+
+def format_for_path(path: str) -> str:
+    return "jsonl" if os.path.splitext(path)[1].lower() in (".jsonl", ".json", ".ndjson") else "csv"
+
+
+# ==========================================
+# Sources
+# ==========================================
+class TelemetrySource:
+    """Base class: poll() returns the records received since the previous call."""
+
+    name = "Telemetry"
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+    def poll(self, now: Optional[float] = None) -> List[dict]:
+        return []
+
+
+class FileTailSource(TelemetrySource):
+    """Follow a CSV / JSONL file and return only newly appended lines."""
+
+    name = "File Tail"
+
+    def __init__(self, path: str, fmt: Optional[str] = None, from_start: bool = False):
+        self.path = path
+        self.fmt = fmt or format_for_path(path)
+        self._from_start = from_start
+        self._offset = None
+        self._partial = ""
+        self._header = None
+
+    def start(self) -> None:
+        self._offset = None
+        self._partial = ""
+        self._header = None
+
+    def poll(self, now: Optional[float] = None) -> List[dict]:
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return []
+        if self._offset is None:
+            # 預設只讀開始追蹤之後新增的資料；CSV 仍需先讀第一行的 header
+            self._offset = 0 if self._from_start else size
+            if self.fmt == "csv" and not self._from_start:
+                with open(self.path, "r", encoding="utf-8", newline="") as f:
+                    self._header = parse_lines([f.readline()], "csv")[1]
+        if size < self._offset:
+            # 檔案被截斷 / 輪替：從頭讀起
+            self._offset, self._partial, self._header = 0, "", None
+        if size == self._offset:
+            return []
+        with open(self.path, "r", encoding="utf-8", newline="") as f:
+            f.seek(self._offset)
+            chunk = f.read()
+            self._offset = f.tell()
+        text = self._partial + chunk
+        lines = text.split("\n")
+        self._partial = lines.pop()  # 最後一行可能尚未寫完
+        records, self._header = parse_lines(lines, self.fmt, self._header)
+        return records
+
+
+class ReplaySource(TelemetrySource):
+    """Replay a recorded CSV / JSONL file using its timestamp column (seconds)."""
+
+    name = "Replay"
+
+    def __init__(self, path: str = "", records: Optional[List[dict]] = None, speed: float = 1.0,
+                 loop: bool = True, fmt: Optional[str] = None):
+        if records is None:
+            with open(path, "r", encoding="utf-8", newline="") as f:
+                records = parse_lines(f, fmt or format_for_path(path))[0]
+        timed = [(record_time(r), r) for r in records]
+        timed = [(t, r) for t, r in timed if t is not None]
+        timed.sort(key=lambda item: item[0])
+        self._t0 = timed[0][0] if timed else 0.0
+        self._times = [t - self._t0 for t, _ in timed]
+        self._records = [r for _, r in timed]
+        self.duration = self._times[-1] if self._times else 0.0
+        # 重播一輪的長度：最後一筆之後再隔一個平均取樣間隔才回到第一筆
+        n = len(self._times)
+        self.period = self.duration + (self.duration / (n - 1) if n > 1 and self.duration > 0 else 1.0)
+        self.speed = max(1e-6, float(speed))
+        self.loop = loop
+        self._start = None
+        self._cursor = 0
+        self._elapsed_base = 0.0
+
+    def start(self) -> None:
+        self._start = None
+        self._cursor = 0
+        self._elapsed_base = 0.0
+
+    def poll(self, now: Optional[float] = None) -> List[dict]:
+        if not self._records:
+            return []
+        now = time.monotonic() if now is None else now
+        if self._start is None:
+            self._start = now
+        elapsed = (now - self._start) * self.speed - self._elapsed_base
+        out = []
+        while True:
+            while self._cursor < len(self._records) and self._times[self._cursor] <= elapsed:
+                out.append(self._records[self._cursor])
+                self._cursor += 1
+            if self._cursor < len(self._records) or not self.loop:
+                break
+            # 播完一輪：時間軸往後平移整數個 period 後重播 (跳過落後的整輪，不重複輸出)
+            if elapsed < self.period:
+                break
+            cycles = int(elapsed // self.period)
+            self._elapsed_base += cycles * self.period
+            elapsed -= cycles * self.period
+            self._cursor = 0
+        return out
+
+
+class LocalHttpSource(TelemetrySource):
+    """MQTT-like local endpoint: POST a JSON object (or list) to http://127.0.0.1:<port>/telemetry/<id>.
+
+    The <id> path segment ("topic") becomes the record key when the body has none.
+    """
+
+    name = "Local HTTP"
+
+    def __init__(self, port: int = 8765, host: str = "127.0.0.1"):
+        self.host = host
+        self.port = int(port)
+        self._queue: "queue.Queue[dict]" = queue.Queue()
+        self._server = None
+        self._thread = None
+
+    def start(self) -> None:
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        source = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                topic = self.path.split("?", 1)[0].strip("/")
+                if topic.startswith("telemetry"):
+                    topic = topic[len("telemetry"):].strip("/")
+                length = int(self.headers.get("Content-Length", 0) or 0)
+                try:
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                except json.JSONDecodeError:
+                    self.send_response(400)
+                    self.end_headers()
+                    return
+                for record in body if isinstance(body, list) else [body]:
+                    if isinstance(record, dict):
+                        source.publish(topic, record)
+                self.send_response(204)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), _Handler)
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="smart_hud.telemetry_http", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        self._thread = None
+
+    def publish(self, topic: str, record: dict) -> None:
+        """Thread-safe; also usable in-process without the HTTP server."""
+        if topic and record_key(record) is None:
+            record = dict(record, id=topic.replace("%2F", "/"))
+        self._queue.put(record)
+
+    def poll(self, now: Optional[float] = None) -> List[dict]:
+        out = []
+        while True:
+            try:
+                out.append(self._queue.get_nowait())
+            except queue.Empty:
+                return out
+
+
+class ConveyorZoneMetrics:
+    """Per trigger-zone occupancy / throughput from Smart Conveyor zone enter / exit events."""
+
+    def __init__(self):
+        self._inside: Dict[str, set] = {}
+        self._entered: Dict[str, int] = {}
+        self._dirty = set()
+
+    def on_event(self, kind: str, payload: dict) -> None:
+        zone = payload.get("zone")
+        if not zone:
+            return
+        board = payload.get("prim_path", "")
+        inside = self._inside.setdefault(zone, set())
+        if kind == "enter":
+            inside.add(board)
+            self._entered[zone] = self._entered.get(zone, 0) + 1
+        else:
+            inside.discard(board)
+        self._dirty.add(zone)
+
+    def pop_records(self) -> List[dict]:
+        out = []
+        for zone in sorted(self._dirty):
+            occupancy = len(self._inside.get(zone, ()))
+            out.append({
+                "id": zone,
+                "status": "BUSY" if occupancy else "IDLE",
+                "state": "MOVING" if occupancy else "IDLE",
+                "occupancy": occupancy,
+                "count": self._entered.get(zone, 0),
+            })
+        self._dirty.clear()
+        return out
+
+
+class ConveyorZoneSource(TelemetrySource):
+    """Smart Conveyor metrics via its message-bus zone events (zone name = machine ID)."""
+
+    name = "Conveyor Zones"
+    ENTER_EVENT = "tw.zin.smart_conveyor.zone_enter"
+    EXIT_EVENT = "tw.zin.smart_conveyor.zone_exit"
+
+    def __init__(self):
+        self.metrics = ConveyorZoneMetrics()
+        self._subs = []
+
+    def start(self) -> None:
+        import carb.events
+        import omni.kit.app
+        bus = omni.kit.app.get_app().get_message_bus_event_stream()
+        self._subs = [
+            bus.create_subscription_to_pop_by_type(
+                carb.events.type_from_string(event_name),
+                lambda e, k=kind: self.metrics.on_event(k, dict(e.payload.get_dict()) if hasattr(e.payload, "get_dict") else dict(e.payload)),
+            )
+            for kind, event_name in (("enter", self.ENTER_EVENT), ("exit", self.EXIT_EVENT))
+        ]
+
+    def stop(self) -> None:
+        self._subs = []
+
+    def poll(self, now: Optional[float] = None) -> List[dict]:
+        return self.metrics.pop_records()
+
+
+# ==========================================
+# Hub
+# ==========================================
+class TelemetryHub:
+    """Polls sources, maps records to HUD prim paths and keeps only changed fields."""
+
+    def __init__(self):
+        self._sources: List[TelemetrySource] = []
+        self._machine_ids: Dict[str, Set[str]] = {}   # machine ID -> HUD prim paths sharing it
+        self._hud_paths = set()
+        self._last: Dict[str, dict] = {}          # prim path -> last pushed fields
+        self.unmatched = 0                         # records whose key matched no HUD
+
+    @property
+    def sources(self) -> List[TelemetrySource]:
+        return list(self._sources)
+
+    def add_source(self, source: TelemetrySource) -> None:
+        source.start()
+        self._sources.append(source)
+
+    def clear_sources(self) -> None:
+        for source in self._sources:
+            try:
+                source.stop()
+            except Exception:
+                pass
+        self._sources = []
+
+    def register_hud(self, prim_path: str, machine_id: Optional[str] = None) -> None:
+        self._hud_paths.add(prim_path)
+        if machine_id:
+            self._machine_ids.setdefault(str(machine_id), set()).add(prim_path)
+
+    def unregister_hud(self, prim_path: str) -> None:
+        self._hud_paths.discard(prim_path)
+        self._last.pop(prim_path, None)
+        # Only this HUD's path: other HUDs may still share its machine ID
+        for mid in [m for m, paths in self._machine_ids.items() if prim_path in paths]:
+            paths = self._machine_ids[mid]
+            paths.discard(prim_path)
+            if not paths:
+                del self._machine_ids[mid]
+
+    def clear_huds(self) -> None:
+        self._hud_paths.clear()
+        self._machine_ids.clear()
+        self._last.clear()
+
+    def resolve(self, key: str) -> List[str]:
+        """HUD prim paths a record key addresses (a prim path, or every HUD with that machine ID)."""
+        if key in self._hud_paths:
+            return [key]
+        return sorted(self._machine_ids.get(key, ()))
+
+    def poll(self, now: Optional[float] = None) -> Dict[str, dict]:
+        """回傳 {prim path: 有變動的欄位}；同一幀內同一 HUD 的多筆紀錄以後者為準。"""
+        changed: Dict[str, dict] = {}
+        for source in self._sources:
+            try:
+                records = source.poll(now)
+            except Exception as e:
+                print(f"[Smart HUD] ⚠️ Telemetry source '{source.name}' failed: {e}")
+                continue
+            for record in records:
+                key = record_key(record)
+                prim_paths = self.resolve(key) if key else []
+                if not prim_paths:
+                    self.unmatched += 1
+                    continue
+                fields = record_fields(record)
+                for prim_path in prim_paths:
+                    last = self._last.setdefault(prim_path, {})
+                    for field, value in fields.items():
+                        if last.get(field) != value:
+                            last[field] = value
+                            changed.setdefault(prim_path, {})[field] = value
+        return changed
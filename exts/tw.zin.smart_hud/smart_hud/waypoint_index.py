@@ -0,0 +1,142 @@
+"""
+Smart HUD — indexed nearest-waypoint lookup for ProdLine_UPH configs.
+
+ProdLine_UPH 資料夾內每個 JSON 是一條產線的輸送帶設定 ("waypoints": [{name, pos, rot, pause}])。
+WaypointPauseIndex 只在資料夾內檔案變動 (檔名 / mtime / 大小) 時重新讀檔，
+將所有 waypoint 建成 3D KD-tree；之後的最近點查詢為 O(log n)，不讀硬碟。
+
+資料夾簽章的檢查 (os.scandir，只 stat 不讀檔) 最多每 check_interval 秒一次。
+
+純 Python，不依賴 Omniverse。
+"""
+
+import json
+import os
+import time
+from typing import List, Optional, Sequence, Tuple
+
+
+class KDTree3:
+    """Static 3D KD-tree over points with attached payloads."""
+
+    def __init__(self, points: Sequence[Sequence[float]], payloads: Sequence = None):
+        self._pts = [(float(p[0]), float(p[1]), float(p[2])) for p in points]
+        self._payloads = list(payloads) if payloads is not None else list(range(len(self._pts)))
+        # 每個節點：(point index, axis, left, right)
+        self._nodes: List[Tuple[int, int, int, int]] = []
+        self._root = self._build(list(range(len(self._pts))), 0)
+
+    def __len__(self):
+        return len(self._pts)
+
+    def _build(self, idx: List[int], depth: int) -> int:
+        if not idx:
+            return -1
+        axis = depth % 3
+        idx.sort(key=lambda i: self._pts[i][axis])
+        mid = len(idx) // 2
+        node = len(self._nodes)
+        self._nodes.append(None)
+        left = self._build(idx[:mid], depth + 1)
+        right = self._build(idx[mid + 1:], depth + 1)
+        self._nodes[node] = (idx[mid], axis, left, right)
+        return node
+
+    def nearest(self, q: Sequence[float], max_distance: float = float("inf")):
+        """回傳 (payload, distance)；max_distance 內沒有點時回傳 (None, inf)。"""
+        best_i, best_d2 = -1, max_distance * max_distance if max_distance != float("inf") else float("inf")
+        q = (float(q[0]), float(q[1]), float(q[2]))
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node < 0:
+                continue
+            i, axis, left, right = self._nodes[node]
+            p = self._pts[i]
+            dx, dy, dz = p[0] - q[0], p[1] - q[1], p[2] - q[2]
+            d2 = dx * dx + dy * dy + dz * dz
+            if d2 < best_d2:
+                best_i, best_d2 = i, d2
+            diff = q[axis] - p[axis]
+            near, far = (left, right) if diff < 0 else (right, left)
+            # 先推遠側 (後處理)，只有切割平面在目前最佳半徑內才需要走訪
+            if diff * diff < best_d2:
+                stack.append(far)
+            stack.append(near)
+        if best_i < 0:
+            return None, float("inf")
+        return self._payloads[best_i], best_d2 ** 0.5
+
+
+def folder_signature(folder: str, pattern_ext: str = ".json") -> Tuple:
+    """資料夾內所有 JSON 的 (檔名, mtime_ns, size)；資料夾不存在時回傳 ()。"""
+    try:
+        entries = [e for e in os.scandir(folder) if e.is_file() and e.name.lower().endswith(pattern_ext)]
+    except OSError:
+        return ()
+    sig = []
+    for e in entries:
+        try:
+            st = e.stat()
+        except OSError:
+            continue
+        sig.append((e.name, st.st_mtime_ns, st.st_size))
+    return tuple(sorted(sig))
+
+
+def load_waypoints(folder: str) -> List[dict]:
+    """讀取資料夾內所有 UPH JSON 的 waypoints (附上來源檔名)。"""
+    out = []
+    for name, _, _ in folder_signature(folder):
+        path = os.path.join(folder, name)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"[Smart HUD] Error reading {path}: {e}")
+            continue
+        for wp in data.get("waypoints", []) if isinstance(data, dict) else []:
+            pos = wp.get("pos") if isinstance(wp, dict) else None
+            if pos and len(pos) >= 3:
+                out.append(dict(wp, source=name))
+    return out
+
+
+class WaypointPauseIndex:
+    """Nearest-waypoint index over a ProdLine_UPH folder, rebuilt only when its files change."""
+
+    def __init__(self, check_interval: float = 2.0, clock=time.monotonic):
+        self.check_interval = check_interval
+        self._clock = clock
+        self._folder = None
+        self._signature = None
+        self._checked_at = None
+        self._tree: Optional[KDTree3] = None
+        self.rebuild_count = 0
+
+    def __len__(self):
+        return len(self._tree) if self._tree else 0
+
+    def ensure_current(self, folder: str, force: bool = False) -> bool:
+        """必要時重建索引，回傳是否有重建。同一資料夾在 check_interval 內不重新 stat。"""
+        now = self._clock()
+        if (not force and folder == self._folder and self._checked_at is not None
+                and now - self._checked_at < self.check_interval):
+            return False
+        self._checked_at = now
+        signature = folder_signature(folder)
+        if folder == self._folder and signature == self._signature and not force:
+            return False
+        waypoints = load_waypoints(folder)
+        self._tree = KDTree3([wp["pos"] for wp in waypoints], waypoints) if waypoints else None
+        self._folder = folder
+        self._signature = signature
+        self.rebuild_count += 1
+        print(f"[Smart HUD] 🗂️ Indexed {len(waypoints)} waypoints from {len(signature)} UPH files in {folder}")
+        return True
+
+    def nearest(self, world_pos: Sequence[float], max_distance: float = float("inf")):
+        """回傳 (waypoint dict, distance)，沒有結果時為 (None, inf)。"""
+        if self._tree is None:
+            return None, float("inf")
+        return self._tree.nearest(world_pos, max_distance)
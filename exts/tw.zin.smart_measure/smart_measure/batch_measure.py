@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Smart Measure — headless batch measurement.
+
+在 Kit 外以純 pxr 開啟 USD，大量量測尺寸、間隙與淨空，結果寫成 CSV 或 JSON：
+
+  - 尺寸：每個 prim 的世界 AABB 長寬高
+  - 間隙：指定的 prim 對以 calculate_gap 計算中心距 (dx, dy, dz, distance)，
+    並附上 AABB 表面間的淨空 (重疊為 0)
+  - 淨空：--pattern 找到的 prim 兩兩之間 AABB 淨空小於 --clearance 者
+    (clearance.candidate_pairs，sweep-and-prune)
+
+單位換算與小數位數沿用 format_stage_unit / get_precision，與 Smart Measure 視窗一致。
+
+stage 以 population mask 開啟，只組合需要的 prim (與其祖先)；prim 很多時分批交給
+process pool，每個 worker 只以自己那一批路徑作為 mask 開啟 stage 並計算 bound。
+--pattern 以最前面不含萬用字元的路徑作為 mask 根，`*` / `?` 不跨越 `/`，`**` 可跨多層。
+
+Usage:
+    python batch_measure.py scene.usd --pair /World/A /World/B [--pair ...] [--pairs pairs.csv]
+    python batch_measure.py scene.usd --pattern "/World/Line*/Robot_*" [--clearance 800] [--unit mm]
+        [--format csv|json] [--out result.csv] [--jobs N] [--time 24]
+
+Exit status: 0 = 全部量測完成；1 = 有找不到或沒有幾何的 prim；2 = 參數或讀檔錯誤。
+"""
+
+import argparse
+import csv
+import json
+import math
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence, TextIO, Tuple
+
+try:
+    from .clearance import aabb_distances, candidate_pairs
+    from .measure_logic import METERS_PER_UNIT_TO_NAME, calculate_gap, format_stage_unit, get_precision
+except ImportError:   # run as a script
+    from clearance import aabb_distances, candidate_pairs
+    from measure_logic import METERS_PER_UNIT_TO_NAME, calculate_gap, format_stage_unit, get_precision
+
+UNIT_TO_METERS = {name: mpu for mpu, name in METERS_PER_UNIT_TO_NAME.items()}
+MIN_PATHS_PER_PROCESS = 64    # smaller lists are measured in-process
+
+Bounds = Tuple[Tuple[float, float, float], Tuple[float, float, float]]
+
+
+# ==========================================
+# Inputs
+# ==========================================
+def read_pairs(stream: TextIO) -> List[Tuple[str, str]]:
+    """Prim path pairs, one per line ("a,b" or "a b"); blank lines and # comments are skipped."""
+    pairs = []
+    for lineno, line in enumerate(stream, 1):
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        fields = [f.strip() for f in re.split(r"[,\s]+", line) if f.strip()]
+        if len(fields) != 2:
+            raise ValueError(f"line {lineno}: expected 2 prim paths, got {len(fields)}")
+        pairs.append((fields[0], fields[1]))
+    return pairs
+
+
+def pattern_regex(pattern: str) -> "re.Pattern":
+    """`*` / `?` match within one path element, `**` across elements."""
+    out = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            out.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            out.append("[^/]")
+            i += 1
+        else:
+            out.append(re.escape(pattern[i]))
+            i += 1
+    return re.compile("".join(out) + r"\Z")
+
+
+def pattern_root(pattern: str) -> str:
+    """Deepest literal prefix of the pattern (the population mask root)."""
+    elements = []
+    for element in pattern.strip("/").split("/"):
+        if any(c in element for c in "*?["):
+            break
+        elements.append(element)
+    return "/" + "/".join(elements)
+
+
+# ==========================================
+# Stage access (pxr)
+# ==========================================
+def open_masked(stage_path: str, paths: Iterable[str]):
+    """Open the stage composing only `paths` (and their ancestors / descendants)."""
+    from pxr import Usd
+    mask = Usd.StagePopulationMask()
+    for p in paths:
+        mask.Add(p)
+    stage = Usd.Stage.OpenMasked(stage_path, mask)
+    if not stage:
+        raise RuntimeError(f"cannot open stage '{stage_path}'")
+    return stage
+
+
+def stage_meters_per_unit(stage_path: str) -> float:
+    from pxr import UsdGeom
+    # An empty mask composes no prims: only the layer metadata is read
+    return float(UsdGeom.GetStageMetersPerUnit(open_masked(stage_path, [])))
+
+
+def find_matching_prims(stage_path: str, pattern: str) -> List[str]:
+    from pxr import Usd
+    root = pattern_root(pattern)
+    regex = pattern_regex(pattern)
+    # Without "**" nothing deeper than the pattern can match
+    max_depth = None if "**" in pattern else pattern.strip("/").count("/") + 1
+    stage = open_masked(stage_path, [root])
+    start = stage.GetPrimAtPath(root) if root != "/" else stage.GetPseudoRoot()
+    if not start:
+        return []
+    matches = []
+    it = iter(Usd.PrimRange(start))
+    for prim in it:
+        path = str(prim.GetPath())
+        if regex.match(path):
+            matches.append(path)
+        if max_depth is not None and path.count("/") >= max_depth:
+            it.PruneChildren()
+    return matches
+
+
+def measure_bounds(stage_path: str, paths: Sequence[str], time: Optional[float] = None) -> Dict[str, Optional[Bounds]]:
+    """World AABB (lo, hi) of each path in stage units; None if the prim is missing or has no geometry."""
+    from pxr import Usd, UsdGeom
+    stage = open_masked(stage_path, paths)
+    time_code = Usd.TimeCode(time) if time is not None else Usd.TimeCode.Default()
+    purposes = [UsdGeom.Tokens.default_, UsdGeom.Tokens.render, UsdGeom.Tokens.proxy, UsdGeom.Tokens.guide]
+    cache = UsdGeom.BBoxCache(time_code, purposes, useExtentsHint=False)
+    result = {}
+    for p in paths:
+        prim = stage.GetPrimAtPath(p)
+        box = cache.ComputeWorldBound(prim).ComputeAlignedBox() if prim and prim.IsValid() else None
+        if box is None or box.IsEmpty():
+            result[p] = None
+        else:
+            lo, hi = box.GetMin(), box.GetMax()
+            result[p] = ((lo[0], lo[1], lo[2]), (hi[0], hi[1], hi[2]))
+    return result
+
+
+def _measure_chunk(args) -> Dict[str, Optional[Bounds]]:
+    return measure_bounds(*args)
+
+
+def measure_all_bounds(stage_path: str, paths: Sequence[str], time: Optional[float] = None,
+                       jobs: Optional[int] = None) -> Dict[str, Optional[Bounds]]:
+    """measure_bounds over many paths, split into one masked stage per worker process."""
+    paths = list(dict.fromkeys(paths))
+    workers = jobs if jobs is not None else (os.cpu_count() or 1)
+    workers = max(1, min(workers, len(paths) // MIN_PATHS_PER_PROCESS))
+    if workers == 1:
+        return measure_bounds(stage_path, paths, time)
+    size = math.ceil(len(paths) / workers)
+    chunks = [(stage_path, paths[s:s + size], time) for s in range(0, len(paths), size)]
+    result = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for part in pool.map(_measure_chunk, chunks):
+            result.update(part)
+    return result
+
+
+# ==========================================
+# Measurements (pure)
+# ==========================================
+def size_rows(bounds: Dict[str, Optional[Bounds]], scale: float) -> List[dict]:
+    rows = []
+    for path, b in bounds.items():
+        if b is None:
+            continue
+        lo, hi = b
+        rows.append({"kind": "size", "prim_a": path, "prim_b": "",
+                     "x": (hi[0] - lo[0]) * scale, "y": (hi[1] - lo[1]) * scale, "z": (hi[2] - lo[2]) * scale})
+    return rows
+
+
+def gap_row(path_a: str, path_b: str, a: Bounds, b: Bounds, scale: float) -> dict:
+    dx, dy, dz, dist = calculate_gap(a[0], a[1], b[0], b[1])
+    clear = float(aabb_distances([a[0]], [a[1]], [b[0]], [b[1]])[0])
+    return {"kind": "gap", "prim_a": path_a, "prim_b": path_b, "x": dx * scale, "y": dy * scale, "z": dz * scale,
+            "distance": dist * scale, "clearance": clear * scale}
+
+
+def clearance_gap_rows(bounds: Dict[str, Optional[Bounds]], threshold: float, scale: float) -> List[dict]:
+    """gap rows for every pair whose AABB clearance is within threshold (stage units)."""
+    paths = [p for p, b in bounds.items() if b is not None]
+    if len(paths) < 2:
+        return []
+    lo = [bounds[p][0] for p in paths]
+    hi = [bounds[p][1] for p in paths]
+    rows = [gap_row(paths[i], paths[j], bounds[paths[i]], bounds[paths[j]], scale)
+            for i, j in candidate_pairs(lo, hi, threshold).tolist()]
+    return sorted(rows, key=lambda r: (r["clearance"], r["prim_a"], r["prim_b"]))
+
+
+# ==========================================
+# Output
+# ==========================================
+_COLUMNS = ("kind", "prim_a", "prim_b", "x", "y", "z", "distance", "clearance")
+
+
+def write_csv(rows: Sequence[dict], stream: TextIO, unit: str, precision: int) -> None:
+    writer = csv.writer(stream)
+    writer.writerow([c if c in ("kind", "prim_a", "prim_b") else f"{c} ({unit})" for c in _COLUMNS])
+    for r in rows:
+        writer.writerow([r.get(c, "") if c in ("kind", "prim_a", "prim_b")
+                         else (f"{r[c]:.{precision}f}" if c in r else "") for c in _COLUMNS])
+
+
+def write_json(rows: Sequence[dict], stream: TextIO, unit: str, precision: int, **header) -> None:
+    rounded = [{k: round(v, precision) if isinstance(v, float) else v for k, v in r.items()} for r in rows]
+    json.dump(dict(header, unit=unit, precision=precision, rows=rounded), stream, indent=2)
+    stream.write("\n")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure sizes, gaps and clearances in a USD file without Kit.")
+    parser.add_argument("stage", help=".usd / .usda / .usdc file")
+    parser.add_argument("--pair", nargs=2, action="append", default=[], metavar=("PRIM_A", "PRIM_B"),
+                        help="measure the gap between two prims (repeatable)")
+    parser.add_argument("--pairs", help="file with one prim path pair per line ('a,b' or 'a b')")
+    parser.add_argument("--pattern", help="measure the size of every prim matching this path pattern")
+    parser.add_argument("--clearance", type=float, default=None,
+                        help="with --pattern: also list pairs whose AABB clearance is within this (output unit)")
+    parser.add_argument("--unit", choices=sorted(UNIT_TO_METERS, key=UNIT_TO_METERS.get),
+                        help="output unit (default: the stage unit)")
+    parser.add_argument("--precision", type=int, default=None, help="decimals (default: get_precision(unit))")
+    parser.add_argument("--format", choices=("csv", "json"), default="csv")
+    parser.add_argument("--out", help="output file (default: stdout)")
+    parser.add_argument("--time", type=float, default=None, help="time code (default: the default time)")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    pairs = [tuple(p) for p in args.pair]
+    try:
+        if args.pairs:
+            with open(args.pairs, encoding="utf-8") as f:
+                pairs += read_pairs(f)
+    except (OSError, ValueError) as e:
+        print(f"[batch_measure] {args.pairs}: {e}", file=sys.stderr)
+        return 2
+    if not pairs and not args.pattern:
+        print("[batch_measure] Nothing to measure: give --pair, --pairs or --pattern.", file=sys.stderr)
+        return 2
+
+    try:
+        mpu = stage_meters_per_unit(args.stage)
+        matches = find_matching_prims(args.stage, args.pattern) if args.pattern else []
+        paths = matches + [p for pair in pairs for p in pair]
+        bounds = measure_all_bounds(args.stage, paths, args.time, args.jobs)
+    except Exception as e:
+        print(f"[batch_measure] {e}", file=sys.stderr)
+        return 2
+
+    stage_unit = format_stage_unit(mpu)
+    unit = args.unit or (stage_unit if stage_unit in UNIT_TO_METERS else "m")
+    precision = args.precision if args.precision is not None else get_precision(unit)
+    scale = mpu / UNIT_TO_METERS[unit]
+
+    rows = size_rows({p: bounds[p] for p in dict.fromkeys(paths)}, scale)
+    for a, b in pairs:
+        if bounds.get(a) is not None and bounds.get(b) is not None:
+            rows.append(gap_row(a, b, bounds[a], bounds[b], scale))
+    if args.pattern and args.clearance is not None:
+        rows += clearance_gap_rows({p: bounds[p] for p in matches}, max(0.0, args.clearance) / scale, scale)
+    missing = sorted(p for p in set(paths) if bounds.get(p) is None)
+    for p in missing:
+        print(f"[batch_measure] no prim or no geometry at {p}", file=sys.stderr)
+
+    out = open(args.out, "w", encoding="utf-8", newline="") if args.out else sys.stdout
+    try:
+        if args.format == "json":
+            write_json(rows, out, unit, precision, stage=args.stage, stage_unit=stage_unit, missing=missing)
+        else:
+            write_csv(rows, out, unit, precision)
+    finally:
+        if args.out:
+            out.close()
+    if args.pattern:
+        print(f"[batch_measure] {len(matches)} prim(s) match {args.pattern}", file=sys.stderr)
+    return 1 if missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
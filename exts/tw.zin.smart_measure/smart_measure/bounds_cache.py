@@ -0,0 +1,133 @@
+"""
+Smart Measure — world bounds cache kept across selections.
+
+原本每次選取改變都 BBoxCache.Clear()，在大型組裝裡重新選同一批零件也要從頭算 bound。
+WorldBoundsCache 以 prim 路徑保存世界座標 AABB，只在 Usd.Notice.ObjectsChanged
+回報會影響 bound 的變更時讓相關路徑失效：
+
+  - prim resync (新增 / 刪除 / 重組)、xformOp、visibility / purpose (會被子孫繼承)：
+    該 prim 與其子孫的世界 bound 都會變，祖先的 bound 也包含它們
+  - points / extent / size / radius ... 幾何屬性：該 prim 與其祖先
+  - 其他屬性 (例如 displayColor、自訂屬性) 不影響 bound，快取保持有效；
+    屬性的新增 / 刪除 (property resync) 也依屬性名稱判斷
+
+有相關變更時內部的 UsdGeom.BBoxCache 仍需 Clear() (它沒有逐路徑失效的 API)，
+但未受影響路徑的結果留在這一層，不必重算。
+
+只依賴 pxr.Usd / UsdGeom / Gf / Tf。
+"""
+
+from typing import Iterable, Optional
+
+from pxr import Gf, Sdf, Tf, Usd, UsdGeom
+
+# 會改變 prim 本身幾何 bound 的屬性 (xformOp:* 與 INHERITED_ATTRIBUTES 另外處理：它們也影響子孫)
+GEOMETRY_ATTRIBUTES = frozenset({
+    "points",
+    "extent",
+    "extentsHint",
+    "size",
+    "radius",
+    "radiusTop",
+    "radiusBottom",
+    "height",
+    "width",
+    "length",
+    "axis",
+})
+
+# 會被子孫繼承的屬性：改在祖先上時整個子樹的 bound 都會變
+INHERITED_ATTRIBUTES = frozenset({"visibility", "purpose"})
+
+
+class WorldBoundsCache:
+    """World-aligned boxes per prim path, invalidated by Usd.Notice.ObjectsChanged instead of per selection."""
+
+    def __init__(self, purposes=None, time_code=Usd.TimeCode.Default()):
+        self._purposes = list(purposes) if purposes else [UsdGeom.Tokens.default_]
+        self._time_code = time_code
+        self._bbox_cache = UsdGeom.BBoxCache(time_code, self._purposes, useExtentsHint=False)
+        self._entries = {}          # Sdf.Path -> Gf.Range3d
+        self._listener = None
+        self.hits = 0
+        self.computed = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def attach(self, stage: Optional[Usd.Stage]) -> None:
+        """Listen to stage changes (dropping everything cached for the previous stage)."""
+        self.detach()
+        if stage:
+            self._listener = Tf.Notice.Register(Usd.Notice.ObjectsChanged, self._on_objects_changed, stage)
+
+    def detach(self) -> None:
+        if self._listener is not None:
+            self._listener.Revoke()
+            self._listener = None
+        self.clear()
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bbox_cache.Clear()
+
+    def world_box(self, prim: Usd.Prim) -> Gf.Range3d:
+        """Axis-aligned world bound of prim's subtree."""
+        path = prim.GetPath()
+        box = self._entries.get(path)
+        if box is not None:
+            self.hits += 1
+            return Gf.Range3d(box)
+        box = self._bbox_cache.ComputeWorldBound(prim).ComputeAlignedBox()
+        self.computed += 1
+        self._entries[path] = box
+        return Gf.Range3d(box)
+
+    def _on_objects_changed(self, notice, sender):
+        self.invalidate(notice.GetResyncedPaths(), notice.GetChangedInfoOnlyPaths())
+
+    def invalidate(self, resynced: Iterable[Sdf.Path] = (), changed_info: Iterable[Sdf.Path] = ()) -> int:
+        """Drop the entries affected by the changed paths; returns how many were dropped."""
+        subtrees = set()    # entries at or below these prims are stale
+        prims = set()       # these prims (and, like subtrees, all their ancestors) are stale
+        for path in list(resynced) + list(changed_info):
+            if not path.IsPropertyPath():
+                # Subtree added / removed / recomposed (changed-info on a prim path is metadata only)
+                if path in resynced:
+                    subtrees.add(path.GetPrimPath())
+                continue
+            # Property resyncs (attribute created / removed) are filtered by name like value changes
+            name = path.name
+            if name in INHERITED_ATTRIBUTES or UsdGeom.Xformable.IsTransformationAffectedByAttrNamed(name):
+                subtrees.add(path.GetPrimPath())
+            elif name in GEOMETRY_ATTRIBUTES:
+                prims.add(path.GetPrimPath())
+        if not subtrees and not prims:
+            return 0
+
+        # BBoxCache has no per-path invalidation: its internal results are stale either way
+        self._bbox_cache.Clear()
+        if Sdf.Path.absoluteRootPath in subtrees:
+            dropped = len(self._entries)
+            self._entries.clear()
+            return dropped
+
+        stale = set()
+        for path in subtrees | prims:
+            while not path.isEmpty:
+                if path in self._entries:
+                    stale.add(path)
+                if path == Sdf.Path.absoluteRootPath:
+                    break
+                path = path.GetParentPath()
+        if subtrees:
+            for path in self._entries:
+                parent = path.GetParentPath()
+                while not parent.isEmpty and parent != Sdf.Path.absoluteRootPath:
+                    if parent in subtrees:
+                        stale.add(path)
+                        break
+                    parent = parent.GetParentPath()
+        for path in stale:
+            del self._entries[path]
+        return len(stale)
@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+Smart Measure — clash (interpenetration) detection between parts.
+
+佈局審查前要找出互相穿插的設備，過去只能目視。這裡分兩個階段：
+
+  1. broad phase：各零件的世界 AABB 以 sweep-and-prune (clearance.candidate_pairs，門檻 0)
+     找出 AABB 相交或相接的候選對
+  2. narrow phase：先把雙方三角形輪流裁到對方的包圍盒內 (通常只剩接觸附近)，
+     再以三角形 BVH 雙樹走訪找出包圍盒重疊的葉節點，
+     三角形對以「一方的邊穿過另一方的三角形」(Möller–Trumbore) 判斷是否穿插。
+     多個候選對時在 process pool 中平行處理；所有零件的世界座標三角形
+     只寫入一次 shared memory，worker 直接對應讀取，不必逐對 pickle
+
+穿插深度是估計值：在兩個 AABB 的重疊區域內取雙方三角形的頂點，沿世界軸與
+穿插三角形的法向量做分離軸投影，取重疊量最小的方向 (凸形接觸時即為最小分離距離，
+凹形零件可能高估)。共面貼合 (沒有邊穿過三角形) 不算 clash；整個零件包在另一個零件
+內部 (表面不相交) 時以射線穿越次數的奇偶判斷，仍列為 clash。
+
+亦可在命令列以純 pxr 對 .usd 檔案執行：
+    python clash.py scene.usd [--root /World] [--depth 1] [--jobs N] [--min-depth 0.5] [--json]
+
+Exit status: 0 = 沒有 clash；1 = 找到 clash；2 = 參數或讀檔錯誤。
+
+除 load_stage_parts() 與 main() 需要 pxr 之外為純 NumPy，不依賴 Omniverse。
+"""
+
+import argparse
+import functools
+import importlib.util
+import json
+import multiprocessing
+import os
+import site
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from .clearance import candidate_pairs
+    from .mesh_distance import MeshBVH, segment_triangle_hits, triangulate
+except ImportError:   # run as a script, or imported without the Kit package
+    from clearance import candidate_pairs
+    from mesh_distance import MeshBVH, segment_triangle_hits, triangulate
+
+_TEST_CHUNK = 200_000      # triangle pairs tested per NumPy batch
+_SHRINK_ROUNDS = 2         # alternate "triangles inside the other side's box" filters
+_LEAF_SIZE = 16
+_MAX_NORMAL_AXES = 64      # contact normals tried by the depth estimate
+_SIDE_EPS = 1e-9          # relative tolerance for "on the plane" (touching, not crossing)
+_EDGES = ((0, 1), (1, 2), (2, 0))
+_RAY_DIRECTION = np.array([1.0, 0.0013 * np.sqrt(2.0), 0.0017 * np.sqrt(3.0)])
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+class Clash(NamedTuple):
+    path_a: str
+    path_b: str
+    depth: float                        # penetration depth estimate (stage units)
+    axis: Tuple[float, float, float]    # move path_b by depth along axis to separate (estimate)
+    point: Tuple[float, float, float]   # a point on the intersection curve
+    triangles: int                      # intersecting triangle pairs
+
+
+# ==========================================
+# Triangle tests
+# ==========================================
+def triangles_intersect(ta: np.ndarray, tb: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(mask, point) of triangle pairs (n, 3, 3) where an edge of one passes through the other.
+
+    The edge's endpoints must lie strictly on opposite sides of the other triangle's plane, so faces
+    that only touch (coplanar contact, a vertex resting on a face) are not reported.
+    """
+    hit = np.zeros(len(ta), dtype=bool)
+    point = np.zeros((len(ta), 3))
+    for edge_tri, other in ((ta, tb), (tb, ta)):
+        normal = np.cross(other[:, 1] - other[:, 0], other[:, 2] - other[:, 0])
+        scale = np.linalg.norm(normal, axis=1) * np.abs(edge_tri - other[:, :1]).max(axis=(1, 2))
+        side = np.einsum("nij,nj->ni", edge_tri - other[:, :1], normal)     # (n, 3) signed, per vertex
+        side = np.where(np.abs(side) > _SIDE_EPS * scale[:, None], np.sign(side), 0.0)
+        for i, j in _EDGES:
+            crossing = side[:, i] * side[:, j] < 0
+            h, p = segment_triangle_hits(edge_tri[:, i], edge_tri[:, j], other[:, 0], other[:, 1], other[:, 2])
+            h &= crossing
+            new = h & ~hit
+            point[new] = p[new]
+            hit |= h
+    return hit, point
+
+
+def point_inside(corners: np.ndarray, point) -> bool:
+    """Whether point lies inside the closed triangle soup (ray-crossing parity)."""
+    point = np.asarray(point, dtype=np.float64)
+    lo, hi = corners.min(axis=(0, 1)), corners.max(axis=(0, 1))
+    if np.any(point < lo) or np.any(point > hi):
+        return False
+    # Slightly skewed ray so it does not graze the edges of grid-aligned geometry
+    far = point + _RAY_DIRECTION * (2.0 * float(np.max(hi - lo)) + 1.0)
+    p = np.broadcast_to(point, (len(corners), 3))
+    q = np.broadcast_to(far, (len(corners), 3))
+    hit, _ = segment_triangle_hits(p, q, corners[:, 0], corners[:, 1], corners[:, 2])
+    return bool(np.count_nonzero(hit) % 2)
+
+
+def _overlapping_leaves(a, b) -> Tuple[np.ndarray, np.ndarray]:
+    """Triangle slot pairs (BVH order) of every pair of leaves whose boxes overlap."""
+    ba, bb = a.bvh, b.bvh
+    ia, ib = [], []
+    stack = [(0, 0)]
+    while stack:
+        i, j = stack.pop()
+        if np.any(a.lo[i] > b.hi[j]) or np.any(b.lo[j] > a.hi[i]):
+            continue
+        leaf_i, leaf_j = ba.is_leaf(i), bb.is_leaf(j)
+        if leaf_i and leaf_j:
+            na, nb = ba.count[i], bb.count[j]
+            ia.append(np.repeat(np.arange(ba.start[i], ba.start[i] + na), nb))
+            ib.append(np.tile(np.arange(bb.start[j], bb.start[j] + nb), na))
+        elif leaf_j or (not leaf_i and np.sum(a.hi[i] - a.lo[i]) >= np.sum(b.hi[j] - b.lo[j])):
+            stack.extend(((int(ba.left[i]), j), (int(ba.right[i]), j)))
+        else:
+            stack.extend(((i, int(bb.left[j])), (i, int(bb.right[j]))))
+    if not ia:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return np.concatenate(ia), np.concatenate(ib)
+
+
+def _box(tris: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    return tris.min(axis=(0, 1)), tris.max(axis=(0, 1))
+
+
+def _triangles_in_box(tris: np.ndarray, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+    keep = np.all(tris.min(axis=1) <= hi, axis=1) & np.all(tris.max(axis=1) >= lo, axis=1)
+    return tris[keep]
+
+
+def _soup_bvh(tris: np.ndarray):
+    """World-space BVH over a triangle soup (n, 3, 3)."""
+    return MeshBVH(tris.reshape(-1, 3), np.arange(3 * len(tris)).reshape(-1, 3), _LEAF_SIZE).to_world()
+
+
+def _unit_normals(tris: np.ndarray) -> np.ndarray:
+    n = np.cross(tris[:, 1] - tris[:, 0], tris[:, 2] - tris[:, 0])
+    length = np.linalg.norm(n, axis=1)
+    keep = length > 0
+    return n[keep] / length[keep, None], length[keep]
+
+
+def penetration_estimate(corners_a: np.ndarray, corners_b: np.ndarray, clash_a: np.ndarray,
+                         clash_b: np.ndarray) -> Tuple[float, np.ndarray]:
+    """(depth, axis) by separating-axis projection of the parts' vertices near the overlap.
+
+    corners_* are the parts' (n, 3, 3) triangles; clash_* the intersecting ones (their normals are tried as axes).
+    """
+    (lo_a, hi_a), (lo_b, hi_b) = _box(corners_a), _box(corners_b)
+    lo, hi = np.maximum(lo_a, lo_b), np.minimum(hi_a, hi_b)
+
+    def local_vertices(corners):
+        # Triangles touching the overlap box of the two parts (all of them when one part encloses the other)
+        near = _triangles_in_box(corners, lo, hi)
+        return (near if len(near) else corners).reshape(-1, 3)
+
+    va, vb = local_vertices(corners_a), local_vertices(corners_b)
+    normals, areas = _unit_normals(np.concatenate([clash_a, clash_b]))
+    if len(normals) > _MAX_NORMAL_AXES:
+        normals = normals[np.argsort(areas)[::-1][:_MAX_NORMAL_AXES]]
+    # Opposite normals give the same axis: fold them onto one hemisphere before deduplicating
+    flip = (normals[:, 0] < 0) | ((normals[:, 0] == 0) & ((normals[:, 1] < 0) | ((normals[:, 1] == 0) & (normals[:, 2] < 0))))
+    normals[flip] *= -1.0
+    axes = np.unique(np.round(np.vstack([np.eye(3), normals]), 9), axis=0)
+    axes /= np.linalg.norm(axes, axis=1)[:, None]
+
+    pa, pb = va @ axes.T, vb @ axes.T
+    forward = pa.max(axis=0) - pb.min(axis=0)       # b separates by moving +axis
+    backward = pb.max(axis=0) - pa.min(axis=0)      # b separates by moving -axis
+    overlap = np.minimum(forward, backward)
+    k = int(np.argmin(overlap))
+    axis = axes[k] if forward[k] <= backward[k] else -axes[k]
+    return max(0.0, float(overlap[k])), axis
+
+
+# ==========================================
+# Narrow phase (shared between the in-process path and the worker processes)
+# ==========================================
+class _PartSet:
+    """World triangles of every part, (T, 3, 3) with per-part offsets."""
+
+    def __init__(self, corners: np.ndarray, offsets: np.ndarray):
+        self.corners = corners
+        self.offsets = offsets
+
+    def part(self, i: int) -> np.ndarray:
+        return self.corners[self.offsets[i]:self.offsets[i + 1]]
+
+    def test_pair(self, i: int, j: int) -> Optional[Tuple[float, Tuple, Tuple, int]]:
+        """(depth, axis, point, intersecting triangle pairs) or None if parts i and j do not interpenetrate."""
+        ca, cb = self.part(i), self.part(j)
+        # Only triangles inside the other part's box can cross it; shrinking both sides in turn
+        # usually leaves a small neighbourhood of the contact, so the BVHs are built per pair.
+        ta, tb = ca, cb
+        for _ in range(_SHRINK_ROUNDS):
+            ta = _triangles_in_box(ta, *_box(tb))
+            if len(ta) == 0:
+                break
+            tb = _triangles_in_box(tb, *_box(ta))
+            if len(tb) == 0:
+                break
+        if len(ta) == 0 or len(tb) == 0:
+            return self._containment(ca, cb)
+        a, b = _soup_bvh(ta), _soup_bvh(tb)
+        ia, ib = _overlapping_leaves(a, b)
+        lo_a, hi_a = a.corners.min(axis=1), a.corners.max(axis=1)
+        lo_b, hi_b = b.corners.min(axis=1), b.corners.max(axis=1)
+        hits_a, hits_b, points = [], [], []
+        for s in range(0, len(ia), _TEST_CHUNK):
+            sa, sb = ia[s:s + _TEST_CHUNK], ib[s:s + _TEST_CHUNK]
+            # Leaf pairs overlap as a whole; most of their triangle pairs do not
+            near = np.all(lo_a[sa] <= hi_b[sb], axis=1) & np.all(lo_b[sb] <= hi_a[sa], axis=1)
+            sa, sb = sa[near], sb[near]
+            hit, point = triangles_intersect(a.corners[sa], b.corners[sb])
+            hits_a.append(sa[hit]); hits_b.append(sb[hit]); points.append(point[hit])
+        if not hits_a or sum(len(h) for h in hits_a) == 0:
+            return self._containment(ca, cb)
+        hits_a, hits_b, points = np.concatenate(hits_a), np.concatenate(hits_b), np.concatenate(points)
+        depth, axis = penetration_estimate(ca, cb, a.corners[np.unique(hits_a)], b.corners[np.unique(hits_b)])
+        return depth, tuple(axis.tolist()), tuple(points.mean(axis=0).tolist()), int(len(hits_a))
+
+    @staticmethod
+    def _containment(ca: np.ndarray, cb: np.ndarray):
+        """No surfaces cross: still a clash if one part sits entirely inside the other."""
+        for inner, outer in ((ca, cb), (cb, ca)):
+            inner_lo, inner_hi = inner.min(axis=(0, 1)), inner.max(axis=(0, 1))
+            if np.any(inner_lo < outer.min(axis=(0, 1))) or np.any(inner_hi > outer.max(axis=(0, 1))):
+                continue
+            if point_inside(outer, inner[0, 0]):
+                depth, axis = penetration_estimate(ca, cb, ca[:0], cb[:0])
+                return depth, tuple(axis.tolist()), tuple(((inner_lo + inner_hi) / 2.0).tolist()), 0
+        return None
+
+
+_WORKER_MODULE = "zin_measure_clash_worker"
+
+
+def _worker_module():
+    """The pool workers' entry point, loaded by file path (the parent's sys.path is left alone)."""
+    module = sys.modules.get(_WORKER_MODULE)
+    if module is None:
+        spec = importlib.util.spec_from_file_location(_WORKER_MODULE, os.path.join(_HERE, _WORKER_MODULE + ".py"))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[_WORKER_MODULE] = module
+        spec.loader.exec_module(module)
+    return module
+
+
+# ==========================================
+# Entry point
+# ==========================================
+def part_bounds(parts: Sequence[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """(lo, hi) world AABBs of parts given as (n, 3, 3) triangle arrays (empty parts get inverted boxes)."""
+    lo = np.full((len(parts), 3), np.inf)
+    hi = np.full((len(parts), 3), -np.inf)
+    for k, tris in enumerate(parts):
+        if len(tris):
+            lo[k] = tris.min(axis=(0, 1))
+            hi[k] = tris.max(axis=(0, 1))
+    return lo, hi
+
+
+def find_clashes(paths: Sequence[str], parts: Sequence[np.ndarray], processes: int = 1,
+                 min_depth: float = 0.0) -> List[Clash]:
+    """Interpenetrating part pairs, deepest first.
+
+    parts[k] holds the world-space triangles (n, 3, 3) of paths[k]. processes > 1 runs the
+    narrow phase in a spawn process pool reading the triangles from shared memory.
+    """
+    parts = [np.asarray(t, dtype=np.float64).reshape(-1, 3, 3) for t in parts]
+    lo, hi = part_bounds(parts)
+    valid = np.flatnonzero(np.all(lo <= hi, axis=1))
+    pairs = [(int(valid[i]), int(valid[j])) for i, j in candidate_pairs(lo[valid], hi[valid], 0.0).tolist()]
+    if not pairs:
+        return []
+
+    offsets = np.concatenate(([0], np.cumsum([len(t) for t in parts]))).astype(np.int64)
+    results = []
+    if processes <= 1 or len(pairs) == 1:
+        part_set = _PartSet(np.concatenate(parts), offsets)
+        results = [(i, j, part_set.test_pair(i, j)) for i, j in pairs]
+    else:
+        corners = np.concatenate(parts)
+        shm = shared_memory.SharedMemory(create=True, size=max(1, corners.nbytes))
+        try:
+            np.ndarray(corners.shape, dtype=np.float64, buffer=shm.buf)[:] = corners
+            # Several chunks per worker so one dense region does not hold up the pool
+            size = max(1, len(pairs) // (processes * 4))
+            chunks = [pairs[s:s + size] for s in range(0, len(pairs), size)]
+            # Workers add this folder to their own sys.path, then unpickle the uniquely named entry point
+            test_chunk = functools.partial(_worker_module().test_chunk, shm.name, corners.shape, offsets)
+            with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn"),
+                                     initializer=site.addsitedir, initargs=(_HERE,)) as pool:
+                for chunk in pool.map(test_chunk, chunks):
+                    results.extend(chunk)
+        finally:
+            shm.close()
+            shm.unlink()
+
+    clashes = [Clash(paths[i], paths[j], *r) for i, j, r in results if r is not None and r[0] >= min_depth]
+    return sorted(clashes, key=lambda c: (-c.depth, c.path_a, c.path_b))
+
+
+# ==========================================
+# Command line (plain pxr)
+# ==========================================
+def load_stage_parts(stage_path: str, root: Optional[str] = None, depth: int = 1,
+                     time_code=None) -> Tuple[List[str], List[np.ndarray], float]:
+    """(part paths, world triangles per part, metersPerUnit) from a USD file.
+
+    Parts are the prims `depth` levels below root (default: the default prim, else the pseudo-root);
+    each part collects the visible meshes in its subtree.
+    """
+    from pxr import Usd, UsdGeom
+    stage = Usd.Stage.Open(stage_path)
+    if not stage:
+        raise RuntimeError(f"cannot open stage '{stage_path}'")
+    time_code = Usd.TimeCode.Default() if time_code is None else time_code
+    if root:
+        root_prim = stage.GetPrimAtPath(root)
+        if not root_prim:
+            raise RuntimeError(f"no prim at '{root}'")
+    else:
+        root_prim = stage.GetDefaultPrim() or stage.GetPseudoRoot()
+
+    level = [root_prim]
+    for _ in range(max(1, depth)):
+        level = [c for p in level for c in p.GetChildren()]
+    xform_cache = UsdGeom.XformCache(time_code)
+    paths, parts = [], []
+    for part in level:
+        tris = []
+        for p in Usd.PrimRange(part, Usd.TraverseInstanceProxies()):
+            if not p.IsA(UsdGeom.Mesh):
+                continue
+            if UsdGeom.Imageable(p).ComputeVisibility(time_code) == UsdGeom.Tokens.invisible:
+                continue
+            mesh = UsdGeom.Mesh(p)
+            points = mesh.GetPointsAttr().Get(time_code)
+            counts = mesh.GetFaceVertexCountsAttr().Get(time_code)
+            indices = mesh.GetFaceVertexIndicesAttr().Get(time_code)
+            if not points or not counts or not indices:
+                continue
+            try:
+                triangles = triangulate(counts, indices)
+            except ValueError as e:
+                print(f"[clash] skipping {p.GetPath()}: {e}", file=sys.stderr)
+                continue
+            m = np.array(xform_cache.GetLocalToWorldTransform(p))
+            world = np.asarray(points, dtype=np.float64) @ m[:3, :3] + m[3, :3]
+            tris.append(world[triangles])
+        if tris:
+            paths.append(str(part.GetPath()))
+            parts.append(np.concatenate(tris))
+    return paths, parts, float(UsdGeom.GetStageMetersPerUnit(stage))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Find interpenetrating parts in a USD file.")
+    parser.add_argument("stage", help=".usd / .usda / .usdc file")
+    parser.add_argument("--root", help="prim whose descendants are the parts (default: the default prim)")
+    parser.add_argument("--depth", type=int, default=1, help="levels below root that form the parts (default: 1)")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--min-depth", type=float, default=0.0, help="ignore clashes shallower than this (stage units)")
+    parser.add_argument("--json", action="store_true", help="print clashes as JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        paths, parts, mpu = load_stage_parts(args.stage, args.root, args.depth)
+    except Exception as e:
+        print(f"[clash] {e}", file=sys.stderr)
+        return 2
+    jobs = args.jobs if args.jobs is not None else (multiprocessing.cpu_count() or 1)
+    clashes = find_clashes(paths, parts, processes=jobs, min_depth=args.min_depth)
+
+    if args.json:
+        print(json.dumps({"meters_per_unit": mpu, "parts": len(paths),
+                          "clashes": [c._asdict() for c in clashes]}, indent=2))
+    else:
+        for c in clashes:
+            print(f"{c.path_a} <-> {c.path_b}: depth {c.depth:.4f} "
+                  f"at ({c.point[0]:.3f}, {c.point[1]:.3f}, {c.point[2]:.3f}) [{c.triangles} triangle pairs]")
+        print(f"Checked {len(paths)} part(s): {len(clashes)} clash(es) (stage units, metersPerUnit={mpu:g}).")
+    return 1 if clashes else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,5 @@
 import math
+import time
 import omni.ext
 import omni.ui as ui
 import omni.kit.ui
@@ -12,7 +13,23 @@ try:
 except Exception:
     clipboard = None
 
+# omni.kit.window.filepicker: optional, CSV export is disabled without it
+try:
+    from omni.kit.window.filepicker import FilePickerDialog
+    import omni.client
+    _HAS_FILEPICKER = True
+except Exception:
+    FilePickerDialog = None
+    _HAS_FILEPICKER = False
+
 from .measure_logic import format_stage_unit, get_precision, calculate_gap, calculate_gap_points
+from .mesh_distance import BVHCache, mesh_set_distance
+from .bounds_cache import WorldBoundsCache
+from .clearance import clearance_rows, sort_rows, write_csv
+from .mass_properties import MassPropertiesCache, combine
+from .live_measure import FrameBudget, LiveSession
+from .obb import OBBCache, compute_obb, obb_distance, points_key, transform_points
+from . import clash as clash_detection
 
 import carb
 import sys
@@ -26,7 +43,6 @@ import tools_box.zin_ui_utils as zin_ui_utils
 
 
 
-
 # ========================================================
 #  Core Logic and UI Widget
 # ========================================================
@@ -35,6 +51,12 @@ class SmartMeasureWidget:
     DISPLAY_UNITS = [
         ("mm", 0.001), ("cm", 0.01), ("m", 1.0), ("inch", 0.0254), ("ft", 0.3048),
     ]
+    DISTANCE_METHODS = ["Bounding Box", "Oriented Box", "Exact (Mesh)"]
+    DIST_BBOX, DIST_OBB, DIST_EXACT = range(3)
+    SIZE_BOXES = ["World-Aligned", "Oriented"]
+    CLEARANCE_MAX_ROWS = 500   # rows shown in the panel; the CSV export has all of them
+    CLASH_MAX_ROWS = 500
+    MASS_MAX_ROWS = 200
 
     def __init__(self):
         self._usd_context = omni.usd.get_context()
@@ -45,7 +67,7 @@ class SmartMeasureWidget:
         self._stage_mpu = 1.0
         self._stage_unit_name = "m"
         self._up_axis = "Z"
-        self._bbox_cache = None
+        self._bbox_cache = None       # WorldBoundsCache: kept across selections, invalidated by Tf.Notice
         self._display_unit_size = "cm"
         self._display_mpu_size = 0.01
         self._custom_precision_size = ui.SimpleIntModel(2)  # Default for cm is 2 decimals
@@ -54,6 +76,46 @@ class SmartMeasureWidget:
         self._display_mpu_dist = 0.01
         self._custom_precision_dist = ui.SimpleIntModel(2)  # Default for cm is 2 decimals
         
+        # Exact mesh-to-mesh distance: triangle BVHs cached by points / topology hash
+        self._dist_method = self.DIST_BBOX
+        self._bvh_cache = BVHCache()
+
+        # Live mode: re-measure while the selection is dragged, within a per-frame time budget
+        self._live_enabled = ui.SimpleBoolModel(False)
+        self._live_enabled.add_value_changed_fn(self._on_live_toggle)
+        self._live_session = LiveSession(self._bvh_cache)
+        self._live_budget = FrameBudget()
+        
+        # Oriented boxes: cached per prim by points hash + transform
+        self._oriented_size = False
+        self._obb_cache = OBBCache()
+        self._last_size_mode = "aabb"
+        self._last_obbs = []          # OBBs drawn (with their axes) in the viewport overlay
+
+        # Mass properties: per-mesh results cached by points / topology hash
+        self._mass_cache = MassPropertiesCache()
+        self._mass_rows = []          # (prim path, MassProperties in stage units)
+        self._mass_total = None
+        self._mass_summary_label = None
+        self._mass_total_labels = None
+        self._mass_list_vbox = None
+
+        # Clearance matrix: pairs of selected prims closer than the threshold (display distance unit)
+        self._clearance_threshold = ui.SimpleFloatModel(80.0)
+        self._clearance_exact = ui.SimpleBoolModel(False)
+        self._clearance_rows = []
+        self._clearance_sort = ("distance", False)
+        self._clearance_summary_label = None
+        self._clearance_list_vbox = None
+        self._filepicker_csv = None
+
+        # Clash detection: interpenetrating pairs among the selected prims (or the children of one prim)
+        self._clash_processes = ui.SimpleIntModel(min(4, os.cpu_count() or 1))
+        self._clash_min_depth = ui.SimpleFloatModel(0.0)
+        self._clashes = []
+        self._clash_summary_label = None
+        self._clash_list_vbox = None
+        
         self._scene_view = None
         self._scene_frame = None
         self._manipulator = None
@@ -83,7 +145,22 @@ class SmartMeasureWidget:
 
     def shutdown(self):
         self._stage_event_sub = None
+        self._update_sub = None
+        self._live_session.detach()
+        if self._bbox_cache: self._bbox_cache.detach()
         self._bbox_cache = None
+        self._bvh_cache.clear()
+        self._obb_cache.clear()
+        self._mass_cache.clear()
+        self._mass_rows = []
+        self._clearance_rows = []
+        self._clashes = []
+        if self._filepicker_csv is not None:
+            try:
+                self._filepicker_csv.destroy()
+            except Exception:
+                pass
+            self._filepicker_csv = None
         self._destroy_scene_overlay()
 
     def build_ui_layout(self):
@@ -120,6 +197,11 @@ class SmartMeasureWidget:
                             self._wid_label = ui.Label("Y width : --")
                             self._hei_label = ui.Label("Z height: --")
                         ui.Spacer(height=2)
+                        def build_size_box():
+                            cb = ui.ComboBox(1 if self._oriented_size else 0, *self.SIZE_BOXES)
+                            cb.model.get_item_value_model().add_value_changed_fn(self._on_size_box_changed)
+                        zin_ui_utils.build_property_row("Box:", build_size_box, tooltip="Oriented: tight box fitted to the geometry (length / width / height along its own axes).")
+                        
                         def build_size_unit():
                             items = [u[0] for u in self.DISPLAY_UNITS]
                             cb = ui.ComboBox(1, *items)
@@ -128,7 +210,7 @@ class SmartMeasureWidget:
                         
                         def build_size_decimals():
                             ui.IntDrag(self._custom_precision_size, min=0, max=6)
-                            self._custom_precision_size.add_value_changed_fn(lambda m: self._update_all_labels())
+                            self._custom_precision_size.add_value_changed_fn(lambda m: (self._update_all_labels(), self._update_mass_labels()))
                         zin_ui_utils.build_property_row("Decimals:", build_size_decimals)
                         
                         zin_ui_utils.build_button_row("", "Copy Size", lambda: self._copy_result("size"), zin_ui_utils.STYLE_POSITIVE)
@@ -137,6 +219,12 @@ class SmartMeasureWidget:
                 with ui.CollapsableFrame("Distance (2 Objects)", collapsed=False, height=0):
                     with ui.VStack(spacing=zin_ui_utils.ZIN_V_SPACING, padding=6, height=0):
                         self._dist_msg_label = ui.Label("Select exactly 2 objects", style={"color": 0xFFAA00FF}, word_wrap=True)
+                        def build_dist_method():
+                            cb = ui.ComboBox(self._dist_method, *self.DISTANCE_METHODS)
+                            cb.model.get_item_value_model().add_value_changed_fn(self._on_dist_method_changed)
+                        zin_ui_utils.build_property_row("Method:", build_dist_method, tooltip="Oriented Box: gap between the fitted oriented boxes.\nExact (Mesh): minimum distance between the mesh triangles in world space.")
+                        zin_ui_utils.build_checkbox_row("Live:", self._live_enabled, "Update while dragging",
+                                                        tooltip="Re-measure when the selected objects move, throttled to keep the viewport interactive.")
                         self._dist_main_label = ui.Label("Distance: --", style={"font_size": 16, "color": 0xFF6AD7D9})
                         with ui.VStack(spacing=2, height=0):
                             self._gap_x_label = ui.Label("Gap X: --", style={"color": 0xFF6060AA})
@@ -165,6 +253,51 @@ class SmartMeasureWidget:
                                 self._overlay_cb.model.add_value_changed_fn(self._on_overlay_toggle)
                                 ui.Label("Show distance line in Viewport", name="Description")
                         zin_ui_utils.build_property_row("Overlay:", build_overlay_cb)
+
+                # Mass properties
+                with ui.CollapsableFrame("Mass Properties", collapsed=True, height=0):
+                    with ui.VStack(spacing=zin_ui_utils.ZIN_V_SPACING, padding=6, height=0):
+                        zin_ui_utils.build_button_row("", "Compute Mass Properties", self._on_compute_mass, zin_ui_utils.STYLE_POSITIVE)
+                        with ui.VStack(spacing=2, height=0):
+                            self._mass_total_labels = (ui.Label("Volume  : --"), ui.Label("Area    : --"), ui.Label("Centroid: --"))
+                        self._mass_summary_label = ui.Label("Select objects with mesh geometry (units follow Object Size)",
+                                                            name="Description", word_wrap=True)
+                        with ui.ScrollingFrame(height=120, style={"background_color": 0x33000000, "border_radius": 4}):
+                            self._mass_list_vbox = ui.VStack(spacing=2, padding=4, height=0)
+
+                # Clearance matrix
+                with ui.CollapsableFrame("Clearance Matrix (Many Objects)", collapsed=True, height=0):
+                    with ui.VStack(spacing=zin_ui_utils.ZIN_V_SPACING, padding=6, height=0):
+                        def build_clearance_threshold():
+                            ui.FloatDrag(self._clearance_threshold, min=0.0, max=1.0e9)
+                        zin_ui_utils.build_property_row("Threshold:", build_clearance_threshold, tooltip="Report pairs closer than this, in the Distance units.")
+                        zin_ui_utils.build_checkbox_row("Exact:", self._clearance_exact, "Refine with mesh distance",
+                                                        tooltip="Candidates within the threshold by bounding box are re-measured on the mesh triangles.")
+                        zin_ui_utils.build_button_row("", "Compute Clearances", self._on_compute_clearance, zin_ui_utils.STYLE_POSITIVE)
+                        self._clearance_summary_label = ui.Label("Select 2 or more objects", name="Description", word_wrap=True)
+                        with ui.HStack(height=20, spacing=4):
+                            ui.Button("Prim A", clicked_fn=lambda: self._on_clearance_sort("path_a"))
+                            ui.Button("Prim B", clicked_fn=lambda: self._on_clearance_sort("path_b"))
+                            ui.Button("Distance", width=80, clicked_fn=lambda: self._on_clearance_sort("distance"))
+                        with ui.ScrollingFrame(height=160, style={"background_color": 0x33000000, "border_radius": 4}):
+                            self._clearance_list_vbox = ui.VStack(spacing=2, padding=4, height=0)
+                        zin_ui_utils.build_button_row("", "Export CSV", self._on_export_clearance_csv)
+
+                # Clash detection
+                with ui.CollapsableFrame("Clash Detection", collapsed=True, height=0):
+                    with ui.VStack(spacing=zin_ui_utils.ZIN_V_SPACING, padding=6, height=0):
+                        ui.Label("Parts: the selected prims, or the children of a single selected prim.",
+                                 name="Description", word_wrap=True)
+                        def build_clash_min_depth():
+                            ui.FloatDrag(self._clash_min_depth, min=0.0, max=1.0e9)
+                        zin_ui_utils.build_property_row("Min depth:", build_clash_min_depth, tooltip="Ignore clashes shallower than this, in the Distance units.")
+                        def build_clash_processes():
+                            ui.IntDrag(self._clash_processes, min=1, max=max(1, os.cpu_count() or 1))
+                        zin_ui_utils.build_property_row("Processes:", build_clash_processes, tooltip="Worker processes for the triangle tests (1 = run inside Kit).")
+                        zin_ui_utils.build_button_row("", "Detect Clashes", self._on_detect_clashes, zin_ui_utils.STYLE_POSITIVE)
+                        self._clash_summary_label = ui.Label("Select the parts to check", name="Description", word_wrap=True)
+                        with ui.ScrollingFrame(height=160, style={"background_color": 0x33000000, "border_radius": 4}):
+                            self._clash_list_vbox = ui.VStack(spacing=2, padding=4, height=0)
                         
                 ui.Spacer()
         
@@ -172,6 +305,8 @@ class SmartMeasureWidget:
         if not self._stage_event_sub:
             stream = self._usd_context.get_stage_event_stream()
             self._stage_event_sub = stream.create_subscription_to_pop(self._on_stage_event, name="smart_measure_stage")
+        if self._live_enabled.get_value_as_bool() and not self._update_sub:
+            self._on_live_toggle(self._live_enabled)
 
         self._refresh_stage_info()
         self._check_selection_and_measure()
@@ -180,7 +315,9 @@ class SmartMeasureWidget:
 
     def _init_bbox_cache(self):
         purposes = [UsdGeom.Tokens.default_, UsdGeom.Tokens.render, UsdGeom.Tokens.proxy, UsdGeom.Tokens.guide]
-        self._bbox_cache = UsdGeom.BBoxCache(Usd.TimeCode.Default(), purposes, useExtentsHint=False)
+        if self._bbox_cache: self._bbox_cache.detach()
+        self._bbox_cache = WorldBoundsCache(purposes)
+        self._bbox_cache.attach(self._usd_context.get_stage())
 
     def _subscribe_events(self):
         # [Refactor] Consolidated into stage event stream
@@ -198,6 +335,17 @@ class SmartMeasureWidget:
 
         if event.type == int(omni.usd.StageEventType.OPENED):
             self._init_bbox_cache()
+            self._bvh_cache.clear()
+            self._obb_cache.clear()
+            self._mass_cache.clear()
+            self._mass_rows = []
+            self._mass_total = None
+            self._update_mass_labels()
+            self._clearance_rows = []
+            self._rebuild_clearance_list()
+            self._clashes = []
+            self._rebuild_clash_list()
+            if self._update_sub: self._live_session.attach(self._usd_context.get_stage())
             self._refresh_stage_info()
             self._check_selection_and_measure()
         
@@ -211,6 +359,9 @@ class SmartMeasureWidget:
             self._refresh_header_info()
             self._update_all_labels(clear=True)
             if self._sel_list_vbox: self._sel_list_vbox.clear()
+            if self._bbox_cache: self._bbox_cache.detach()
+            self._bbox_cache = None       # re-created (and attached) by the next measurement
+            self._live_session.detach()
 
     def _refresh_stage_info(self):
         stage = self._usd_context.get_stage()
@@ -313,6 +464,7 @@ class SmartMeasureWidget:
                  with self._sel_list_vbox:
                      ui.Label("None", style={"color": 0xFF888888, "font_style": "italic"})
 
+        if self._update_sub: self._live_session.track(paths)
         if paths: self._measure_paths(paths)
         else: self._on_clear()
 
@@ -320,7 +472,6 @@ class SmartMeasureWidget:
         stage = self._usd_context.get_stage()
         if not stage: return self._on_clear()
         if not self._bbox_cache: self._init_bbox_cache()
-        self._bbox_cache.Clear()
 
         union_box = None
         count = 0
@@ -330,8 +481,7 @@ class SmartMeasureWidget:
             prim = stage.GetPrimAtPath(p)
             if not prim or not prim.IsValid(): continue
             try:
-                bbox = self._bbox_cache.ComputeWorldBound(prim)
-                world = bbox.ComputeAlignedBox()
+                world = self._bbox_cache.world_box(prim)
                 if world.IsEmpty(): continue
                 valid_prims.append((prim, world))
                 if union_box is None: union_box = Gf.Range3d(world)
@@ -339,22 +489,127 @@ class SmartMeasureWidget:
                 count += 1
             except: continue
 
+        self._last_obbs = []
+        self._last_size_mode = "aabb"
         if union_box and not union_box.IsEmpty() and count > 0:
             sz = union_box.GetSize()
             s = float(self._stage_mpu)
             self._last_size_m = (sz[0]*s, sz[1]*s, sz[2]*s)
             self._last_count = count
+            union_obb = self._prim_obb([v[0] for v in valid_prims]) if self._oriented_size else None
+            if union_obb is not None:
+                length, width, height = union_obb.dimensions(self._up_vector())
+                self._last_size_m = (length*s, width*s, height*s)
+                self._last_size_mode = "obb"
+                self._last_obbs.append(union_obb)
         else:
             self._last_size_m = None
 
         self._last_dist_data = None
         if len(valid_prims) == 2:
-            dx, dy, dz, dist = self._calculate_gap(valid_prims[0][1], valid_prims[1][1])
-            p1, p2 = self._calculate_gap_points(valid_prims[0][1], valid_prims[1][1])
             s = float(self._stage_mpu)
-            self._last_dist_data = {"dist": dist*s, "gap": (dx*s, dy*s, dz*s), "p1": p1, "p2": p2}
+            result = None
+            if self._dist_method == self.DIST_EXACT:
+                exact = self._exact_gap(valid_prims[0][0], valid_prims[1][0])
+                if exact is not None:
+                    result = (exact.distance, exact.point_a, exact.point_b, "exact")
+            elif self._dist_method == self.DIST_OBB:
+                obb_a, obb_b = self._prim_obb([valid_prims[0][0]]), self._prim_obb([valid_prims[1][0]])
+                if obb_a is not None and obb_b is not None:
+                    result = obb_distance(obb_a, obb_b) + ("obb",)
+                    self._last_obbs = [obb_a, obb_b]
+            if result is not None:
+                dist, p1, p2, method = result
+                dx, dy, dz = (abs(p2[i] - p1[i]) for i in range(3))
+                self._last_dist_data = {"dist": dist*s, "gap": (dx*s, dy*s, dz*s), "p1": p1, "p2": p2,
+                                        "method": method}
+            else:
+                dx, dy, dz, dist = self._calculate_gap(valid_prims[0][1], valid_prims[1][1])
+                p1, p2 = self._calculate_gap_points(valid_prims[0][1], valid_prims[1][1])
+                self._last_dist_data = {"dist": dist*s, "gap": (dx*s, dy*s, dz*s), "p1": p1, "p2": p2,
+                                        "method": "bbox"}
         self._update_all_labels()
 
+    def _world_meshes(self, prim, time_code=Usd.TimeCode.Default()):
+        """Visible meshes under prim, placed in world space (BVHs are reused while the points are unchanged)."""
+        import numpy as np
+        meshes = []
+        xform_cache = UsdGeom.XformCache(time_code)
+        for p in Usd.PrimRange(prim, Usd.TraverseInstanceProxies()):
+            if not p.IsA(UsdGeom.Mesh):
+                continue
+            if UsdGeom.Imageable(p).ComputeVisibility(time_code) == UsdGeom.Tokens.invisible:
+                continue
+            mesh = UsdGeom.Mesh(p)
+            points = mesh.GetPointsAttr().Get(time_code)
+            counts = mesh.GetFaceVertexCountsAttr().Get(time_code)
+            indices = mesh.GetFaceVertexIndicesAttr().Get(time_code)
+            if not points or not counts or not indices:
+                continue
+            try:
+                bvh = self._bvh_cache.get(np.asarray(points), np.asarray(counts), np.asarray(indices))
+            except ValueError as e:
+                carb.log_warn(f"[SmartMeasure] Skipping {p.GetPath()}: {e}")
+                continue
+            meshes.append(bvh.to_world(np.array(xform_cache.GetLocalToWorldTransform(p))))
+        return meshes
+
+    def _up_vector(self):
+        return (0.0, 0.0, 1.0) if self._up_axis == "Z" else (0.0, 1.0, 0.0)
+
+    def _world_point_sets(self, prim, time_code=Usd.TimeCode.Default()):
+        """(local points, local-to-world matrix) of the visible geometry under prim.
+
+        Point-based prims contribute their points; other boundables (Cube, Sphere ...) their extent corners.
+        """
+        import numpy as np
+        sets = []
+        xform_cache = UsdGeom.XformCache(time_code)
+        for p in Usd.PrimRange(prim, Usd.TraverseInstanceProxies()):
+            if not p.IsA(UsdGeom.Boundable):
+                continue
+            if UsdGeom.Imageable(p).ComputeVisibility(time_code) == UsdGeom.Tokens.invisible:
+                continue
+            if p.IsA(UsdGeom.PointBased):
+                points = UsdGeom.PointBased(p).GetPointsAttr().Get(time_code)
+                if not points:
+                    continue
+                points = np.asarray(points)
+            else:
+                boundable = UsdGeom.Boundable(p)
+                extent = boundable.GetExtentAttr().Get(time_code) or UsdGeom.Boundable.ComputeExtentFromPlugins(boundable, time_code)
+                if not extent:
+                    continue
+                lo, hi = np.asarray(extent[0]), np.asarray(extent[1])
+                points = np.array([[(hi if i & bit else lo)[axis] for axis, bit in enumerate((1, 2, 4))] for i in range(8)])
+            sets.append((points, np.array(xform_cache.GetLocalToWorldTransform(p))))
+        return sets
+
+    def _prim_obb(self, prims):
+        """Oriented box of the geometry under prims (cached while points and transforms are unchanged)."""
+        import numpy as np
+        sets = [ps for prim in prims for ps in self._world_point_sets(prim)]
+        if not sets:
+            return None
+        key = tuple(points_key(points, matrix) for points, matrix in sets)
+        cache_path = "|".join(str(prim.GetPath()) for prim in prims)
+        return self._obb_cache.get(cache_path, key, lambda: compute_obb(
+            np.vstack([transform_points(points, matrix) for points, matrix in sets])))
+
+    def _exact_gap(self, prim_a, prim_b):
+        """Exact mesh-to-mesh minimum distance (stage units); None if either side has no mesh geometry."""
+        live = self._live_session
+        if live.tracks(prim_a.GetPath()) and live.tracks(prim_b.GetPath()):
+            # Live: BVHs captured once; only the moved side's transform is re-applied
+            meshes_a = live.world_meshes(prim_a.GetPath())
+            meshes_b = live.world_meshes(prim_b.GetPath())
+        else:
+            meshes_a = self._world_meshes(prim_a)
+            meshes_b = self._world_meshes(prim_b)
+        if not meshes_a or not meshes_b:
+            return None
+        return mesh_set_distance(meshes_a, meshes_b)
+
     def _calculate_gap(self, b1, b2):
         mn1, mx1 = b1.GetMin(), b1.GetMax()
         mn2, mx2 = b2.GetMin(), b2.GetMax()
@@ -370,6 +625,7 @@ class SmartMeasureWidget:
     def _on_clear(self):
         self._last_size_m = None
         self._last_dist_data = None
+        self._last_obbs = []
         self._update_all_labels(clear=True)
 
     def _update_all_labels(self, clear=False):
@@ -384,9 +640,14 @@ class SmartMeasureWidget:
                 p = self._custom_precision_size.as_int
                 m = self._display_mpu_size
                 x, y, z = self._last_size_m
-                self._len_label.text = f"X length: {x/m:.{p}f} {self._display_unit_size}"
-                self._wid_label.text = f"Y width : {y/m:.{p}f} {self._display_unit_size}"
-                self._hei_label.text = f"Z height: {z/m:.{p}f} {self._display_unit_size}"
+                if self._last_size_mode == "obb":
+                    self._len_label.text = f"Length  : {x/m:.{p}f} {self._display_unit_size}"
+                    self._wid_label.text = f"Width   : {y/m:.{p}f} {self._display_unit_size}"
+                    self._hei_label.text = f"Height  : {z/m:.{p}f} {self._display_unit_size}"
+                else:
+                    self._len_label.text = f"X length: {x/m:.{p}f} {self._display_unit_size}"
+                    self._wid_label.text = f"Y width : {y/m:.{p}f} {self._display_unit_size}"
+                    self._hei_label.text = f"Z height: {z/m:.{p}f} {self._display_unit_size}"
             
             # Distance
             if clear or self._last_dist_data is None:
@@ -402,7 +663,12 @@ class SmartMeasureWidget:
                 else:
                     self._dist_msg_label.text = "Objects have no bounds"
             else:
-                self._dist_msg_label.text = "Distance Calculated"; self._dist_msg_label.style = {"color": 0xFF00AA00}
+                if self._dist_method == self.DIST_EXACT and self._last_dist_data.get("method") != "exact":
+                    self._dist_msg_label.text = "No mesh geometry - bounding box used"; self._dist_msg_label.style = {"color": 0xFFAA00FF}
+                elif self._dist_method == self.DIST_OBB and self._last_dist_data.get("method") != "obb":
+                    self._dist_msg_label.text = "No geometry - bounding box used"; self._dist_msg_label.style = {"color": 0xFFAA00FF}
+                else:
+                    self._dist_msg_label.text = "Distance Calculated"; self._dist_msg_label.style = {"color": 0xFF00AA00}
                 p = self._custom_precision_dist.as_int
                 m = self._display_mpu_dist
                 d = self._last_dist_data['dist']
@@ -428,14 +694,14 @@ class SmartMeasureWidget:
         """Use omni.ui.scene.SceneView to draw distance lines and labels on the Viewport"""
 
         # --- 使用者關閉 overlay 或清除模式 ---
-        if not self._show_viewport_overlay or clear or not self._last_dist_data:
+        if not self._show_viewport_overlay or clear:
             self._destroy_scene_overlay()
             return
 
-        p1 = self._last_dist_data.get("p1")
-        p2 = self._last_dist_data.get("p2")
+        p1 = self._last_dist_data.get("p1") if self._last_dist_data else None
+        p2 = self._last_dist_data.get("p2") if self._last_dist_data else None
 
-        if not p1 or not p2:
+        if (not p1 or not p2) and not self._last_obbs:
             self._destroy_scene_overlay()
             return
 
@@ -468,35 +734,11 @@ class SmartMeasureWidget:
                     aspect_ratio_policy=sc.AspectRatioPolicy.STRETCH
                 )
                 with self._scene_view.scene:
-                    # --- 測距線段 (青色) ---
-                    p1_list = list(p1)
-                    p2_list = list(p2)
-                    sc.Line(p1_list, p2_list, color=ui.color(0.0, 1.0, 1.0, 1.0), thicknesses=[2.0])
-
-                    # --- 端點十字標記 ---
-                    marker_size = 2.0
-                    for pt in [p1_list, p2_list]:
-                        with sc.Transform(transform=sc.Matrix44.get_translation_matrix(pt[0], pt[1], pt[2])):
-                            sc.Line([-marker_size, 0, 0], [marker_size, 0, 0],
-                                    color=ui.color(0.0, 1.0, 1.0, 0.8), thicknesses=[1.5])
-                            sc.Line([0, -marker_size, 0], [0, marker_size, 0],
-                                    color=ui.color(0.0, 1.0, 1.0, 0.8), thicknesses=[1.5])
-                            sc.Line([0, 0, -marker_size], [0, 0, marker_size],
-                                    color=ui.color(0.0, 1.0, 1.0, 0.8), thicknesses=[1.5])
-
-                    # --- 中點距離標籤 ---
-                    mid = [(p1[i] + p2[i]) / 2.0 for i in range(3)]
-                    d_str = self._dist_main_label.text.replace("Distance: ", "") if self._dist_main_label else ""
-                    with sc.Transform(
-                        transform=sc.Matrix44.get_translation_matrix(mid[0], mid[1], mid[2]),
-                        look_at=sc.Transform.LookAt.CAMERA
-                    ):
-                        sc.Label(
-                            d_str,
-                            color=ui.color(0.0, 1.0, 1.0, 1.0),
-                            size=18,
-                            alignment=ui.Alignment.CENTER
-                        )
+                    # --- OBB 外框與軸向 (軸色與 Gap X/Y/Z 標籤相同) ---
+                    for box in self._last_obbs:
+                        self._draw_obb(sc, box)
+                    if p1 and p2:
+                        self._draw_distance(sc, p1, p2)
 
             # 將 SceneView 的 camera model 綁定到 viewport 的 camera
             # 相容多版本 Kit (105~109) 的 camera model 取得方式
@@ -506,6 +748,46 @@ class SmartMeasureWidget:
         except Exception as e:
             carb.log_warn(f"[SmartMeasure] Viewport overlay error: {e}")
 
+    def _draw_obb(self, sc, box):
+        edge_color = ui.color(1.0, 1.0, 1.0, 0.5)
+        for a, b in box.edges():
+            sc.Line(a.tolist(), b.tolist(), color=edge_color, thicknesses=[1.0])
+        axis_colors = [ui.color(0.67, 0.38, 0.38, 1.0), ui.color(0.44, 0.64, 0.46, 1.0), ui.color(0.31, 0.49, 0.63, 1.0)]
+        center = box.center
+        for axis, half, color in zip(box.axes, box.half_extents, axis_colors):
+            sc.Line(center.tolist(), (center + axis * half).tolist(), color=color, thicknesses=[2.0])
+
+    def _draw_distance(self, sc, p1, p2):
+        # --- 測距線段 (青色) ---
+        p1_list = list(p1)
+        p2_list = list(p2)
+        sc.Line(p1_list, p2_list, color=ui.color(0.0, 1.0, 1.0, 1.0), thicknesses=[2.0])
+
+        # --- 端點十字標記 ---
+        marker_size = 2.0
+        for pt in [p1_list, p2_list]:
+            with sc.Transform(transform=sc.Matrix44.get_translation_matrix(pt[0], pt[1], pt[2])):
+                sc.Line([-marker_size, 0, 0], [marker_size, 0, 0],
+                        color=ui.color(0.0, 1.0, 1.0, 0.8), thicknesses=[1.5])
+                sc.Line([0, -marker_size, 0], [0, marker_size, 0],
+                        color=ui.color(0.0, 1.0, 1.0, 0.8), thicknesses=[1.5])
+                sc.Line([0, 0, -marker_size], [0, 0, marker_size],
+                        color=ui.color(0.0, 1.0, 1.0, 0.8), thicknesses=[1.5])
+
+        # --- 中點距離標籤 ---
+        mid = [(p1[i] + p2[i]) / 2.0 for i in range(3)]
+        d_str = self._dist_main_label.text.replace("Distance: ", "") if self._dist_main_label else ""
+        with sc.Transform(
+            transform=sc.Matrix44.get_translation_matrix(mid[0], mid[1], mid[2]),
+            look_at=sc.Transform.LookAt.CAMERA
+        ):
+            sc.Label(
+                d_str,
+                color=ui.color(0.0, 1.0, 1.0, 1.0),
+                size=18,
+                alignment=ui.Alignment.CENTER
+            )
+
     def _bind_scene_view_camera(self, viewport_window):
         """將自建的 SceneView 的 camera model 綁定到 viewport 的 camera。
         基於 USD Composer 109.0.3 (Kit 109) 實際 API 偵測結果。"""
@@ -566,12 +848,339 @@ class SmartMeasureWidget:
         self._display_unit_size = u[0]; self._display_mpu_size = u[1]
         self._custom_precision_size.set_value(get_precision(u[0]) if get_precision(u[0]) is not None else 3)
         self._update_all_labels()
+        self._update_mass_labels()
         
     def _on_dist_unit_changed(self, m, _=None): 
         idx = m.get_value_as_int(); u = self.DISPLAY_UNITS[max(0, min(idx, 4))]
         self._display_unit_dist = u[0]; self._display_mpu_dist = u[1]
         self._custom_precision_dist.set_value(get_precision(u[0]) if get_precision(u[0]) is not None else 3)
         self._update_all_labels()
+        self._rebuild_clearance_list()
+        self._rebuild_clash_list()
+
+    def _on_live_toggle(self, model):
+        if model.get_value_as_bool():
+            self._live_session.attach(self._usd_context.get_stage())
+            self._live_session.track(self._usd_context.get_selection().get_selected_prim_paths())
+            self._live_budget = FrameBudget()
+            stream = omni.kit.app.get_app().get_update_event_stream()
+            self._update_sub = stream.create_subscription_to_pop(self._on_live_update, name="smart_measure_live")
+        else:
+            self._update_sub = None
+            self._live_session.detach()
+
+    def _on_live_update(self, event):
+        # [Lifecycle] Liveness Check
+        if not self._sel_list_vbox:
+            self._update_sub = None
+            self._live_session.detach()
+            return
+        if not self._live_session.dirty or not self._live_budget.ready():
+            return
+        # Clear first: changes made while measuring mark the session dirty again
+        self._live_session.dirty = False
+        start = time.perf_counter()
+        paths = self._usd_context.get_selection().get_selected_prim_paths()
+        if paths: self._measure_paths(paths)
+        self._live_budget.spent(time.perf_counter() - start)
+
+    def _on_size_box_changed(self, m, _=None):
+        self._oriented_size = m.get_value_as_int() == 1
+        paths = self._usd_context.get_selection().get_selected_prim_paths()
+        if paths: self._measure_paths(paths)
+
+    def _on_dist_method_changed(self, m, _=None):
+        self._dist_method = max(0, min(m.get_value_as_int(), len(self.DISTANCE_METHODS) - 1))
+        paths = self._usd_context.get_selection().get_selected_prim_paths()
+        if paths: self._measure_paths(paths)
+
+    # ========================================================
+    #  Mass Properties
+    # ========================================================
+    def _prim_mass_properties(self, prim, time_code=Usd.TimeCode.Default()):
+        """Totals over the visible meshes under prim, in world space (stage units)."""
+        import numpy as np
+        props = []
+        xform_cache = UsdGeom.XformCache(time_code)
+        for p in Usd.PrimRange(prim, Usd.TraverseInstanceProxies()):
+            if not p.IsA(UsdGeom.Mesh):
+                continue
+            if UsdGeom.Imageable(p).ComputeVisibility(time_code) == UsdGeom.Tokens.invisible:
+                continue
+            mesh = UsdGeom.Mesh(p)
+            points = mesh.GetPointsAttr().Get(time_code)
+            counts = mesh.GetFaceVertexCountsAttr().Get(time_code)
+            indices = mesh.GetFaceVertexIndicesAttr().Get(time_code)
+            if not points or not counts or not indices:
+                continue
+            try:
+                props.append(self._mass_cache.get(np.asarray(points), np.asarray(counts), np.asarray(indices),
+                                                  np.array(xform_cache.GetLocalToWorldTransform(p))))
+            except ValueError as e:
+                carb.log_warn(f"[SmartMeasure] Skipping {p.GetPath()}: {e}")
+        return combine(props)
+
+    def _on_compute_mass(self):
+        stage = self._usd_context.get_stage()
+        paths = self._usd_context.get_selection().get_selected_prim_paths() if stage else []
+        self._mass_rows = []
+        for path in paths:
+            prim = stage.GetPrimAtPath(path)
+            if prim and prim.IsValid():
+                props = self._prim_mass_properties(prim)
+                if props.meshes:
+                    self._mass_rows.append((path, props))
+        self._mass_total = combine([props for _, props in self._mass_rows]) if self._mass_rows else None
+        self._update_mass_labels()
+
+    def _format_mass(self, value, power):
+        """Stage-unit length / area / volume (power 1 / 2 / 3) in the size display unit."""
+        scaled = value * (float(self._stage_mpu) / self._display_mpu_size) ** power
+        suffix = {1: "", 2: "\u00b2", 3: "\u00b3"}[power]
+        return f"{scaled:.{self._custom_precision_size.get_value_as_int()}f} {self._display_unit_size}{suffix}"
+
+    def _update_mass_labels(self):
+        if not self._mass_total_labels: return
+        volume_label, area_label, centroid_label = self._mass_total_labels
+        total = self._mass_total
+        if total is None:
+            volume_label.text, area_label.text, centroid_label.text = "Volume  : --", "Area    : --", "Centroid: --"
+            self._mass_summary_label.text = "Select objects with mesh geometry (units follow Object Size)"
+        else:
+            volume_label.text = f"Volume  : {self._format_mass(total.volume, 3)}" + ("" if total.closed else "  (open meshes)")
+            area_label.text = f"Area    : {self._format_mass(total.area, 2)}"
+            scale, precision = float(self._stage_mpu) / self._display_mpu_size, self._custom_precision_size.get_value_as_int()
+            centroid_label.text = "Centroid: (" + ", ".join(f"{v * scale:.{precision}f}" for v in total.centroid) + f") {self._display_unit_size}"
+            summary = f"{total.meshes} mesh(es) in {len(self._mass_rows)} object(s)"
+            if total.open_meshes:
+                summary += f"; {total.open_meshes} open mesh(es): volume is not reliable"
+            self._mass_summary_label.text = summary
+            self._mass_summary_label.style = {"color": 0xFF00AAFF} if total.open_meshes else {}
+        if not self._mass_list_vbox: return
+        self._mass_list_vbox.clear()
+        with self._mass_list_vbox:
+            if not self._mass_rows:
+                ui.Label("None", style={"color": 0xFF888888, "font_style": "italic"})
+                return
+            for path, props in self._mass_rows[:self.MASS_MAX_ROWS]:
+                # Objects containing open meshes in orange
+                color = 0xFF00AAFF if props.open_meshes else 0xFFDDDDDD
+                tip = f"{path}\n{props.meshes} mesh(es), {props.open_meshes} open"
+                with ui.HStack(height=20, spacing=4):
+                    ui.Label(path.rsplit("/", 1)[-1], tooltip=tip, style={"color": color})
+                    ui.Label(self._format_mass(props.volume, 3), width=110, alignment=ui.Alignment.RIGHT_CENTER, style={"color": color})
+                    ui.Label(self._format_mass(props.area, 2), width=110, alignment=ui.Alignment.RIGHT_CENTER, style={"color": color})
+            hidden = len(self._mass_rows) - self.MASS_MAX_ROWS
+            if hidden > 0:
+                ui.Label(f"... {hidden} more", name="Description")
+
+    # ========================================================
+    #  Clearance Matrix
+    # ========================================================
+    def _on_compute_clearance(self):
+        import numpy as np
+        stage = self._usd_context.get_stage()
+        paths = self._usd_context.get_selection().get_selected_prim_paths()
+        self._clearance_rows = []
+        if not stage or len(paths) < 2:
+            self._set_clearance_summary("Select 2 or more objects")
+            return self._rebuild_clearance_list()
+        if not self._bbox_cache: self._init_bbox_cache()
+
+        prims, lo, hi = [], [], []
+        for p in paths:
+            prim = stage.GetPrimAtPath(p)
+            if not prim or not prim.IsValid(): continue
+            world = self._bbox_cache.world_box(prim)
+            if world.IsEmpty(): continue
+            prims.append(prim)
+            lo.append(tuple(world.GetMin()))
+            hi.append(tuple(world.GetMax()))
+        if len(prims) < 2:
+            self._set_clearance_summary("Select 2 or more objects with geometry")
+            return self._rebuild_clearance_list()
+
+        # Threshold is entered in the distance display unit
+        threshold = max(0.0, self._clearance_threshold.get_value_as_float()) * self._display_mpu_dist / float(self._stage_mpu)
+        exact = None
+        if self._clearance_exact.get_value_as_bool():
+            meshes = {}
+
+            def exact(i, j):
+                for k in (i, j):
+                    if k not in meshes:
+                        meshes[k] = self._world_meshes(prims[k])
+                r = mesh_set_distance(meshes[i], meshes[j]) if meshes[i] and meshes[j] else None
+                return (r.distance, r.point_a, r.point_b) if r is not None else None
+
+        start = time.perf_counter()
+        self._clearance_rows = clearance_rows([str(p.GetPath()) for p in prims], np.array(lo), np.array(hi), threshold, exact)
+        elapsed = time.perf_counter() - start
+        self._clearance_sort = ("distance", False)
+        self._set_clearance_summary(
+            f"{len(self._clearance_rows)} pair(s) under {self._format_clearance(threshold)} "
+            f"among {len(prims)} objects ({elapsed:.2f} s)")
+        self._rebuild_clearance_list()
+
+    def _format_clearance(self, distance):
+        """Stage-unit distance in the distance display unit."""
+        value = distance * float(self._stage_mpu) / self._display_mpu_dist
+        return f"{value:.{self._custom_precision_dist.get_value_as_int()}f} {self._display_unit_dist}"
+
+    def _set_clearance_summary(self, text):
+        if self._clearance_summary_label: self._clearance_summary_label.text = text
+
+    def _on_clearance_sort(self, key):
+        current, descending = self._clearance_sort
+        self._clearance_sort = (key, not descending if key == current else False)
+        self._clearance_rows = sort_rows(self._clearance_rows, *self._clearance_sort)
+        self._rebuild_clearance_list()
+
+    def _rebuild_clearance_list(self):
+        if not self._clearance_list_vbox: return
+        self._clearance_list_vbox.clear()
+        with self._clearance_list_vbox:
+            if not self._clearance_rows:
+                ui.Label("None", style={"color": 0xFF888888, "font_style": "italic"})
+                return
+            for row in self._clearance_rows[:self.CLEARANCE_MAX_ROWS]:
+                # Touching / intersecting pairs in red; AABB-only distances dimmed
+                color = 0xFF4444FF if row.distance <= 0.0 else (0xFFDDDDDD if row.exact else 0xFFAAAAAA)
+                with ui.HStack(height=20, spacing=4,
+                               mouse_pressed_fn=lambda x, y, b, m, r=row: self._select_clearance_pair(r)):
+                    ui.Label(row.path_a.rsplit("/", 1)[-1], tooltip=row.path_a, style={"color": color})
+                    ui.Label(row.path_b.rsplit("/", 1)[-1], tooltip=row.path_b, style={"color": color})
+                    ui.Label(self._format_clearance(row.distance), width=80, alignment=ui.Alignment.RIGHT_CENTER,
+                             style={"color": color})
+            hidden = len(self._clearance_rows) - self.CLEARANCE_MAX_ROWS
+            if hidden > 0:
+                ui.Label(f"... {hidden} more (Export CSV for all)", name="Description")
+
+    def _select_clearance_pair(self, row):
+        # Selecting the pair re-runs the 2-object distance readout (and its viewport line) for it
+        self._usd_context.get_selection().set_selected_prim_paths([row.path_a, row.path_b], True)
+
+    def _on_export_clearance_csv(self):
+        """Open a FilePicker dialog to save the clearance rows as CSV."""
+        if not self._clearance_rows:
+            self._set_clearance_summary("Nothing to export - compute clearances first")
+            return
+        if not _HAS_FILEPICKER:
+            self._set_clearance_summary("FilePicker not available in this Kit version.")
+            carb.log_warn("[SmartMeasure] omni.kit.window.filepicker not available.")
+            return
+        if self._filepicker_csv is not None:
+            self._filepicker_csv.destroy()
+            self._filepicker_csv = None
+
+        def _apply_save(filename: str, dirname: str):
+            if not filename.lower().endswith(".csv"):
+                filename += ".csv"
+            filepath = os.path.join(dirname, filename).replace('\\', '/')
+            try:
+                import io
+                stream = io.StringIO()
+                write_csv(self._clearance_rows, stream, scale=float(self._stage_mpu) / self._display_mpu_dist,
+                          unit=self._display_unit_dist, precision=self._custom_precision_dist.get_value_as_int())
+                text = stream.getvalue()
+                # omni.client first (Nucleus URLs), plain open() for local paths
+                result = omni.client.write_file(filepath, text.encode("utf-8"))
+                if result != omni.client.Result.OK:
+                    with open(filepath, "w", encoding="utf-8", newline="") as f:
+                        f.write(text)
+                self._set_clearance_summary(f"CSV saved: {os.path.basename(filepath)}")
+            except Exception as e:
+                self._set_clearance_summary(f"CSV save failed: {e}")
+                carb.log_warn(f"[SmartMeasure] CSV export error: {e}")
+            if self._filepicker_csv:
+                self._filepicker_csv.hide()
+
+        self._filepicker_csv = FilePickerDialog(
+            "Save Clearance Matrix as CSV",
+            allow_multi_selection=False,
+            apply_button_label="Save",
+            click_apply_handler=_apply_save,
+            click_cancel_handler=lambda *_: self._filepicker_csv.hide() if self._filepicker_csv else None,
+            file_extension_options=[("*.csv", "CSV Files")],
+        )
+        self._filepicker_csv.show()
+
+    # ========================================================
+    #  Clash Detection
+    # ========================================================
+    def _clash_parts(self):
+        """Prims to check against each other: the selection, or the children of a single selected prim."""
+        stage = self._usd_context.get_stage()
+        paths = self._usd_context.get_selection().get_selected_prim_paths()
+        if not stage or not paths:
+            return []
+        prims = [stage.GetPrimAtPath(p) for p in paths]
+        prims = [p for p in prims if p and p.IsValid()]
+        if len(prims) == 1:
+            prims = [c for c in prims[0].GetChildren() if c.IsA(UsdGeom.Imageable)]
+        return prims
+
+    def _clash_worker_count(self):
+        # Spawned workers re-run sys.executable: only use them when that is a Python interpreter (not the Kit binary)
+        requested = max(1, self._clash_processes.get_value_as_int())
+        if requested > 1 and not os.path.basename(sys.executable).lower().startswith("python"):
+            carb.log_info(f"[SmartMeasure] {sys.executable} is not a Python interpreter; clash tests run in-process.")
+            return 1
+        return requested
+
+    def _on_detect_clashes(self):
+        import numpy as np
+        paths, parts = [], []
+        for prim in self._clash_parts():
+            meshes = self._world_meshes(prim)
+            if meshes:
+                paths.append(str(prim.GetPath()))
+                parts.append(np.concatenate([m.corners for m in meshes]))
+        self._clashes = []
+        if len(parts) < 2:
+            self._set_clash_summary("Need 2 or more parts with mesh geometry")
+            return self._rebuild_clash_list()
+
+        min_depth = max(0.0, self._clash_min_depth.get_value_as_float()) * self._display_mpu_dist / float(self._stage_mpu)
+        processes = self._clash_worker_count()
+        start = time.perf_counter()
+        try:
+            self._clashes = clash_detection.find_clashes(paths, parts, processes=processes, min_depth=min_depth)
+        except (OSError, RuntimeError) as e:
+            # Includes a broken process pool: the in-process path gives the same result
+            carb.log_warn(f"[SmartMeasure] Clash worker processes failed ({e}); running in-process.")
+            processes = 1
+            self._clashes = clash_detection.find_clashes(paths, parts, processes=1, min_depth=min_depth)
+        elapsed = time.perf_counter() - start
+        triangles = sum(len(t) for t in parts)
+        self._set_clash_summary(
+            f"{len(self._clashes)} clash(es) among {len(parts)} parts, {triangles:,} triangles "
+            f"({elapsed:.2f} s, {processes} process{'es' if processes > 1 else ''})")
+        self._rebuild_clash_list()
+
+    def _set_clash_summary(self, text):
+        if self._clash_summary_label: self._clash_summary_label.text = text
+
+    def _rebuild_clash_list(self):
+        if not self._clash_list_vbox: return
+        self._clash_list_vbox.clear()
+        with self._clash_list_vbox:
+            if not self._clashes:
+                ui.Label("None", style={"color": 0xFF888888, "font_style": "italic"})
+                return
+            for c in self._clashes[:self.CLASH_MAX_ROWS]:
+                detail = f"{c.triangles} intersecting triangle pairs" if c.triangles else "one part contains the other"
+                tip = f"{c.path_a}\n{c.path_b}\n{detail}"
+                # Clicking a row selects the pair (the Distance panel then measures it)
+                with ui.HStack(height=20, spacing=4,
+                               mouse_pressed_fn=lambda x, y, b, m, c=c: self._usd_context.get_selection().set_selected_prim_paths([c.path_a, c.path_b], True)):
+                    ui.Label(c.path_a.rsplit("/", 1)[-1], tooltip=tip, style={"color": 0xFF4444FF})
+                    ui.Label(c.path_b.rsplit("/", 1)[-1], tooltip=tip, style={"color": 0xFF4444FF})
+                    ui.Label(self._format_clearance(c.depth), width=80, alignment=ui.Alignment.RIGHT_CENTER,
+                             tooltip="Penetration depth (estimate)", style={"color": 0xFF4444FF})
+            hidden = len(self._clashes) - self.CLASH_MAX_ROWS
+            if hidden > 0:
+                ui.Label(f"... {hidden} more", name="Description")
 
     def _copy_result(self, mode):
         if not clipboard: return
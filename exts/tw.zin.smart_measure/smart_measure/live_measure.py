@@ -0,0 +1,165 @@
+"""
+Smart Measure — live measurement while dragging.
+
+原本只有選取改變才量測，把零件推到目標間隙要反覆「移動、取消選取、再選取」。
+Live 模式下 LiveSession 監聽 Usd.Notice.ObjectsChanged，只在與被選 prim 相關的變更
+(它們本身、子孫或祖先) 發生時標記 dirty，由每個 frame 的 update 事件重新量測：
+
+  - xformOp 變更 (拖曳)：moved。mesh 的 BVH 在開始追蹤時建立一次，之後每次量測只重讀
+    local-to-world matrix 並呼叫 MeshBVH.to_world；靜止的那一邊 matrix 沒變，
+    直接沿用上次的 WorldMesh (不重讀 points、不重算雜湊、不 refit)，只有移動的一邊 refit。
+    幾何相同的 mesh 共用同一個 MeshBVH，而 MeshBVH 只記得最後一次擺放，
+    因此 WorldMesh 以 (mesh prim 路徑, matrix) 快取在 session 內
+  - points / 拓撲 / visibility 變更或 prim resync：下次量測時重新擷取 mesh
+  - FrameBudget 把量測限制在每個 frame 的時間預算內：一次量測花了 k 個預算，
+    就跳過接下來 k 個 frame，拖曳中 UI 仍維持流暢；dirty 會保留到真正量測為止，
+    放開滑鼠後最後的位置一定會被量到
+
+只依賴 pxr.Usd / UsdGeom / Sdf / Tf (與 mesh_distance 的 BVHCache)。
+"""
+
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+from pxr import Sdf, Tf, Usd, UsdGeom
+
+# Attributes that change a mesh's local geometry (its BVH has to be rebuilt)
+MESH_ATTRIBUTES = frozenset({"points", "faceVertexCounts", "faceVertexIndices"})
+
+DEFAULT_FRAME_BUDGET = 0.008     # seconds per frame (half of a 60 Hz frame)
+
+
+class FrameBudget:
+    """Skip frames after an expensive update so recomputation averages at most `budget` seconds per frame."""
+
+    def __init__(self, budget: float = DEFAULT_FRAME_BUDGET):
+        self.budget = budget
+        self._skip = 0
+
+    def ready(self) -> bool:
+        """Called once per frame: True if this frame may run an update."""
+        if self._skip > 0:
+            self._skip -= 1
+            return False
+        return True
+
+    def spent(self, seconds: float) -> None:
+        """Record what the last update cost."""
+        self._skip = int(seconds // self.budget) if self.budget > 0.0 else 0
+
+
+class LiveSession:
+    """Tracks the selected prims: flags relevant stage changes and keeps their mesh BVHs between updates."""
+
+    def __init__(self, bvh_cache, time_code=Usd.TimeCode.Default()):
+        self._bvh_cache = bvh_cache
+        self._time_code = time_code
+        self._stage = None
+        self._listener = None
+        self._tracked = []               # Sdf.Path
+        self._meshes = {}                # tracked Sdf.Path -> [(mesh Usd.Prim, MeshBVH)], captured lazily
+        self._placed = {}                # mesh Sdf.Path -> (MeshBVH, matrix bytes, WorldMesh)
+        self.dirty = False
+
+    def attach(self, stage: Optional[Usd.Stage]) -> None:
+        self.detach()
+        self._stage = stage
+        if stage:
+            self._listener = Tf.Notice.Register(Usd.Notice.ObjectsChanged, self._on_objects_changed, stage)
+
+    def detach(self) -> None:
+        if self._listener is not None:
+            self._listener.Revoke()
+            self._listener = None
+        self._stage = None
+        self.track(())
+
+    def track(self, paths: Iterable) -> None:
+        """Follow these prims (the current selection); drops the captured meshes."""
+        self._tracked = [Sdf.Path(str(p)) for p in paths]
+        self._meshes = {}
+        self._placed = {}
+        self.dirty = False
+
+    def tracks(self, path) -> bool:
+        return Sdf.Path(str(path)) in self._tracked
+
+    def _affects_tracked(self, prim_path: Sdf.Path) -> List[Sdf.Path]:
+        # A change moves / reshapes a tracked prim if it is on the prim, below it or on an ancestor
+        return [t for t in self._tracked if t.HasPrefix(prim_path) or prim_path.HasPrefix(t)]
+
+    def _on_objects_changed(self, notice, sender):
+        self.invalidate(notice.GetResyncedPaths(), notice.GetChangedInfoOnlyPaths())
+
+    def invalidate(self, resynced: Iterable[Sdf.Path] = (), changed_info: Iterable[Sdf.Path] = ()) -> bool:
+        """Mark dirty if a change affects the tracked prims; returns whether it did."""
+        if not self._tracked:
+            return False
+        resynced = list(resynced)
+        relevant = False
+        for path in resynced + list(changed_info):
+            if path.IsPropertyPath():
+                name = path.name
+                if UsdGeom.Xformable.IsTransformationAffectedByAttrNamed(name):
+                    reshaped = False
+                elif name == "visibility" or name in MESH_ATTRIBUTES:
+                    reshaped = True
+                else:
+                    continue
+            elif path in resynced:
+                reshaped = True
+            else:
+                continue                 # metadata only
+            hit = self._affects_tracked(path.GetPrimPath())
+            if not hit:
+                continue
+            relevant = True
+            if reshaped:
+                for t in hit:
+                    self._meshes.pop(t, None)
+        if relevant:
+            self.dirty = True
+        return relevant
+
+    def _capture(self, path: Sdf.Path) -> List[Tuple[Usd.Prim, object]]:
+        captured = []
+        prim = self._stage.GetPrimAtPath(path) if self._stage else None
+        if not prim or not prim.IsValid():
+            return captured
+        for p in Usd.PrimRange(prim, Usd.TraverseInstanceProxies()):
+            if not p.IsA(UsdGeom.Mesh):
+                continue
+            if UsdGeom.Imageable(p).ComputeVisibility(self._time_code) == UsdGeom.Tokens.invisible:
+                continue
+            mesh = UsdGeom.Mesh(p)
+            points = mesh.GetPointsAttr().Get(self._time_code)
+            counts = mesh.GetFaceVertexCountsAttr().Get(self._time_code)
+            indices = mesh.GetFaceVertexIndicesAttr().Get(self._time_code)
+            if not points or not counts or not indices:
+                continue
+            try:
+                bvh = self._bvh_cache.get(np.asarray(points), np.asarray(counts), np.asarray(indices))
+            except ValueError:
+                continue
+            captured.append((p, bvh))
+        return captured
+
+    def world_meshes(self, path) -> list:
+        """WorldMeshes of a tracked prim at its current transforms (only changed matrices are re-applied)."""
+        path = Sdf.Path(str(path))
+        captured = self._meshes.get(path)
+        if captured is None:
+            captured = self._meshes[path] = self._capture(path)
+        xform_cache = UsdGeom.XformCache(self._time_code)
+        worlds = []
+        for p, bvh in captured:
+            if not p.IsValid():
+                continue
+            matrix = np.array(xform_cache.GetLocalToWorldTransform(p), dtype=np.float64)
+            key = matrix.tobytes()
+            placed = self._placed.get(p.GetPath())
+            # A recaptured mesh has a new BVH, so its old placement is not reused
+            if placed is None or placed[0] is not bvh or placed[1] != key:
+                placed = self._placed[p.GetPath()] = (bvh, key, bvh.to_world(matrix))
+            worlds.append(placed[2])
+        return worlds
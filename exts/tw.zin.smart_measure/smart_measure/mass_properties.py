@@ -0,0 +1,198 @@
+"""
+Smart Measure — mass properties (volume, surface area, centroid).
+
+重量與塗裝估算需要零件體積與表面積。這裡直接由 mesh 的 points 與 face indices 計算：
+
+  - 體積：每個三角形與原點構成的有號四面體體積 a·(b×c)/6 加總 (散度定理)，
+    形心為各四面體形心以有號體積加權
+  - 表面積：每個面 (n-gon) 的向量面積 ½Σ(b−a)×(c−a) 取長度；扇形三角化的三角形
+    即使在凹多邊形上互相重疊，向量加總後仍是正確的平面多邊形面積
+  - 封閉性：每條邊剛好被兩個面以相反方向使用才是封閉且方向一致的 mesh；
+    開放 mesh 的體積不可信 (closed=False)，形心改用表面積加權。
+    為了 normals / UV 而拆開的頂點 (split vertices) 先依位置合併 (weld) 再數邊，
+    否則每個面各自一份頂點的 mesh 會被當成開放
+
+MassPropertiesCache 以 geometry_key (points + 拓撲雜湊) 快取 local 空間的結果；
+剛體 + 等比縮放的 transform 直接換算 (體積 × s³、面積 × s²)，其他 transform
+才在世界座標重算 (並以 transform 一起作為快取鍵)。
+
+純 NumPy，不依賴 Omniverse。
+"""
+
+from collections import OrderedDict
+from typing import NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from .mesh_distance import geometry_key, triangulate
+except ImportError:   # imported as a top-level module (tests, worker processes)
+    from mesh_distance import geometry_key, triangulate
+
+
+class MassProperties(NamedTuple):
+    volume: float                               # >= 0; meaningless when not closed
+    area: float
+    centroid: Tuple[float, float, float]        # volume centroid if closed, else area centroid
+    closed: bool
+    meshes: int = 1
+    open_meshes: int = 0
+
+
+EMPTY = MassProperties(0.0, 0.0, (0.0, 0.0, 0.0), True, meshes=0)
+
+
+def triangle_faces(face_counts) -> np.ndarray:
+    """Face index of each triangle produced by triangulate(face_counts, ...)."""
+    counts = np.asarray(face_counts, dtype=np.int64).ravel()
+    n_tris = np.where(counts >= 3, counts - 2, 0)
+    return np.repeat(np.arange(counts.size), n_tris)
+
+
+WELD_TOLERANCE = 1e-6     # relative to the mesh's bounding box size
+
+
+def weld(points, triangles, tolerance: float = WELD_TOLERANCE) -> np.ndarray:
+    """triangles re-indexed so points at the same position (within tolerance) share one index."""
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    tris = np.asarray(triangles, dtype=np.int64).reshape(-1, 3)
+    if len(points) == 0:
+        return tris
+    size = float(np.ptp(points, axis=0).max())
+    step = tolerance * (size if size > 0.0 else 1.0)
+    keys = np.round((points - points.min(axis=0)) / step).astype(np.int64)
+    _, inverse = np.unique(keys, axis=0, return_inverse=True)
+    return inverse.ravel()[tris]
+
+
+def is_closed(triangles, points=None) -> bool:
+    """Every edge is used exactly twice, in opposite directions (closed and consistently oriented).
+
+    With points, vertices are first welded by position so split-vertex meshes count as closed.
+    """
+    tris = np.asarray(triangles, dtype=np.int64).reshape(-1, 3)
+    if len(tris) == 0:
+        return False
+    if points is not None:
+        tris = weld(points, tris)
+    edges = np.concatenate([tris[:, [0, 1]], tris[:, [1, 2]], tris[:, [2, 0]]])
+    edges = edges[edges[:, 0] != edges[:, 1]]       # degenerate fan triangles add no real edges
+    directed, directed_count = np.unique(edges, axis=0, return_counts=True)
+    if np.any(directed_count != 1):
+        return False
+    undirected, undirected_count = np.unique(np.sort(directed, axis=1), axis=0, return_counts=True)
+    return bool(np.all(undirected_count == 2))
+
+
+def compute_mass_properties(points, face_counts, face_indices) -> MassProperties:
+    """Volume, area and centroid of one polygon mesh, in the points' space."""
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    tris = triangulate(face_counts, face_indices)
+    if len(tris) == 0:
+        return MassProperties(0.0, 0.0, (0.0, 0.0, 0.0), False, open_meshes=1)
+    a, b, c = points[tris[:, 0]], points[tris[:, 1]], points[tris[:, 2]]
+
+    # Area: vector area per face, so concave n-gons (overlapping fan triangles) are exact
+    cross = np.cross(b - a, c - a)
+    faces = triangle_faces(face_counts)
+    face_vec = np.zeros((int(np.asarray(face_counts).size), 3))
+    np.add.at(face_vec, faces, cross)
+    face_len = np.linalg.norm(face_vec, axis=1)
+    area = 0.5 * float(face_len.sum())
+
+    closed = is_closed(tris, points)
+    signed = np.einsum("ij,ij->i", a, np.cross(b, c)) / 6.0
+    volume = float(signed.sum())
+    if closed and abs(volume) > 0.0:
+        centroid = (signed[:, None] * (a + b + c)).sum(axis=0) / (4.0 * volume)
+    else:
+        # Triangle areas signed along their face normal (cancels fan overlaps)
+        normal = face_vec / np.where(face_len > 0.0, face_len, 1.0)[:, None]
+        weight = 0.5 * np.einsum("ij,ij->i", cross, normal[faces])
+        total = weight.sum()
+        centroid = (weight[:, None] * (a + b + c)).sum(axis=0) / (3.0 * total) if total > 0.0 else points.mean(axis=0)
+    return MassProperties(abs(volume), area, tuple(float(v) for v in centroid), closed,
+                          open_meshes=0 if closed else 1)
+
+
+def _similarity_scale(linear: np.ndarray) -> Optional[float]:
+    """s if linear is a rotation (or reflection) times a uniform scale s, else None."""
+    gram = linear @ linear.T
+    s2 = np.trace(gram) / 3.0
+    if s2 <= 0.0 or not np.allclose(gram, s2 * np.eye(3), rtol=0.0, atol=1e-9 * s2):
+        return None
+    return float(np.sqrt(s2))
+
+
+def transform_properties(props: MassProperties, matrix) -> Optional[MassProperties]:
+    """props placed with a row-vector (USD style) 4x4 matrix; None if it is not rigid + uniform scale."""
+    m = np.asarray(matrix, dtype=np.float64).reshape(4, 4)
+    s = _similarity_scale(m[:3, :3])
+    if s is None:
+        return None
+    centroid = np.asarray(props.centroid) @ m[:3, :3] + m[3, :3]
+    return props._replace(volume=props.volume * s ** 3, area=props.area * s ** 2,
+                          centroid=tuple(float(v) for v in centroid))
+
+
+def combine(props: Sequence[MassProperties]) -> MassProperties:
+    """Totals over several meshes; the centroid is volume-weighted over closed meshes (area-weighted if none)."""
+    props = [p for p in props if p.meshes]
+    if not props:
+        return EMPTY
+    closed = [p for p in props if p.closed and p.volume > 0.0]
+    weights = np.array([p.volume for p in closed]) if closed else np.array([p.area for p in props])
+    centers = np.array([p.centroid for p in (closed or props)])
+    centroid = (weights @ centers) / weights.sum() if weights.sum() > 0.0 else centers.mean(axis=0)
+    return MassProperties(
+        volume=sum(p.volume for p in props),
+        area=sum(p.area for p in props),
+        centroid=tuple(float(v) for v in centroid),
+        closed=all(p.closed for p in props),
+        meshes=sum(p.meshes for p in props),
+        open_meshes=sum(p.open_meshes for p in props),
+    )
+
+
+class MassPropertiesCache:
+    """LRU of local-space mass properties keyed by geometry_key (points + topology)."""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.computed = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _lookup(self, key, compute):
+        props = self._entries.get(key)
+        if props is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return props
+        props = compute()
+        self.computed += 1
+        self._entries[key] = props
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return props
+
+    def get(self, points, face_counts, face_indices, matrix=None) -> MassProperties:
+        """Mass properties of the mesh placed with matrix (local space if None)."""
+        key = geometry_key(points, face_counts, face_indices)
+        local = self._lookup(key, lambda: compute_mass_properties(points, face_counts, face_indices))
+        if matrix is None:
+            return local
+        placed = transform_properties(local, matrix)
+        if placed is not None:
+            return placed
+        # Non-uniform scale / shear: recompute from the world points
+        m = np.asarray(matrix, dtype=np.float64).reshape(4, 4)
+        world = lambda: compute_mass_properties(np.asarray(points, dtype=np.float64) @ m[:3, :3] + m[3, :3],
+                                                face_counts, face_indices)
+        return self._lookup((key, m.tobytes()), world)
+
+    def clear(self) -> None:
+        self._entries.clear()
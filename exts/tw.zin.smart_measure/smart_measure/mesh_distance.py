@@ -0,0 +1,365 @@
+"""
+Smart Measure — exact mesh-to-mesh minimum distance.
+
+calculate_gap / calculate_gap_points 以 AABB 估算，旋轉或凹形零件 (支架、散熱片) 的間隙
+可能差到數公分。這裡以每個 mesh 的三角形 BVH 求世界座標下的精確最短距離與最近點對：
+
+  - MeshBVH 在 mesh 的 local 空間建立 (依重心中位數切分，葉節點最多 LEAF_SIZE 個三角形)，
+    BVHCache 以 points + 拓撲的雜湊快取，幾何不變就不需重建
+  - to_world(matrix) 把頂點轉到世界座標並逐層 refit 節點包圍盒，階層本身不變，
+    只改 transform 時不需重建
+  - mesh_distance 以包圍盒距離排序的 heap 做雙樹走訪，葉節點配對的所有三角形對
+    以 NumPy 一次計算 (點-三角形、邊-邊、邊穿過三角形)
+
+純 NumPy，不依賴 Omniverse。
+"""
+
+import hashlib
+import heapq
+from collections import OrderedDict
+from typing import NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+LEAF_SIZE = 8
+_EPS = 1e-12
+
+
+class MeshDistance(NamedTuple):
+    distance: float
+    point_a: Tuple[float, float, float]
+    point_b: Tuple[float, float, float]
+    triangle_a: int          # index into the (triangulated) mesh's triangles
+    triangle_b: int
+    mesh_a: int = 0          # index into the mesh lists given to mesh_set_distance
+    mesh_b: int = 0
+
+
+# ==========================================
+# Geometry input
+# ==========================================
+def triangulate(face_counts, face_indices) -> np.ndarray:
+    """Fan-triangulate polygon faces into an (n, 3) index array; faces with < 3 vertices are dropped."""
+    counts = np.asarray(face_counts, dtype=np.int64).ravel()
+    indices = np.asarray(face_indices, dtype=np.int64).ravel()
+    if counts.size == 0:
+        return np.zeros((0, 3), dtype=np.int64)
+    if counts.sum() > indices.size:
+        raise ValueError(f"faceVertexCounts need {int(counts.sum())} indices, got {indices.size}")
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    n_tris = np.where(counts >= 3, counts - 2, 0)
+    face = np.repeat(np.arange(counts.size), n_tris)
+    k = np.arange(int(n_tris.sum())) - np.repeat(np.cumsum(n_tris) - n_tris, n_tris)
+    base = starts[face]
+    return np.stack([indices[base], indices[base + k + 1], indices[base + k + 2]], axis=1)
+
+
+def geometry_key(points, face_counts, face_indices) -> str:
+    """Hash of a mesh's points and topology (the BVH cache key)."""
+    h = hashlib.blake2b(digest_size=16)
+    for array, dtype in ((points, np.float64), (face_counts, np.int64), (face_indices, np.int64)):
+        data = np.ascontiguousarray(np.asarray(array, dtype=dtype))
+        h.update(np.int64(data.size).tobytes())
+        h.update(data.tobytes())
+    return h.hexdigest()
+
+
+# ==========================================
+# BVH
+# ==========================================
+class WorldMesh:
+    """A MeshBVH placed in world space: transformed triangle corners and refit node boxes."""
+
+    __slots__ = ("bvh", "corners", "lo", "hi")
+
+    def __init__(self, bvh: "MeshBVH", corners: np.ndarray, lo: np.ndarray, hi: np.ndarray):
+        self.bvh = bvh
+        self.corners = corners   # (n triangles, 3, 3) in BVH order
+        self.lo = lo             # (n nodes, 3)
+        self.hi = hi
+
+    def __len__(self):
+        return len(self.corners)
+
+    @property
+    def bounds(self) -> Tuple[np.ndarray, np.ndarray]:
+        return self.lo[0], self.hi[0]
+
+
+class MeshBVH:
+    """Triangle BVH built once in the mesh's local space."""
+
+    def __init__(self, points, triangles, leaf_size: int = LEAF_SIZE):
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        triangles = np.asarray(triangles, dtype=np.int64).reshape(-1, 3)
+        self.leaf_size = max(1, int(leaf_size))
+        self._build(triangles)
+        self._world = None   # (matrix bytes, WorldMesh) of the last placement
+
+    def __len__(self):
+        return len(self.triangles)
+
+    @property
+    def node_count(self) -> int:
+        return len(self.start)
+
+    def is_leaf(self, node: int) -> bool:
+        return self.left[node] < 0
+
+    def _build(self, triangles):
+        n = len(triangles)
+        order = np.arange(n, dtype=np.int64)
+        centroids = self.points[triangles].mean(axis=1) if n else np.zeros((0, 3))
+        start, count, left, right, depth = [], [], [], [], []
+
+        def _node(s, e, d):
+            start.append(s); count.append(e - s); left.append(-1); right.append(-1); depth.append(d)
+            return len(start) - 1
+
+        stack = [(_node(0, n, 0), 0, n, 0)] if n else []
+        while stack:
+            node, s, e, d = stack.pop()
+            if e - s <= self.leaf_size:
+                continue
+            c = centroids[order[s:e]]
+            axis = int(np.argmax(c.max(axis=0) - c.min(axis=0)))
+            mid = (s + e) // 2
+            order[s:e] = order[s:e][np.argpartition(c[:, axis], mid - s)]
+            # Children always get higher ids than their parent (used by the level-wise refit)
+            left[node] = _node(s, mid, d + 1)
+            right[node] = _node(mid, e, d + 1)
+            stack.append((left[node], s, mid, d + 1))
+            stack.append((right[node], mid, e, d + 1))
+
+        self.order = order                        # BVH triangle slot -> original triangle index
+        self.triangles = triangles[order]
+        self.start = np.asarray(start, dtype=np.int64)
+        self.count = np.asarray(count, dtype=np.int64)
+        self.left = np.asarray(left, dtype=np.int64)
+        self.right = np.asarray(right, dtype=np.int64)
+        depth = np.asarray(depth, dtype=np.int64)
+        internal = self.left >= 0
+        leaves = np.flatnonzero(~internal)
+        self._leaves = leaves[np.argsort(self.start[leaves])]   # leaves tile [0, n) in order
+        self._levels = [np.flatnonzero(internal & (depth == d)) for d in range(int(depth.max()) if n else 0)]
+
+    def _refit(self, corners):
+        lo = np.empty((self.node_count, 3))
+        hi = np.empty((self.node_count, 3))
+        if self.node_count == 0:
+            return lo, hi
+        seg = self.start[self._leaves]
+        lo[self._leaves] = np.minimum.reduceat(corners.min(axis=1), seg)
+        hi[self._leaves] = np.maximum.reduceat(corners.max(axis=1), seg)
+        for ids in reversed(self._levels):
+            lo[ids] = np.minimum(lo[self.left[ids]], lo[self.right[ids]])
+            hi[ids] = np.maximum(hi[self.left[ids]], hi[self.right[ids]])
+        return lo, hi
+
+    def to_world(self, matrix=None) -> WorldMesh:
+        """Place the mesh with a row-vector (USD style) 4x4 local-to-world matrix; the last placement is reused."""
+        m = None if matrix is None else np.asarray(matrix, dtype=np.float64).reshape(4, 4)
+        key = None if m is None else m.tobytes()
+        if self._world is not None and self._world[0] == key:
+            return self._world[1]
+        points = self.points if m is None else self.points @ m[:3, :3] + m[3, :3]
+        corners = points[self.triangles]
+        world = WorldMesh(self, corners, *self._refit(corners))
+        self._world = (key, world)
+        return world
+
+
+class BVHCache:
+    """LRU of MeshBVHs keyed by geometry_key (points + topology)."""
+
+    def __init__(self, max_entries: int = 64, leaf_size: int = LEAF_SIZE):
+        self.max_entries = max_entries
+        self.leaf_size = leaf_size
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.builds = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, points, face_counts, face_indices) -> MeshBVH:
+        key = geometry_key(points, face_counts, face_indices)
+        bvh = self._entries.get(key)
+        if bvh is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return bvh
+        bvh = MeshBVH(points, triangulate(face_counts, face_indices), self.leaf_size)
+        self.builds += 1
+        self._entries[key] = bvh
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return bvh
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+# ==========================================
+# Vectorized primitives (all inputs are (n, 3) arrays)
+# ==========================================
+def _dot(u, v):
+    return np.einsum("ij,ij->i", u, v)
+
+
+def closest_points_on_triangles(p, a, b, c) -> np.ndarray:
+    """Closest point of each triangle (a, b, c) to p (Ericson, Real-Time Collision Detection 5.1.5)."""
+    ab, ac = b - a, c - a
+    ap, bp, cp = p - a, p - b, p - c
+    d1, d2 = _dot(ab, ap), _dot(ac, ap)
+    d3, d4 = _dot(ab, bp), _dot(ac, bp)
+    d5, d6 = _dot(ab, cp), _dot(ac, cp)
+    va = d3 * d6 - d5 * d4
+    vb = d5 * d2 - d1 * d6
+    vc = d1 * d4 - d3 * d2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        denom = va + vb + vc
+        result = a + ab * (vb / denom)[:, None] + ac * (vc / denom)[:, None]
+        # Regions from lowest to highest priority, so the earlier Voronoi tests win
+        e43, e56 = d4 - d3, d5 - d6
+        regions = (
+            ((va <= 0) & (e43 >= 0) & (e56 >= 0), lambda: b + (c - b) * (e43 / (e43 + e56))[:, None]),
+            ((vb <= 0) & (d2 >= 0) & (d6 <= 0), lambda: a + ac * (d2 / (d2 - d6))[:, None]),
+            ((d6 >= 0) & (d5 <= d6), lambda: c),
+            ((vc <= 0) & (d1 >= 0) & (d3 <= 0), lambda: a + ab * (d1 / (d1 - d3))[:, None]),
+            ((d3 >= 0) & (d4 <= d3), lambda: b),
+            ((d1 <= 0) & (d2 <= 0), lambda: a),
+        )
+        for mask, point in regions:
+            if mask.any():
+                result = np.where(mask[:, None], point(), result)
+    # Degenerate triangles: any point on them is a valid bound; their edges are tested separately
+    bad = ~np.isfinite(result).all(axis=1)
+    if bad.any():
+        result[bad] = a[bad]
+    return result
+
+
+def closest_points_on_segments(p1, q1, p2, q2) -> Tuple[np.ndarray, np.ndarray]:
+    """Closest points between segments p1-q1 and p2-q2 (Ericson 5.1.9)."""
+    d1, d2, r = q1 - p1, q2 - p2, p1 - p2
+    a, e = _dot(d1, d1), _dot(d2, d2)
+    b, c, f = _dot(d1, d2), _dot(d1, r), _dot(d2, r)
+    denom = a * e - b * b
+    with np.errstate(divide="ignore", invalid="ignore"):
+        s = np.where(denom > _EPS * a * e, np.clip((b * f - c * e) / denom, 0.0, 1.0), 0.0)
+        t = np.where(e > _EPS, (b * s + f) / e, 0.0)
+        s = np.where(t < 0.0, np.where(a > _EPS, np.clip(-c / a, 0.0, 1.0), 0.0),
+                     np.where(t > 1.0, np.where(a > _EPS, np.clip((b - c) / a, 0.0, 1.0), 0.0), s))
+    t = np.clip(t, 0.0, 1.0)
+    return p1 + d1 * s[:, None], p2 + d2 * t[:, None]
+
+
+def segment_triangle_hits(p, q, a, b, c) -> Tuple[np.ndarray, np.ndarray]:
+    """(hit mask, hit point) of segments p-q crossing triangles (a, b, c) (Möller–Trumbore)."""
+    d = q - p
+    e1, e2 = b - a, c - a
+    h = np.cross(d, e2)
+    det = _dot(e1, h)
+    ok = np.abs(det) > _EPS * np.sqrt(_dot(d, d) * _dot(e1, e1) * _dot(e2, e2))
+    inv = np.divide(1.0, det, out=np.zeros_like(det), where=ok)
+    s = p - a
+    u = inv * _dot(s, h)
+    qv = np.cross(s, e1)
+    v = inv * _dot(d, qv)
+    t = inv * _dot(e2, qv)
+    hit = ok & (u >= 0) & (v >= 0) & (u + v <= 1) & (t >= 0) & (t <= 1)
+    return hit, p + d * t[:, None]
+
+
+_EDGES = ((0, 1), (1, 2), (2, 0))
+
+
+def triangle_distances(ta: np.ndarray, tb: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Distance and closest points for each triangle pair; ta, tb are (n, 3, 3). Intersecting pairs are 0."""
+    pa, pb = [], []
+    for i in range(3):
+        pa.append(ta[:, i]); pb.append(closest_points_on_triangles(ta[:, i], tb[:, 0], tb[:, 1], tb[:, 2]))
+        pb.append(tb[:, i]); pa.append(closest_points_on_triangles(tb[:, i], ta[:, 0], ta[:, 1], ta[:, 2]))
+    for i, j in _EDGES:
+        for k, m in _EDGES:
+            x, y = closest_points_on_segments(ta[:, i], ta[:, j], tb[:, k], tb[:, m])
+            pa.append(x); pb.append(y)
+    pa, pb = np.stack(pa), np.stack(pb)            # (candidates, n, 3)
+    d2 = np.einsum("kij,kij->ki", pa - pb, pa - pb)
+    # Crossing triangles touch at the point where an edge of one passes through the other
+    for edge_tri, other in ((ta, tb), (tb, ta)):
+        for i, j in _EDGES:
+            hit, point = segment_triangle_hits(edge_tri[:, i], edge_tri[:, j], other[:, 0], other[:, 1], other[:, 2])
+            if hit.any():
+                d2 = np.vstack([d2, np.where(hit, 0.0, np.inf)[None]])
+                pa = np.concatenate([pa, point[None]])
+                pb = np.concatenate([pb, point[None]])
+    best = np.argmin(d2, axis=0)
+    cols = np.arange(len(ta))
+    return np.sqrt(d2[best, cols]), pa[best, cols], pb[best, cols]
+
+
+# ==========================================
+# Queries
+# ==========================================
+def _box_distance2(lo_a, hi_a, lo_b, hi_b) -> float:
+    gap = np.maximum(0.0, np.maximum(lo_a - hi_b, lo_b - hi_a))
+    return float(gap @ gap)
+
+
+def mesh_distance(a: WorldMesh, b: WorldMesh, upper_bound: float = np.inf) -> Optional[MeshDistance]:
+    """Exact minimum distance between two placed meshes; None if either is empty or nothing beats upper_bound."""
+    if len(a) == 0 or len(b) == 0:
+        return None
+    ba, bb = a.bvh, b.bvh
+    best_d2 = float(upper_bound) ** 2 if np.isfinite(upper_bound) else np.inf
+    best = None
+    heap = [(_box_distance2(a.lo[0], a.hi[0], b.lo[0], b.hi[0]), 0, 0)]
+    while heap:
+        d2, i, j = heapq.heappop(heap)
+        if d2 >= best_d2:
+            break
+        leaf_i, leaf_j = ba.is_leaf(i), bb.is_leaf(j)
+        if leaf_i and leaf_j:
+            sa, na = ba.start[i], ba.count[i]
+            sb, nb = bb.start[j], bb.count[j]
+            ia = np.repeat(np.arange(sa, sa + na), nb)
+            ib = np.tile(np.arange(sb, sb + nb), na)
+            dist, pa, pb = triangle_distances(a.corners[ia], b.corners[ib])
+            k = int(np.argmin(dist))
+            if dist[k] ** 2 < best_d2:
+                best_d2 = float(dist[k]) ** 2
+                best = MeshDistance(float(dist[k]), tuple(pa[k].tolist()), tuple(pb[k].tolist()),
+                                    int(ba.order[ia[k]]), int(bb.order[ib[k]]))
+                if best_d2 == 0.0:
+                    break
+            continue
+        # Descend into the larger box (a leaf cannot be split)
+        if leaf_j or (not leaf_i and np.sum(a.hi[i] - a.lo[i]) >= np.sum(b.hi[j] - b.lo[j])):
+            for c in (ba.left[i], ba.right[i]):
+                heapq.heappush(heap, (_box_distance2(a.lo[c], a.hi[c], b.lo[j], b.hi[j]), int(c), j))
+        else:
+            for c in (bb.left[j], bb.right[j]):
+                heapq.heappush(heap, (_box_distance2(a.lo[i], a.hi[i], b.lo[c], b.hi[c]), i, int(c)))
+    return best
+
+
+def mesh_set_distance(meshes_a: Sequence[WorldMesh], meshes_b: Sequence[WorldMesh]) -> Optional[MeshDistance]:
+    """Minimum distance between two groups of meshes (e.g. all meshes under two selected prims)."""
+    pairs = []
+    for ia, a in enumerate(meshes_a):
+        for ib, b in enumerate(meshes_b):
+            if len(a) and len(b):
+                pairs.append((_box_distance2(a.lo[0], a.hi[0], b.lo[0], b.hi[0]), ia, ib))
+    pairs.sort()
+    best = None
+    for d2, ia, ib in pairs:
+        if best is not None and d2 >= best.distance ** 2:
+            break
+        r = mesh_distance(meshes_a[ia], meshes_b[ib], upper_bound=best.distance if best else np.inf)
+        if r is not None:
+            best = r._replace(mesh_a=ia, mesh_b=ib)
+            if best.distance == 0.0:
+                break
+    return best
@@ -0,0 +1,33 @@
+"""
+Smart Measure — clash detection pool worker entry point.
+
+clash.find_clashes 的 spawn process pool 以模組名稱 unpickle 工作函式。Kit 內 clash 以
+smart_measure.clash 載入，worker 若依此名稱 import 會連帶執行需要 Kit 的套件 __init__；
+因此 worker 的進入點放在這個名稱唯一的頂層模組：
+
+  - 主行程由 clash._worker_module() 以檔案路徑載入，不修改 sys.path
+  - worker 行程的 initializer (site.addsitedir) 只在 worker 內把這個資料夾加入 sys.path，
+    之後才 import 本模組與 clash
+
+每個 worker 第一次收到工作時對應 shared memory 中的世界座標三角形，之後重複使用。
+
+純 NumPy，不依賴 Omniverse。
+"""
+
+from typing import List, Tuple
+
+import numpy as np
+
+_WORKER = None   # (shared memory name, SharedMemory, _PartSet) in each pool process
+
+
+def test_chunk(shm_name: str, shape: Tuple[int, ...], offsets: np.ndarray, pairs: List[Tuple[int, int]]) -> list:
+    """Narrow-phase results [(i, j, result)] for a chunk of candidate pairs."""
+    global _WORKER
+    if _WORKER is None or _WORKER[0] != shm_name:
+        from multiprocessing import shared_memory
+        from clash import _PartSet      # worker process only: its sys.path has this folder
+        shm = shared_memory.SharedMemory(name=shm_name)
+        _WORKER = (shm_name, shm, _PartSet(np.ndarray(shape, dtype=np.float64, buffer=shm.buf), offsets))
+    parts = _WORKER[2]
+    return [(i, j, parts.test_pair(i, j)) for i, j in pairs]
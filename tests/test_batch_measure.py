@@ -0,0 +1,97 @@
+import csv
+import io
+import json
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("pxr")
+from pxr import Usd, UsdGeom
+
+# 把包含 batch_measure.py 的資料夾直接加到 sys.path
+EXT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'exts', 'tw.zin.smart_measure', 'smart_measure'))
+if EXT_DIR not in sys.path:
+    sys.path.insert(0, EXT_DIR)
+
+from batch_measure import find_matching_prims, main, measure_all_bounds, pattern_root, read_pairs
+from measure_logic import calculate_gap
+
+
+def _layout(tmp_path, robots=3):
+    """cm stage: /World/Line{1,2}/Robot_i cubes of size 20, 100 cm apart."""
+    path = str(tmp_path / "line.usda")
+    stage = Usd.Stage.CreateNew(path)
+    UsdGeom.SetStageMetersPerUnit(stage, 0.01)
+    UsdGeom.Xform.Define(stage, "/World")
+    for line in (1, 2):
+        UsdGeom.Xform.Define(stage, f"/World/Line{line}")
+        for i in range(robots):
+            cube = UsdGeom.Cube.Define(stage, f"/World/Line{line}/Robot_{i}")
+            cube.CreateSizeAttr(20.0)
+            cube.AddTranslateOp().Set((i * 100.0, line * 1000.0, 0.0))
+    UsdGeom.Cube.Define(stage, "/World/Line1/Robot_0/Gripper").CreateSizeAttr(1.0)
+    stage.GetRootLayer().Save()
+    return path
+
+
+def test_pairs_file_and_patterns():
+    assert read_pairs(io.StringIO("# robot vs rack\n/A,/B\n\n/C  /D  # same line\n")) == [("/A", "/B"), ("/C", "/D")]
+    with pytest.raises(ValueError):
+        read_pairs(io.StringIO("/A,/B,/C\n"))
+    assert pattern_root("/World/Line*/Robot_?") == "/World"
+    assert pattern_root("/World/Line1/Robot_0") == "/World/Line1/Robot_0"
+    assert pattern_root("/**/Robot_*") == "/"
+
+
+def test_pattern_matching_on_masked_stage(tmp_path):
+    path = _layout(tmp_path)
+    assert find_matching_prims(path, "/World/Line*/Robot_?") == [
+        "/World/Line1/Robot_0", "/World/Line1/Robot_1", "/World/Line1/Robot_2",
+        "/World/Line2/Robot_0", "/World/Line2/Robot_1", "/World/Line2/Robot_2"]
+    # `*` 不跨越 `/`；`**` 可以
+    assert find_matching_prims(path, "/World/*/Gripper") == []
+    assert find_matching_prims(path, "/World/**/Gripper") == ["/World/Line1/Robot_0/Gripper"]
+    assert find_matching_prims(path, "/Missing/*") == []
+
+
+def test_process_pool_matches_in_process(tmp_path, monkeypatch):
+    import batch_measure
+    path = _layout(tmp_path, robots=5)
+    paths = find_matching_prims(path, "/World/Line*/Robot_*") + ["/World/Nope"]
+    serial = measure_all_bounds(path, paths, jobs=1)
+    assert serial["/World/Nope"] is None
+    assert serial["/World/Line2/Robot_4"] == ((390.0, 1990.0, -10.0), (410.0, 2010.0, 10.0))
+    monkeypatch.setattr(batch_measure, "MIN_PATHS_PER_PROCESS", 2)
+    assert measure_all_bounds(path, paths, jobs=2) == serial
+
+
+def test_command_line_csv_and_json(tmp_path, capsys):
+    path = _layout(tmp_path)
+    pairs = tmp_path / "pairs.csv"
+    pairs.write_text("/World/Line1/Robot_0,/World/Line2/Robot_2\n")
+
+    out = tmp_path / "gaps.csv"
+    assert main([path, "--pairs", str(pairs), "--unit", "mm", "--out", str(out)]) == 0
+    with out.open() as f:
+        rows = list(csv.DictReader(f))
+    assert [r["kind"] for r in rows] == ["size", "size", "gap"]
+    assert rows[0]["x (mm)"] == "200.0"           # mm 預設 1 位小數
+    dx, dy, dz, dist = calculate_gap((-10, 990, -10), (10, 1010, 10), (190, 1990, -10), (210, 2010, 10))
+    assert float(rows[2]["distance (mm)"]) == pytest.approx(dist * 10, abs=0.05)
+    assert float(rows[2]["x (mm)"]) == pytest.approx(dx * 10)
+    assert float(rows[2]["clearance (mm)"]) == pytest.approx(((180 ** 2 + 980 ** 2) ** 0.5) * 10, abs=0.05)
+
+    # 同一條線上相鄰機器人淨空 80 cm，兩條線之間遠超過門檻
+    assert main([path, "--pattern", "/World/Line*/Robot_?", "--clearance", "90", "--format", "json", "--jobs", "1"]) == 0
+    report = json.loads(capsys.readouterr().out)
+    assert report["stage_unit"] == "cm" and report["unit"] == "cm" and report["precision"] == 2
+    gaps = [r for r in report["rows"] if r["kind"] == "gap"]
+    assert len([r for r in report["rows"] if r["kind"] == "size"]) == 6 and len(gaps) == 4
+    assert all(r["clearance"] == 80.0 and r["distance"] == 100.0 for r in gaps)
+
+    assert main([path, "--pair", "/World/Line1/Robot_0", "/World/Ghost"]) == 1
+    assert "/World/Ghost" in capsys.readouterr().err
+    assert main([path]) == 2
+    assert main([str(tmp_path / "missing.usda"), "--pattern", "/World/*"]) == 2
@@ -0,0 +1,116 @@
+import os
+import sys
+
+import pytest
+
+pxr = pytest.importorskip("pxr")
+from pxr import Gf, Sdf, Usd, UsdGeom
+
+# 把包含 bounds_cache.py 的資料夾直接加到 sys.path（不經過需要 omni 的 __init__）
+EXT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'exts', 'tw.zin.smart_measure', 'smart_measure'))
+if EXT_DIR not in sys.path:
+    sys.path.insert(0, EXT_DIR)
+
+from bounds_cache import WorldBoundsCache
+
+
+def _stage():
+    stage = Usd.Stage.CreateInMemory()
+    UsdGeom.Xform.Define(stage, "/World")
+    for line in ("A", "B"):
+        UsdGeom.Xform.Define(stage, f"/World/{line}")
+        for i in range(2):
+            cube = UsdGeom.Cube.Define(stage, f"/World/{line}/C{i}")
+            cube.CreateSizeAttr(2.0)
+            cube.AddTranslateOp().Set((i * 10.0, 0.0 if line == "A" else 50.0, 0.0))
+    return stage
+
+
+def _fresh_box(stage, path):
+    cache = UsdGeom.BBoxCache(Usd.TimeCode.Default(), [UsdGeom.Tokens.default_], useExtentsHint=False)
+    return cache.ComputeWorldBound(stage.GetPrimAtPath(path)).ComputeAlignedBox()
+
+
+def _fill(cache, stage):
+    for p in ("/World", "/World/A", "/World/A/C0", "/World/A/C1", "/World/B", "/World/B/C0", "/World/B/C1"):
+        prim = stage.GetPrimAtPath(p)
+        if prim:
+            cache.world_box(prim)
+
+
+def test_repeated_selection_hits_the_cache():
+    stage = _stage()
+    cache = WorldBoundsCache()
+    cache.attach(stage)
+    prim = stage.GetPrimAtPath("/World/A/C1")
+    box = cache.world_box(prim)
+    assert box.GetMin() == Gf.Vec3d(9, -1, -1) and box.GetMax() == Gf.Vec3d(11, 1, 1)
+    for _ in range(5):
+        assert cache.world_box(prim) == box
+    assert cache.computed == 1 and cache.hits == 5
+    # 回傳的是副本，呼叫端 UnionWith 不會改到快取
+    cache.world_box(prim).UnionWith(Gf.Vec3d(100, 100, 100))
+    assert cache.world_box(prim) == box
+
+
+def test_xform_change_drops_the_subtree_and_ancestors_only():
+    stage = _stage()
+    cache = WorldBoundsCache()
+    cache.attach(stage)
+    _fill(cache, stage)
+    UsdGeom.Xformable(stage.GetPrimAtPath("/World/A")).AddTranslateOp().Set((0.0, 0.0, 5.0))
+    assert len(cache) == 3                       # /World/B 子樹不受影響
+    assert Sdf.Path("/World/B/C1") in cache._entries
+    for p in ("/World", "/World/A", "/World/A/C0", "/World/B/C1"):
+        assert cache.world_box(stage.GetPrimAtPath(p)) == _fresh_box(stage, p)
+
+
+def test_geometry_and_visibility_changes():
+    stage = _stage()
+    cache = WorldBoundsCache()
+    cache.attach(stage)
+    _fill(cache, stage)
+    # 幾何屬性：自己與祖先失效，兄弟與其他子樹保留
+    UsdGeom.Cube(stage.GetPrimAtPath("/World/B/C0")).GetSizeAttr().Set(6.0)
+    assert sorted(str(p) for p in cache._entries) == ["/World/A", "/World/A/C0", "/World/A/C1", "/World/B/C1"]
+    assert cache.world_box(stage.GetPrimAtPath("/World/B")) == _fresh_box(stage, "/World/B")
+
+    # 不影響 bound 的屬性：什麼都不丟
+    before = len(cache)
+    UsdGeom.Gprim(stage.GetPrimAtPath("/World/A/C0")).CreateDisplayColorAttr([(1.0, 0.0, 0.0)])
+    stage.GetPrimAtPath("/World/A").CreateAttribute("zin:note", Sdf.ValueTypeNames.String).Set("x")
+    assert len(cache) == before
+
+    # visibility：整個子樹
+    UsdGeom.Imageable(stage.GetPrimAtPath("/World/A")).MakeInvisible()
+    assert not any(str(p).startswith("/World/A") for p in cache._entries)
+    assert cache.world_box(stage.GetPrimAtPath("/World")) == _fresh_box(stage, "/World/B")
+
+
+def test_inherited_purpose_drops_the_subtree():
+    stage = _stage()
+    cache = WorldBoundsCache()
+    cache.attach(stage)
+    _fill(cache, stage)
+    # purpose 會被子孫繼承：改在 /World/B 上，子孫 cube 都不再算 default purpose
+    UsdGeom.Imageable(stage.GetPrimAtPath("/World/B")).CreatePurposeAttr(UsdGeom.Tokens.guide)
+    assert sorted(str(p) for p in cache._entries) == ["/World/A", "/World/A/C0", "/World/A/C1"]
+    for p in ("/World", "/World/B/C0"):
+        assert cache.world_box(stage.GetPrimAtPath(p)) == _fresh_box(stage, p)
+    assert cache.world_box(stage.GetPrimAtPath("/World/B/C1")).IsEmpty()
+
+
+def test_resync_and_detach():
+    stage = _stage()
+    cache = WorldBoundsCache()
+    cache.attach(stage)
+    _fill(cache, stage)
+    stage.RemovePrim("/World/B/C1")
+    assert Sdf.Path("/World/B/C1") not in cache._entries and Sdf.Path("/World/A/C1") in cache._entries
+    assert cache.world_box(stage.GetPrimAtPath("/World/B")) == _fresh_box(stage, "/World/B")
+
+    cache.detach()
+    assert len(cache) == 0
+    _fill(cache, stage)
+    UsdGeom.Xformable(stage.GetPrimAtPath("/World")).AddTranslateOp().Set((1.0, 0.0, 0.0))
+    assert len(cache) == 6                       # 已停止監聽
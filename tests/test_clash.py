@@ -0,0 +1,100 @@
+import json
+import os
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+# 把包含 clash.py 的資料夾直接加到 sys.path
+EXT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'exts', 'tw.zin.smart_measure', 'smart_measure'))
+if EXT_DIR not in sys.path:
+    sys.path.insert(0, EXT_DIR)
+
+from clash import find_clashes, main, point_inside, triangles_intersect
+from mesh_distance import triangulate
+
+_CUBE_POINTS = np.array([(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0), (0, 0, 1), (1, 0, 1), (1, 1, 1), (0, 1, 1)], dtype=float)
+_CUBE_COUNTS = [4] * 6
+_CUBE_INDICES = [0, 3, 2, 1, 4, 5, 6, 7, 0, 1, 5, 4, 1, 2, 6, 5, 2, 3, 7, 6, 3, 0, 4, 7]
+
+
+def _cube(offset=(0.0, 0.0, 0.0), size=1.0):
+    return (_CUBE_POINTS * size + offset)[triangulate(_CUBE_COUNTS, _CUBE_INDICES)]
+
+
+def _sphere(center, radius=1.0, n=24):
+    th, ph = np.meshgrid(np.linspace(0, np.pi, n), np.linspace(0, 2 * np.pi, 2 * n))
+    points = np.stack([np.sin(th) * np.cos(ph), np.sin(th) * np.sin(ph), np.cos(th)], -1).reshape(-1, 3) * radius + center
+    idx = np.arange(2 * n * n).reshape(2 * n, n)
+    quads = np.stack([idx[:-1, :-1], idx[1:, :-1], idx[1:, 1:], idx[:-1, 1:]], -1).reshape(-1, 4)
+    return points[triangulate([4] * len(quads), quads.ravel())]
+
+
+def test_crossing_triangles_but_not_touching_ones():
+    a = np.array([[[0, 0, 0], [2, 0, 0], [0, 2, 0]]], dtype=float)
+    crossing = np.array([[[0.5, 0.5, -1], [0.5, 0.5, 1], [1.5, 1.5, 1]]], dtype=float)
+    resting = np.array([[[0.5, 0.5, 0], [0.5, 0.5, 1], [1.5, 1.5, 1]]], dtype=float)   # 頂點放在面上
+    coplanar = np.array([[[0.5, 0.5, 0], [3, 0.5, 0], [0.5, 3, 0]]], dtype=float)
+    hit, point = triangles_intersect(np.repeat(a, 3, axis=0), np.vstack([crossing, resting, coplanar]))
+    assert hit.tolist() == [True, False, False]
+    # 兩條邊各在 (0.5, 0.5, 0) 與 (1, 1, 0) 穿過 a
+    assert tuple(point[0]) in {(0.5, 0.5, 0.0), (1.0, 1.0, 0.0)}
+
+
+def test_overlapping_touching_and_separate_cubes():
+    parts = [_cube(), _cube((0.7, 0.2, 0.1)), _cube((1.0, 0.0, 0.0)), _cube((5.0, 0.0, 0.0))]
+    clashes = find_clashes(["/A", "/B", "/C", "/D"], parts)
+    # A–C 只是面貼面；D 在遠處
+    assert [(c.path_a, c.path_b) for c in clashes] == [("/B", "/C"), ("/A", "/B")]
+    b_c, a_b = clashes
+    assert a_b.depth == pytest.approx(0.3) and a_b.axis == pytest.approx((1.0, 0.0, 0.0))
+    assert b_c.depth == pytest.approx(0.7)
+    assert a_b.triangles > 0
+    assert find_clashes(["/A", "/B", "/C", "/D"], parts, min_depth=0.5) == [b_c]
+
+
+def test_contained_part_and_sphere_depth():
+    big, small = _cube((-2.0, -2.0, -2.0), size=10.0), _cube((0.25, 0.25, 0.25), size=0.5)
+    assert point_inside(big, (0.5, 0.5, 0.5)) and not point_inside(small, (2.0, 0.5, 0.5))
+    (c,) = find_clashes(["/Cabinet", "/Box"], [big, small])
+    assert c.triangles == 0 and c.point == pytest.approx((0.5, 0.5, 0.5))
+    assert c.depth == pytest.approx(2.75)          # 沿最近的一面推出去
+
+    # 兩個半徑 1、中心距 1.5 的球：最小分離距離 0.5
+    (c,) = find_clashes(["/S1", "/S2"], [_sphere((0, 0, 0), n=48), _sphere((1.5, 0, 0), n=48)])
+    assert c.depth == pytest.approx(0.5, abs=0.01) and c.axis == pytest.approx((1.0, 0.0, 0.0), abs=1e-6)
+
+
+def test_process_pool_matches_in_process():
+    rng = np.random.default_rng(5)
+    paths = [f"/World/P{i}" for i in range(12)]
+    parts = [_sphere(rng.uniform(0, 6, 3), radius=rng.uniform(0.5, 1.2), n=12) for _ in paths]
+    serial = find_clashes(paths, parts)
+    assert serial and find_clashes(paths, parts, processes=2) == serial
+
+
+def test_command_line_on_usd_file(tmp_path, capsys):
+    pytest.importorskip("pxr")
+    from pxr import Usd, UsdGeom
+
+    path = str(tmp_path / "layout.usda")
+    stage = Usd.Stage.CreateNew(path)
+    world = UsdGeom.Xform.Define(stage, "/World")
+    stage.SetDefaultPrim(world.GetPrim())
+    for name, offset in (("Robot", (0, 0, 0)), ("Conveyor", (0.8, 0, 0)), ("Rack", (10, 0, 0))):
+        UsdGeom.Xform.Define(stage, f"/World/{name}").AddTranslateOp().Set(offset)
+        mesh = UsdGeom.Mesh.Define(stage, f"/World/{name}/Body")
+        mesh.CreatePointsAttr([tuple(p) for p in _CUBE_POINTS])
+        mesh.CreateFaceVertexCountsAttr(_CUBE_COUNTS)
+        mesh.CreateFaceVertexIndicesAttr(_CUBE_INDICES)
+    stage.GetRootLayer().Save()
+
+    assert main([path, "--json", "--jobs", "1"]) == 1
+    report = json.loads(capsys.readouterr().out)
+    assert report["parts"] == 3
+    (c,) = report["clashes"]
+    assert (c["path_a"], c["path_b"]) == ("/World/Robot", "/World/Conveyor")
+    assert c["depth"] == pytest.approx(0.2)
+    assert main([path, "--root", "/World/Rack", "--jobs", "1"]) == 0
+    assert main([str(tmp_path / "missing.usda")]) == 2
@@ -0,0 +1,79 @@
+import io
+import os
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+# 把包含 clearance.py 的資料夾直接加到 sys.path
+EXT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'exts', 'tw.zin.smart_measure', 'smart_measure'))
+if EXT_DIR not in sys.path:
+    sys.path.insert(0, EXT_DIR)
+
+from clearance import aabb_distances, candidate_pairs, clearance_rows, sort_rows, write_csv
+
+
+def _brute_force(lo, hi, threshold):
+    pairs = []
+    for i in range(len(lo)):
+        for j in range(i + 1, len(lo)):
+            if aabb_distances(lo[i:i + 1], hi[i:i + 1], lo[j:j + 1], hi[j:j + 1])[0] <= threshold:
+                pairs.append([i, j])
+    return pairs
+
+
+def test_sweep_and_prune_matches_brute_force():
+    rng = np.random.default_rng(3)
+    lo = rng.uniform(0, 5000, (300, 3)) * (1, 1, 0)
+    hi = lo + rng.uniform(50, 200, (300, 3))
+    for threshold in (0.0, 80.0, 400.0):
+        assert candidate_pairs(lo, hi, threshold).tolist() == _brute_force(lo, hi, threshold)
+    assert candidate_pairs(lo[:1], hi[:1], 10.0).shape == (0, 2)
+
+
+def test_sparse_row_of_cabinets_only_pairs_neighbours():
+    # 300 個機櫃排成一列，間距 1000 (> 門檻 800)，只有每隔 10 個的維修通道較窄
+    n = 300
+    x = np.arange(n) * 1600.0
+    x[10::10] -= 300.0
+    lo = np.stack([x, np.zeros(n), np.zeros(n)], axis=1)
+    hi = lo + (600.0, 600.0, 2000.0)
+    pairs = candidate_pairs(lo, hi, 800.0)
+    assert len(pairs) == 29
+    assert all(j == i + 1 for i, j in pairs.tolist())
+
+
+def test_exact_distance_refines_candidates():
+    lo = np.array([[0, 0, 0], [1.5, 0, 0], [10, 0, 0]], dtype=float)
+    hi = lo + 1.0
+    calls = []
+
+    def exact(i, j):
+        calls.append((i, j))
+        # 實際外形比 AABB 窄：距離 = AABB 距離 + 0.4
+        return 0.9, (1.0, 0.5, 0.5), (1.9, 0.5, 0.5)
+
+    rows = clearance_rows(["/A", "/B", "/C"], lo, hi, threshold=1.0, exact=exact)
+    assert calls == [(0, 1)]
+    assert rows[0].distance == 0.9 and rows[0].exact
+    assert clearance_rows(["/A", "/B", "/C"], lo, hi, threshold=0.8, exact=exact) == []
+    # 沒有精確幾何時保留 AABB 距離
+    rows = clearance_rows(["/A", "/B", "/C"], lo, hi, threshold=1.0, exact=lambda i, j: None)
+    assert rows[0].distance == pytest.approx(0.5) and not rows[0].exact
+
+
+def test_sorting_and_csv():
+    lo = np.array([[0, 0, 0], [1.2, 0, 0], [2.3, 0, 0]], dtype=float)
+    hi = lo + 1.0
+    rows = clearance_rows(["/Z", "/Y", "/X"], lo, hi, threshold=5.0)
+    assert [r.distance for r in rows] == pytest.approx([0.1, 0.2, 1.3])
+    assert [r.path_a for r in sort_rows(rows, "path_a")] == ["/Y", "/Z", "/Z"]
+    assert sort_rows(rows, "distance", descending=True)[0].path_b == "/X"
+
+    out = io.StringIO()
+    write_csv(rows[:1], out, scale=10.0, unit="mm", precision=1)
+    assert out.getvalue().splitlines() == [
+        "prim_a,prim_b,distance (mm),method,ax,ay,az,bx,by,bz",
+        "/Y,/X,1.0,aabb,,,,,,",
+    ]
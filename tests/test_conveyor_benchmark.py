@@ -0,0 +1,64 @@
+import math
+import os
+import sys
+
+import pytest
+
+# 把包含 benchmark.py 的資料夾直接加到 sys.path
+EXT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'exts', 'tw.zin.smart_conveyor', 'smart_conveyor'))
+if EXT_DIR not in sys.path:
+    sys.path.insert(0, EXT_DIR)
+
+from benchmark import (compare_to_baseline, dispatch_interval_for_boards, generate_line_waypoints,
+                       path_travel_time, percentile, summarize)
+from config_lint import analyze_config
+
+
+def test_generated_line_is_lint_clean():
+    wps = generate_line_waypoints(12)
+    assert len(wps) == 12
+    cfg = {"prim_paths": "/World/PCB", "speed": 50.0, "dispatch_interval": 10.0, "waypoints": wps}
+    assert analyze_config(cfg)["issues"] == []
+
+
+def test_dispatch_interval_targets_board_count():
+    wps = generate_line_waypoints(5, spacing=100.0)
+    total = path_travel_time(wps, 50.0)
+    assert math.isclose(dispatch_interval_for_boards(wps, 50.0, 10) * 10, total)
+
+
+def test_percentile_and_summarize():
+    values = [1.0, 2.0, 3.0, 4.0]
+    assert percentile(values, 50) == 2.5
+    assert percentile(values, 100) == 4.0
+    s = summarize(values)
+    assert s["mean"] == 2.5 and s["max"] == 4.0
+    assert summarize([])["p95"] == 0.0
+
+
+def _result(name, p95, start_ms=10.0):
+    return {"name": name, "start_sim_ms": start_ms,
+            "spawner_ms": {"p50": 0.1, "p95": 0.2},
+            "controller_ms": {"p50": p95 / 2, "p95": p95},
+            "usd_changes_per_frame": {"mean": 30.0}}
+
+
+def test_compare_to_baseline_flags_only_real_regressions():
+    baseline = {"scenarios": [_result("N1_M10_K10", 2.0), _result("N10_M10_K10", 20.0)]}
+    current = {"scenarios": [
+        _result("N1_M10_K10", 2.1),                  # +5%: 在門檻內
+        _result("N10_M10_K10", 30.0, start_ms=50.0),  # +50%: regression
+        _result("N50_M10_K10", 99.0),                 # baseline 沒有：略過
+    ]}
+    regressions = compare_to_baseline(current, baseline, threshold=0.2)
+    assert {(r["scenario"], r["metric"]) for r in regressions} == {
+        ("N10_M10_K10", "controller_ms.p95"),
+        ("N10_M10_K10", "controller_ms.p50"),
+        ("N10_M10_K10", "start_sim_ms"),
+    }
+
+
+def test_noise_floor_ignores_tiny_absolute_changes():
+    baseline = {"scenarios": [_result("A", 0.01)]}
+    current = {"scenarios": [_result("A", 0.03)]}   # x3 但只差 0.02 ms
+    assert compare_to_baseline(current, baseline, threshold=0.2) == []
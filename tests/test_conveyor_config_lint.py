@@ -0,0 +1,138 @@
+import json
+import math
+import os
+import sys
+
+import pytest
+
+# 把包含 config_lint.py 的資料夾直接加到 sys.path
+EXT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'exts', 'tw.zin.smart_conveyor', 'smart_conveyor'))
+if EXT_DIR not in sys.path:
+    sys.path.insert(0, EXT_DIR)
+
+from config_lint import analyze_config, lint_paths, main
+
+
+def _codes(result):
+    return {i["code"] for i in result["issues"]}
+
+
+def _good_config(**overrides):
+    cfg = {
+        "prim_paths": "/World/PCB_A",
+        "speed": 50.0,
+        "dispatch_interval": 5.0,
+        "waypoints": [
+            {"name": "S", "pos": [0, 0, 0], "rot": [0, 0, 0], "pause": 0.0},
+            {"name": "M", "pos": [100, 0, 0], "rot": [0, 0, 0], "pause": 0.0},
+            {"name": "E", "pos": [200, 0, 0], "rot": [0, 0, 0], "pause": 0.0},
+        ],
+    }
+    cfg.update(overrides)
+    return cfg
+
+
+# ─── 單一設定檔 ──────────────────────────────────────────
+
+def test_clean_config_has_no_issues():
+    assert analyze_config(_good_config())["issues"] == []
+
+
+def test_nested_format_is_normalised():
+    cfg = {
+        "global_settings": {"speed": 50.0, "dispatch_interval": 5.0},
+        "target_pcb_paths": ["/World/PCB_A"],
+        "waypoints": _good_config()["waypoints"],
+    }
+    result = analyze_config(cfg)
+    assert result["issues"] == []
+    assert list(result["templates"]) == ["/World/PCB_A"]
+
+
+def test_zero_length_segment_and_duplicate_position():
+    wps = _good_config()["waypoints"] + [
+        {"pos": [200, 0, 0], "pause": 0.0},   # 與上一點重疊 → 零長度
+        {"pos": [100, 0, 0], "pause": 0.0},   # 與 wp[1] 重複
+    ]
+    result = analyze_config(_good_config(waypoints=wps))
+    by_code = {i["code"]: i for i in result["issues"]}
+    assert by_code["zero-length-segment"]["path"] == "$.waypoints[3]"
+    assert by_code["duplicate-position"]["path"] == "$.waypoints[4].pos"
+    assert by_code["zero-length-segment"]["severity"] == "error"
+    assert by_code["duplicate-position"]["severity"] == "error"
+
+
+def test_nan_position_is_error():
+    wps = _good_config()["waypoints"]
+    wps[1]["pos"] = [math.nan, 0, 0]
+    issue = [i for i in analyze_config(_good_config(waypoints=wps))["issues"] if i["code"] == "nan-position"][0]
+    assert issue["severity"] == "error"
+    assert issue["path"] == "$.waypoints[1].pos"
+
+
+def test_dispatch_shorter_than_first_segment_overlaps():
+    # 第一段 100 units @ 50/s = 2s，加上 1s 停留 → 需要 3s，發車間隔 2.5s 會重疊
+    wps = _good_config()["waypoints"]
+    wps[1]["pause"] = 1.0
+    result = analyze_config(_good_config(waypoints=wps, dispatch_interval=2.5))
+    assert "dispatch-overlap" in _codes(result)
+    assert "dispatch-overlap" not in _codes(analyze_config(_good_config(dispatch_interval=3.5)))
+
+
+def test_invalid_speed_and_too_few_waypoints():
+    result = analyze_config(_good_config(speed=0, waypoints=[{"pos": [0, 0, 0]}]))
+    assert {"invalid-speed", "too-few-waypoints"} <= _codes(result)
+
+
+def test_template_checks():
+    cfg = _good_config(
+        prim_paths="/World/PCB_A, World/NoSlash",
+        multi_lines=[{"enabled": True, "paths": "/World/PCB_A", "config_file": ""}],
+    )
+    result = analyze_config(cfg, known_prims={"/World/PCB_A"})
+    codes = _codes(result)
+    assert "invalid-template-path" in codes
+    assert "shared-template" in codes
+    assert "missing-config-file" in codes
+    assert "template-not-found" not in codes
+
+    missing = analyze_config(_good_config(), known_prims=set())
+    assert "template-not-found" in _codes(missing)
+
+
+# ─── 資料夾 / CLI ───────────────────────────────────────
+
+def test_lint_folder_reports_cross_file_conflicts(tmp_path):
+    (tmp_path / "line_a.json").write_text(json.dumps(_good_config()), encoding="utf-8")
+    (tmp_path / "line_b.json").write_text(json.dumps(_good_config()), encoding="utf-8")
+    (tmp_path / "broken.json").write_text("{not json", encoding="utf-8")
+
+    issues = lint_paths([str(tmp_path)], jobs=2)
+    codes = [i["code"] for i in issues]
+    assert codes.count("shared-template-across-files") == 2
+    assert "invalid-json" in codes
+    # --jobs 0 / 負數：在行程內執行，結果相同
+    assert lint_paths([str(tmp_path)], jobs=0) == issues
+    assert lint_paths([str(tmp_path)], jobs=-3) == issues
+
+
+def test_main_exit_status(tmp_path, capsys):
+    good = tmp_path / "good.json"
+    good.write_text(json.dumps(_good_config()), encoding="utf-8")
+    assert main([str(good)]) == 0
+
+    bad = tmp_path / "bad.json"
+    bad.write_text(json.dumps(_good_config(speed=-1)), encoding="utf-8")
+    assert main([str(bad), "--jobs", "1"]) == 1
+    assert "invalid-speed" in capsys.readouterr().out
+
+    # 板子重疊在 Play 時才會出錯：不需要 --strict 也要擋下
+    overlap = tmp_path / "overlap.json"
+    overlap.write_text(json.dumps(_good_config(dispatch_interval=1.0)), encoding="utf-8")
+    assert main([str(overlap)]) == 1
+
+    warn = tmp_path / "warn.json"
+    zones = [{"name": "Z", "start": 50, "end": 60}, {"name": "Z", "start": 70, "end": 80}]
+    warn.write_text(json.dumps(_good_config(trigger_zones=zones)), encoding="utf-8")
+    assert main([str(warn)]) == 0
+    assert main([str(warn), "--strict"]) == 1
@@ -0,0 +1,108 @@
+import os
+import random
+import sys
+
+import pytest
+
+# 把包含 trigger_zones.py 的資料夾直接加到 sys.path
+EXT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'exts', 'tw.zin.smart_conveyor', 'smart_conveyor'))
+if EXT_DIR not in sys.path:
+    sys.path.insert(0, EXT_DIR)
+
+from trigger_zones import ZoneIndex, ZoneTracker, build_trigger_zones, cumulative_arc_lengths
+from config_lint import analyze_config
+
+
+WAYPOINTS = [
+    {"name": "S", "pos": [0, 0, 0]},
+    {"name": "AOI", "pos": [100, 0, 0]},
+    {"name": "E", "pos": [100, 50, 0]},
+]
+
+
+def _recorder():
+    events = []
+    return events, lambda kind, zone, s: events.append((kind, zone["name"]))
+
+
+# ─── arc length / zone 建立 ─────────────────────────────
+
+def test_cumulative_arc_lengths():
+    assert cumulative_arc_lengths(WAYPOINTS) == [0.0, 100.0, 150.0]
+
+
+def test_build_trigger_zones_from_range_and_waypoint():
+    zones = build_trigger_zones([
+        {"name": "Belt", "start": 20, "end": 80},
+        {"name": "Unload", "waypoint": "E"},
+        {"name": "Inverted", "start": 90, "end": 60},
+        {"name": "Missing", "waypoint": "NOPE"},
+    ], WAYPOINTS)
+    by_name = {z["name"]: (z["start"], z["end"]) for z in zones}
+    assert by_name == {"Belt": (20.0, 80.0), "Unload": (150.0, 150.0), "Inverted": (60.0, 90.0)}
+
+
+# ─── ZoneIndex 查詢 ─────────────────────────────────────
+
+def test_zone_index_matches_brute_force():
+    rng = random.Random(7)
+    zones = []
+    for i in range(200):
+        a = rng.uniform(0, 1000)
+        zones.append({"name": f"Z{i}", "start": a, "end": a + rng.uniform(0, 50)})
+    index = ZoneIndex(zones)
+    for _ in range(200):
+        lo = rng.uniform(-10, 1010)
+        hi = lo + rng.uniform(0, 30)
+        got = {index.zones[i]["name"] for i in index.query(lo, hi)}
+        want = {z["name"] for z in zones if z["start"] <= hi and z["end"] >= lo}
+        assert got == want
+
+
+def test_zone_index_empty():
+    assert ZoneIndex([]).query(0, 100) == []
+
+
+# ─── ZoneTracker enter / exit ───────────────────────────
+
+def test_tracker_enter_and_exit():
+    events, emit = _recorder()
+    tracker = ZoneTracker(ZoneIndex([{"name": "AOI", "start": 10, "end": 20}]), emit)
+    for s in (0, 5, 12, 18, 25):
+        tracker.update(s)
+    assert events == [("enter", "AOI"), ("exit", "AOI")]
+
+
+def test_tracker_fast_board_passes_whole_zone_in_one_frame():
+    events, emit = _recorder()
+    tracker = ZoneTracker(ZoneIndex([{"name": "Eye", "start": 50, "end": 50}]), emit)
+    tracker.update(0)
+    tracker.update(120)
+    assert events == [("enter", "Eye"), ("exit", "Eye")]
+
+
+def test_tracker_reverse_direction_and_reset():
+    events, emit = _recorder()
+    tracker = ZoneTracker(ZoneIndex([{"name": "AOI", "start": 10, "end": 20}]), emit)
+    tracker.update(30)
+    tracker.update(15)
+    assert tracker.inside == ["AOI"]
+    tracker.reset()
+    assert events == [("enter", "AOI"), ("exit", "AOI")]
+    assert tracker.inside == []
+
+
+# ─── linter 整合 ───────────────────────────────────────
+
+def test_linter_checks_trigger_zones():
+    cfg = {
+        "speed": 50.0, "dispatch_interval": 5.0, "prim_paths": "/World/PCB",
+        "waypoints": WAYPOINTS,
+        "trigger_zones": [
+            {"name": "Unload", "waypoint": "E"},
+            {"name": "Far", "start": 500, "end": 600},
+            {"name": "Ghost", "waypoint": "X"},
+        ],
+    }
+    codes = {i["code"] for i in analyze_config(cfg)["issues"]}
+    assert codes == {"zone-outside-path", "unknown-zone-waypoint"}
@@ -0,0 +1,73 @@
+import os
+import sys
+
+import pytest
+
+pxr = pytest.importorskip("pxr")
+from pxr import Gf, Usd, UsdGeom
+
+# 把包含 hud_anchor.py 的資料夾直接加到 sys.path（不經過需要 omni 的 __init__）
+EXT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'exts', 'tw.zin.smart_hud', 'smart_hud'))
+if EXT_DIR not in sys.path:
+    sys.path.insert(0, EXT_DIR)
+
+from hud_anchor import AnchorBatch, affects_bounds
+
+
+def _per_prim_anchor(prim, z_offset):
+    """原本的做法：每個 prim 各建一個 BBoxCache。"""
+    cache = UsdGeom.BBoxCache(Usd.TimeCode.Default(), [UsdGeom.Tokens.default_, UsdGeom.Tokens.render])
+    box = cache.ComputeWorldBound(prim).ComputeAlignedBox()
+    lo, hi = box.GetMin(), box.GetMax()
+    return Gf.Vec3d((lo[0] + hi[0]) / 2.0, (lo[1] + hi[1]) / 2.0, hi[2] + z_offset)
+
+
+def _stage():
+    stage = Usd.Stage.CreateInMemory()
+    line = UsdGeom.Xform.Define(stage, "/World/Line")
+    line.AddTranslateOp().Set((1000, 0, 0))
+    line.AddRotateZOp().Set(30.0)
+    for i in range(3):
+        machine = UsdGeom.Xform.Define(stage, f"/World/Line/M{i}")
+        machine.AddTranslateOp().Set((i * 300.0, 50.0, 0.0))
+        machine.AddRotateXYZOp().Set((0.0, 15.0 * i, 45.0))
+        cube = UsdGeom.Cube.Define(stage, f"/World/Line/M{i}/Body")
+        cube.CreateSizeAttr(100.0)
+        cube.AddTranslateOp().Set((0, 0, 50.0 + i))
+    UsdGeom.Xform.Define(stage, "/World/Empty").AddTranslateOp().Set((5, 6, 7))
+    return stage
+
+
+def test_shared_batch_matches_per_prim_world_bounds():
+    stage = _stage()
+    batch = AnchorBatch(z_offset=80.0)
+    for i in range(3):
+        prim = stage.GetPrimAtPath(f"/World/Line/M{i}")
+        anchor = batch.world_anchor(prim, batch.local_bound(prim))
+        want = _per_prim_anchor(prim, 80.0)
+        assert Gf.IsClose(anchor, want, 1e-6)
+    # 沒有幾何的 prim 放在原點上方
+    empty = stage.GetPrimAtPath("/World/Empty")
+    assert Gf.IsClose(batch.world_anchor(empty, batch.local_bound(empty)), Gf.Vec3d(5, 6, 87), 1e-9)
+
+
+def test_cached_local_bound_follows_transform_only_changes():
+    stage = _stage()
+    prim = stage.GetPrimAtPath("/World/Line/M1")
+    local = AnchorBatch().local_bound(prim)
+
+    # 只移動 prim 本身 (例如播放中的動畫)：local bound 仍然有效
+    UsdGeom.Xformable(prim).GetOrderedXformOps()[0].Set((123.0, -40.0, 10.0))
+    batch = AnchorBatch(z_offset=80.0)
+    assert Gf.IsClose(batch.world_anchor(prim, local), _per_prim_anchor(prim, 80.0), 1e-6)
+    assert batch.bounds_computed == 0
+
+    # 幾何改變則需要重新計算 local bound
+    UsdGeom.Cube(stage.GetPrimAtPath("/World/Line/M1/Body")).GetSizeAttr().Set(400.0)
+    assert not Gf.IsClose(batch.world_anchor(prim, local), _per_prim_anchor(prim, 80.0), 1e-6)
+    assert Gf.IsClose(batch.world_anchor(prim, batch.local_bound(prim)), _per_prim_anchor(prim, 80.0), 1e-6)
+
+
+def test_bounds_attributes():
+    assert affects_bounds("points") and affects_bounds("visibility") and affects_bounds("size")
+    assert not affects_bounds("hud_content") and not affects_bounds("primvars:displayColor")
@@ -0,0 +1,104 @@
+import os
+import sys
+
+import pytest
+
+pxr = pytest.importorskip("pxr")
+from pxr import Sdf, Tf, Usd, UsdGeom
+
+# 把包含 hud_anchor_index.py 的資料夾直接加到 sys.path（不經過需要 omni 的 __init__）
+EXT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'exts', 'tw.zin.smart_hud', 'smart_hud'))
+if EXT_DIR not in sys.path:
+    sys.path.insert(0, EXT_DIR)
+
+from hud_anchor_index import AnchorIndex, is_xform_attribute
+
+
+def _stage():
+    """/World/Line/{M1, M2} 為 HUD prim，M1 底下有一個 Body cube；/World/Rack 與 HUD 無關。"""
+    stage = Usd.Stage.CreateInMemory()
+    UsdGeom.Xform.Define(stage, "/World")
+    UsdGeom.Xform.Define(stage, "/World/Line").AddTranslateOp().Set((0.0, 0.0, 0.0))
+    for name in ("M1", "M2"):
+        prim = UsdGeom.Xform.Define(stage, f"/World/Line/{name}").GetPrim()
+        prim.CreateAttribute("machine_type", Sdf.ValueTypeNames.String).Set("Machine")
+    UsdGeom.Cube.Define(stage, "/World/Line/M1/Body").CreateSizeAttr(1.0)
+    UsdGeom.Xform.Define(stage, "/World/Rack").AddTranslateOp().Set((0.0, 0.0, 0.0))
+    return stage
+
+
+class _Listener:
+    """與 extension 相同：把 ObjectsChanged 的路徑交給 AnchorIndex。"""
+
+    def __init__(self, stage, index):
+        self.index = index
+        self._key = Tf.Notice.Register(Usd.Notice.ObjectsChanged, self._on_changed, stage)
+
+    def _on_changed(self, notice, sender):
+        self.index.note([str(p) for p in notice.GetResyncedPaths()], [str(p) for p in notice.GetChangedInfoOnlyPaths()])
+
+    def Revoke(self):
+        self._key.Revoke()
+
+
+def _indexed(stage):
+    index = AnchorIndex()
+    for path in ("/World/Line/M1", "/World/Line/M2"):
+        index.add(path)
+    assert index.pop() == ({"/World/Line/M1", "/World/Line/M2"}, {"/World/Line/M1", "/World/Line/M2"})
+    return index, _Listener(stage, index)
+
+
+def test_ancestor_xform_moves_descendant_huds_without_touching_their_bounds():
+    stage = _stage()
+    index, listener = _indexed(stage)
+    UsdGeom.Xformable(stage.GetPrimAtPath("/World/Line")).GetOrderedXformOps()[0].Set((5.0, 0.0, 0.0))
+    assert index.pop() == ({"/World/Line/M1", "/World/Line/M2"}, set())
+
+    # 子孫移動：HUD 本身不動，但 local bound 改變
+    UsdGeom.Xformable(stage.GetPrimAtPath("/World/Line/M1/Body")).AddTranslateOp().Set((0.0, 0.0, 2.0))
+    assert index.pop() == ({"/World/Line/M1"}, {"/World/Line/M1"})
+    assert is_xform_attribute("xformOpOrder") and not is_xform_attribute("xformOpX")
+    listener.Revoke()
+
+
+def test_unrelated_changes_dirty_nothing():
+    stage = _stage()
+    index, listener = _indexed(stage)
+    UsdGeom.Xformable(stage.GetPrimAtPath("/World/Rack")).GetOrderedXformOps()[0].Set((9.0, 0.0, 0.0))
+    UsdGeom.Gprim(stage.GetPrimAtPath("/World/Line/M1/Body")).CreateDisplayColorAttr([(1.0, 0.0, 0.0)])
+    stage.GetPrimAtPath("/World/Line/M2").GetAttribute("machine_type").Set("Robot Station")
+    assert index.pop() == (set(), set())
+    listener.Revoke()
+
+
+def test_geometry_and_inherited_attributes():
+    stage = _stage()
+    index, listener = _indexed(stage)
+    UsdGeom.Cube(stage.GetPrimAtPath("/World/Line/M1/Body")).GetSizeAttr().Set(3.0)
+    assert index.pop() == ({"/World/Line/M1"}, {"/World/Line/M1"})
+    # purpose / visibility 由子孫繼承：祖先上的變更也讓子孫 HUD 的 local bound 失效
+    UsdGeom.Imageable(stage.GetPrimAtPath("/World/Line")).CreatePurposeAttr(UsdGeom.Tokens.guide)
+    assert index.pop() == ({"/World/Line/M1", "/World/Line/M2"}, {"/World/Line/M1", "/World/Line/M2"})
+    listener.Revoke()
+
+
+def test_resync_dirties_and_reindexes():
+    stage = _stage()
+    index, listener = _indexed(stage)
+    stage.RemovePrim("/World/Line/M2")
+    assert index.pop() == ({"/World/Line/M2"}, {"/World/Line/M2"})
+    # discovery 重新掃描 resync root 後以 remove / add 更新索引
+    index.remove("/World/Line/M2")
+    UsdGeom.Xform.Define(stage, "/World/Rack/M3").GetPrim().CreateAttribute(
+        "machine_type", Sdf.ValueTypeNames.String).Set("Machine")
+    assert index.pop() == (set(), set())      # 尚未被索引
+    index.add("/World/Rack/M3")
+    index.pop()
+
+    UsdGeom.Xformable(stage.GetPrimAtPath("/World/Line")).GetOrderedXformOps()[0].Set((1.0, 0.0, 0.0))
+    assert index.pop() == ({"/World/Line/M1"}, set())
+    UsdGeom.Xformable(stage.GetPrimAtPath("/World/Rack")).GetOrderedXformOps()[0].Set((1.0, 0.0, 0.0))
+    assert index.pop() == ({"/World/Rack/M3"}, set())
+    assert "/World/Line/M2" not in index and "/World/Rack/M3" in index
+    listener.Revoke()
@@ -0,0 +1,132 @@
+import os
+import sys
+
+import pytest
+
+pxr = pytest.importorskip("pxr")
+from pxr import Sdf, Usd, UsdGeom
+
+# 把包含 anim_cycle.py 的資料夾直接加到 sys.path（不經過需要 omni 的 __init__）
+EXT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'exts', 'tw.zin.smart_hud', 'smart_hud'))
+if EXT_DIR not in sys.path:
+    sys.path.insert(0, EXT_DIR)
+
+from anim_cycle import AnimCycleCache, combine_source_stats, find_animation_sources, scan_layer_time_samples
+
+
+def _animated_asset(start=0.0, end=48.0):
+    """匿名 layer (需保持強參照)：/Char 底下的 /Char/Arm 有 translate time samples。"""
+    layer = Sdf.Layer.CreateAnonymous(".usda")
+    asset = Usd.Stage.Open(layer)
+    UsdGeom.Xform.Define(asset, "/Char")
+    arm = UsdGeom.Xform.Define(asset, "/Char/Arm")
+    op = arm.AddTranslateOp()
+    op.Set((0, 0, 0), start)
+    op.Set((10, 0, 0), end)
+    return layer
+
+
+def _scene_referencing(asset_layer, offset=0.0, scale=1.0):
+    stage = Usd.Stage.CreateInMemory()
+    station = UsdGeom.Xform.Define(stage, "/World/Station").GetPrim()
+    station.GetReferences().AddReference(asset_layer.identifier, "/Char", Sdf.LayerOffset(offset, scale))
+    return stage, station
+
+
+def _detect(stage, prim, cache):
+    sources = find_animation_sources(stage, prim)
+    for s in cache.missing(sources):
+        cache.put(s, scan_layer_time_samples(s.layer, s.path), cache.version(s))
+    return combine_source_stats(sources, [cache.get(s) for s in sources], stage.GetRootLayer().identifier)
+
+
+def test_scan_reads_layer_time_samples_under_root_only():
+    layer = _animated_asset(5.0, 65.0)
+    stats = scan_layer_time_samples(layer, "/Char")
+    assert (stats["start"], stats["end"]) == (5.0, 65.0)
+    assert stats["samples_found"] == 1
+    assert scan_layer_time_samples(layer, "/Missing")["start"] is None
+
+
+def test_referenced_animation_with_layer_offset():
+    stage, station = _scene_referencing(_animated_asset(0.0, 48.0), offset=100.0, scale=0.5)
+    result = _detect(stage, station, AnimCycleCache())
+    assert result["status"] == "Success"
+    assert (result["start"], result["end"]) == pytest.approx((100.0, 124.0))
+
+
+def test_layer_time_codes_fallback_when_no_samples():
+    layer = Sdf.Layer.CreateAnonymous(".usda")
+    asset = Usd.Stage.Open(layer)
+    UsdGeom.Xform.Define(asset, "/Char")
+    asset.SetStartTimeCode(10)
+    asset.SetEndTimeCode(70)
+    stage, station = _scene_referencing(layer)
+    result = _detect(stage, station, AnimCycleCache())
+    assert result["status"] == "Success (Layer)"
+    assert (result["start"], result["end"]) == (10.0, 70.0)
+
+
+def test_cache_shared_between_huds_and_invalidated_by_layer_change():
+    asset = _animated_asset()
+    stage, station = _scene_referencing(asset)
+    other = UsdGeom.Xform.Define(stage, "/World/Station2").GetPrim()
+    other.GetReferences().AddReference(asset.identifier, "/Char")
+
+    cache = AnimCycleCache()
+    _detect(stage, station, cache)
+    # 第二個 HUD 參照同一個動畫來源：asset layer 不需要再掃描，只剩它自己在 root layer 的 spec
+    missing = cache.missing(find_animation_sources(stage, other))
+    assert [s.layer for s in missing] == [stage.GetRootLayer()]
+
+    cache.note_layer_changed(asset.identifier)
+    assert asset in [s.layer for s in cache.missing(find_animation_sources(stage, other))]
+
+
+def test_put_discards_results_scanned_before_a_layer_change():
+    asset = _animated_asset()
+    stage, station = _scene_referencing(asset)
+    cache = AnimCycleCache()
+    source = next(s for s in find_animation_sources(stage, station) if s.layer == asset)
+    before = cache.version(source)
+    stats = scan_layer_time_samples(source.layer, source.path)
+    cache.note_layer_changed(asset.identifier, serial=42)
+    assert not cache.put(source, stats, before)
+    assert cache.get(source) is None
+
+
+def test_waiters_start_only_one_scan_per_source():
+    asset = _animated_asset()
+    stage, station = _scene_referencing(asset)
+    source = find_animation_sources(stage, station)[0]
+    cache = AnimCycleCache()
+    assert cache.add_waiter(source, lambda s: None)
+    assert not cache.add_waiter(source, lambda s: None)
+    assert len(cache.pop_waiters(source)) == 2
+
+
+def test_root_layer_sources_are_invalidated_by_their_own_paths_only():
+    stage = Usd.Stage.CreateInMemory()
+    UsdGeom.Xform.Define(stage, "/World")
+    op = UsdGeom.Xform.Define(stage, "/World/Robot").AddTranslateOp()
+    op.Set((0, 0, 0), 0.0)
+    op.Set((5, 0, 0), 30.0)
+    conveyor = UsdGeom.Xform.Define(stage, "/World/Conveyor").AddTranslateOp()
+    robot = stage.GetPrimAtPath("/World/Robot")
+    cache = AnimCycleCache()
+    assert _detect(stage, robot, cache)["end"] == 30.0
+    (source,) = find_animation_sources(stage, robot)
+    local = [layer.identifier for layer in stage.GetLayerStack()]
+
+    # 輸送帶每幀寫 root layer 的其他路徑：不失效
+    conveyor.Set((1, 0, 0))
+    assert cache.note_paths_changed([Sdf.Path("/World/Conveyor.xformOp:translate")], local) == 0
+    assert cache.get(source) is not None
+    # 來源子樹內的編輯、或祖先 resync：失效
+    assert cache.note_paths_changed([Sdf.Path("/World/Robot.xformOp:translate")], local) == 1
+    assert cache.get(source) is None
+    assert _detect(stage, robot, cache)["end"] == 30.0
+    assert cache.note_paths_changed([Sdf.Path("/World")], local) == 1
+    # 不在 layer stack 內 (被參照) 的 layer 不以路徑失效
+    assert _detect(stage, robot, cache)["end"] == 30.0
+    assert cache.note_paths_changed([Sdf.Path("/World/Robot.xformOp:translate")], ["other.usda"]) == 0
@@ -0,0 +1,74 @@
+import os
+import sys
+
+import pytest
+
+pxr = pytest.importorskip("pxr")
+from pxr import Sdf, Tf, Usd, UsdGeom
+
+# 把包含 hud_authoring.py 的資料夾直接加到 sys.path（不經過需要 omni 的 __init__）
+EXT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'exts', 'tw.zin.smart_hud', 'smart_hud'))
+if EXT_DIR not in sys.path:
+    sys.path.insert(0, EXT_DIR)
+
+from hud_authoring import author_attributes, collect_targets, hud_attribute_values, restore_specs, snapshot_specs
+
+
+def _assembly():
+    # 組件來自另一個 layer (reference)，在 root layer 上只會寫入 over
+    asset = Sdf.Layer.CreateAnonymous(".usda")
+    asset_stage = Usd.Stage.Open(asset)
+    UsdGeom.Xform.Define(asset_stage, "/Asm")
+    for i in range(3):
+        UsdGeom.Mesh.Define(asset_stage, f"/Asm/Station_{i}/Body")
+        UsdGeom.Cube.Define(asset_stage, f"/Asm/Station_{i}/Bolt")
+    UsdGeom.Mesh.Define(asset_stage, "/Asm/Frame")
+    asset_stage.GetRootLayer().defaultPrim = "Asm"
+
+    root = Sdf.Layer.CreateAnonymous(".usda")
+    stage = Usd.Stage.Open(root)
+    stage.DefinePrim("/World/Line", "Xform").GetReferences().AddReference(asset.identifier)
+    existing = stage.GetPrimAtPath("/World/Line/Frame").CreateAttribute("hud_content", Sdf.ValueTypeNames.String)
+    existing.Set("old")
+    return stage, root, asset
+
+
+def test_collect_targets_filters_by_type_and_pattern():
+    stage, _, _asset = _assembly()
+    assert len(collect_targets(stage, ["/World/Line"])) == 4
+    assert collect_targets(stage, ["/World/Line"], path_pattern="*/Station_*") == [
+        "/World/Line/Station_0/Body", "/World/Line/Station_1/Body", "/World/Line/Station_2/Body"]
+    assert len(collect_targets(stage, ["/World/Line"], type_names=("Mesh", "Cube"))) == 7
+    # 不展開，或沒有符合類型的子孫時保留選取項本身
+    assert collect_targets(stage, ["/World/Line"], expand_children=False) == ["/World/Line"]
+    assert collect_targets(stage, ["/World/Line/Station_0/Bolt", "/Missing"]) == ["/World/Line/Station_0/Bolt"]
+
+
+def test_bulk_authoring_sends_one_notice_and_restores():
+    stage, root, _asset = _assembly()
+    before = root.ExportToString()
+    targets = collect_targets(stage, ["/World/Line"])
+    plan = {p: hud_attribute_values("Machine", "S01", "Chassis", "Process:", cycle_frames=i) for i, p in enumerate(targets)}
+
+    notices = []
+    listener = Tf.Notice.Register(Usd.Notice.ObjectsChanged, lambda n, s: notices.append(n), stage)
+    try:
+        snapshot = snapshot_specs(root, plan)
+        assert author_attributes(root, plan) == 4
+    finally:
+        listener.Revoke()
+    assert len(notices) == 1
+
+    frame = stage.GetPrimAtPath("/World/Line/Frame")
+    assert frame.GetAttribute("machine_type").Get() == "Machine"
+    assert frame.GetAttribute("hud_content").Get() == "Chassis"
+    assert stage.GetPrimAtPath(targets[2]).GetAttribute("hud_custom_cycle_length").Get() == 2
+    attr = frame.GetAttribute("aif:core:modelNumber")
+    assert attr.GetCustomData()["omni"]["kit"]["locked"] is True
+    assert attr.GetDocumentation().endswith("[AIF-MANAGED]")
+
+    # 既有的 spec 還原成原本的值，新建的 spec 與 over 全部移除
+    restore_specs(root, snapshot)
+    assert frame.GetAttribute("hud_content").Get() == "old"
+    assert not frame.GetAttribute("machine_type")
+    assert root.ExportToString() == before
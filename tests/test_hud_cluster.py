@@ -0,0 +1,90 @@
+import math
+import os
+import sys
+
+import pytest
+
+# 把包含 hud_cluster.py 的資料夾直接加到 sys.path（不經過需要 omni 的 __init__）
+EXT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'exts', 'tw.zin.smart_hud', 'smart_hud'))
+if EXT_DIR not in sys.path:
+    sys.path.insert(0, EXT_DIR)
+
+from hud_cluster import (LOD_COMPACT, LOD_FULL, LOD_ICON, ScreenClusterer, project_to_screen,
+                         projected_size_px, select_lod, summarize_cluster)
+
+
+def _view_proj_looking_down_x(fov_deg=90.0, near=1.0, far=1e5):
+    """相機在原點、看向 +X、Z-up 的 view * projection（row-vector 慣例）。"""
+    view = [[0, 0, -1, 0], [-1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 0, 1]]
+    f = 1.0 / math.tan(math.radians(fov_deg) / 2.0)
+    proj = [
+        [f, 0, 0, 0],
+        [0, f, 0, 0],
+        [0, 0, (far + near) / (near - far), -1],
+        [0, 0, 2 * far * near / (near - far), 0],
+    ]
+    return [[sum(view[r][k] * proj[k][c] for k in range(4)) for c in range(4)] for r in range(4)]
+
+
+# ─── 投影與 LOD ─────────────────────────────────────────
+
+def test_project_to_screen_center_and_behind_camera():
+    vp = _view_proj_looking_down_x()
+    x, y, w = project_to_screen(vp, (100.0, 0.0, 0.0), 800, 600)
+    assert (x, y) == pytest.approx((400.0, 300.0))
+    assert w == pytest.approx(100.0)
+    # +Y 世界座標在畫面左側、+Z 在上方
+    x, y, _ = project_to_screen(vp, (100.0, 50.0, 50.0), 800, 600)
+    assert x < 400.0 and y < 300.0
+    assert project_to_screen(vp, (-100.0, 0.0, 0.0), 800, 600) is None
+
+
+def test_projected_size_shrinks_with_distance_and_selects_lod():
+    near = projected_size_px(35.0, 100.0, 1.0, 600)
+    far = projected_size_px(35.0, 1000.0, 1.0, 600)
+    assert near == pytest.approx(105.0) and far == pytest.approx(10.5)
+    assert select_lod(near, 24.0, 12.0) == LOD_FULL
+    assert select_lod(15.0, 24.0, 12.0) == LOD_COMPACT
+    assert select_lod(far, 24.0, 12.0) == LOD_ICON
+
+
+# ─── Summary badge ──────────────────────────────────────
+
+def test_summarize_cluster_worst_status_and_mean_progress():
+    s = summarize_cluster(["PASS", "FAIL", "IDLE", None], [None, 20.0, None, 60.0])
+    assert s == {"count": 4, "worst_status": "FAIL", "mean_progress": 40.0}
+    s = summarize_cluster(["IDLE", "MOVING"], [None, None])
+    assert s["worst_status"] == "MOVING" and s["mean_progress"] is None
+
+
+# ─── ScreenClusterer ────────────────────────────────────
+
+def test_clusterer_groups_same_cell_and_tracks_dirty_cells():
+    c = ScreenClusterer(cell_px=100.0)
+    c.update("a", (10, 10))
+    c.update("b", (90, 50))
+    c.update("c", (310, 10))
+    assert c.clusters() == {(0, 0): {"a", "b"}}
+    assert c.is_clustered("a") and not c.is_clustered("c")
+    assert sorted(c.pop_dirty()) == [(0, 0), (3, 0)]
+
+    # 在同一格內移動不產生 dirty cell
+    c.update("a", (20, 20))
+    assert c.pop_dirty() == []
+
+    # 換格只影響新舊兩格
+    c.update("b", (320, 20))
+    assert sorted(c.pop_dirty()) == [(0, 0), (3, 0)]
+    assert c.clusters() == {(3, 0): {"b", "c"}}
+    assert not c.is_clustered("a")
+
+
+def test_clusterer_retain_drops_culled_huds():
+    c = ScreenClusterer(cell_px=100.0)
+    for key in ("a", "b", "c"):
+        c.update(key, (5, 5))
+    c.pop_dirty()
+    c.retain({"a"})
+    assert len(c) == 1
+    assert c.clusters() == {}
+    assert c.pop_dirty() == [(0, 0)]
@@ -0,0 +1,72 @@
+import os
+import sys
+
+import pytest
+
+# 把包含 hud_discovery.py 的資料夾直接加到 sys.path（不經過需要 omni 的 __init__）
+EXT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'exts', 'tw.zin.smart_hud', 'smart_hud'))
+if EXT_DIR not in sys.path:
+    sys.path.insert(0, EXT_DIR)
+
+from hud_discovery import DiscoveryTracker, collapse_roots, is_under, split_property_path
+
+
+def test_split_property_path_and_is_under():
+    assert split_property_path("/World/A.machine_type") == ("/World/A", "machine_type")
+    assert split_property_path("/World/A.aif:core:modelNumber") == ("/World/A", "aif:core:modelNumber")
+    assert split_property_path("/World/A") == ("/World/A", "")
+    assert is_under("/World/A/B", "/World/A") and is_under("/World/A", "/World/A")
+    assert not is_under("/World/AB", "/World/A")
+    assert is_under("/anything", "/")
+
+
+def test_collapse_roots_drops_nested_paths():
+    assert collapse_roots(["/World/A/B", "/World/A", "/World/C", "/World/A/B/C"]) == ["/World/A", "/World/C"]
+    assert collapse_roots(["/World/X", "/"]) == ["/"]
+
+
+def test_tracker_classifies_resyncs_and_hud_attribute_edits():
+    t = DiscoveryTracker()
+    assert not t
+    t.note(
+        resynced=["/World/Line1", "/World/M2.machine_type", "/World/M3.points"],
+        changed_info_only=["/World/M4.hud_content", "/World/M5.xformOp:translate", "/World/Line1/M6.hud_sub_title"],
+    )
+    assert t
+    roots, updated = t.pop()
+    assert roots == ["/World/Line1"]
+    # M6 在 resync root 之下，會隨子樹重新掃描；M3 / M5 不是 HUD 屬性
+    assert updated == ["/World/M2", "/World/M4"]
+    assert not t and t.pop() == ([], [])
+
+
+pxr = pytest.importorskip("pxr")
+from pxr import Sdf, Tf, Usd, UsdGeom
+
+
+def test_tracker_fed_by_real_usd_notices():
+    stage = Usd.Stage.CreateInMemory()
+    UsdGeom.Xform.Define(stage, "/World")
+    m1 = UsdGeom.Cube.Define(stage, "/World/M1").GetPrim()
+    tracker = DiscoveryTracker()
+
+    def _on_changed(notice, sender):
+        tracker.note((str(p) for p in notice.GetResyncedPaths()), (str(p) for p in notice.GetChangedInfoOnlyPaths()))
+
+    listener = Tf.Notice.Register(Usd.Notice.ObjectsChanged, _on_changed, stage)
+    try:
+        attr = m1.CreateAttribute("machine_type", Sdf.ValueTypeNames.String)
+        attr.Set("Machine")
+        m1.CreateAttribute("hud_content", Sdf.ValueTypeNames.String).Set("AOI")
+        UsdGeom.Xformable(m1).AddTranslateOp().Set((1, 2, 3))
+        assert tracker.pop() == ([], ["/World/M1"])
+
+        UsdGeom.Cube.Define(stage, "/World/Line/M2")
+        attr.Set("Robot Station")
+        roots, updated = tracker.pop()
+        assert roots == ["/World/Line"] and updated == ["/World/M1"]
+
+        stage.RemovePrim("/World/M1")
+        assert tracker.pop() == (["/World/M1"], [])
+    finally:
+        listener.Revoke()
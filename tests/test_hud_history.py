@@ -0,0 +1,78 @@
+import os
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+# 把包含 hud_history.py 的資料夾直接加到 sys.path（不經過需要 omni 的 __init__）
+EXT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'exts', 'tw.zin.smart_hud', 'smart_hud'))
+if EXT_DIR not in sys.path:
+    sys.path.insert(0, EXT_DIR)
+
+from hud_history import MetricHistory, TieredRing, downsample
+
+
+def test_ring_keeps_last_capacity_samples_in_order():
+    ring = TieredRing(capacity=5, tiers=1)
+    for i in range(12):
+        ring.push(i, i * 10.0)
+    rows = ring.tier(0)
+    assert rows[0].tolist() == [7, 8, 9, 10, 11]
+    assert rows[3].tolist() == [70.0, 80.0, 90.0, 100.0, 110.0]
+    assert ring.latest() == 110.0 and len(ring) == 5
+
+
+def test_tiers_hold_min_max_mean_of_buckets():
+    ring = TieredRing(capacity=4, tiers=3, factor=2)
+    values = [3, 1, 4, 1, 5, 9, 2, 6]
+    for t, v in enumerate(values):
+        ring.push(t, v)
+    t1 = ring.tier(1)
+    assert t1[0].tolist() == [0, 2, 4, 6]
+    assert t1[1].tolist() == [1, 1, 5, 2]
+    assert t1[2].tolist() == [3, 4, 9, 6]
+    assert t1[3].tolist() == [2.0, 2.5, 7.0, 4.0]
+    t2 = ring.tier(2)
+    assert t2[1].tolist() == [1, 2] and t2[2].tolist() == [4, 9] and t2[3].tolist() == [2.25, 5.5]
+
+
+def test_window_uses_coarser_tier_only_after_the_finer_one_wrapped():
+    ring = TieredRing(capacity=10, tiers=3, factor=4)
+    for t in range(8):
+        ring.push(t, t)
+    assert ring.window(100).shape[1] == 8           # tier 0 仍保有全部資料
+    for t in range(8, 200):
+        ring.push(t, t)
+    rows = ring.window(40)                           # tier 1：每列 4 個樣本
+    assert rows.shape[1] == 10 and rows[1][-1] == 196.0 and rows[2][-1] == 199.0
+
+
+def test_memory_is_fixed_per_metric():
+    hist = MetricHistory(capacity=64, tiers=3, factor=8, max_metrics=2)
+    assert hist.nbytes == 0
+    assert hist.set_current("progress", 50.0)
+    assert hist.set_current("temperature", "71.5")   # CSV 遙測值為字串
+    assert not hist.set_current("status", "RUN")
+    assert not hist.set_current("humidity", 40.0)     # 超過 max_metrics
+    size = hist.nbytes
+    for t in range(10000):
+        hist.set_current("progress", t % 100)
+        hist.sample(t)
+    assert hist.nbytes == size
+    assert hist.metrics() == ["progress", "temperature"] and hist.primary() == "progress"
+
+
+def test_sparkline_downsamples_to_fixed_points():
+    hist = MetricHistory(capacity=120)
+    for t in range(100):
+        hist.set_current("temperature", 20.0 + t)
+        hist.sample(t)
+    values, lo, hi = hist.sparkline("temperature", points=10)
+    assert len(values) == 10 and lo == 20.0 and hi == 119.0
+    assert values[0] == pytest.approx(np.mean(np.arange(20.0, 30.0)))
+    assert hist.sparkline("missing") is None
+
+    rows = np.array([np.arange(5.0), [1, 2, 3, 4, 5], [1, 2, 3, 4, 5], [1, 2, 3, 4, 5]])
+    lo, hi, mean = downsample(rows, 2)
+    assert lo.tolist() == [1, 3] and hi.tolist() == [2, 5] and mean.tolist() == [1.5, 4.0]
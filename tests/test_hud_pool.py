@@ -0,0 +1,99 @@
+import os
+import sys
+
+# 把包含 hud_pool.py 的資料夾直接加到 sys.path（不經過需要 omni 的 __init__）
+EXT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'exts', 'tw.zin.smart_hud', 'smart_hud'))
+if EXT_DIR not in sys.path:
+    sys.path.insert(0, EXT_DIR)
+
+from hud_pool import PanelContent, PanelPool
+
+
+def _pool(caps=None):
+    log = []
+
+    def factory(kind, hud_type):
+        panel = {"kind": kind, "type": hud_type, "owner": None}
+        log.append(("create", kind, hud_type))
+        return panel
+
+    def bind(panel, owner):
+        panel["owner"] = owner
+
+    def unbind(panel, owner):
+        panel["owner"] = None
+
+    def destroy(panel):
+        log.append(("destroy", panel["kind"], panel["type"]))
+
+    return PanelPool(factory, caps=caps, bind=bind, unbind=unbind, destroy=destroy), log
+
+
+def test_released_panels_are_rebound_not_rebuilt():
+    pool, log = _pool()
+    a = pool.acquire("collapsed", "Machine", "/World/A")
+    assert a["owner"] == "/World/A" and pool.panel_of("/World/A") is a
+    assert pool.acquire("collapsed", "Machine", "/World/A") is a   # already bound
+    pool.release("/World/A")
+    assert a["owner"] is None
+
+    b = pool.acquire("collapsed", "Machine", "/World/B")
+    assert b is a and b["owner"] == "/World/B"
+    assert [e for e in log if e[0] == "create"] == [("create", "collapsed", "Machine")]
+    # 不同類型不共用
+    c = pool.acquire("collapsed", "Robot Station", "/World/C")
+    assert c is not a
+    assert pool.stats()["reused"] == 1 and pool.stats()["created"] == 2
+
+
+def test_switching_kind_releases_previous_panel():
+    pool, _ = _pool()
+    collapsed = pool.acquire("collapsed", "Machine", "/A")
+    expanded = pool.acquire("expanded", "Machine", "/A")
+    assert expanded is not collapsed and collapsed["owner"] is None
+    assert pool.stats()["free"] == 1 and pool.stats()["in_use"] == 1
+
+
+def test_cap_evicts_idle_panels_of_other_types_then_denies():
+    pool, log = _pool(caps={"expanded": 2})
+    pool.acquire("expanded", "Machine", "/A")
+    pool.acquire("expanded", "Robot Station", "/B")
+    pool.release("/A")
+    # 到上限：淘汰閒置的 Machine 面板來建立 Human Station 面板
+    h = pool.acquire("expanded", "Human Station", "/C")
+    assert h is not None and ("destroy", "expanded", "Machine") in log
+    assert pool.stats()["live"]["expanded"] == 2
+    # 沒有閒置面板可淘汰時拒絕
+    assert pool.acquire("expanded", "Machine", "/D") is None
+    assert pool.stats()["denied"] == 1
+    # 其他 kind 不受影響
+    assert pool.acquire("icon", "Machine", "/D") is not None
+
+
+def test_prewarm_respects_cap_and_panels_iteration():
+    pool, _ = _pool(caps={"expanded": 3})
+    assert pool.prewarm("expanded", "Machine", 2) == 2
+    assert pool.prewarm("expanded", "Machine", 2) == 0
+    assert pool.prewarm("expanded", "Robot Station", 5) == 1
+    first = pool.acquire("expanded", "Machine", "/A")
+    assert pool.stats()["created"] == 3 and pool.stats()["reused"] == 1
+    assert len(list(pool.panels("expanded"))) == 3 and first in list(pool.panels())
+    pool.clear()
+    assert len(pool) == 0 and pool.panel_of("/A") is None
+
+
+def test_binding_a_pooled_panel_twice_does_not_rebuild_its_widgets():
+    log = []
+    content = PanelContent(build=lambda: log.append("build") or {"title": None},
+                           rebind=lambda handles, owner: handles.update(title=owner))
+    # 綁定早於 frame 第一次繪製：建立時直接顯示目前的 owner
+    content.bind("/World/A")
+    assert log == []
+    content.build()
+    assert content.handles["title"] == "/World/A"
+
+    content.unbind()
+    content.bind("/World/B")
+    content.bind("/World/C")
+    assert log == ["build"] and content.builds == 1
+    assert content.handles["title"] == "/World/C"
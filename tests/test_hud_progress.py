@@ -0,0 +1,57 @@
+import os
+import sys
+
+import pytest
+
+# 把包含 hud_progress.py 的資料夾直接加到 sys.path（不經過需要 omni 的 __init__）
+EXT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'exts', 'tw.zin.smart_hud', 'smart_hud'))
+if EXT_DIR not in sys.path:
+    sys.path.insert(0, EXT_DIR)
+
+from hud_progress import (RedrawCounter, fill_style, format_progress, label_style, pack_color, progress_color,
+                          quantize_progress)
+
+
+def test_quantize_progress_to_display_steps():
+    assert quantize_progress(37.26) == 37.5
+    assert quantize_progress(37.24) == 37.0
+    assert quantize_progress(-3.0) == 0.0 and quantize_progress(104.0) == 100.0
+    assert quantize_progress(12.34, step=0) == 12.34
+    assert format_progress(quantize_progress(99.99)) == "100.0%"
+
+
+def test_small_changes_collapse_to_one_redraw():
+    # 3 秒週期、60 fps：連續幀中量化值不變的幀不需重繪
+    values = [quantize_progress(100.0 - i * 100.0 / 900.0) for i in range(900)]
+    changes = sum(1 for a, b in zip(values, values[1:]) if a != b)
+    assert changes == 200
+
+
+def test_fill_styles_are_shared_per_colour_level():
+    assert fill_style(80.0) is fill_style(80.4)
+    assert fill_style(80.0) is not fill_style(20.0)
+    assert label_style(10) is label_style(10)
+    # 兩端顏色與 ui.color 相同的打包方式 (0xAABBGGRR)
+    assert fill_style(100.0)["background_color"] == 0xFF00FF00
+    assert fill_style(0.0)["background_color"] == 0xFF0000FF
+    assert pack_color(*progress_color(50.0)) == 0xFF00FFFF
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_redraw_counter_reports_rate_per_window():
+    clock = _Clock()
+    counter = RedrawCounter(window=1.0, clock=clock)
+    for i in range(30):
+        clock.now = i / 30.0
+        counter.note()
+    assert counter.rate() == 0.0          # 第一個視窗尚未結束
+    clock.now = 1.0
+    assert counter.rate() == pytest.approx(30.0)
+    assert counter.total == 30
@@ -0,0 +1,80 @@
+import os
+import sys
+
+import pytest
+
+# 把包含 hud_scheduler.py 的資料夾直接加到 sys.path（不經過需要 omni 的 __init__）
+EXT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'exts', 'tw.zin.smart_hud', 'smart_hud'))
+if EXT_DIR not in sys.path:
+    sys.path.insert(0, EXT_DIR)
+
+from hud_scheduler import FrameBudgetScheduler
+
+
+class _FakeClock:
+    """每個 work 花費固定時間的假時鐘。"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _scheduler(budget_ms=1.0, cost_ms=0.4, **kwargs):
+    clock = _FakeClock()
+    sched = FrameBudgetScheduler(budget_ms=budget_ms, clock=clock, **kwargs)
+    served = []
+
+    def work(key):
+        served.append(key)
+        clock.now += cost_ms / 1000.0
+
+    return sched, served, work
+
+
+def test_budget_defers_overflow_to_next_frame():
+    sched, served, work = _scheduler(budget_ms=1.0, cost_ms=0.4)
+    for k in range(5):
+        sched.mark_dirty(k)
+    assert sched.run(set(range(5)), work) == 3      # 0.4 + 0.4 + 0.4 >= 1.0
+    assert sched.stats()["deferred"] == 2
+    assert sched.run(set(range(5)), work) == 2
+    assert sorted(served) == list(range(5))
+    assert len(sched) == 0
+
+
+def test_at_least_one_refresh_even_if_over_budget():
+    sched, served, work = _scheduler(budget_ms=0.1, cost_ms=5.0)
+    sched.mark_dirty("a")
+    sched.mark_dirty("b")
+    assert sched.run({"a", "b"}, work) == 1
+    assert sched.run({"a", "b"}, work) == 1
+
+
+def test_culled_huds_stay_pending_until_visible():
+    sched, served, work = _scheduler()
+    sched.mark_dirty("hidden")
+    assert sched.run(set(), work) == 0
+    assert sched.is_dirty("hidden")
+    sched.run({"hidden"}, work)
+    assert served == ["hidden"]
+
+
+def test_round_robin_prefers_near_but_never_starves_far():
+    # 每幀只做得完一個 HUD，近的 HUD 每幀都變動
+    sched, served, work = _scheduler(budget_ms=0.1, cost_ms=1.0, near_distance=100.0)
+    distance = {"near": 10.0, "far": 5000.0}
+    for _ in range(200):
+        sched.mark_dirty("near")
+        sched.mark_dirty("far")
+        sched.run({"near", "far"}, work, distance.get)
+    assert served.count("near") > served.count("far") > 0
+
+
+def test_refresh_rate_metric_tracks_fraction_served():
+    sched, served, work = _scheduler(budget_ms=1.0, cost_ms=0.6, smoothing=1.0)
+    for k in range(4):
+        sched.mark_dirty(k)
+    sched.run(set(range(4)), work, dt=1.0 / 60.0)   # 4 個中服務 2 個
+    assert sched.refresh_rate_hz == pytest.approx(30.0)
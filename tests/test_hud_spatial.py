@@ -0,0 +1,84 @@
+import math
+import os
+import random
+import sys
+
+import pytest
+
+# 把包含 hud_spatial.py 的資料夾直接加到 sys.path（不經過需要 omni 的 __init__）
+EXT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'exts', 'tw.zin.smart_hud', 'smart_hud'))
+if EXT_DIR not in sys.path:
+    sys.path.insert(0, EXT_DIR)
+
+from hud_spatial import SpatialGrid, frustum_planes_from_matrix, point_in_frustum
+
+
+def _mat_mul(a, b):
+    return [[sum(a[r][k] * b[k][c] for k in range(4)) for c in range(4)] for r in range(4)]
+
+
+def _view_proj_looking_down_x(fov_deg=90.0, near=1.0, far=1e5):
+    """相機在原點、看向 +X、Z-up 的 view * projection（row-vector 慣例）。"""
+    # world -> camera：camera 看向 -Z，X_cam = -Y_world, Y_cam = Z_world, Z_cam = -X_world
+    view = [
+        [0, 0, -1, 0],
+        [-1, 0, 0, 0],
+        [0, 1, 0, 0],
+        [0, 0, 0, 1],
+    ]
+    f = 1.0 / math.tan(math.radians(fov_deg) / 2.0)
+    proj = [
+        [f, 0, 0, 0],
+        [0, f, 0, 0],
+        [0, 0, (far + near) / (near - far), -1],
+        [0, 0, 2 * far * near / (near - far), 0],
+    ]
+    return _mat_mul(view, proj)
+
+
+# ─── 視錐平面 ───────────────────────────────────────────
+
+def test_frustum_planes_accept_front_reject_back():
+    planes = frustum_planes_from_matrix(_view_proj_looking_down_x())
+    assert len(planes) == 6
+    assert point_in_frustum(planes, (100.0, 0.0, 0.0))
+    assert point_in_frustum(planes, (100.0, 90.0, 0.0))       # 45° 以內
+    assert not point_in_frustum(planes, (-100.0, 0.0, 0.0))   # 相機背後
+    assert not point_in_frustum(planes, (100.0, 200.0, 0.0))  # 超出左右視角
+    assert point_in_frustum(planes, (100.0, 105.0, 0.0), margin=10.0)
+
+
+# ─── SpatialGrid ───────────────────────────────────────
+
+def test_update_moves_between_cells_and_remove():
+    grid = SpatialGrid(cell_size=10.0)
+    grid.update("a", (1, 1, 1))
+    grid.update("a", (55, 1, 1))
+    assert len(grid) == 1
+    assert grid.position("a") == (55.0, 1.0, 1.0)
+    assert grid.query_sphere((0, 0, 0), 5.0) == []
+    assert grid.query_sphere((50, 0, 0), 10.0) == ["a"]
+    grid.remove("a")
+    assert len(grid) == 0 and "a" not in grid
+
+
+@pytest.mark.parametrize("cell_size", [50.0, 2000.0])
+def test_frustum_query_matches_brute_force(cell_size):
+    rng = random.Random(3)
+    grid = SpatialGrid(cell_size=cell_size)
+    points = {}
+    for i in range(500):
+        p = (rng.uniform(-3000, 3000), rng.uniform(-3000, 3000), rng.uniform(-200, 200))
+        points[i] = p
+        grid.update(i, p)
+
+    planes = frustum_planes_from_matrix(_view_proj_looking_down_x())
+    cam = (0.0, 0.0, 0.0)
+    max_d = 2500.0
+    got = set(grid.query_frustum(planes, cam, max_d))
+    want = {
+        k for k, p in points.items()
+        if math.dist(p, cam) <= max_d and point_in_frustum(planes, p)
+    }
+    assert got == want
+    assert 0 < len(got) < len(points) // 2
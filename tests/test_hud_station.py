@@ -0,0 +1,60 @@
+import os
+import sys
+
+# 把包含 hud_station.py 的資料夾直接加到 sys.path（不經過需要 omni 的 __init__）
+EXT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'exts', 'tw.zin.smart_hud', 'smart_hud'))
+if EXT_DIR not in sys.path:
+    sys.path.insert(0, EXT_DIR)
+
+from hud_station import StationProgressRouter
+
+
+def _event(wp, pos, board="/World/PCB_0", pause=10.0, elapsed=0.0, line="Line_A"):
+    return {"line_id": line, "prim_path": board, "waypoint": f"WP{wp}", "waypoint_index": wp,
+            "pos": pos, "pause": pause, "elapsed": elapsed}
+
+
+def _router():
+    router = StationProgressRouter(match_tolerance=100.0)
+    router.set_hud("/World/S01", (0.0, 0.0, 0.0))
+    router.set_hud("/World/S02", (500.0, 0.0, 0.0))
+    return router
+
+
+def test_events_route_to_the_nearest_hud_within_tolerance():
+    router = _router()
+    assert router.handle("arrived", _event(1, [480.0, 10.0, 0.0]), now=0.0) == "/World/S02"
+    assert router.handle("arrived", _event(2, [250.0, 0.0, 0.0]), now=0.0) is None
+    assert router.unmatched == 1
+    assert router.busy() == ["/World/S02"]
+    assert router.progress("/World/S01", now=0.0) == 100.0
+
+
+def test_progress_is_extrapolated_and_corrected_by_events():
+    router = _router()
+    router.handle("arrived", _event(0, [5.0, 0.0, 0.0]), now=100.0)
+    assert router.progress("/World/S01", now=102.5) == 75.0
+    # 輸送帶的 elapsed 校正 HUD 時鐘的漂移
+    router.handle("progress", _event(0, [5.0, 0.0, 0.0], elapsed=2.0), now=103.0)
+    assert router.progress("/World/S01", now=103.0) == 80.0
+    assert router.progress("/World/S01", now=200.0) == 0.0
+    router.handle("left", _event(0, [5.0, 0.0, 0.0], elapsed=10.0), now=108.0)
+    assert router.progress("/World/S01", now=108.0) == 100.0 and router.busy() == []
+
+
+def test_events_of_another_board_do_not_steal_the_station():
+    router = _router()
+    router.handle("arrived", _event(0, [0.0, 0.0, 0.0], board="/World/PCB_0"), now=0.0)
+    router.handle("progress", _event(0, [0.0, 0.0, 0.0], board="/World/PCB_1", elapsed=9.0), now=1.0)
+    router.handle("left", _event(0, [0.0, 0.0, 0.0], board="/World/PCB_1"), now=1.0)
+    assert router.progress("/World/S01", now=1.0) == 90.0
+
+
+def test_moving_or_removing_a_hud_re_resolves_stations():
+    router = _router()
+    assert router.resolve("Line_A", 0, (0.0, 0.0, 0.0)) == "/World/S01"
+    router.set_hud("/World/S01", (1000.0, 0.0, 0.0))
+    assert router.resolve("Line_A", 0, (0.0, 0.0, 0.0)) is None
+    router.remove_hud("/World/S02")
+    assert router.resolve("Line_A", 1, (500.0, 0.0, 0.0)) is None
+    assert len(router) == 1
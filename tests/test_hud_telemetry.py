@@ -0,0 +1,143 @@
+import json
+import os
+import sys
+import urllib.request
+
+import pytest
+
+# 把包含 telemetry.py 的資料夾直接加到 sys.path（不經過需要 omni 的 __init__）
+EXT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'exts', 'tw.zin.smart_hud', 'smart_hud'))
+if EXT_DIR not in sys.path:
+    sys.path.insert(0, EXT_DIR)
+
+from telemetry import (ConveyorZoneMetrics, FileTailSource, LocalHttpSource, ReplaySource, TelemetryHub,
+                       TelemetrySource, parse_lines)
+
+
+class _ListSource(TelemetrySource):
+    def __init__(self):
+        self.pending = []
+
+    def poll(self, now=None):
+        out, self.pending = self.pending, []
+        return out
+
+
+def test_parse_csv_coerces_numbers_and_jsonl_skips_bad_lines():
+    records, header = parse_lines(["id,status,defect_rate", "AOI-1,PASS,1.5", ""], "csv")
+    assert header == ["id", "status", "defect_rate"]
+    assert records == [{"id": "AOI-1", "status": "PASS", "defect_rate": 1.5}]
+    records, _ = parse_lines(['{"id": "R1", "state": "IDLE"}', "not json", "[1, 2]"], "jsonl")
+    assert records == [{"id": "R1", "state": "IDLE"}]
+
+
+def test_hub_maps_by_prim_path_or_machine_id_and_pushes_only_changes():
+    hub = TelemetryHub()
+    src = _ListSource()
+    hub.add_source(src)
+    hub.register_hud("/World/AOI", machine_id="AOI-1")
+    hub.register_hud("/World/Robot")
+
+    src.pending = [
+        {"id": "AOI-1", "status": "PASS", "defect_rate": 1.0},
+        {"prim_path": "/World/Robot", "state": "MOVING"},
+        {"id": "UNKNOWN", "status": "FAIL"},
+    ]
+    assert hub.poll() == {
+        "/World/AOI": {"status": "PASS", "defect_rate": 1.0},
+        "/World/Robot": {"state": "MOVING"},
+    }
+    assert hub.unmatched == 1
+
+    src.pending = [{"id": "AOI-1", "status": "PASS", "defect_rate": 2.0},
+                   {"prim_path": "/World/Robot", "state": "MOVING"}]
+    assert hub.poll() == {"/World/AOI": {"defect_rate": 2.0}}
+
+    hub.unregister_hud("/World/AOI")
+    src.pending = [{"id": "AOI-1", "status": "FAIL"}]
+    assert hub.poll() == {}
+
+
+def test_shared_machine_id_reaches_every_hud():
+    hub = TelemetryHub()
+    src = _ListSource()
+    hub.add_source(src)
+    # 批次寫入的 modelNumber：兩個 HUD 共用同一個 ID
+    hub.register_hud("/World/AOI_A", machine_id="AOI-X")
+    hub.register_hud("/World/AOI_B", machine_id="AOI-X")
+    assert hub.resolve("AOI-X") == ["/World/AOI_A", "/World/AOI_B"]
+
+    src.pending = [{"id": "AOI-X", "status": "PASS"}]
+    assert hub.poll() == {"/World/AOI_A": {"status": "PASS"}, "/World/AOI_B": {"status": "PASS"}}
+
+    # 移除其中一個不影響另一個
+    hub.unregister_hud("/World/AOI_A")
+    src.pending = [{"id": "AOI-X", "status": "FAIL"}]
+    assert hub.poll() == {"/World/AOI_B": {"status": "FAIL"}}
+    assert hub.unmatched == 0
+
+    hub.unregister_hud("/World/AOI_B")
+    src.pending = [{"id": "AOI-X", "status": "PASS"}]
+    assert hub.poll() == {} and hub.unmatched == 1
+
+
+def test_file_tail_reads_only_appended_complete_lines(tmp_path):
+    path = tmp_path / "feed.csv"
+    path.write_text("id,status\nAOI-1,OLD\n", encoding="utf-8")
+    src = FileTailSource(str(path))
+    src.start()
+    assert src.poll() == []                     # 既有資料不重播
+
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("AOI-1,PASS\nAOI-2,FA")         # 第二行尚未寫完
+    assert src.poll() == [{"id": "AOI-1", "status": "PASS"}]
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("IL\n")
+    assert src.poll() == [{"id": "AOI-2", "status": "FAIL"}]
+
+
+def test_replay_emits_by_timestamp_and_loops(tmp_path):
+    path = tmp_path / "rec.jsonl"
+    path.write_text("\n".join(json.dumps(r) for r in [
+        {"t": 10.0, "id": "R1", "state": "IDLE"},
+        {"t": 11.0, "id": "R1", "state": "MOVING"},
+        {"t": 12.0, "id": "R1", "state": "WELDING"},
+    ]), encoding="utf-8")
+    src = ReplaySource(str(path))
+    src.start()
+    assert [r["state"] for r in src.poll(now=100.0)] == ["IDLE"]
+    assert src.poll(now=100.5) == []
+    assert [r["state"] for r in src.poll(now=102.0)] == ["MOVING", "WELDING"]
+    # 第二輪在最後一筆之後一個取樣間隔從頭播放
+    assert [r["state"] for r in src.poll(now=103.1)] == ["IDLE"]
+    assert [r["state"] for r in src.poll(now=104.1)] == ["MOVING"]
+
+    once = ReplaySource(str(path), loop=False)
+    once.start()
+    assert len(once.poll(now=0.0) + once.poll(now=50.0)) == 3
+    assert once.poll(now=60.0) == []
+
+
+def test_conveyor_zone_metrics_occupancy():
+    m = ConveyorZoneMetrics()
+    m.on_event("enter", {"zone": "Reflow", "prim_path": "/World/PCB_0"})
+    m.on_event("enter", {"zone": "Reflow", "prim_path": "/World/PCB_1"})
+    m.on_event("exit", {"zone": "Reflow", "prim_path": "/World/PCB_0"})
+    assert m.pop_records() == [{"id": "Reflow", "status": "BUSY", "state": "MOVING", "occupancy": 1, "count": 2}]
+    assert m.pop_records() == []
+
+
+def test_local_http_source_queues_posts():
+    src = LocalHttpSource(port=0)
+    src.start()
+    try:
+        req = urllib.request.Request(
+            f"http://127.0.0.1:{src.port}/telemetry/AOI-1",
+            data=json.dumps({"status": "FAIL"}).encode(), method="POST",
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(req, timeout=5) as resp:
+            assert resp.status == 204
+        assert src.poll() == [{"status": "FAIL", "id": "AOI-1"}]
+    finally:
+        src.stop()
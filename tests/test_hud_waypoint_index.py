@@ -0,0 +1,84 @@
+import json
+import math
+import os
+import random
+import sys
+
+import pytest
+
+# 把包含 waypoint_index.py 的資料夾直接加到 sys.path（不經過需要 omni 的 __init__）
+EXT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'exts', 'tw.zin.smart_hud', 'smart_hud'))
+if EXT_DIR not in sys.path:
+    sys.path.insert(0, EXT_DIR)
+
+from waypoint_index import KDTree3, WaypointPauseIndex
+
+
+def _write_line(folder, name, waypoints):
+    with open(os.path.join(folder, name), "w", encoding="utf-8") as f:
+        json.dump({"speed": 50.0, "waypoints": waypoints}, f)
+
+
+def test_kdtree_matches_brute_force():
+    rng = random.Random(5)
+    pts = [(rng.uniform(-1e4, 1e4), rng.uniform(-1e4, 1e4), rng.uniform(0, 500)) for _ in range(400)]
+    tree = KDTree3(pts)
+    for _ in range(100):
+        q = (rng.uniform(-1e4, 1e4), rng.uniform(-1e4, 1e4), rng.uniform(0, 500))
+        idx, d = tree.nearest(q)
+        want = min(math.dist(p, q) for p in pts)
+        assert d == pytest.approx(want)
+        assert math.dist(pts[idx], q) == pytest.approx(want)
+
+
+def test_kdtree_max_distance_and_empty():
+    tree = KDTree3([(0, 0, 0)], ["origin"])
+    assert tree.nearest((3, 4, 0)) == ("origin", 5.0)
+    assert tree.nearest((3, 4, 0), max_distance=4.0) == (None, float("inf"))
+    assert KDTree3([]).nearest((0, 0, 0)) == (None, float("inf"))
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_index_rebuilds_only_when_folder_changes(tmp_path):
+    folder = str(tmp_path)
+    _write_line(folder, "Line_A.json", [
+        {"name": "WP_0", "pos": [0, 0, 0], "pause": 0.0},
+        {"name": "AOI", "pos": [1000, 0, 0], "pause": 12.5},
+    ])
+    (tmp_path / "notes.txt").write_text("ignored")
+    clock = _Clock()
+    index = WaypointPauseIndex(check_interval=2.0, clock=clock)
+
+    assert index.ensure_current(folder)
+    wp, d = index.nearest((990, 5, 0))
+    assert wp["name"] == "AOI" and wp["pause"] == 12.5 and wp["source"] == "Line_A.json"
+
+    # 間隔內不重新檢查；間隔後檔案沒變也不重建
+    assert not index.ensure_current(folder)
+    clock.now = 5.0
+    assert not index.ensure_current(folder)
+    assert index.rebuild_count == 1
+
+    _write_line(folder, "Line_B.json", [{"name": "Robot", "pos": [0, 3000, 0], "pause": 4.0}])
+    clock.now = 10.0
+    assert index.ensure_current(folder)
+    assert len(index) == 3
+    assert index.nearest((0, 2900, 0))[0]["name"] == "Robot"
+
+
+def test_index_tolerates_bad_files_and_missing_folder(tmp_path):
+    (tmp_path / "broken.json").write_text("{not json")
+    _write_line(str(tmp_path), "ok.json", [{"name": "A", "pos": [1, 2, 3]}, {"name": "no_pos"}])
+    index = WaypointPauseIndex()
+    index.ensure_current(str(tmp_path))
+    assert len(index) == 1
+
+    index.ensure_current(str(tmp_path / "missing"))
+    assert index.nearest((0, 0, 0)) == (None, float("inf"))
@@ -0,0 +1,116 @@
+import os
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pxr = pytest.importorskip("pxr")
+from pxr import Usd, UsdGeom
+
+# 把包含 live_measure.py 的資料夾直接加到 sys.path（不經過需要 omni 的 __init__）
+EXT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'exts', 'tw.zin.smart_measure', 'smart_measure'))
+if EXT_DIR not in sys.path:
+    sys.path.insert(0, EXT_DIR)
+
+from live_measure import FrameBudget, LiveSession
+from mesh_distance import BVHCache, mesh_set_distance
+
+_CUBE_POINTS = [(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0), (0, 0, 1), (1, 0, 1), (1, 1, 1), (0, 1, 1)]
+_CUBE_COUNTS = [4] * 6
+_CUBE_INDICES = [0, 3, 2, 1, 4, 5, 6, 7, 0, 1, 5, 4, 1, 2, 6, 5, 2, 3, 7, 6, 3, 0, 4, 7]
+
+
+def _stage():
+    stage = Usd.Stage.CreateInMemory()
+    UsdGeom.Xform.Define(stage, "/World")
+    for name, x, scale in (("Robot", 0.0, 1.0), ("Fixture", 3.0, 2.0), ("Other", 10.0, 1.0)):
+        xf = UsdGeom.Xform.Define(stage, f"/World/{name}")
+        xf.AddTranslateOp().Set((x, 0.0, 0.0))
+        mesh = UsdGeom.Mesh.Define(stage, f"/World/{name}/Body")
+        mesh.CreatePointsAttr([tuple(v * scale for v in p) for p in _CUBE_POINTS])
+        mesh.CreateFaceVertexCountsAttr(_CUBE_COUNTS)
+        mesh.CreateFaceVertexIndicesAttr(_CUBE_INDICES)
+    return stage
+
+
+def test_frame_budget_skips_frames_after_expensive_updates():
+    budget = FrameBudget(0.01)
+    assert budget.ready()
+    budget.spent(0.035)                 # 3.5 個預算：接下來跳過 3 個 frame
+    assert [budget.ready() for _ in range(5)] == [False, False, False, True, True]
+    budget.spent(0.002)
+    assert budget.ready()
+
+
+def test_drag_reuses_the_static_side():
+    stage = _stage()
+    bvh_cache = BVHCache()
+    session = LiveSession(bvh_cache)
+    session.attach(stage)
+    session.track(["/World/Robot", "/World/Fixture"])
+    robot, fixture = session.world_meshes("/World/Robot"), session.world_meshes("/World/Fixture")
+    assert mesh_set_distance(robot, fixture).distance == pytest.approx(2.0)
+    assert bvh_cache.builds == 2 and not session.dirty
+
+    # 與追蹤對象無關的變更不觸發量測
+    UsdGeom.Xformable(stage.GetPrimAtPath("/World/Other")).GetOrderedXformOps()[0].Set((20.0, 0.0, 0.0))
+    assert not session.dirty
+
+    op = UsdGeom.Xformable(stage.GetPrimAtPath("/World/Robot")).GetOrderedXformOps()[0]
+    for x in (0.5, 1.0, 1.5):
+        op.Set((x, 0.0, 0.0))
+        assert session.dirty
+        session.dirty = False
+        moved, static = session.world_meshes("/World/Robot"), session.world_meshes("/World/Fixture")
+        assert static[0] is fixture[0]               # 靜止的一邊沿用同一個 WorldMesh
+        assert mesh_set_distance(moved, static).distance == pytest.approx(2.0 - x)
+    assert bvh_cache.builds == 2 and bvh_cache.hits == 0
+
+
+def test_identical_meshes_share_the_bvh_and_keep_their_placements():
+    stage = _stage()
+    # Fixture 改成與 Robot 完全相同的幾何：兩者共用同一個 MeshBVH
+    UsdGeom.Mesh(stage.GetPrimAtPath("/World/Fixture/Body")).GetPointsAttr().Set(_CUBE_POINTS)
+    bvh_cache = BVHCache()
+    session = LiveSession(bvh_cache)
+    session.attach(stage)
+    session.track(["/World/Robot", "/World/Fixture"])
+    robot, fixture = session.world_meshes("/World/Robot"), session.world_meshes("/World/Fixture")
+    assert bvh_cache.builds == 1 and bvh_cache.hits == 1
+    assert mesh_set_distance(robot, fixture).distance == pytest.approx(2.0)
+
+    op = UsdGeom.Xformable(stage.GetPrimAtPath("/World/Robot")).GetOrderedXformOps()[0]
+    for x in (0.5, 1.0, 1.5):
+        op.Set((x, 0.0, 0.0))
+        session.dirty = False
+        moved, static = session.world_meshes("/World/Robot"), session.world_meshes("/World/Fixture")
+        assert static[0] is fixture[0]               # 共用 BVH 時靜止的一邊仍沿用同一個 WorldMesh
+        assert moved[0] is not robot[0]
+        assert mesh_set_distance(moved, static).distance == pytest.approx(2.0 - x)
+
+
+def test_geometry_change_recaptures_and_ancestor_moves_count():
+    stage = _stage()
+    bvh_cache = BVHCache()
+    session = LiveSession(bvh_cache)
+    session.attach(stage)
+    session.track(["/World/Robot", "/World/Fixture"])
+    before = session.world_meshes("/World/Fixture")
+    session.world_meshes("/World/Robot")
+
+    UsdGeom.Mesh(stage.GetPrimAtPath("/World/Fixture/Body")).GetPointsAttr().Set(
+        [tuple(v * 3.0 for v in p) for p in _CUBE_POINTS])
+    assert session.dirty
+    after = session.world_meshes("/World/Fixture")
+    assert after[0] is not before[0] and bvh_cache.builds == 3
+    assert after[0].bounds[1] == pytest.approx((6.0, 3.0, 3.0))
+
+    session.dirty = False
+    UsdGeom.Xformable(stage.GetPrimAtPath("/World")).AddTranslateOp().Set((0.0, 0.0, 1.0))
+    assert session.dirty                           # 祖先移動也會移動被追蹤的 prim
+    assert session.world_meshes("/World/Robot")[0].bounds[0] == pytest.approx((0.0, 0.0, 1.0))
+
+    session.detach()
+    session.dirty = False
+    UsdGeom.Xformable(stage.GetPrimAtPath("/World/Robot")).GetOrderedXformOps()[0].Set((1.0, 0.0, 0.0))
+    assert not session.dirty and not session.tracks("/World/Robot")
@@ -0,0 +1,104 @@
+import os
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+# 把包含 mass_properties.py 的資料夾直接加到 sys.path
+EXT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'exts', 'tw.zin.smart_measure', 'smart_measure'))
+if EXT_DIR not in sys.path:
+    sys.path.insert(0, EXT_DIR)
+
+from mass_properties import MassPropertiesCache, combine, compute_mass_properties, is_closed
+from mesh_distance import triangulate
+
+_CUBE_POINTS = np.array([(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0), (0, 0, 1), (1, 0, 1), (1, 1, 1), (0, 1, 1)], dtype=float)
+_CUBE_COUNTS = [4] * 6
+_CUBE_INDICES = [0, 3, 2, 1, 4, 5, 6, 7, 0, 1, 5, 4, 1, 2, 6, 5, 2, 3, 7, 6, 3, 0, 4, 7]
+
+
+def _matrix(scale=(1.0, 1.0, 1.0), translate=(0.0, 0.0, 0.0), angle=0.0):
+    """Row-vector 4x4: scale, then rotate about Z, then translate."""
+    c, s = np.cos(angle), np.sin(angle)
+    m = np.eye(4)
+    m[:3, :3] = np.diag(scale) @ np.array([[c, s, 0], [-s, c, 0], [0, 0, 1]])
+    m[3, :3] = translate
+    return m
+
+
+def test_box_volume_area_and_centroid():
+    box = compute_mass_properties(_CUBE_POINTS * (2, 3, 4) + 10, _CUBE_COUNTS, _CUBE_INDICES)
+    assert box.closed and box.open_meshes == 0
+    assert box.volume == pytest.approx(24.0)
+    assert box.area == pytest.approx(2 * (6 + 8 + 12))
+    assert box.centroid == pytest.approx((11.0, 11.5, 12.0))
+    # 反向的面 (normals 朝內) 體積仍為正
+    flipped = np.asarray(_CUBE_INDICES).reshape(6, 4)[:, ::-1].ravel()
+    assert compute_mass_properties(_CUBE_POINTS, _CUBE_COUNTS, flipped).volume == pytest.approx(1.0)
+
+
+def test_concave_ngon_prism():
+    # L 形六邊形擠出成柱：上下兩個凹 n-gon + 6 個側面
+    outline = [(0, 0), (2, 0), (2, 1), (1, 1), (1, 2), (0, 2)]
+    points = [(x, y, 0.0) for x, y in outline] + [(x, y, 3.0) for x, y in outline]
+    counts = [6, 6] + [4] * 6
+    indices = list(range(5, -1, -1)) + list(range(6, 12))
+    for i in range(6):
+        j = (i + 1) % 6
+        indices += [i, j, j + 6, i + 6]
+    props = compute_mass_properties(points, counts, indices)
+    assert props.closed
+    assert props.volume == pytest.approx(3.0 * 3)
+    assert props.area == pytest.approx(2 * 3 + 8 * 3)
+    assert props.centroid == pytest.approx((5 / 6, 5 / 6, 1.5))
+
+
+def test_open_mesh_is_flagged():
+    tris = triangulate(_CUBE_COUNTS[:5], _CUBE_INDICES[:20])     # 少了 x = 0 那一面
+    assert is_closed(triangulate(_CUBE_COUNTS, _CUBE_INDICES)) and not is_closed(tris)
+    side_off = compute_mass_properties(_CUBE_POINTS, _CUBE_COUNTS[:5], _CUBE_INDICES[:20])
+    assert not side_off.closed and side_off.open_meshes == 1
+    assert side_off.area == pytest.approx(5.0)
+    assert side_off.centroid == pytest.approx((0.6, 0.5, 0.5))    # 面積加權
+
+    cube = compute_mass_properties(_CUBE_POINTS, _CUBE_COUNTS, _CUBE_INDICES)
+    total = combine([cube, side_off._replace(centroid=(5.5, 0.5, 0.4))])
+    assert not total.closed and total.meshes == 2 and total.open_meshes == 1
+    assert total.area == pytest.approx(11.0)
+    assert total.centroid == pytest.approx(cube.centroid)        # 只以封閉 mesh 的體積加權
+
+
+def test_split_vertex_cube_is_closed():
+    # 每個面各自一份頂點 (匯出 normals / UV 時常見)：24 個 points、6 個 quad
+    points = np.asarray(_CUBE_POINTS)[_CUBE_INDICES]
+    indices = list(range(24))
+    assert not is_closed(triangulate(_CUBE_COUNTS, indices))              # 只看 index 是開放的
+    assert is_closed(triangulate(_CUBE_COUNTS, indices), points)
+    props = compute_mass_properties(points, _CUBE_COUNTS, indices)
+    assert props.closed and props.open_meshes == 0
+    assert props.volume == pytest.approx(1.0)
+    assert props.area == pytest.approx(6.0)
+    assert props.centroid == pytest.approx((0.5, 0.5, 0.5))
+    # 浮點誤差範圍內的位置也會合併
+    jittered = points + np.random.default_rng(0).uniform(-1e-9, 1e-9, points.shape)
+    assert compute_mass_properties(jittered, _CUBE_COUNTS, indices).closed
+
+
+def test_cache_and_transforms():
+    cache = MassPropertiesCache()
+    rigid = _matrix(scale=(2, 2, 2), translate=(5, 0, 0), angle=0.7)
+    placed = cache.get(_CUBE_POINTS, _CUBE_COUNTS, _CUBE_INDICES, rigid)
+    assert placed.volume == pytest.approx(8.0) and placed.area == pytest.approx(24.0)
+    expected = compute_mass_properties(_CUBE_POINTS @ rigid[:3, :3] + rigid[3, :3], _CUBE_COUNTS, _CUBE_INDICES)
+    assert placed.centroid == pytest.approx(expected.centroid)
+    for angle in (0.0, 1.0, 2.0):
+        cache.get(_CUBE_POINTS, _CUBE_COUNTS, _CUBE_INDICES, _matrix(translate=(angle, 0, 0), angle=angle))
+    assert cache.computed == 1 and cache.hits == 3
+
+    # 非等比縮放：在世界座標重算，並以 transform 快取
+    stretch = _matrix(scale=(1, 2, 3), angle=0.3)
+    for _ in range(2):
+        props = cache.get(_CUBE_POINTS, _CUBE_COUNTS, _CUBE_INDICES, stretch)
+    assert props.volume == pytest.approx(6.0) and props.area == pytest.approx(2 * (2 + 3 + 6))
+    assert cache.computed == 2 and len(cache) == 2
@@ -0,0 +1,120 @@
+import math
+import os
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+# 把包含 mesh_distance.py 的資料夾直接加到 sys.path
+EXT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'exts', 'tw.zin.smart_measure', 'smart_measure'))
+if EXT_DIR not in sys.path:
+    sys.path.insert(0, EXT_DIR)
+
+from mesh_distance import (BVHCache, MeshBVH, closest_points_on_triangles, mesh_distance, mesh_set_distance,
+                           triangle_distances, triangulate)
+
+
+def _cube(size=1.0):
+    """Unit cube as 6 quads (faceVertexCounts / faceVertexIndices)."""
+    s = size
+    points = [(0, 0, 0), (s, 0, 0), (s, s, 0), (0, s, 0), (0, 0, s), (s, 0, s), (s, s, s), (0, s, s)]
+    counts = [4] * 6
+    indices = [0, 3, 2, 1, 4, 5, 6, 7, 0, 1, 5, 4, 1, 2, 6, 5, 2, 3, 7, 6, 3, 0, 4, 7]
+    return np.array(points, dtype=np.float64), counts, indices
+
+
+def _translate(x, y, z):
+    m = np.eye(4)
+    m[3, :3] = (x, y, z)
+    return m
+
+
+def _rotate_z(deg):
+    c, s = math.cos(math.radians(deg)), math.sin(math.radians(deg))
+    m = np.eye(4)
+    m[0, :2] = (c, s)
+    m[1, :2] = (-s, c)
+    return m
+
+
+def _brute_force(world_a, world_b):
+    ta, tb = world_a.corners, world_b.corners
+    ia = np.repeat(np.arange(len(ta)), len(tb))
+    ib = np.tile(np.arange(len(tb)), len(ta))
+    dist, _, _ = triangle_distances(ta[ia], tb[ib])
+    return float(dist.min())
+
+
+def test_triangulate_fans_ngons_and_drops_degenerate_faces():
+    tris = triangulate([3, 4, 2, 5], [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13])
+    assert tris.tolist() == [[0, 1, 2], [3, 4, 5], [3, 5, 6], [9, 10, 11], [9, 11, 12], [9, 12, 13]]
+    with pytest.raises(ValueError):
+        triangulate([4], [0, 1, 2])
+
+
+def test_rotated_cubes_use_true_geometry_not_aabbs():
+    points, counts, indices = _cube()
+    bvh = MeshBVH(points, triangulate(counts, indices))
+    a = bvh.to_world()
+    # 以中心繞 Z 旋轉 45° 的方塊，最近點是它的角 (calculate_gap 的中心距離為 2.0)
+    b = MeshBVH(points, triangulate(counts, indices)).to_world(
+        _translate(-0.5, -0.5, 0.0) @ _rotate_z(45) @ _translate(2.5, 0.5, 0.0))
+    r = mesh_distance(a, b)
+    half_diag = math.sqrt(2) / 2
+    assert r.distance == pytest.approx(1.5 - half_diag)
+    assert r.point_a[:2] == pytest.approx((1.0, 0.5)) and r.point_b[:2] == pytest.approx((2.5 - half_diag, 0.5))
+    assert math.dist(r.point_a, r.point_b) == pytest.approx(r.distance)
+
+
+def test_intersecting_meshes_report_zero_distance():
+    points, counts, indices = _cube()
+    bvh = MeshBVH(points, triangulate(counts, indices))
+    other = MeshBVH(points, triangulate(counts, indices))
+    r = mesh_distance(bvh.to_world(), other.to_world(_translate(0.5, 0.5, 0.5)))
+    assert r.distance == 0.0
+    assert r.point_a == r.point_b
+
+
+def test_bvh_matches_brute_force_on_random_soup():
+    rng = np.random.default_rng(7)
+    for seed in range(5):
+        pa = rng.uniform(0, 10, (150, 3))
+        pb = rng.uniform(0, 10, (150, 3)) + (12.0, rng.uniform(-3, 3), 0.0)
+        ta = rng.integers(0, 150, (100, 3))
+        tb = rng.integers(0, 150, (100, 3))
+        a = MeshBVH(pa, ta, leaf_size=4).to_world()
+        b = MeshBVH(pb, tb, leaf_size=4).to_world(_rotate_z(seed * 20.0))
+        r = mesh_distance(a, b)
+        assert r.distance == pytest.approx(_brute_force(a, b))
+        # 回傳的三角形編號指向原始 (未排序) 的三角形，最近點落在該三角形上
+        tri = pa[ta[r.triangle_a]]
+        p = np.array([r.point_a])
+        on_tri = closest_points_on_triangles(p, tri[None, 0], tri[None, 1], tri[None, 2])
+        assert on_tri[0] == pytest.approx(p[0])
+
+
+def test_cache_reuses_bvh_and_last_placement():
+    points, counts, indices = _cube()
+    cache = BVHCache()
+    bvh = cache.get(points, counts, indices)
+    assert cache.get(points.copy(), list(counts), list(indices)) is bvh
+    assert cache.builds == 1 and cache.hits == 1
+    moved = points.copy()
+    moved[0, 0] = -1.0
+    assert cache.get(moved, counts, indices) is not bvh
+
+    world = bvh.to_world(_translate(1, 0, 0))
+    assert bvh.to_world(_translate(1, 0, 0)) is world
+    lo, hi = bvh.to_world(_translate(5, 0, 0)).bounds
+    assert lo.tolist() == [5, 0, 0] and hi.tolist() == [6, 1, 1]
+
+
+def test_mesh_set_distance_picks_the_closest_pair():
+    points, counts, indices = _cube()
+    bvh = BVHCache().get(points, counts, indices)
+    group_a = [MeshBVH(points, triangulate(counts, indices)).to_world(_translate(x, 0, 0)) for x in (0.0, 3.0)]
+    group_b = [bvh.to_world(_translate(10.0, 0, 0)), MeshBVH(points, triangulate(counts, indices)).to_world(_translate(4.5, 0, 0))]
+    r = mesh_set_distance(group_a, group_b)
+    assert r.distance == pytest.approx(0.5) and (r.mesh_a, r.mesh_b) == (1, 1)
+    assert mesh_set_distance([], group_b) is None
@@ -0,0 +1,94 @@
+import math
+import os
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+# 把包含 obb.py 的資料夾直接加到 sys.path
+EXT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'exts', 'tw.zin.smart_measure', 'smart_measure'))
+if EXT_DIR not in sys.path:
+    sys.path.insert(0, EXT_DIR)
+
+from obb import OBB, OBBCache, compute_obb, convex_hull_2d, min_area_rectangle, obb_distance, points_key
+
+
+def _rot_z(deg):
+    c, s = math.cos(math.radians(deg)), math.sin(math.radians(deg))
+    return np.array([[c, s, 0.0], [-s, c, 0.0], [0.0, 0.0, 1.0]])
+
+
+def _board(length=30.0, width=20.0, height=1.6, deg=30.0, offset=(0.0, 0.0, 0.0)):
+    """Box corners plus random interior points, rotated about Z (row-vector convention)."""
+    rng = np.random.default_rng(1)
+    half = np.array([length, width, height]) / 2.0
+    signs = np.array([[sx, sy, sz] for sx in (-1, 1) for sy in (-1, 1) for sz in (-1, 1)])
+    pts = np.vstack([signs * half, rng.uniform(-half, half, (500, 3))])
+    return pts @ _rot_z(deg) + np.asarray(offset)
+
+
+def test_hull_and_calipers():
+    rng = np.random.default_rng(0)
+    square = np.array([[0, 0], [1, 0], [1, 1], [0, 1]], dtype=float)
+    pts = np.vstack([square, rng.uniform(0.01, 0.99, (200, 2))])
+    hull = convex_hull_2d(pts)
+    assert sorted(map(tuple, hull.tolist())) == sorted(map(tuple, square.tolist()))
+    # 旋轉 30° 的矩形：最小面積矩形回到原本的面積與方向
+    rect = np.array([[0, 0], [4, 0], [4, 1], [0, 1]], dtype=float) @ _rot_z(30)[:2, :2]
+    direction, area = min_area_rectangle(rect)
+    assert area == pytest.approx(4.0)
+    # 方向可以是矩形的任一邊
+    cos = abs(direction @ np.array([math.cos(math.radians(30)), math.sin(math.radians(30))]))
+    assert min(cos, 1.0 - cos) == pytest.approx(0.0, abs=1e-9)
+
+
+def test_rotated_board_reports_true_dimensions():
+    pts = _board()
+    aabb = np.ptp(pts, axis=0)
+    assert aabb[0] > 35.0                            # 世界 AABB 被放大
+    box = compute_obb(pts)
+    assert box.dimensions() == pytest.approx((30.0, 20.0, 1.6))
+    assert box.volume == pytest.approx(30.0 * 20.0 * 1.6)
+    assert np.linalg.det(box.axes) == pytest.approx(1.0)
+    # 每個點都在 OBB 內
+    assert np.allclose(box.closest_points(pts), pts)
+
+
+def test_flat_and_degenerate_inputs():
+    plate = _board(height=0.0)
+    assert compute_obb(plate).dimensions() == pytest.approx((30.0, 20.0, 0.0))
+    single = compute_obb([[1.0, 2.0, 3.0]])
+    assert single.size.tolist() == [0.0, 0.0, 0.0] and single.center.tolist() == [1.0, 2.0, 3.0]
+    assert compute_obb(np.zeros((0, 3))) is None
+
+
+def test_obb_distance_between_rotated_boxes():
+    a = OBB([0.0, 0.0, 0.0], np.eye(3), [1.0, 1.0, 1.0])
+    # 繞 Z 旋轉 45° 的立方體，角朝向 a 的 +X 面
+    b = OBB([4.0, 0.0, 0.0], _rot_z(45), [1.0, 1.0, 1.0])
+    d, pa, pb = obb_distance(a, b)
+    assert d == pytest.approx(3.0 - math.sqrt(2.0), abs=1e-9)
+    assert pa[0] == pytest.approx(1.0) and pb[0] == pytest.approx(4.0 - math.sqrt(2.0))
+    assert math.dist(pa, pb) == pytest.approx(d, abs=1e-9)
+    # 重疊或包含時為 0
+    assert obb_distance(a, OBB([0.5, 0.0, 0.0], _rot_z(10), [0.2, 0.2, 0.2]))[0] == pytest.approx(0.0, abs=1e-9)
+    assert obb_distance(a, OBB([1.5, 1.5, 0.0], _rot_z(0), [1.0, 1.0, 1.0]))[0] == pytest.approx(0.0, abs=1e-9)
+
+
+def test_cache_keys_on_points_and_transform():
+    cache = OBBCache()
+    pts = _board()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return compute_obb(pts)
+
+    key = (points_key(pts, np.eye(4)),)
+    box = cache.get("/World/Board", key, compute)
+    assert cache.get("/World/Board", (points_key(pts.copy(), np.eye(4)),), compute) is box
+    moved = np.eye(4)
+    moved[3, 0] = 5.0
+    cache.get("/World/Board", (points_key(pts, moved),), compute)
+    assert len(calls) == 2 and cache.hits == 1